@@ -13,6 +13,15 @@ USE_REDIS_CACHE = True  # Change to True to use Redis Cache
 # Postgres
 USE_POSTGRES_DB = True  # Change to True to use Posgres DB
 
+# Database engine, each overridden by the environment variable of the same name
+DB_ECHO = False  # Log every SQL statement
+DB_POOL_SIZE = 5  # Connections kept open
+DB_MAX_OVERFLOW = 10  # Connections opened beyond DB_POOL_SIZE under load, closed when returned
+DB_POOL_TIMEOUT = 30.0  # Seconds to wait for a connection before failing the request
+DB_POOL_RECYCLE = 1800  # Seconds after which a connection is replaced, -1 to keep it forever
+DB_POOL_PRE_PING = False  # Test every connection on checkout, at the cost of a round trip
+DB_SQLITE_POOL = "queue"  # SQLite pool: queue, static (one connection) or null (a connection per checkout)
+
 
 DESCRIPTION = """
 This API is the backend of the student management system.\n
@@ -4,28 +4,37 @@ from dotenv import load_dotenv
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
-from fastapi.responses import FileResponse
+from fastapi import Body, FastAPI, Query
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.inmemory import InMemoryBackend
 # from fastapi_cache.coder import PickleCoder
 from fastapi_cache.decorator import cache
 
-from typing import Union, Optional, Type, Any
+from typing import List, Union, Optional, Type, Any
 from utils.student import Student
 from utils.instructor import Instructor
 from utils.course import Course
 from utils.enrollment import Enrollment
+from utils.enums.department import Department
+from utils.enums.grade import Grade
+from utils.enums.major import Major
 
+from utils.batch import MAX_BATCH_SIZE, ItemOutcome, create_rows, delete_rows, update_rows
+from utils.export import ExportFormat, export_rows
 from utils.logging import logging
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, page_statement, split_page
+from utils.pool import PoolStats, engine_options, pool_stats
+from utils.search import create_search_indexes, search_statement
+from utils.writes import write_row
 
 from sqlmodel import SQLModel, select
 from sqlmodel.sql.expression import SelectOfScalar
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from sqlalchemy.ext.asyncio import create_async_engine
-from sqlalchemy import Engine
+from sqlalchemy import Connection, Engine
 
 from typing import Dict
 
@@ -45,6 +54,17 @@ sms_resource: Dict[str,
                    Union[Engine, logging.Logger]] = {}
 
 
+def create_missing_indexes(connection: Connection) -> None:
+    """
+    Creates the indexes declared on the models that the database lacks. `create_all` skips tables
+    that already exist, indexes included.
+    """
+
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
 @asynccontextmanager
 async def lifespan(_: FastAPI) -> AsyncIterator[None]:
     # Cache
@@ -72,15 +92,17 @@ async def lifespan(_: FastAPI) -> AsyncIterator[None]:
         # Allow a single connection to be accessed from multiple threads.
         connect_args = {"check_same_thread": False}
 
-    # Define the async engine
+    # Define the async engine, its pool and echo configured by the DB_* settings of config and env
     engine = create_async_engine(
-        DATABASE_URL, echo=True, connect_args=connect_args)
+        DATABASE_URL, connect_args=connect_args, **engine_options(DATABASE_URL))
 
     sms_resource["engine"] = engine
 
-    # Startup actions: create database tables
+    # Startup actions: create database tables, the indexes added since they were created and the name search indexes
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(create_missing_indexes)
+        await create_search_indexes(conn)
 
     # Logger
     logger = logging.getLogger(__name__)
@@ -128,9 +150,25 @@ class EndpointResponse(SQLModel):
     execution_msg: str
     execution_code: int
     result: ResultItem
+    # Cursor of the next page of a paginated list, None on the last page
+    next_cursor: Optional[str] = None
     # result: Any
 
 
+class BatchResponse(SQLModel):
+    execution_msg: str
+    execution_code: int
+    # Outcome of every item of the batch, in the order they were sent
+    result: List[ItemOutcome]
+
+
+class PoolResponse(SQLModel):
+    execution_msg: str
+    execution_code: int
+    # Live statistics of the database connection pool
+    result: PoolStats
+
+
 class ErrorResponse(SQLModel):
     execution_msg: str
     execution_code: int
@@ -145,7 +183,18 @@ async def status_check():
     return {"Status": "API is online..."}
 
 
-async def endpoint_output(endpoint_result: ResultItem, code: int = 0, error: str = None) -> Union[ErrorResponse, EndpointResponse]:
+# Pool statistics endpoint: connections checked out, waiters and wait times, never cached
+@app.get('/api/v1/sms/pool', tags=['Home'])
+async def database_pool() -> Union[ErrorResponse, PoolResponse]:
+    try:
+        stats = pool_stats(sms_resource["engine"].pool)
+    except ValueError as e:
+        return ErrorResponse(execution_msg='Execution failed', execution_code=0, error=str(e))
+
+    return PoolResponse(execution_msg='Execution was successful', execution_code=1, result=stats)
+
+
+async def endpoint_output(endpoint_result: ResultItem, code: int = 0, error: str = None, next_cursor: Optional[str] = None) -> Union[ErrorResponse, EndpointResponse]:
     msg = 'Execution failed'
     output = ErrorResponse(**{'execution_msg': msg,
                               'execution_code': code, 'error': error})
@@ -155,7 +204,7 @@ async def endpoint_output(endpoint_result: ResultItem, code: int = 0, error: str
             msg = 'Execution was successful'
             output = EndpointResponse(
                 **{'execution_msg': msg,
-                   'execution_code': code, 'result': endpoint_result}
+                   'execution_code': code, 'result': endpoint_result, 'next_cursor': next_cursor}
             )
 
     except Exception as e:
@@ -172,44 +221,63 @@ async def endpoint_output(endpoint_result: ResultItem, code: int = 0, error: str
 
 
 # Caching Post requests is challenging
+# Every write is a single statement, see `utils.writes`
 async def sms_posts(instance: ResultItem, idx: str = None, action: str = "add") -> Union[ErrorResponse, EndpointResponse]:
-    async with AsyncSession(sms_resource["engine"]) as session:
-        code = 1
-        error = None
-        result = None
-        existing = await session.get(instance.__class__, idx)
+    code = 1
+    error = None
+    result = None
 
-        # For add action, do db operation if instance is not existing. Other actions, do db operation if instance exists in db
-        checker = existing is None if action == "add" else existing is not None
+    try:
+        result = await write_row(sms_resource["engine"], instance, idx, action)
+    except Exception as e:
+        code = 0
+        error = str(e)
 
-        try:
-            if checker:
-                if action == "delete":
-                    await session.delete(existing)  # Asynchronous
-                    await session.commit()
-                else:  # add or update use add
-                    session.add(instance)  # Not asynchronous
-                    await session.commit()
-                    await session.refresh(instance)
-                    result = instance
-        except Exception as e:
-            code = 0
-            error = str(e)
+    finally:
+        return await endpoint_output(result, code, error)
+
+
+# Batches are written by a few set-based statements in one transaction, see `utils.batch`
+async def sms_batch(sms_class: Type[Result], items: List[Any], action: str = "add") -> Union[ErrorResponse, BatchResponse]:
+    write = {"add": create_rows, "update": update_rows,
+             "delete": delete_rows}[action]
+
+    try:
+        async with sms_resource["engine"].begin() as connection:
+            outcomes = await write(connection, sms_class, items)
+    except Exception as e:
+        return await endpoint_output(None, 0, str(e))
+
+    return BatchResponse(execution_msg='Execution was successful', execution_code=1, result=outcomes)
 
-        finally:
-            return await endpoint_output(result, code, error)
+
+# Items of a batch request, or the IDs of a batch delete
+BatchBody = Body(max_length=MAX_BATCH_SIZE)
 
 
 # @cache(expire=ONE_DAY_SEC, namespace='sms_gets')  # Cache for 1 day
-async def sms_gets(sms_class: Type[Result], action: str = "first", idx: str = None, stmt: SelectOfScalar[Type[Result]] = None) -> Union[ErrorResponse, EndpointResponse]:
+async def sms_gets(sms_class: Type[Result], action: str = "first", idx: str = None, stmt: SelectOfScalar[Type[Result]] = None,
+                   limit: Optional[int] = None, after: Optional[str] = None) -> Union[ErrorResponse, EndpointResponse]:
     async with AsyncSession(sms_resource["engine"]) as session:
         code = 1
         error = None
         result = None
+        next_cursor = None
         try:
             if action == "all":
                 statement = select(sms_class) if stmt is None else stmt
+
+                # Lists read one page at a time in primary key order, see `utils.pagination`
+                if limit is not None:
+                    statement = page_statement(
+                        statement, sms_class, limit, after)
+
                 instance_list = (await session.exec(statement)).all()
+
+                if limit is not None:
+                    instance_list, next_cursor = split_page(
+                        instance_list, limit)
+
                 if instance_list:
                     result = {
                         str(instance.id): instance for instance in instance_list}
@@ -222,7 +290,22 @@ async def sms_gets(sms_class: Type[Result], action: str = "first", idx: str = No
             code = 0
             error = str(e)
         finally:
-            return await endpoint_output(result, code, error)
+            return await endpoint_output(result, code, error, next_cursor)
+
+
+# Whole tables are streamed rather than read through `sms_gets`, see `utils.export`
+def sms_exports(sms_class: Type[Result], format: ExportFormat, compress: bool) -> StreamingResponse:
+    file_name = f"{sms_class.__tablename__}.{format.value}" + \
+        (".gz" if compress else "")
+
+    return StreamingResponse(export_rows(sms_resource["engine"], sms_class, format, compress),
+                             media_type="application/gzip" if compress else format.media_type,
+                             headers={"Content-Disposition": "attachment; filename=" + file_name})
+
+
+# Page size and cursor of the list endpoints
+PageLimit = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+PageAfter = Query(default=None, description="The next_cursor of the previous page")
 
 
 # Student Routes
@@ -242,14 +325,48 @@ async def delete_student(student: Student) -> Union[ErrorResponse, EndpointRespo
     return await sms_posts(student, student.id, action="delete")
 
 
+@app.post('/api/v1/sms/add_students', tags=['Student'])
+async def add_students(students: List[Student] = BatchBody) -> Union[ErrorResponse, BatchResponse]:
+    return await sms_batch(Student, students, action="add")
+
+
+@app.put('/api/v1/sms/update_students', tags=['Student'])
+async def update_students(students: List[Student] = BatchBody) -> Union[ErrorResponse, BatchResponse]:
+    return await sms_batch(Student, students, action="update")
+
+
+@app.delete('/api/v1/sms/delete_students', tags=['Student'])
+async def delete_students(ids: List[str] = BatchBody) -> Union[ErrorResponse, BatchResponse]:
+    return await sms_batch(Student, ids, action="delete")
+
+
 @app.get("/api/v1/sms/students/{id}", tags=['Student'])
 async def find_student(id: str) -> Union[ErrorResponse, EndpointResponse]:
     return await sms_gets(Student, "first", id)
 
 
 @app.get("/api/v1/sms/students", tags=['Student'])
-async def all_students() -> Union[ErrorResponse, EndpointResponse]:
-    return await sms_gets(Student, "all")
+async def all_students(major: Optional[Major] = None, limit: int = PageLimit, after: Optional[str] = PageAfter) -> Union[ErrorResponse, EndpointResponse]:
+    # Filters are served by the indexes declared on the models
+    stmt = select(Student)
+
+    if major is not None:
+        stmt = stmt.where(Student.major == major)
+
+    return await sms_gets(Student, "all", stmt=stmt, limit=limit, after=after)
+
+
+@app.get("/api/v1/sms/export/students", tags=['Student'])
+async def export_students(format: ExportFormat = ExportFormat.NDJSON, gzip: bool = False) -> StreamingResponse:
+    return sms_exports(Student, format, gzip)
+
+
+# Name search, best matches first, backed by the indexes of `utils.search`
+@app.get("/api/v1/sms/search/students", tags=['Student'])
+async def search_students(query: str, limit: int = Query(default=10, ge=1, le=100)) -> Union[ErrorResponse, EndpointResponse]:
+    stmt = search_statement(Student, query, limit,
+                            sms_resource["engine"].dialect.name)
+    return await sms_gets(Student, "all", stmt=stmt)
 
 
 # Instructor Routes
@@ -269,14 +386,46 @@ async def delete_instructor(instructor: Instructor) -> Union[ErrorResponse, Endp
     return await sms_posts(instructor, instructor.id, action="delete")
 
 
+@app.post('/api/v1/sms/add_instructors', tags=['Instructor'])
+async def add_instructors(instructors: List[Instructor] = BatchBody) -> Union[ErrorResponse, BatchResponse]:
+    return await sms_batch(Instructor, instructors, action="add")
+
+
+@app.put('/api/v1/sms/update_instructors', tags=['Instructor'])
+async def update_instructors(instructors: List[Instructor] = BatchBody) -> Union[ErrorResponse, BatchResponse]:
+    return await sms_batch(Instructor, instructors, action="update")
+
+
+@app.delete('/api/v1/sms/delete_instructors', tags=['Instructor'])
+async def delete_instructors(ids: List[str] = BatchBody) -> Union[ErrorResponse, BatchResponse]:
+    return await sms_batch(Instructor, ids, action="delete")
+
+
 @app.get("/api/v1/sms/instructors/{id}", tags=['Instructor'])
 async def find_instructor(id: str) -> Union[ErrorResponse, EndpointResponse]:
     return await sms_gets(Instructor, "first", id)
 
 
 @app.get("/api/v1/sms/instructors", tags=['Instructor'])
-async def all_instructors() -> Union[ErrorResponse, EndpointResponse]:
-    return await sms_gets(Instructor, "all")
+async def all_instructors(department: Optional[Department] = None, limit: int = PageLimit, after: Optional[str] = PageAfter) -> Union[ErrorResponse, EndpointResponse]:
+    stmt = select(Instructor)
+
+    if department is not None:
+        stmt = stmt.where(Instructor.department == department)
+
+    return await sms_gets(Instructor, "all", stmt=stmt, limit=limit, after=after)
+
+
+@app.get("/api/v1/sms/export/instructors", tags=['Instructor'])
+async def export_instructors(format: ExportFormat = ExportFormat.NDJSON, gzip: bool = False) -> StreamingResponse:
+    return sms_exports(Instructor, format, gzip)
+
+
+@app.get("/api/v1/sms/search/instructors", tags=['Instructor'])
+async def search_instructors(query: str, limit: int = Query(default=10, ge=1, le=100)) -> Union[ErrorResponse, EndpointResponse]:
+    stmt = search_statement(Instructor, query, limit,
+                            sms_resource["engine"].dialect.name)
+    return await sms_gets(Instructor, "all", stmt=stmt)
 
 
 # Course Routes
@@ -296,14 +445,34 @@ async def delete_student(course: Course) -> Union[ErrorResponse, EndpointRespons
     return await sms_posts(course, course.id, action="delete")
 
 
+@app.post('/api/v1/sms/add_courses', tags=['Course'])
+async def add_courses(courses: List[Course] = BatchBody) -> Union[ErrorResponse, BatchResponse]:
+    return await sms_batch(Course, courses, action="add")
+
+
+@app.put('/api/v1/sms/update_courses', tags=['Course'])
+async def update_courses(courses: List[Course] = BatchBody) -> Union[ErrorResponse, BatchResponse]:
+    return await sms_batch(Course, courses, action="update")
+
+
+@app.delete('/api/v1/sms/delete_courses', tags=['Course'])
+async def delete_courses(ids: List[str] = BatchBody) -> Union[ErrorResponse, BatchResponse]:
+    return await sms_batch(Course, ids, action="delete")
+
+
 @app.get("/api/v1/sms/courses/{id}", tags=['Course'])
 async def find_course(id: str) -> Union[ErrorResponse, EndpointResponse]:
     return await sms_gets(Course, "first", id)
 
 
 @app.get("/api/v1/sms/courses", tags=['Course'])
-async def all_courses() -> Union[ErrorResponse, EndpointResponse]:
-    return await sms_gets(Course, "all")
+async def all_courses(limit: int = PageLimit, after: Optional[str] = PageAfter) -> Union[ErrorResponse, EndpointResponse]:
+    return await sms_gets(Course, "all", limit=limit, after=after)
+
+
+@app.get("/api/v1/sms/export/courses", tags=['Course'])
+async def export_courses(format: ExportFormat = ExportFormat.NDJSON, gzip: bool = False) -> StreamingResponse:
+    return sms_exports(Course, format, gzip)
 
 
 # Enroll Routes
@@ -323,6 +492,21 @@ async def delete_enrolled_student(enrollment: Enrollment) -> Union[ErrorResponse
     return await sms_posts(enrollment, enrollment.id, action="delete")
 
 
+@app.post('/api/v1/sms/enroll_students', tags=['Enroll'])
+async def enroll_students(enrollments: List[Enrollment] = BatchBody) -> Union[ErrorResponse, BatchResponse]:
+    return await sms_batch(Enrollment, enrollments, action="add")
+
+
+@app.put('/api/v1/sms/update_enrolled_students', tags=['Enroll'])
+async def update_enrolled_students(enrollments: List[Enrollment] = BatchBody) -> Union[ErrorResponse, BatchResponse]:
+    return await sms_batch(Enrollment, enrollments, action="update")
+
+
+@app.delete('/api/v1/sms/delete_enrolled_students', tags=['Enroll'])
+async def delete_enrolled_students(ids: List[str] = BatchBody) -> Union[ErrorResponse, BatchResponse]:
+    return await sms_batch(Enrollment, ids, action="delete")
+
+
 @app.get('/api/v1/sms/enrollments/{id}', tags=['Enroll'])
 async def find_enrollment_by_id(id: str) -> Union[ErrorResponse, EndpointResponse]:
     return await sms_gets(Enrollment, "first", id)
@@ -335,10 +519,28 @@ async def find_enrollment_by_student_id(student_id: str) -> Union[ErrorResponse,
 
 
 @app.get('/api/v1/sms/enrollments', tags=['Enroll'])
-async def all_enrolled_students() -> Union[ErrorResponse, EndpointResponse]:
-    return await sms_gets(Enrollment, "all")
+async def all_enrolled_students(grade: Optional[Grade] = None, course_id: Optional[str] = None, limit: int = PageLimit, after: Optional[str] = PageAfter) -> Union[ErrorResponse, EndpointResponse]:
+    stmt = select(Enrollment)
+
+    if grade is not None:
+        stmt = stmt.where(Enrollment.grade == grade)
+
+    if course_id is not None:
+        stmt = stmt.where(Enrollment.course_id == course_id)
+
+    return await sms_gets(Enrollment, "all", stmt=stmt, limit=limit, after=after)
+
+
+@app.get("/api/v1/sms/export/enrollments", tags=['Enroll'])
+async def export_enrollments(format: ExportFormat = ExportFormat.NDJSON, gzip: bool = False) -> StreamingResponse:
+    return sms_exports(Enrollment, format, gzip)
 
 
 @app.put('/api/v1/sms/grade_student', tags=['Grade'])
 async def assign_grade(enrollment: Enrollment) -> Union[ErrorResponse, EndpointResponse]:
     return await sms_posts(enrollment, enrollment.id, action="update")
+
+
+@app.put('/api/v1/sms/grade_students', tags=['Grade'])
+async def assign_grades(enrollments: List[Enrollment] = BatchBody) -> Union[ErrorResponse, BatchResponse]:
+    return await sms_batch(Enrollment, enrollments, action="update")
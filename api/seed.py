@@ -0,0 +1,156 @@
+"""
+Fills the API database with a synthetic institution from `utils.generator`, in bulk.
+
+Rows are handed straight to the driver's executemany, chunk by chunk, bypassing the ORM, the model
+validators and SQLAlchemy's per-row parameter processing, so a million enrollments take seconds. The same seed always produces the
+same institution.
+
+Run from the api directory:
+    python seed.py --students 250000 --seed 42
+    python seed.py --students 250000 --url sqlite+aiosqlite:///sms.db --reset
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import Any, List, Sequence, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlmodel import SQLModel
+
+from config import ENV_PATH, USE_POSTGRES_DB
+from utils.course import Course
+from utils.enrollment import Enrollment
+from utils.enums.course_name_id import CourseNameId
+from utils.generator import InstitutionGenerator
+from utils.ids import new_ids
+from utils.instructor import Instructor
+from utils.search import create_search_indexes
+from utils.student import Student
+
+
+# Rows per executemany call
+BATCH_SIZE = 10_000
+
+
+def placeholder(paramstyle: str, position: int) -> str:
+    """
+    Returns the positional placeholder of a DB-API parameter style, `position` starting at 1.
+    """
+
+    if paramstyle == "qmark":
+        return "?"
+
+    if paramstyle == "numeric":
+        return f":{position}"
+
+    if paramstyle == "numeric_dollar":
+        return f"${position}"
+
+    return "%s"
+
+
+async def insert_rows(connection: AsyncConnection, table: Any, columns: Sequence[str], rows: List[Tuple[Any, ...]]) -> None:
+    """
+    Inserts rows of positional values into a table through the driver, in batches of `BATCH_SIZE`.
+
+    Values go to the driver as they are, so enums must already be the member names SQLAlchemy stores.
+    """
+
+    paramstyle = connection.dialect.paramstyle
+    statement = (f"INSERT INTO {table.name} ({', '.join(columns)}) "
+                 f"VALUES ({', '.join(placeholder(paramstyle, position) for position in range(1, len(columns) + 1))})")
+
+    for start in range(0, len(rows), BATCH_SIZE):
+        await connection.exec_driver_sql(statement, rows[start:start + BATCH_SIZE])
+
+
+async def seed(url: str, generator: InstitutionGenerator, chunk_size: int, reset: bool) -> int:
+    """
+    Writes every course, instructor, student and enrollment of the generator to the database.
+
+    Args:
+        url (str): The database URL.
+        generator (InstitutionGenerator): The data to write.
+        chunk_size (int): The number of students written per transaction.
+        reset (bool): Whether to drop and recreate the tables first.
+
+    Returns:
+        int: The number of enrollments written.
+    """
+
+    engine = create_async_engine(url)
+    course_names = {course_name_id.course_id: course_name_id.course_name for course_name_id in CourseNameId}
+    enrollments = 0
+
+    async with engine.begin() as connection:
+        if reset:
+            await connection.run_sync(SQLModel.metadata.drop_all)
+
+        await connection.run_sync(SQLModel.metadata.create_all)
+
+        await insert_rows(connection, Course.__table__, ("id", "course_name"),
+                          [(course_id, course_names[course_id]) for course_id in generator.course_ids])
+
+        instructors = generator.instructor_records()
+        await insert_rows(connection, Instructor.__table__, ("id", "first_name", "last_name", "name", "department", "course_id"), [
+            (id_number, first_name, last_name, f"{first_name} {last_name}", department.name, course_id)
+            for id_number, first_name, last_name, department, course_id in zip(
+                instructors.id_numbers, instructors.first_names, instructors.last_names, instructors.departments, instructors.course_ids)])
+
+    for chunk in generator.chunks(chunk_size):
+        # One transaction per chunk, students first so the enrollments' foreign keys resolve
+        async with engine.begin() as connection:
+            await insert_rows(connection, Student.__table__, ("id", "first_name", "last_name", "name", "major"), [
+                (id_number, first_name, last_name, f"{first_name} {last_name}", major.name)
+                for id_number, first_name, last_name, major in zip(chunk.id_numbers, chunk.first_names, chunk.last_names, chunk.majors)])
+
+            ids = iter(new_ids(chunk.enrollment_count))
+            await insert_rows(connection, Enrollment.__table__, ("id", "student_id", "course_id", "grade"), [
+                (next(ids), id_number, course_id, grade.name)
+                for course_id, (id_numbers, grades) in chunk.enrollments.items()
+                for id_number, grade in zip(id_numbers, grades)])
+
+        enrollments += chunk.enrollment_count
+
+    # Built once the rows are in, which is cheaper than maintaining it row by row on a fresh database
+    async with engine.begin() as connection:
+        await create_search_indexes(connection)
+
+    await engine.dispose()
+
+    return enrollments
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=250_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--courses-per-student", type=float, default=4.0)
+    parser.add_argument("--zipf-exponent", type=float, default=1.0)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--url", default=None,
+                        help="Database URL, defaults to the one the API uses")
+    parser.add_argument("--reset", action="store_true",
+                        help="Drop every table before seeding")
+    args = parser.parse_args()
+
+    load_dotenv(ENV_PATH)
+    url = args.url or (os.getenv("POSTGRES_URL")
+                       if USE_POSTGRES_DB else "sqlite+aiosqlite:///sms.db")
+
+    generator = InstitutionGenerator(students=args.students, seed=args.seed,
+                                     courses_per_student=args.courses_per_student, zipf_exponent=args.zipf_exponent)
+
+    start = time.perf_counter()
+    enrollments = await seed(url, generator, args.chunk_size, args.reset)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.students:,} students, {generator.instructors:,} instructors and {enrollments:,} enrollments "
+          f"written in {elapsed:.1f} s ({enrollments / elapsed:,.0f} enrollments/s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
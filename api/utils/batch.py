@@ -0,0 +1,276 @@
+"""
+Set-based batch writes: many rows created, updated or deleted per statement, with an outcome per row.
+
+Each chunk of `BATCH_CHUNK_SIZE` rows is written by a single statement:
+    create  INSERT ... VALUES (...), (...) ON CONFLICT (id) DO NOTHING RETURNING id
+    update  WITH batch AS (VALUES (...), (...)) UPDATE ... FROM batch WHERE id = batch.id RETURNING id
+    delete  DELETE ... WHERE id IN (...) RETURNING id
+
+The IDs returned tell which rows were written, every other row of the chunk already existed or was
+not found. Foreign keys and the rows depending on deleted ones are checked with one query per chunk
+beforehand, so a bad row gets its own outcome instead of failing the whole batch. The caller runs
+the whole batch in one transaction.
+"""
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, Type
+
+from sqlalchemy import Table, cast, column, delete, distinct, select, update, values
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlmodel import SQLModel
+
+
+# Rows per statement, well within the bound parameters allowed by SQLite and asyncpg
+BATCH_CHUNK_SIZE = 500
+
+# Rows per request
+MAX_BATCH_SIZE = 10_000
+
+# Multi-row INSERT with ON CONFLICT of every supported database
+INSERTS: Dict[str, Callable[[Table], Any]] = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+class Outcome(str, Enum):
+    """
+    Enum representing what a batch write did with one row.
+    """
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    EXISTS = "exists"
+    NOT_FOUND = "not_found"
+    DUPLICATE = "duplicate"
+    INVALID = "invalid"
+    CONFLICT = "conflict"
+
+
+class ItemOutcome(SQLModel):
+    id: Optional[str]
+    outcome: Outcome
+    error: Optional[str] = None
+
+
+class OnDelete(str, Enum):
+    """
+    Enum representing what deleting a row does to the rows referencing it.
+    """
+    CASCADE = "cascade"
+    SET_NULL = "set_null"
+    RESTRICT = "restrict"
+
+
+# Referencing column -> what deleting the referenced row does, as the ORM does when deleting one row:
+# a course takes its enrollments with it and leaves its instructors without a course. Any other
+# reference, such as the enrollments of a student, keeps the referenced row from being deleted.
+ON_DELETE: Dict[str, OnDelete] = {
+    "enrollment.course_id": OnDelete.CASCADE,
+    "instructor.course_id": OnDelete.SET_NULL,
+}
+
+
+def _chunks(items: Sequence[Any]) -> List[Sequence[Any]]:
+    return [items[start:start + BATCH_CHUNK_SIZE] for start in range(0, len(items), BATCH_CHUNK_SIZE)]
+
+
+def row_values(table: Table, item: SQLModel) -> Dict[str, Any]:
+    """
+    Returns the column values of a model instance, by column name.
+    """
+
+    return {table_column.name: getattr(item, table_column.name) for table_column in table.columns}
+
+
+async def _existing(connection: AsyncConnection, table_column: Any, keys: Set[Any]) -> Set[Any]:
+    """
+    Returns the keys present in a column, one query per chunk of keys.
+    """
+
+    found: Set[Any] = set()
+
+    for chunk in _chunks(list(keys)):
+        found.update((await connection.execute(
+            select(distinct(table_column)).where(table_column.in_(chunk)))).scalars())
+
+    return found
+
+
+async def _missing_references(connection: AsyncConnection, table: Table, rows: List[Dict[str, Any]]) -> Dict[int, str]:
+    """
+    Checks the foreign keys of rows about to be written.
+
+    Returns:
+        Dict[int, str]: The position of every row referencing a missing row, with the reason.
+    """
+
+    errors: Dict[int, str] = {}
+
+    for foreign_key in table.foreign_keys:
+        name, referenced = foreign_key.parent.name, foreign_key.column
+        keys = {row[name] for row in rows if row[name] is not None}
+        found = await _existing(connection, referenced, keys)
+
+        for position, row in enumerate(rows):
+            if row[name] is not None and row[name] not in found and position not in errors:
+                errors[position] = f"{referenced.table.name} with ID {row[name]} does not exist."
+
+    return errors
+
+
+def _screen(rows: List[Dict[str, Any]], invalid: Dict[int, str], outcomes: List[Optional[ItemOutcome]]) -> List[int]:
+    """
+    Sets the outcome of the rows that are not written, invalid or repeating an earlier ID, and returns the positions of the others.
+    """
+
+    seen: Set[Any] = set()
+    positions: List[int] = []
+
+    for position, row in enumerate(rows):
+        id = row["id"]
+
+        if id in seen:
+            outcomes[position] = ItemOutcome(id=id, outcome=Outcome.DUPLICATE,
+                                             error=f"ID {id} appears earlier in the batch.")
+        elif position in invalid:
+            outcomes[position] = ItemOutcome(id=id, outcome=Outcome.INVALID, error=invalid[position])
+        else:
+            seen.add(id)
+            positions.append(position)
+
+    return positions
+
+
+async def create_rows(connection: AsyncConnection, model: Type[SQLModel], items: Sequence[SQLModel]) -> List[ItemOutcome]:
+    """
+    Inserts many rows, skipping those whose ID already exists.
+
+    Args:
+        connection (AsyncConnection): A connection inside the transaction of the batch.
+        model (Type[SQLModel]): The table model of the rows.
+        items (Sequence[SQLModel]): The rows to insert.
+
+    Returns:
+        List[ItemOutcome]: The outcome of every row, in the order of `items`.
+    """
+
+    table = model.__table__
+    rows = [row_values(table, item) for item in items]
+    outcomes: List[Optional[ItemOutcome]] = [None] * len(rows)
+    positions = _screen(rows, await _missing_references(connection, table, rows), outcomes)
+    insert = INSERTS[connection.dialect.name]
+
+    for chunk in _chunks(positions):
+        statement = insert(table).values([rows[position] for position in chunk]).on_conflict_do_nothing(
+            index_elements=[table.c.id]).returning(table.c.id)
+        created = set((await connection.execute(statement)).scalars())
+
+        for position in chunk:
+            id = rows[position]["id"]
+            outcomes[position] = ItemOutcome(id=id, outcome=Outcome.CREATED) if id in created else \
+                ItemOutcome(id=id, outcome=Outcome.EXISTS, error=f"{table.name} with ID {id} already exists.")
+
+    return outcomes
+
+
+async def update_rows(connection: AsyncConnection, model: Type[SQLModel], items: Sequence[SQLModel]) -> List[ItemOutcome]:
+    """
+    Replaces the columns of many existing rows, matched by ID.
+
+    Args:
+        connection (AsyncConnection): A connection inside the transaction of the batch.
+        model (Type[SQLModel]): The table model of the rows.
+        items (Sequence[SQLModel]): The new versions of the rows.
+
+    Returns:
+        List[ItemOutcome]: The outcome of every row, in the order of `items`.
+    """
+
+    table = model.__table__
+    names = [table_column.name for table_column in table.columns]
+    rows = [row_values(table, item) for item in items]
+    outcomes: List[Optional[ItemOutcome]] = [None] * len(rows)
+    positions = _screen(rows, await _missing_references(connection, table, rows), outcomes)
+
+    for chunk in _chunks(positions):
+        # A CTE over VALUES, as SQLite does not name the columns of VALUES in FROM
+        batch = values(*(column(name, table.c[name].type) for name in names), name="batch").data(
+            [tuple(rows[position][name] for name in names) for position in chunk]).cte("batch")
+
+        # Cast back to the column types, which VALUES does not carry over on every database
+        statement = update(table).where(table.c.id == batch.c.id).values(
+            {name: cast(batch.c[name], table.c[name].type) for name in names if name != "id"}).returning(table.c.id)
+        updated = set((await connection.execute(statement)).scalars())
+
+        for position in chunk:
+            id = rows[position]["id"]
+            outcomes[position] = ItemOutcome(id=id, outcome=Outcome.UPDATED) if id in updated else \
+                ItemOutcome(id=id, outcome=Outcome.NOT_FOUND, error=f"{table.name} with ID {id} does not exist.")
+
+    return outcomes
+
+
+def dependents(table: Table) -> List[Tuple[Any, OnDelete]]:
+    """
+    Returns every column referencing a table, with what deleting a row of the table does to it.
+    """
+
+    return [(foreign_key.parent, ON_DELETE.get(f"{other.name}.{foreign_key.parent.name}", OnDelete.RESTRICT))
+            for other in SQLModel.metadata.sorted_tables
+            for foreign_key in other.foreign_keys if foreign_key.column.table is table]
+
+
+async def delete_rows(connection: AsyncConnection, model: Type[SQLModel], ids: Sequence[str]) -> List[ItemOutcome]:
+    """
+    Deletes many rows by ID, with the rows depending on them as given by `ON_DELETE`.
+
+    Args:
+        connection (AsyncConnection): A connection inside the transaction of the batch.
+        model (Type[SQLModel]): The table model of the rows.
+        ids (Sequence[str]): The IDs of the rows to delete.
+
+    Returns:
+        List[ItemOutcome]: The outcome of every ID, in the order of `ids`.
+    """
+
+    table = model.__table__
+    references = dependents(table)
+    outcomes: List[Optional[ItemOutcome]] = [None] * len(ids)
+    positions = _screen([{"id": id} for id in ids], {}, outcomes)
+
+    for chunk in _chunks(positions):
+        keys = {ids[position] for position in chunk}
+        blocked: Dict[str, str] = {}
+
+        for referencing, on_delete in references:
+            if on_delete is OnDelete.RESTRICT:
+                for id in await _existing(connection, referencing, keys):
+                    blocked.setdefault(id, f"{table.name} with ID {id} is referenced by {referencing.table.name}.")
+
+        keys -= blocked.keys()
+        deleted: Set[str] = set()
+
+        if keys:
+            for referencing, on_delete in references:
+                if on_delete is OnDelete.CASCADE:
+                    await connection.execute(delete(referencing.table).where(referencing.in_(keys)))
+                elif on_delete is OnDelete.SET_NULL:
+                    await connection.execute(update(referencing.table).where(
+                        referencing.in_(keys)).values({referencing.name: None}))
+
+            deleted.update((await connection.execute(
+                delete(table).where(table.c.id.in_(keys)).returning(table.c.id))).scalars())
+
+        for position in chunk:
+            id = ids[position]
+
+            if id in blocked:
+                outcomes[position] = ItemOutcome(id=id, outcome=Outcome.CONFLICT, error=blocked[id])
+            elif id in deleted:
+                outcomes[position] = ItemOutcome(id=id, outcome=Outcome.DELETED)
+            else:
+                outcomes[position] = ItemOutcome(id=id, outcome=Outcome.NOT_FOUND,
+                                                 error=f"{table.name} with ID {id} does not exist.")
+
+    return outcomes
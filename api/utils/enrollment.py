@@ -1,6 +1,7 @@
 from utils.enums.grade import Grade
-import uuid
+from utils.ids import new_id
 
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 
 
@@ -9,14 +10,19 @@ class Enrollment(SQLModel, table=True):
     Represents an Enrollment, including the student, the course they are enrolled in, and the assigned grade.
 
     Attributes:
-        id: (int): The enrollment ID
+        id: (str): The enrollment ID, time-ordered so new rows land at the end of the index
         student_id (str): The ID of the student who is enrolled in the course.
         course_id (str): The ID of the course in which the student is enrolled.
         grade (Grade): The grade assigned to the student for the course. Default if NO_GRADE with enum value of None if no grade has been assigned yet.
     """
 
+    # Serve the course and grade filters of the enrollments list, pages included as rows come in ID order
+    # behind the filtered columns. A grade alone is served by the primary key, one row in a few matching.
+    __table_args__ = (Index("ix_enrollment_grade_course_id_id", "grade", "course_id", "id"),
+                      Index("ix_enrollment_course_id_id", "course_id", "id"))
+
     id: str = Field(
-        default_factory=lambda: str(uuid.uuid4()),  # Generates a UUID4 string
+        default_factory=new_id,  # Time-ordered, so inserts append to the primary key index
         primary_key=True,
         index=True,
         nullable=False,
@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Optional
 
 
 class Grade(str, Enum):
@@ -21,3 +22,43 @@ class Grade(str, Enum):
     PASS = "Pass"
     FAIL = "Fail"
     NO_GRADE = None
+
+    @property
+    def grade_points(self) -> Optional[float]:
+        """
+        The grade points of a letter grade on a 4.0 scale.
+
+        Returns:
+            Optional[float]: The grade points, or None for grades that do not count towards a GPA (Pass, Fail and no grade).
+        """
+        return GRADE_POINTS.get(self)
+
+    @property
+    def is_passing(self) -> Optional[bool]:
+        """
+        Whether the grade passes the course. D- and above and Pass are passing, F and Fail are not.
+
+        Returns:
+            Optional[bool]: True if passing, False if failing, or None if no grade has been assigned yet.
+        """
+        if self is Grade.NO_GRADE:
+            return None
+
+        return self not in (Grade.F, Grade.FAIL)
+
+
+GRADE_POINTS = {
+    Grade.A_PLUS: 4.0,
+    Grade.A: 4.0,
+    Grade.A_MINUS: 3.7,
+    Grade.B_PLUS: 3.3,
+    Grade.B: 3.0,
+    Grade.B_MINUS: 2.7,
+    Grade.C_PLUS: 2.3,
+    Grade.C: 2.0,
+    Grade.C_MINUS: 1.7,
+    Grade.D_PLUS: 1.3,
+    Grade.D: 1.0,
+    Grade.D_MINUS: 0.7,
+    Grade.F: 0.0,
+}
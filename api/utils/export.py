@@ -0,0 +1,120 @@
+"""
+Streaming exports of whole tables as NDJSON or CSV, optionally gzipped.
+
+Rows are read through a server-side cursor (`AsyncConnection.stream` with `yield_per`) as plain
+column tuples, without building ORM objects, and each batch is encoded and handed to the response as
+soon as it arrives. The server holds one batch at a time whatever the size of the table, and the
+first bytes go out while the database is still sending the rest.
+"""
+import csv
+import io
+import json
+import zlib
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, List, Sequence, Type
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import SQLModel
+
+
+# Rows fetched from the cursor, encoded and sent at a time
+EXPORT_BATCH_SIZE = 1_000
+
+
+class ExportFormat(str, Enum):
+    """
+    Enum representing the formats of a table export.
+    """
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+    @property
+    def media_type(self) -> str:
+        """
+        The media type of an uncompressed export.
+        """
+
+        return "application/x-ndjson" if self is ExportFormat.NDJSON else "text/csv"
+
+
+def _plain(value: Any) -> Any:
+    # Enums are exported as their value, as in every other response of the API
+    return value.value if isinstance(value, Enum) else value
+
+
+def _ndjson_encoder(columns: List[str]) -> Callable[[Sequence[Sequence[Any]]], str]:
+    """
+    Returns a function encoding a batch of rows as one JSON object per line.
+    """
+
+    dumps = json.JSONEncoder(ensure_ascii=False, default=str).encode
+
+    def encode(rows: Sequence[Sequence[Any]]) -> str:
+        return "".join(dumps(dict(zip(columns, map(_plain, row)))) + "\n" for row in rows)
+
+    return encode
+
+
+def _csv_encoder(columns: List[str]) -> Callable[[Sequence[Sequence[Any]]], str]:
+    """
+    Returns a function encoding a batch of rows as CSV lines, the header line before the first batch.
+    """
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+
+    def encode(rows: Sequence[Sequence[Any]]) -> str:
+        writer.writerows([_plain(value) for value in row] for row in rows)
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+        return text
+
+    return encode
+
+
+async def export_rows(engine: AsyncEngine, model: Type[SQLModel], format: ExportFormat, compress: bool = False,
+                      batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """
+    Streams every row of a table, in primary key order, encoded batch by batch.
+
+    Args:
+        engine (AsyncEngine): The engine of the database.
+        model (Type[SQLModel]): The table model to export.
+        format (ExportFormat): The encoding of the rows.
+        compress (bool, optional): Whether to gzip the stream. Defaults to False.
+        batch_size (int, optional): The number of rows fetched and encoded at a time. Defaults to `EXPORT_BATCH_SIZE`.
+
+    Yields:
+        bytes: The next part of the export.
+    """
+
+    table = model.__table__
+    columns = [column.name for column in table.columns]
+    encode = (_ndjson_encoder if format is ExportFormat.NDJSON else _csv_encoder)(columns)
+
+    # A gzip stream, flushed after every batch so that compressed rows go out as they are read
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+
+    statement = select(*table.columns).order_by(
+        *table.primary_key.columns).execution_options(yield_per=batch_size)
+
+    async with engine.connect() as connection:
+        result = await connection.stream(statement)
+        empty = True
+
+        async for rows in result.partitions(batch_size):
+            empty = False
+            data = encode(rows).encode()
+            yield compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH) if compressor is not None else data
+
+        # A CSV export of an empty table is still its header line
+        tail = encode([]).encode() if empty else b""
+
+        if compressor is not None:
+            yield compressor.compress(tail) + compressor.flush()
+        elif tail:
+            yield tail
@@ -1,5 +1,6 @@
 from typing_extensions import Self, Optional
 from pydantic import model_validator
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship
 
 
@@ -18,6 +19,9 @@ class Instructor(Person, table=True):
         set_id() -> Self: An SQLmodel validator that automatically sets the instructor's ID with a "INS" prefix through handle_id method in the Person class.
     """
 
+    # Serves the department filter of the instructors list
+    __table_args__ = (Index("ix_instructor_department_id", "department", "id"),)
+
     department: Department = Field(sa_column=Field(sa_type=Department))
 
     course_id: Optional[str] = Field(
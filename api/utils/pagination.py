@@ -0,0 +1,101 @@
+"""
+Keyset pagination of the list endpoints.
+
+A page is read with `WHERE id > :after ORDER BY id LIMIT :limit + 1`. The primary key index, or an
+index ending in `id` behind the filtered columns, serves it by seeking straight to the first row of
+the page, so every page costs the same however deep it is, unlike OFFSET, which reads and drops every
+row before the page. The extra row only tells whether another page follows.
+
+Cursors are opaque to clients: the last ID of a page, encoded as URL-safe base64. They stay valid
+while rows are added or deleted, a page simply starting after the last row the client has seen.
+"""
+import base64
+import binascii
+from typing import List, Optional, Sequence, Tuple, Type, TypeVar
+
+from sqlmodel import SQLModel
+from sqlmodel.sql.expression import SelectOfScalar
+
+
+# Rows per page when the client does not ask for a number, and the most it can ask for
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1_000
+
+Row = TypeVar("Row", bound=SQLModel)
+
+
+def encode_cursor(id: str) -> str:
+    """
+    Returns the cursor of the page starting after a row.
+
+    Args:
+        id (str): The ID of the last row of the current page.
+    """
+
+    return base64.urlsafe_b64encode(id.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    """
+    Returns the ID a cursor starts after.
+
+    Args:
+        cursor (str): A cursor returned by `encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor was not returned by `encode_cursor`.
+    """
+
+    try:
+        id = base64.b64decode(cursor + "=" * (-len(cursor) % 4),
+                              altchars=b"-_", validate=True).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        id = ""
+
+    if not id:
+        raise ValueError(f"Invalid page cursor: {cursor!r}")
+
+    return id
+
+
+def page_statement(statement: SelectOfScalar[Type[Row]], model: Type[Row], limit: int, after: Optional[str] = None) -> SelectOfScalar[Type[Row]]:
+    """
+    Restricts a select statement to one page of rows in primary key order.
+
+    Args:
+        statement (SelectOfScalar): The statement selecting every row, filters included.
+        model (Type[SQLModel]): The model selected, whose `id` is the sort key.
+        limit (int): The number of rows of the page.
+        after (Optional[str], optional): The cursor of the page, None for the first page.
+
+    Returns:
+        SelectOfScalar: The statement reading the page and one more row.
+
+    Raises:
+        ValueError: If `after` is not a valid cursor.
+    """
+
+    if after is not None:
+        statement = statement.where(model.id > decode_cursor(after))
+
+    return statement.order_by(model.id).limit(limit + 1)
+
+
+def split_page(rows: Sequence[Row], limit: int) -> Tuple[List[Row], Optional[str]]:
+    """
+    Splits the rows read by a `page_statement` into the page and the cursor of the next one.
+
+    Args:
+        rows (Sequence[SQLModel]): The rows read, at most `limit + 1`.
+        limit (int): The number of rows of the page.
+
+    Returns:
+        Tuple[List[SQLModel], Optional[str]]: The rows of the page, and the cursor of the next page or None if this is the last one.
+    """
+
+    if len(rows) <= limit:
+        return list(rows), None
+
+    page = list(rows[:limit])
+
+    return page, encode_cursor(page[-1].id)
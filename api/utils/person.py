@@ -1,10 +1,11 @@
-import uuid
 from typing import Optional
 from typing_extensions import Self
 
 from pydantic import model_validator
 from sqlmodel import SQLModel, Field
 
+from utils.ids import new_id
+
 
 class Person(SQLModel):
     """
@@ -55,16 +56,13 @@ class Person(SQLModel):
             id (Optional[str]): An optional ID. If provided, it is returned as-is.
 
         Returns:
-            str: A unique identifier with the given prefix. If no ID is provided, a new ID is generated using UUID.
+            str: A unique identifier with the given prefix. If no ID is provided, a new time-ordered ID is generated.
         """
 
         # Use id if give else generate id
         if self.id is None or self.id == "":
-            # Generate a random UUID and take only the first 8 characters
-            short_uuid = str(uuid.uuid4())[:8]
-
-            # Add a custom prefix
-            self.id = f"{prefix}-{short_uuid}"
+            # Generate a time-ordered ID with the custom prefix, see `utils.ids`
+            self.id = new_id(prefix)
 
     def __str__(self) -> str:
         """
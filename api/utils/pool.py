@@ -0,0 +1,209 @@
+"""
+Engine settings read from the environment, and connection pools that measure themselves.
+
+Every pool of the API counts its checkouts, the callers waiting for a connection and the time they
+waited, which `pool_stats` reports along with the size and overflow of a queue pool. Counting wraps
+the pool's own `_do_get` and `_do_return_conn`, so the figures are the pool's, whichever engine,
+session or connection checked the connection out.
+"""
+import os
+import threading
+import time
+from enum import Enum
+from typing import Any, Dict, Optional, Type
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, StaticPool
+from sqlmodel import SQLModel
+
+from config import (
+    DB_ECHO,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_SQLITE_POOL,
+)
+
+
+class InstrumentedPool:
+    """
+    Mixin counting the checkouts of a pool, its waiters and their wait time.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._checked_out = 0
+        self._waiters = 0
+        self._checkouts = 0
+        self._failed_checkouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _do_get(self) -> Any:
+        with self._stats_lock:
+            self._waiters += 1
+
+        start = time.perf_counter()
+
+        try:
+            connection = super()._do_get()
+        except BaseException:
+            # Timeouts and connect errors are counted apart, their wait would skew that of the checkouts
+            with self._stats_lock:
+                self._waiters -= 1
+                self._failed_checkouts += 1
+            raise
+
+        waited = time.perf_counter() - start
+
+        with self._stats_lock:
+            self._waiters -= 1
+            self._checked_out += 1
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        return connection
+
+    def _do_return_conn(self, record: Any) -> None:
+        with self._stats_lock:
+            self._checked_out -= 1
+
+        super()._do_return_conn(record)
+
+
+class InstrumentedQueuePool(InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+class InstrumentedNullPool(InstrumentedPool, NullPool):
+    pass
+
+
+class InstrumentedStaticPool(InstrumentedPool, StaticPool):
+    pass
+
+
+class SQLitePool(str, Enum):
+    """
+    Enum representing the pools of a SQLite engine.
+    """
+    QUEUE = "queue"    # Connections kept open and shared, bounded like a Postgres pool
+    STATIC = "static"  # One connection for the whole app, needed by in-memory databases
+    NULL = "null"      # A new connection per checkout, closed on return
+
+
+SQLITE_POOLS: Dict[SQLitePool, Type[Pool]] = {
+    SQLitePool.QUEUE: InstrumentedQueuePool,
+    SQLitePool.STATIC: InstrumentedStaticPool,
+    SQLitePool.NULL: InstrumentedNullPool,
+}
+
+
+class PoolStats(SQLModel):
+    pool: str
+    # Connections kept by a queue pool, and those opened beyond them, None for other pools
+    size: Optional[int] = None
+    overflow: Optional[int] = None
+    checked_out: int
+    waiters: int
+    checkouts: int
+    # Checkouts that timed out or failed to connect
+    failed_checkouts: int
+    # Seconds spent getting a connection by the successful checkouts, opening it included
+    wait_seconds_total: float
+    wait_seconds_max: float
+    wait_seconds_avg: float
+
+
+def _env(name: str, default: Any) -> Any:
+    """
+    Returns an environment variable converted to the type of its default, or the default if unset.
+
+    Raises:
+        ValueError: If the variable cannot be converted.
+    """
+
+    value = os.getenv(name)
+
+    if value is None or value == "":
+        return default
+
+    if isinstance(default, bool):
+        if value.lower() in ("1", "true", "yes", "on"):
+            return True
+        if value.lower() in ("0", "false", "no", "off"):
+            return False
+        raise ValueError(f"{name} must be true or false, got {value!r}")
+
+    try:
+        return type(default)(value)
+    except ValueError:
+        raise ValueError(f"{name} must be of type {type(default).__name__}, got {value!r}") from None
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """
+    Returns the keyword arguments of `create_async_engine` for a database, from the `DB_*`
+    environment variables with the defaults of `config`.
+
+    Args:
+        url (str): The URL of the database.
+
+    Returns:
+        Dict[str, Any]: The echo, pool class and pool settings of the engine.
+
+    Raises:
+        ValueError: If a variable has an invalid value.
+    """
+
+    options: Dict[str, Any] = {
+        "echo": _env("DB_ECHO", DB_ECHO),
+        "pool_pre_ping": _env("DB_POOL_PRE_PING", DB_POOL_PRE_PING),
+        "pool_recycle": _env("DB_POOL_RECYCLE", DB_POOL_RECYCLE),
+    }
+
+    if url.startswith("sqlite"):
+        options["poolclass"] = SQLITE_POOLS[SQLitePool(_env("DB_SQLITE_POOL", DB_SQLITE_POOL))]
+    else:
+        options["poolclass"] = InstrumentedQueuePool
+
+    # Only a queue pool is bounded
+    if options["poolclass"] is InstrumentedQueuePool:
+        options.update(pool_size=_env("DB_POOL_SIZE", DB_POOL_SIZE),
+                       max_overflow=_env("DB_MAX_OVERFLOW", DB_MAX_OVERFLOW),
+                       pool_timeout=_env("DB_POOL_TIMEOUT", DB_POOL_TIMEOUT))
+
+    return options
+
+
+def pool_stats(pool: Pool) -> PoolStats:
+    """
+    Returns the live statistics of a pool created by `engine_options`.
+
+    The counters belong to the pool object: they restart from zero whenever the engine replaces its
+    pool, as `engine.dispose()` does.
+
+    Args:
+        pool (Pool): The pool of the engine, `engine.pool`.
+
+    Raises:
+        ValueError: If the pool is not instrumented.
+    """
+
+    if not isinstance(pool, InstrumentedPool):
+        raise ValueError(f"{type(pool).__name__} does not collect statistics.")
+
+    with pool._stats_lock:
+        checkouts, wait_total = pool._checkouts, pool._wait_total
+        stats = PoolStats(pool=type(pool).__name__, checked_out=pool._checked_out, waiters=pool._waiters,
+                          checkouts=checkouts, failed_checkouts=pool._failed_checkouts,
+                          wait_seconds_total=wait_total, wait_seconds_max=pool._wait_max,
+                          wait_seconds_avg=wait_total / checkouts if checkouts else 0.0)
+
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.size, stats.overflow = pool.size(), max(pool.overflow(), 0)
+
+    return stats
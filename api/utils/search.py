@@ -0,0 +1,153 @@
+"""
+Indexed name search over the student and instructor tables.
+
+PostgreSQL gets a GiST trigram index from the pg_trgm extension on `name`, which serves substring
+matches (ILIKE) and fuzzy ones (the `%` similarity operator), and hands back the closest names first
+through the `<->` distance operator, so a query reads `limit` rows instead of every match.
+SQLite gets an FTS5 table over `name`, kept in sync with triggers, which serves prefix matches of
+every query term. The FTS5 table is keyed on the implicit `rowid` of its table, which VACUUM may
+renumber since the tables have text primary keys, so whatever runs VACUUM must call
+`rebuild_search_indexes` right after it. Ranking every match by bm25 costs milliseconds per thousand rows, so only the
+first `RANK_WINDOW` matches are ranked, shortest name first.
+"""
+import re
+from typing import List, Type
+
+from sqlalchemy import and_, column, false, func, literal_column, or_, table, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlmodel import SQLModel, select
+from sqlmodel.sql.expression import SelectOfScalar
+
+
+# Tables with a searchable `name` column
+SEARCHABLE_TABLES = ("student", "instructor")
+
+# Matches ranked per query on SQLite
+RANK_WINDOW = 1_000
+
+_TERMS = re.compile(r"[^\W_]+")
+
+
+def fts_table(table_name: str) -> str:
+    """
+    Returns the name of the FTS5 table indexing a table's names on SQLite.
+    """
+
+    return f"{table_name}_name_fts"
+
+
+async def create_search_indexes(connection: AsyncConnection) -> None:
+    """
+    Creates the name search indexes of `SEARCHABLE_TABLES`, if they do not exist yet.
+
+    On SQLite, the FTS5 table is filled from its table whenever its triggers are missing, which is
+    the case the first time and after the tables were dropped and recreated.
+
+    Args:
+        connection (AsyncConnection): A connection in a transaction, after the tables were created.
+    """
+
+    if connection.dialect.name == "postgresql":
+        await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+        for table_name in SEARCHABLE_TABLES:
+            await connection.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{table_name}_name_trgm ON {table_name} USING gist (name gist_trgm_ops)"))
+
+        return
+
+    for table_name in SEARCHABLE_TABLES:
+        fts = fts_table(table_name)
+        triggers = (await connection.execute(text(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND tbl_name = :table_name AND name LIKE :pattern"),
+            {"table_name": table_name, "pattern": f"{fts}_%"})).scalar()
+
+        if triggers == 3:
+            continue
+
+        # External content table: FTS5 stores the index only and reads names from the table
+        await connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(name, content='{table_name}', content_rowid='rowid', "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"))
+        await connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table_name} BEGIN "
+            f"INSERT INTO {fts}(rowid, name) VALUES (new.rowid, new.name); END"))
+        await connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table_name} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, name) VALUES ('delete', old.rowid, old.name); END"))
+        await connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF name ON {table_name} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, name) VALUES ('delete', old.rowid, old.name); "
+            f"INSERT INTO {fts}(rowid, name) VALUES (new.rowid, new.name); END"))
+        await connection.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+async def rebuild_search_indexes(connection: AsyncConnection) -> None:
+    """
+    Refills the FTS5 tables of `SEARCHABLE_TABLES` from their tables on SQLite, and does nothing on PostgreSQL.
+
+    VACUUM may renumber the rowids of tables without an INTEGER PRIMARY KEY, which the FTS5 tables are
+    keyed on, so their matches would point at the wrong rows. Call this after every VACUUM.
+
+    Args:
+        connection (AsyncConnection): A connection in a transaction, after `create_search_indexes`.
+    """
+
+    if connection.dialect.name == "postgresql":
+        return
+
+    for table_name in SEARCHABLE_TABLES:
+        fts = fts_table(table_name)
+        await connection.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+def query_terms(query: str) -> List[str]:
+    """
+    Splits a search query into its terms of letters and digits, dropping punctuation, wildcards and operators.
+    """
+
+    return _TERMS.findall(query)
+
+
+def search_statement(model: Type[SQLModel], query: str, limit: int, dialect: str) -> SelectOfScalar:
+    """
+    Builds the statement finding the rows of a searchable model whose name matches a query, best first.
+
+    Args:
+        model (Type[SQLModel]): `Student` or `Instructor`.
+        query (str): Terms separated by spaces, such as "ada lov".
+        limit (int): Maximum number of rows.
+        dialect (str): The name of the engine's dialect, "postgresql" or "sqlite".
+
+    Returns:
+        SelectOfScalar: The statement selecting the matching rows.
+    """
+
+    terms = query_terms(query)
+
+    if not terms:
+        return select(model).where(false()).limit(limit)
+
+    if dialect == "postgresql":
+        # Every term as a substring, or the whole query fuzzily, closest first, all served by the trigram index
+        joined = " ".join(terms)
+        substrings = and_(*(model.name.ilike(f"%{term}%") for term in terms))
+
+        return (select(model)
+                .where(or_(substrings, model.name.op("%")(joined)))
+                .order_by(model.name.op("<->")(joined), model.id)
+                .limit(limit))
+
+    # Every term as a quoted prefix query, so no user input is read as FTS5 syntax
+    fts_name = fts_table(model.__tablename__)
+    fts = table(fts_name, column("rowid"))
+    match = " ".join(f'"{term}"*' for term in terms)
+    matched = (select(fts.c.rowid)
+               .where(literal_column(fts_name).op("MATCH")(match))
+               .limit(RANK_WINDOW)
+               .subquery())
+
+    return (select(model)
+            .join(matched, matched.c.rowid == literal_column(f"{model.__tablename__}.rowid"))
+            .order_by(func.length(model.name), model.name, model.id)
+            .limit(limit))
@@ -1,5 +1,6 @@
 from typing import Optional
 from pydantic import model_validator
+from sqlalchemy import Index
 from sqlmodel import Field
 from typing_extensions import Self
 
@@ -18,6 +19,9 @@ class Student(Person, table=True):
         set_id() -> Self: An SQLModel model validator that automatically sets the student's ID with a "STU" prefix through handle_id method in the Person class.
     """
 
+    # Serves the major filter of the students list, pages included as rows come in ID order within a major
+    __table_args__ = (Index("ix_student_major_id", "major", "id"),)
+
     major: Major = Field(sa_column=Field(sa_type=Major))
 
     @model_validator(mode='after')
@@ -0,0 +1,75 @@
+"""
+Single-row writes of the API in one statement each, instead of a lookup followed by the write:
+    add     INSERT ... ON CONFLICT (id) DO NOTHING RETURNING *
+    update  UPDATE ... WHERE id = :id RETURNING *
+    delete  DELETE ... WHERE id = :id RETURNING id
+
+Whether the row existed is read from what the statement returns, so a concurrent writer can no
+longer slip in between the check and the write, and the row returned replaces the refresh that used
+to follow. A single statement is atomic on its own and runs on an autocommit connection, without
+BEGIN and COMMIT around it. Deleting a row whose dependents the ORM used to delete or detach, such as
+the enrollments and instructors of a course, runs those statements first in one transaction.
+"""
+from typing import Any, List, Optional
+
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import SQLModel
+
+from utils.batch import INSERTS, OnDelete, dependents, row_values
+
+
+async def write_row(engine: AsyncEngine, item: SQLModel, id: str, action: str = "add") -> Optional[SQLModel]:
+    """
+    Adds, updates or deletes one row in a single statement.
+
+    Args:
+        engine (AsyncEngine): The engine of the database.
+        item (SQLModel): The row to write, the table model instance received by the endpoint.
+        id (str): The ID of the row.
+        action (str, optional): "add", "update" or "delete". Defaults to "add".
+
+    Returns:
+        Optional[SQLModel]: The row as stored after an add or update, or None if the ID already existed on add, did not exist on update, or on delete.
+
+    Raises:
+        ValueError: If `action` is unknown.
+    """
+
+    model = type(item)
+    table = model.__table__
+    statements: List[Any] = []
+
+    if action == "add":
+        statements.append(INSERTS[engine.dialect.name](table).values(row_values(table, item)).on_conflict_do_nothing(
+            index_elements=[table.c.id]).returning(*table.columns))
+    elif action == "update":
+        values = {name: value for name, value in row_values(table, item).items() if name != "id"}
+        statements.append(update(table).where(table.c.id == id).values(values).returning(*table.columns))
+    elif action == "delete":
+        # Rows restricting the delete are left to the database, as with the ORM
+        for referencing, on_delete in dependents(table):
+            if on_delete is OnDelete.CASCADE:
+                statements.append(delete(referencing.table).where(referencing == id))
+            elif on_delete is OnDelete.SET_NULL:
+                statements.append(update(referencing.table).where(
+                    referencing == id).values({referencing.name: None}))
+
+        statements.append(delete(table).where(table.c.id == id).returning(table.c.id))
+    else:
+        raise ValueError(f"Unknown write action: {action!r}")
+
+    async with engine.connect() as connection:
+        if len(statements) == 1:
+            await connection.execution_options(isolation_level="AUTOCOMMIT")
+
+        async with connection.begin():
+            for statement in statements:
+                result = await connection.execute(statement)
+
+            row = result.first()
+
+    if action == "delete" or row is None:
+        return None
+
+    return model(**row._mapping)
@@ -148,14 +148,19 @@ if __name__ == "__main__":
         Choose a module:
         1. Vanilla
         2. Pydantic
+        3. Columnar
         """
     )
 
-    choice = input("Enter '1' for Vanilla or any other input for Pydantic: ")
+    choice = input(
+        "Enter '1' for Vanilla, '3' for Columnar or any other input for Pydantic: ")
 
     if choice == "1":
         from utils.vanilla.student_management_system import Student, Instructor, Course, StudentManagementSystem
         print("🚀 Vanilla module loaded from utils.vanilla")
+    elif choice == "3":
+        from utils.columnar.student_management_system import Student, Instructor, Course, StudentManagementSystem
+        print("🚀 Columnar module loaded from utils.columnar")
     else:
         from utils.pydantic.student_management_system import Student, Instructor, Course, StudentManagementSystem
         print("🚀 Pydantic module loaded from utils.pydantic")
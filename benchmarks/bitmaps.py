@@ -0,0 +1,95 @@
+"""
+Measures set-algebra course queries on the course bitmaps of `utils.bitmaps` against intersecting the
+lists of `find_course_enrolled_students` as Python sets.
+
+The system is filled by `utils.generator`, whose Zipfian course popularity gives both large and small
+courses. Each query is counted and, separately, iterated to the end.
+
+Usage:
+    python -m benchmarks.bitmaps --students 1000000 --backend vanilla
+"""
+import argparse
+import importlib
+import time
+from typing import Callable, Dict, Set, Tuple
+
+from utils.bitmaps import CourseQuery, enrolled_in, enrolled_in_subject
+from utils.enums.course_name_id import CourseNameId
+from utils.generator import InstitutionGenerator, populate
+
+
+def best_of(function: Callable[[], object], repeat: int) -> float:
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+def queries(sms) -> Dict[str, Tuple[CourseQuery, Callable[[], Set[str]]]]:
+    """
+    Returns every query as a bitmap query and as its equivalent over materialized student lists.
+    """
+
+    def students(course_id: str) -> Set[str]:
+        return set(sms.find_course_enrolled_students(course_id))
+
+    econ = [course_id for course_id in sms.courses if course_id.startswith("ECON")]
+
+    return {
+        "A and B": (enrolled_in(CourseNameId.INTRO_TO_PROGRAMMING) & enrolled_in(CourseNameId.LINEAR_ALGEBRA),
+                    lambda: students("CS101") & students("MATH101")),
+        "A and B not C": (enrolled_in(CourseNameId.INTRO_TO_PROGRAMMING) & enrolled_in(CourseNameId.LINEAR_ALGEBRA)
+                          & ~enrolled_in(CourseNameId.DATA_STRUCTURES),
+                          lambda: students("CS101") & students("MATH101") - students("CS102")),
+        "any ECON": (enrolled_in_subject("ECON"),
+                     lambda: set().union(*map(students, econ))),
+        "not A": (~enrolled_in(CourseNameId.INTRO_TO_PROGRAMMING),
+                  lambda: set(sms.students) - students("CS101")),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=1_000_000)
+    parser.add_argument("--backend", default="vanilla",
+                        choices=["vanilla", "pydantic", "columnar", "threadsafe"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    module = importlib.import_module(
+        f"utils.{args.backend}.student_management_system")
+    sms = module.StudentManagementSystem()
+    populate(sms, InstitutionGenerator(args.students, seed=args.seed))
+
+    # The first query builds the bitmaps
+    start = time.perf_counter()
+    sms.count_students_where(enrolled_in(CourseNameId.INTRO_TO_PROGRAMMING))
+    build = time.perf_counter() - start
+    bitmaps = sms._course_bitmaps
+
+    print(f"{len(sms.students):,} students, {len(sms.courses)} courses, bitmaps built in {build:.2f} s, "
+          f"{bitmaps.nbytes() / 2**20:.1f} MiB")
+    print(f"{'query':<15} {'matches':>9} {'count ms':>9} {'iterate ms':>11} {'sets ms':>9} {'speedup':>8}")
+
+    for name, (query, baseline) in queries(sms).items():
+        matches = sms.count_students_where(query)
+
+        if matches != len(baseline()):
+            raise SystemExit(f"{name}: bitmaps and sets disagree")
+
+        count = best_of(lambda: sms.count_students_where(query), args.repeat)
+        iterate = best_of(lambda: sum(1 for _ in sms.iter_students_where(query)), args.repeat)
+        sets = best_of(baseline, args.repeat)
+
+        print(f"{name:<15} {matches:>9,} {count * 1000:>9.2f} {iterate * 1000:>11.1f} "
+              f"{sets * 1000:>9.1f} {sets / count:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Measures the cost of change events: `grade_student` throughput without subscribers, with a
+synchronous callback and with an asyncio subscriber reading batches in another thread, and the time
+to enroll a large batch with each.
+
+Usage:
+    python -m benchmarks.events --students 10000 --operations 50000 --backend vanilla
+"""
+import argparse
+import asyncio
+import importlib
+import random
+import threading
+import time
+from typing import Callable, List, Optional
+
+from utils.enums import CourseNameId, Grade, Major
+
+
+BACKENDS = ("vanilla", "pydantic", "columnar", "threadsafe")
+
+
+def build(module, students: int, enrollments: List[tuple]):
+    sms = module.StudentManagementSystem()
+    majors = list(Major)
+
+    sms.add_courses_many(module.Course(course_name_id=course_name_id)
+                         for course_name_id in CourseNameId)
+    sms.add_students_many(module.Student(first_name=f"First{i}", last_name=f"Last{i}", major=majors[i % len(majors)], id_number=f"STU-{i:08d}")
+                          for i in range(students))
+
+    return sms
+
+
+def consume(sms, ready: threading.Event, counted: List[int], linger: float) -> Callable[[], None]:
+    """
+    Starts an event loop in a thread reading every event of the system, and returns the function stopping it.
+    """
+
+    loop = asyncio.new_event_loop()
+    subscription = None
+
+    async def read() -> None:
+        nonlocal subscription
+        subscription = sms.subscribe_async(batch_size=1_000, linger=linger)
+        ready.set()
+
+        async for events in subscription:
+            counted[0] += len(events)
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(read(),))
+    thread.start()
+    ready.wait()
+
+    def stop() -> None:
+        subscription.close()
+        thread.join()
+        loop.close()
+
+    return stop
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--courses-per-student", type=int, default=5)
+    parser.add_argument("--operations", type=int, default=50_000)
+    parser.add_argument("--backend", default="vanilla", choices=BACKENDS)
+    parser.add_argument("--linger", type=float, default=0.005,
+                        help="seconds the asyncio subscriber waits for a batch to fill")
+    args = parser.parse_args()
+
+    module = importlib.import_module(
+        f"utils.{args.backend}.student_management_system")
+    rng = random.Random(0)
+    course_ids = [course_name_id.course_id for course_name_id in CourseNameId]
+    grades = list(Grade)
+    enrollments = [(f"STU-{i:08d}", course_id) for i in range(args.students)
+                   for course_id in rng.sample(course_ids, args.courses_per_student)]
+    operations = [(*rng.choice(enrollments), rng.choice(grades))
+                  for _ in range(args.operations)]
+
+    print(f"{args.backend}: {args.students:,} students, {len(enrollments):,} enrollments, {args.operations:,} grade_student calls")
+    print(f"{'subscriber':<12} {'enroll_many s':>14} {'grade ops/s':>12} {'overhead':>9} {'delivered':>10}")
+
+    baseline: Optional[float] = None
+
+    for subscriber in ("none", "callback", "asyncio"):
+        sms = build(module, args.students, enrollments)
+        counted = [0]
+        stop: Optional[Callable[[], None]] = None
+
+        if subscriber == "callback":
+            def count(events: list) -> None:
+                counted[0] += len(events)
+
+            subscription = sms.subscribe(count, batched=True)
+            stop = subscription.close
+        elif subscriber == "asyncio":
+            stop = consume(sms, threading.Event(), counted, args.linger)
+
+        start = time.perf_counter()
+        sms.enroll_many(enrollments)
+        enroll = time.perf_counter() - start
+
+        start = time.perf_counter()
+
+        for id_number, course_id, grade in operations:
+            sms.grade_student(id_number, course_id, grade)
+
+        rate = args.operations / (time.perf_counter() - start)
+
+        if stop is not None:
+            stop()
+
+        baseline = baseline or rate
+        print(f"{subscriber:<12} {enroll:>14.2f} {rate:>12,.0f} {baseline / rate - 1:>8.1%} {counted[0]:>10,}")
+
+
+if __name__ == "__main__":
+    main()
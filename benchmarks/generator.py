@@ -0,0 +1,52 @@
+"""
+Measures generating a synthetic institution with `utils.generator` and streaming it into each backend.
+
+Usage:
+    python -m benchmarks.generator --students 250000 --seed 42
+"""
+import argparse
+import importlib
+import time
+
+from utils.generator import InstitutionGenerator, populate
+
+
+BACKENDS = ("vanilla", "pydantic", "columnar", "threadsafe")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=250_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--courses-per-student", type=float, default=4.0)
+    parser.add_argument("--zipf-exponent", type=float, default=1.0)
+    parser.add_argument("--backends", nargs="+",
+                        default=list(BACKENDS), choices=BACKENDS)
+    args = parser.parse_args()
+
+    generator = InstitutionGenerator(students=args.students, seed=args.seed,
+                                     courses_per_student=args.courses_per_student, zipf_exponent=args.zipf_exponent)
+
+    start = time.perf_counter()
+    enrollments = sum(chunk.enrollment_count for chunk in generator.chunks())
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.students:,} students, {generator.instructors:,} instructors, {enrollments:,} enrollments")
+    print(f"{'generate only':<14} {elapsed:>7.2f} s")
+
+    for backend in args.backends:
+        module = importlib.import_module(
+            f"utils.{backend}.student_management_system")
+        sms = module.StudentManagementSystem()
+
+        start = time.perf_counter()
+        populate(sms, generator)
+        elapsed = time.perf_counter() - start
+
+        sms.verify_indexes()
+        print(f"{backend:<14} {elapsed:>7.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Measures the throughput of a journaled StudentManagementSystem under each fsync policy, and the
+time to replay and to checkpoint the resulting journal.
+
+Every operation is a `grade_student` call, the most frequent change of a running system.
+
+Usage:
+    python -m benchmarks.journal --students 10000 --operations 5000 --backend vanilla
+"""
+import argparse
+import importlib
+import os
+import random
+import tempfile
+import time
+
+from utils.enums import CourseNameId, Grade, Major
+from utils.journal import FsyncPolicy, Journal
+
+
+BACKENDS = ("vanilla", "pydantic", "columnar")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--courses-per-student", type=int, default=5)
+    parser.add_argument("--operations", type=int, default=5_000)
+    parser.add_argument("--interval-ms", type=float, default=10.0)
+    parser.add_argument("--backend", default="vanilla", choices=BACKENDS)
+    args = parser.parse_args()
+
+    module = importlib.import_module(
+        f"utils.{args.backend}.student_management_system")
+    rng = random.Random(0)
+    course_ids = [course_name_id.course_id for course_name_id in CourseNameId]
+    majors = list(Major)
+    grades = list(Grade)
+    enrollments = [(f"STU-{i:08d}", course_id) for i in range(args.students)
+                   for course_id in rng.sample(course_ids, args.courses_per_student)]
+    operations = [(*rng.choice(enrollments), rng.choice(grades))
+                  for _ in range(args.operations)]
+
+    print(f"{args.backend}: {args.students:,} students, {len(enrollments):,} enrollments, {args.operations:,} grade_student calls")
+    print(f"{'policy':<10} {'ops/s':>10} {'MiB':>6} {'replay s':>9} {'checkpoint s':>13}")
+
+    for policy in FsyncPolicy:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sms.journal")
+            journal = Journal.open(
+                module.StudentManagementSystem, path, fsync=policy, interval_ms=args.interval_ms)
+            sms = journal.system
+
+            sms.add_courses_many(module.Course(course_name_id=course_name_id)
+                                 for course_name_id in CourseNameId)
+            sms.add_students_many(module.Student(first_name=f"First{i}", last_name=f"Last{i}", major=majors[i % len(majors)], id_number=f"STU-{i:08d}")
+                                  for i in range(args.students))
+            sms.enroll_many(enrollments)
+
+            start = time.perf_counter()
+
+            for id_number, course_id, grade in operations:
+                sms.grade_student(id_number=id_number,
+                                  course_id=course_id, grade=grade)
+
+            journal.flush()
+            elapsed = time.perf_counter() - start
+            journal.close()
+            size = os.path.getsize(path)
+
+            start = time.perf_counter()
+            journal = Journal.open(module.StudentManagementSystem, path)
+            replay_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            journal.checkpoint()
+            checkpoint_time = time.perf_counter() - start
+            journal.close()
+
+            print(f"{policy.value:<10} {args.operations / elapsed:>10,.0f} {size / 2**20:>6.1f} {replay_time:>9.2f} {checkpoint_time:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Compares the memory held by the vanilla, pydantic and columnar StudentManagementSystem backends.
+
+Usage:
+    python -m benchmarks.memory --students 100000 --courses-per-student 5
+"""
+import argparse
+import gc
+import importlib
+import random
+import tracemalloc
+from typing import Tuple
+
+from utils.enums import CourseNameId, Major
+
+
+BACKENDS = ("vanilla", "pydantic", "columnar")
+
+
+def measure(backend: str, students: int, courses_per_student: int, seed: int = 0) -> Tuple[int, int]:
+    """
+    Builds a system with the given backend and returns the bytes it holds according to tracemalloc,
+    in total and for the enrollments alone.
+    """
+
+    module = importlib.import_module(
+        f"utils.{backend}.student_management_system")
+    rng = random.Random(seed)
+    course_ids = [course_name_id.course_id for course_name_id in CourseNameId]
+    majors = list(Major)
+
+    gc.collect()
+    tracemalloc.start()
+
+    sms = module.StudentManagementSystem()
+    sms.add_courses_many(module.Course(course_name_id=course_name_id)
+                         for course_name_id in CourseNameId)
+    sms.add_students_many(module.Student(first_name=f"First{i}", last_name=f"Last{i}", major=majors[i % len(majors)], id_number=f"STU-{i:08d}")
+                          for i in range(students))
+
+    gc.collect()
+    before_enrollments, _ = tracemalloc.get_traced_memory()
+
+    sms.enroll_many((f"STU-{i:08d}", course_id)
+                    for i in range(students) for course_id in rng.sample(course_ids, courses_per_student))
+
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return held, held - before_enrollments
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--courses-per-student", type=int, default=5)
+    parser.add_argument("--backends", nargs="+",
+                        default=list(BACKENDS), choices=BACKENDS)
+    args = parser.parse_args()
+
+    enrollments = args.students * args.courses_per_student
+    print(f"{args.students:,} students, {enrollments:,} enrollments")
+    print(f"{'backend':<10} {'total MiB':>10} {'enrollments MiB':>16} {'bytes/enrollment':>17}")
+
+    for backend in args.backends:
+        held, enrollments_held = measure(
+            backend, args.students, args.courses_per_student)
+        print(f"{backend:<10} {held / 2**20:>10.1f} {enrollments_held / 2**20:>16.1f} {enrollments_held / enrollments:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
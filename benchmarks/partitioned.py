@@ -0,0 +1,92 @@
+"""
+Measures how the partitioned StudentManagementSystem scales with its number of shards: loading a
+generated institution, enrolling and grading a batch of new students, and computing grade
+analytics. The first row is a single system in this process, without worker processes. Speedups are
+relative to one shard, and only show with as many free cores as shards.
+
+Usage:
+    python -m benchmarks.partitioned --students 500000 --shards 1 2 4 8 --backend columnar
+"""
+import argparse
+import importlib
+import os
+import random
+from typing import Any, Dict, List
+
+from benchmarks.timing import timed
+from utils.analytics import GradeAnalytics
+from utils.enums import Grade, Major
+from utils.generator import InstitutionGenerator, populate
+from utils.partitioned.student_management_system import StudentManagementSystem as PartitionedStudentManagementSystem
+
+
+def run(sms: Any, generator: InstitutionGenerator, module: Any, new_students: int, seed: int) -> Dict[str, float]:
+    rng = random.Random(seed)
+    course_ids = generator.course_ids
+    grades = [grade for grade in Grade if grade is not Grade.NO_GRADE]
+    students = [module.Student(first_name=f"New{i}", last_name=f"Student{i}", major=rng.choice(list(Major)))
+                for i in range(new_students)]
+    enrollments = [(student.id_number, course_id) for student in students
+                   for course_id in rng.sample(course_ids, 4)]
+    graded = [(id_number, course_id, rng.choice(grades))
+              for id_number, course_id in enrollments]
+
+    if isinstance(sms, PartitionedStudentManagementSystem):
+        def analytics() -> None:
+            result = sms.grade_analytics()
+            result.student_gpa(), result.course_averages(), result.major_averages()
+
+        load, _ = timed(lambda: sms.populate(generator))
+    else:
+        def analytics() -> None:
+            result = GradeAnalytics(sms)
+            result.student_gpa(), result.course_averages(), result.major_averages()
+
+        load, _ = timed(lambda: populate(sms, generator))
+
+    return {
+        "populate": load,
+        "add+enroll": timed(lambda: (sms.add_students_many(students), sms.enroll_many(enrollments)))[0],
+        "grade_many": timed(lambda: sms.grade_many(graded))[0],
+        "analytics": timed(analytics)[0],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=200_000)
+    parser.add_argument("--new-students", type=int, default=50_000)
+    parser.add_argument("--shards", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--backend", default="vanilla",
+                        choices=["vanilla", "pydantic", "columnar"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    module = importlib.import_module(
+        f"utils.{args.backend}.student_management_system")
+    generator = InstitutionGenerator(args.students, seed=args.seed)
+    columns = ["populate", "add+enroll", "grade_many", "analytics"]
+
+    print(f"{args.backend}: {args.students:,} students, {args.new_students:,} new students enrolled in 4 courses each, "
+          f"{os.cpu_count()} CPU(s)")
+    print(f"{'shards':<12}" + "".join(f"{column:>20}" for column in columns))
+
+    timings = run(module.StudentManagementSystem(), generator, module, args.new_students, args.seed)
+    print(f"{'in-process':<12}" + "".join(f"{timings[column]:>19.2f}s" for column in columns))
+
+    baseline: List[float] = []
+
+    for shards in args.shards:
+        with PartitionedStudentManagementSystem(shards=shards, backend=args.backend) as sms:
+            timings = run(sms, generator, module, args.new_students, args.seed)
+
+        seconds = [timings[column] for column in columns]
+        baseline = baseline or seconds
+        print(f"{shards:<12}" + "".join(f"{value:>10.2f}s ({base / value:>4.1f}x)"
+                                        for value, base in zip(seconds, baseline)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Measures the name search index of `utils.search` against a linear scan over every name.
+
+People come from `utils.generator`, and queries are taken from random people: full names, prefixes
+of both names, a single prefix and misspelled last names.
+
+Usage:
+    python -m benchmarks.search --students 1000000 --queries 1000
+"""
+import argparse
+import random
+import statistics
+import time
+from typing import Callable, Dict, List, Tuple
+
+from utils.generator import InstitutionGenerator
+from utils.search import NameIndex, tokenize
+
+
+def make_queries(names: List[Tuple[str, str]], count: int, rng: random.Random) -> Dict[str, List[str]]:
+    """
+    Returns `count` queries of every kind, built from random names.
+    """
+
+    def misspell(name: str) -> str:
+        # Drop one letter that is neither the first nor the last
+        position = rng.randrange(1, len(name) - 1) if len(name) > 2 else 0
+        return name[:position] + name[position + 1:]
+
+    people = [rng.choice(names) for _ in range(count)]
+
+    return {
+        "full name": [f"{first} {last}" for first, last in people],
+        "two prefixes": [f"{first[:3]} {last[:3]}" for first, last in people],
+        "one prefix": [first[:2] for first, _ in people],
+        "misspelled": [misspell(last) for _, last in people],
+    }
+
+
+def scan(names: List[Tuple[str, str]], query: str, limit: int) -> List[int]:
+    """
+    The baseline: the first people whose name tokens start with every term of the query, after a
+    full pass, as ranking needs every match.
+    """
+
+    terms = tokenize(query)
+    found = []
+
+    for position, (first, last) in enumerate(names):
+        tokens = tokenize(f"{first} {last}")
+
+        if all(any(token.startswith(term) for token in tokens) for term in terms):
+            found.append(position)
+
+    return found[:limit]
+
+
+def latencies(search: Callable[[str], object], queries: List[str]) -> List[float]:
+    timings = []
+
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        timings.append(time.perf_counter() - start)
+
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--scan-queries", type=int, default=3,
+                        help="Queries per kind for the linear scan, which is slow")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generator = InstitutionGenerator(args.students, seed=args.seed, courses_per_student=1)
+    ids: List[str] = []
+    names: List[Tuple[str, str]] = []
+
+    for chunk in generator.chunks():
+        ids.extend(chunk.id_numbers)
+        names.extend(zip(chunk.first_names, chunk.last_names))
+
+    index = NameIndex()
+    start = time.perf_counter()
+    index.add_many(zip(ids, names))
+    build = time.perf_counter() - start
+
+    # The first search sorts the tokens, which belongs to the build
+    start = time.perf_counter()
+    index.search(names[0][0])
+    build += time.perf_counter() - start
+
+    print(f"{len(ids):,} people, index built in {build:.2f} s")
+    print(f"{'query':<14} {'index p50 ms':>13} {'index p99 ms':>13} {'scan p50 ms':>12}")
+
+    queries = make_queries(names, args.queries, random.Random(args.seed))
+
+    for kind, kind_queries in queries.items():
+        indexed = sorted(latencies(lambda query: index.search(query, limit=args.limit), kind_queries))
+        scanned = latencies(lambda query: scan(names, query, args.limit),
+                            kind_queries[:args.scan_queries])
+        p99 = indexed[min(len(indexed) - 1, int(len(indexed) * 0.99))]
+
+        print(f"{kind:<14} {statistics.median(indexed) * 1000:>13.3f} {p99 * 1000:>13.3f} "
+              f"{statistics.median(scanned) * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
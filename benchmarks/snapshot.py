@@ -0,0 +1,90 @@
+"""
+Compares restoring a StudentManagementSystem from a binary snapshot with rebuilding it through the
+public add_* and enroll_* APIs and with unpickling it.
+
+Usage:
+    python -m benchmarks.snapshot --students 100000 --courses-per-student 5
+"""
+import argparse
+import importlib
+import os
+import pickle
+import random
+import tempfile
+from typing import Any, List, Tuple
+
+from benchmarks.timing import timed
+from utils.enums import CourseNameId, Major
+
+
+BACKENDS = ("vanilla", "pydantic", "columnar")
+
+
+def rebuild(module: Any, students: List[Tuple[str, str, str, Major]], enrollments: List[Tuple[str, str]]) -> Any:
+    """
+    Builds a system from scratch through the bulk add_* and enroll_* APIs.
+    """
+
+    sms = module.StudentManagementSystem()
+    sms.add_courses_many(module.Course(course_name_id=course_name_id)
+                         for course_name_id in CourseNameId)
+    sms.add_students_many(module.Student(first_name=first_name, last_name=last_name, major=major, id_number=id_number)
+                          for id_number, first_name, last_name, major in students)
+    sms.enroll_many(enrollments)
+
+    return sms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--courses-per-student", type=int, default=5)
+    parser.add_argument("--backends", nargs="+",
+                        default=list(BACKENDS), choices=BACKENDS)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    course_ids = [course_name_id.course_id for course_name_id in CourseNameId]
+    majors = list(Major)
+    students = [(f"STU-{i:08d}", f"First{i}", f"Last{i}", majors[i % len(majors)])
+                for i in range(args.students)]
+    enrollments = [(id_number, course_id) for id_number, *_ in students
+                   for course_id in rng.sample(course_ids, args.courses_per_student)]
+
+    print(f"{args.students:,} students, {len(enrollments):,} enrollments")
+    print(f"{'backend':<10} {'rebuild s':>10} {'save s':>8} {'load s':>8} {'MiB':>6} {'pickle s':>9} {'unpickle s':>11} {'MiB':>6}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot_path = os.path.join(directory, "sms.snap")
+        pickle_path = os.path.join(directory, "sms.pickle")
+
+        for backend in args.backends:
+            module = importlib.import_module(
+                f"utils.{backend}.student_management_system")
+            system = module.StudentManagementSystem
+
+            rebuild_time, sms = timed(
+                lambda: rebuild(module, students, enrollments), pause_gc=True)
+            save_time, _ = timed(lambda: sms.save_snapshot(snapshot_path), pause_gc=True)
+            load_time, loaded = timed(
+                lambda: system.load_snapshot(snapshot_path), pause_gc=True)
+            loaded.verify_indexes()
+
+            def dump() -> None:
+                with open(pickle_path, "wb") as file:
+                    pickle.dump(sms, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+            def undump() -> Any:
+                with open(pickle_path, "rb") as file:
+                    return pickle.load(file)
+
+            pickle_time, _ = timed(dump, pause_gc=True)
+            unpickle_time, _ = timed(undump, pause_gc=True)
+
+            print(f"{backend:<10} {rebuild_time:>10.2f} {save_time:>8.2f} {load_time:>8.2f} {os.path.getsize(snapshot_path) / 2**20:>6.1f} "
+                  f"{pickle_time:>9.2f} {unpickle_time:>11.2f} {os.path.getsize(pickle_path) / 2**20:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""
+Runs every StudentManagementSystem operation at several scales on each backend and records the wall
+time per call, the peak memory of building the system and the memory held per student, instructor
+and enrollment, according to tracemalloc.
+
+The report is written as JSON, and two reports can be compared to gate upgrades: the comparison
+exits with status 1 if any time or memory figure grew by more than the threshold.
+
+Usage:
+    python -m benchmarks.suite --sizes 1000 100000 1000000 --output report.json
+    python -m benchmarks.suite --compare baseline.json report.json --threshold 0.25
+"""
+import argparse
+import gc
+import importlib
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from benchmarks.timing import timed_calls
+from utils.enums import CourseNameId, Department, Grade, Major
+
+
+BACKENDS = ("vanilla", "pydantic", "columnar", "threadsafe")
+
+# Figures compared between reports, all of them lower is better
+METRICS = ("ns_per_call", "peak_bytes", "held_bytes", "bytes_per_student",
+           "bytes_per_instructor", "bytes_per_enrollment")
+
+
+class Population:
+    """
+    The entities of one run, derived from the number of students so every backend gets the same data.
+
+    Attributes:
+        student_ids (List[str]): The IDs of the students.
+        instructor_ids (List[str]): The IDs of the instructors, one in fifty students but at least one per course.
+        enrollments (List[Tuple[str, str]]): The (student ID, course ID) pairs.
+    """
+
+    def __init__(self, size: int, courses_per_student: int, seed: int) -> None:
+        rng = random.Random(seed)
+        course_ids = [course_name_id.course_id for course_name_id in CourseNameId]
+
+        self.student_ids = [f"STU-{i:08d}" for i in range(size)]
+        self.instructor_ids = [f"INS-{i:08d}" for i in range(
+            max(size // 50, len(course_ids)))]
+        self.enrollments = [(id_number, course_id) for id_number in self.student_ids
+                            for course_id in rng.sample(course_ids, courses_per_student)]
+
+
+def build(module: Any, population: Population, on_stage: Callable[[str], None] = lambda stage: None) -> Any:
+    """
+    Builds a system through its bulk APIs, calling `on_stage` after each kind of entity is added.
+    """
+
+    majors = list(Major)
+    departments = list(Department)
+
+    sms = module.StudentManagementSystem()
+    sms.add_courses_many(module.Course(course_name_id=course_name_id)
+                         for course_name_id in CourseNameId)
+    on_stage("courses")
+
+    sms.add_students_many(module.Student(first_name=f"First{i}", last_name=f"Last{i}", major=majors[i % len(majors)], id_number=id_number)
+                          for i, id_number in enumerate(population.student_ids))
+    on_stage("students")
+
+    sms.add_instructors_many(module.Instructor(first_name=f"First{i}", last_name=f"Last{i}", department=departments[i % len(departments)], id_number=id_number)
+                             for i, id_number in enumerate(population.instructor_ids))
+
+    for instructor_id, course in zip(population.instructor_ids, list(sms.courses.values())):
+        course.add_instructor(sms.instructors[instructor_id])
+
+    on_stage("instructors")
+
+    sms.enroll_many(population.enrollments)
+    on_stage("enrollments")
+
+    return sms
+
+
+def measure_memory(module: Any, population: Population) -> Dict[str, float]:
+    """
+    Builds a system under tracemalloc and returns its peak and held memory, and the bytes held per entity.
+    """
+
+    held: Dict[str, int] = {}
+
+    def on_stage(stage: str) -> None:
+        gc.collect()
+        held[stage] = tracemalloc.get_traced_memory()[0]
+
+    gc.collect()
+    tracemalloc.start()
+
+    sms = build(module, population, on_stage)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+
+    tracemalloc.stop()
+    del sms
+
+    return {
+        "peak_bytes": peak,
+        "held_bytes": current,
+        "bytes_per_student": (held["students"] - held["courses"]) / len(population.student_ids),
+        "bytes_per_instructor": (held["instructors"] - held["students"]) / len(population.instructor_ids),
+        "bytes_per_enrollment": (held["enrollments"] - held["instructors"]) / len(population.enrollments),
+    }
+
+
+def time_operations(module: Any, sms: Any, population: Population, operations: int, seed: int) -> Iterable[Tuple[str, int, float]]:
+    """
+    Times every operation of the system, yielding the name, number of calls and seconds of each.
+
+    Reads run first, then changes to existing entries, then additions, and removals last, so every
+    operation runs against a system of the full size. Entities added here get IDs outside the population.
+    """
+
+    rng = random.Random(seed)
+    students = rng.sample(population.student_ids, min(
+        operations, len(population.student_ids)))
+    instructors = rng.sample(population.instructor_ids, min(
+        operations, len(population.instructor_ids)))
+    enrollments = rng.sample(population.enrollments, min(
+        operations, len(population.enrollments)))
+    course_ids = list(sms.courses)
+    courses = [rng.choice(course_ids) for _ in range(operations)]
+    grades = list(Grade)
+
+    new_students = [module.Student(first_name="New", last_name=f"Student{i}", major=Major.MATHEMATICS, id_number=f"STU-NEW-{i:08d}")
+                    for i in range(2 * operations)]
+    new_instructors = [module.Instructor(first_name="New", last_name=f"Instructor{i}", department=Department.MATHEMATICS, id_number=f"INS-NEW-{i:08d}")
+                       for i in range(2 * operations)]
+
+    # Reads
+    yield ("find_student", *timed_calls(lambda id_number: sms.find_student(id_number=id_number), students))
+    yield ("find_instructor", *timed_calls(lambda id_number: sms.find_instructor(id_number=id_number), instructors))
+    yield ("find_course", *timed_calls(lambda course_id: sms.find_course(course_id=course_id), courses))
+    yield ("find_course_enrollments", *timed_calls(lambda course_id: sms.find_course_enrollments(course_id=course_id), courses[:len(course_ids)]))
+    yield ("find_course_enrolled_students", *timed_calls(lambda course_id: sms.find_course_enrolled_students(course_id=course_id), courses[:len(course_ids)]))
+    yield ("find_student_enrollments", *timed_calls(lambda id_number: sms.find_student_enrollments(id_number=id_number), students))
+    yield ("find_enrolled_student_courses", *timed_calls(lambda id_number: sms.find_enrolled_student_courses(id_number=id_number), students))
+    yield ("find_instructor_courses", *timed_calls(lambda id_number: sms.find_instructor_courses(id_number=id_number), instructors))
+
+    # Changes to existing entries
+    yield ("grade_student", *timed_calls(lambda enrollment: sms.grade_student(id_number=enrollment[0], course_id=enrollment[1], grade=rng.choice(grades)), enrollments))
+
+    replacements = [module.Student(first_name="Updated", last_name="Student", major=Major.PHYSICS, id_number=id_number)
+                    for id_number in students]
+    yield ("update_student", *timed_calls(lambda student: sms.update_student(student=student), replacements))
+
+    replacements = [module.Instructor(first_name="Updated", last_name="Instructor", department=Department.PHYSICS, id_number=id_number)
+                    for id_number in instructors]
+    yield ("update_instructor", *timed_calls(lambda instructor: sms.update_instructor(instructor=instructor), replacements))
+
+    course_name_ids = {course_name_id.course_id: course_name_id for course_name_id in CourseNameId}
+    replacements = [module.Course(course_name_id=course_name_ids[course.course_id], enrolled_students=dict(course.enrolled_students), instructors=dict(course.instructors))
+                    for course in list(sms.courses.values())]
+    yield ("update_course", *timed_calls(lambda course: sms.update_course(course=course), replacements))
+
+    # Additions
+    yield ("add_student", *timed_calls(lambda student: sms.add_student(student=student), new_students[:operations]))
+    yield ("add_students_many", *timed_calls(lambda batch: sms.add_students_many(students=batch), [new_students[operations:]]))
+    yield ("add_instructor", *timed_calls(lambda instructor: sms.add_instructor(instructor=instructor), new_instructors[:operations]))
+    yield ("add_instructors_many", *timed_calls(lambda batch: sms.add_instructors_many(instructors=batch), [new_instructors[operations:]]))
+    yield ("enroll_student", *timed_calls(lambda pair: sms.enroll_student(id_number=pair[0], course_id=pair[1]),
+                                    [(student.id_number, course_id) for student, course_id in zip(new_students[:operations], courses)]))
+    yield ("enroll_many", *timed_calls(sms.enroll_many, [[(student.id_number, course_id) for student, course_id in zip(new_students[operations:], courses)]]))
+
+    # Whole-system operations
+    yield ("verify_indexes", *timed_calls(lambda _: sms.verify_indexes(), [None]))
+    yield ("snapshot", *timed_calls(lambda _: sms.snapshot().close(), [None]))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sms.snap")
+        yield ("save_snapshot", *timed_calls(sms.save_snapshot, [path]))
+        yield ("load_snapshot", *timed_calls(module.StudentManagementSystem.load_snapshot, [path]))
+
+    # Removals
+    yield ("remove_student", *timed_calls(lambda student: sms.remove_student(id_number=student.id_number), new_students))
+    yield ("remove_instructor", *timed_calls(lambda instructor: sms.remove_instructor(id_number=instructor.id_number), new_instructors))
+    yield ("remove_course", *timed_calls(lambda course_id: sms.remove_course(course_id=course_id), course_ids))
+    yield ("add_course", *timed_calls(lambda course_name_id: sms.add_course(course=module.Course(course_name_id=course_name_id)), list(CourseNameId)))
+
+
+def run(backends: List[str], sizes: List[int], courses_per_student: int, operations: int, memory: bool, seed: int) -> Dict[str, Any]:
+    """
+    Runs the suite and returns the report.
+    """
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "courses_per_student": courses_per_student,
+            "operations": operations,
+            "seed": seed,
+        },
+        "operations": [],
+        "memory": [],
+    }
+
+    for size in sizes:
+        population = Population(size, courses_per_student, seed)
+
+        for backend in backends:
+            module = importlib.import_module(
+                f"utils.{backend}.student_management_system")
+
+            if memory:
+                figures = measure_memory(module, population)
+                report["memory"].append(
+                    {"backend": backend, "size": size, **figures})
+                print(f"{backend:<10} {size:>9,} {'memory':<30} peak {figures['peak_bytes'] / 2**20:>9.1f} MiB, "
+                      f"{figures['bytes_per_student']:.0f} B/student, {figures['bytes_per_instructor']:.0f} B/instructor, "
+                      f"{figures['bytes_per_enrollment']:.0f} B/enrollment")
+
+            gc.collect()
+            start = time.perf_counter()
+            sms = build(module, population)
+            seconds = time.perf_counter() - start
+            report["operations"].append({"backend": backend, "size": size, "operation": "build", "calls": 1,
+                                         "seconds": seconds, "ns_per_call": seconds * 1e9})
+
+            for operation, calls, seconds in time_operations(module, sms, population, min(operations, size), seed):
+                ns_per_call = seconds / calls * 1e9
+                report["operations"].append({"backend": backend, "size": size, "operation": operation, "calls": calls,
+                                             "seconds": seconds, "ns_per_call": ns_per_call})
+                print(f"{backend:<10} {size:>9,} {operation:<30} {calls:>7,} calls {ns_per_call / 1000:>12.2f} us/call")
+
+            del sms
+
+    return report
+
+
+def _index(report: Dict[str, Any]) -> Dict[Tuple[str, int, str], Dict[str, float]]:
+    """
+    Flattens a report into figures keyed by (backend, size, what was measured).
+    """
+
+    figures = {(row["backend"], row["size"], row["operation"]): {"ns_per_call": row["ns_per_call"]}
+               for row in report["operations"]}
+
+    for row in report["memory"]:
+        figures[(row["backend"], row["size"], "memory")] = {
+            metric: row[metric] for metric in METRICS if metric in row}
+
+    return figures
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compares two reports and prints every figure they share.
+
+    Args:
+        baseline (Dict[str, Any]): The reference report.
+        current (Dict[str, Any]): The report to check.
+        threshold (float): The relative growth above which a figure is a regression, 0.25 for 25%.
+
+    Returns:
+        List[str]: A description of every regression, empty if there is none.
+    """
+
+    before, after = _index(baseline), _index(current)
+    regressions = []
+
+    print(f"{'backend':<10} {'size':>9} {'measure':<30} {'metric':<21} {'baseline':>14} {'current':>14} {'change':>8}")
+
+    for key in sorted(before.keys() & after.keys()):
+        for metric in sorted(before[key].keys() & after[key].keys()):
+            old, new = before[key][metric], after[key][metric]
+            change = (new - old) / old if old else 0.0
+            flag = " <-" if change > threshold else ""
+            print(f"{key[0]:<10} {key[1]:>9,} {key[2]:<30} {metric:<21} {old:>14,.0f} {new:>14,.0f} {change:>+8.1%}{flag}")
+
+            if change > threshold:
+                regressions.append(
+                    f"{key[0]} {key[1]:,} {key[2]} {metric}: {old:,.0f} -> {new:,.0f} ({change:+.1%})")
+
+    for key in sorted(before.keys() - after.keys()):
+        print(f"{key[0]:<10} {key[1]:>9,} {key[2]:<30} missing from the current report")
+
+    return regressions
+
+
+def main() -> Optional[int]:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+",
+                        default=["vanilla", "pydantic"], choices=BACKENDS)
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--courses-per-student", type=int, default=3)
+    parser.add_argument("--operations", type=int, default=1_000,
+                        help="Calls timed per operation, at most the number of students")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip the tracemalloc build, which doubles the run time")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="Compare two reports instead of running the suite")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Relative growth counted as a regression by --compare")
+    args = parser.parse_args()
+
+    if args.compare:
+        reports = []
+
+        for path in args.compare:
+            with open(path, encoding="utf-8") as file:
+                reports.append(json.load(file))
+
+        regressions = compare(*reports, threshold=args.threshold)
+
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}:")
+            print("\n".join(regressions))
+            return 1
+
+        print(f"\nNo regression above {args.threshold:.0%}.")
+        return 0
+
+    report = run(args.backends, args.sizes, args.courses_per_student,
+                 args.operations, not args.no_memory, args.seed)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+        print(f"Report written to {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
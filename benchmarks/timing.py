@@ -0,0 +1,48 @@
+"""
+Timing helpers shared by the benchmarks.
+"""
+import gc
+import time
+from typing import Any, Callable, Iterable, Tuple
+
+
+def timed(function: Callable[[], Any], pause_gc: bool = False) -> Tuple[float, Any]:
+    """
+    Runs a function and returns its wall time and result.
+
+    Args:
+        function (Callable[[], Any]): The function to time.
+        pause_gc (bool, optional): Whether to collect the garbage of earlier runs first and keep the cyclic garbage collector off while the function runs, to time building many objects without the collections they trigger. Defaults to False.
+
+    Returns:
+        Tuple[float, Any]: The seconds the function took and what it returned.
+    """
+
+    if pause_gc:
+        gc.collect()
+        gc.disable()
+
+    try:
+        start = time.perf_counter()
+        result = function()
+        return time.perf_counter() - start, result
+    finally:
+        if pause_gc:
+            gc.enable()
+
+
+def timed_calls(function: Callable[[Any], Any], arguments: Iterable[Any]) -> Tuple[int, float]:
+    """
+    Calls `function` once per argument and returns the number of calls and the seconds they took.
+    """
+
+    arguments = list(arguments)
+
+    def call_all() -> None:
+        for argument in arguments:
+            function(argument)
+
+    gc.collect()
+    seconds, _ = timed(call_all)
+
+    return len(arguments), seconds
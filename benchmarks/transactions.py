@@ -0,0 +1,126 @@
+"""
+Measures a term-registration job, new students each enrolled in and graded for a few courses, on
+a populated system: applied call by call, inside `transaction()`, and buffered by `batch()`. Also
+times rolling the job back against the deep copy taken before risky jobs without transactions.
+
+Usage:
+    python -m benchmarks.transactions --students 100000 --new-students 5000 --backend vanilla
+"""
+import argparse
+import copy
+import gc
+import importlib
+import random
+import time
+from typing import Any, List, Tuple
+
+from benchmarks.timing import timed
+from utils.enums import Grade, Major
+from utils.generator import InstitutionGenerator, populate
+
+
+class Abort(Exception):
+    pass
+
+
+def registration(module, sms, count: int, courses_per_student: int, seed: int) -> Tuple[List[Any], List[Tuple[str, str]], List[Tuple[str, str, Grade]]]:
+    rng = random.Random(seed)
+    course_ids = list(sms.courses)
+    grades = [grade for grade in Grade if grade is not Grade.NO_GRADE]
+    students = [module.Student(first_name=f"New{i}", last_name=f"Student{i}", major=rng.choice(list(Major)))
+                for i in range(count)]
+    enrollments = [(student.id_number, course_id) for student in students
+                   for course_id in rng.sample(course_ids, courses_per_student)]
+    graded = [(id_number, course_id, rng.choice(grades))
+              for id_number, course_id in enrollments]
+
+    return students, enrollments, graded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--new-students", type=int, default=5_000)
+    parser.add_argument("--courses-per-student", type=int, default=4)
+    parser.add_argument("--backend", default="vanilla",
+                        choices=["vanilla", "pydantic", "columnar", "threadsafe"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    module = importlib.import_module(
+        f"utils.{args.backend}.student_management_system")
+
+    def fresh():
+        # Courses and their system reference each other, so the previous system is only freed by a collection
+        gc.collect()
+        sms = module.StudentManagementSystem()
+        populate(sms, InstitutionGenerator(args.students, seed=args.seed))
+
+        return sms
+
+    def one_by_one(sms, students, enrollments, graded) -> None:
+        for student in students:
+            sms.add_student(student)
+
+        for id_number, course_id in enrollments:
+            sms.enroll_student(id_number, course_id)
+
+        for id_number, course_id, grade in graded:
+            sms.grade_student(id_number, course_id, grade)
+
+    def batched(sms, students, enrollments, graded) -> None:
+        with sms.batch() as batch:
+            for student in students:
+                batch.add_student(student)
+
+            for id_number, course_id in enrollments:
+                batch.enroll_student(id_number, course_id)
+
+            for id_number, course_id, grade in graded:
+                batch.grade_student(id_number, course_id, grade)
+
+    sms = fresh()
+    job = registration(module, sms, args.new_students,
+                       args.courses_per_student, args.seed)
+    changes = len(job[0]) + len(job[1]) + len(job[2])
+
+    print(f"{args.backend}: {len(sms.students):,} students, job of {changes:,} changes")
+    print(f"{'mode':<22} {'seconds':>8} {'changes/s':>11}")
+
+    def report(mode: str, seconds: float) -> None:
+        print(f"{mode:<22} {seconds:>8.3f} {changes / seconds:>11,.0f}")
+
+    report("one by one", timed(lambda: one_by_one(sms, *job))[0])
+
+    sms = fresh()
+
+    def in_transaction() -> None:
+        with sms.transaction():
+            one_by_one(sms, *job)
+
+    report("transaction", timed(in_transaction)[0])
+
+    sms = fresh()
+    report("batch", timed(lambda: batched(sms, *job))[0])
+
+    # Rolling back the whole job against copying the system up front
+    sms = fresh()
+    job = registration(module, sms, args.new_students,
+                       args.courses_per_student, args.seed + 1)
+    snapshot, _ = timed(lambda: copy.deepcopy(sms))
+
+    try:
+        with sms.transaction():
+            one_by_one(sms, *job)
+            applied = time.perf_counter()
+            raise Abort
+    except Abort:
+        rollback = time.perf_counter() - applied
+
+    print(f"{'deepcopy before job':<22} {snapshot:>8.3f}")
+    print(f"{'rollback of job':<22} {rollback:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Compares building pydantic models through their validating constructors, `model_construct` and the
+trusted `from_trusted` / `from_trusted_many` path, then restores a pydantic system from a snapshot.
+
+Usage:
+    python -m benchmarks.trusted --students 100000 --courses-per-student 5
+"""
+import argparse
+import os
+import random
+import tempfile
+
+from benchmarks.timing import timed
+from utils.enums import CourseNameId, Grade, Major
+from utils.pydantic.student_management_system import Student, Course, Enrollment, StudentManagementSystem
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--courses-per-student", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    majors = list(Major)
+    grades = list(Grade)
+    course_ids = [course_name_id.course_id for course_name_id in CourseNameId]
+    first_names = [f"First{i}" for i in range(args.students)]
+    last_names = [f"Last{i}" for i in range(args.students)]
+    ids = [f"STU-{i:08d}" for i in range(args.students)]
+    student_majors = [majors[i % len(majors)] for i in range(args.students)]
+    enrollments = [(id_number, course_id, rng.choice(grades)) for id_number in ids
+                   for course_id in rng.sample(course_ids, args.courses_per_student)]
+
+    students = (
+        ("validated", lambda: [Student(first_name=first_name, last_name=last_name, id_number=id_number, major=major)
+                               for first_name, last_name, id_number, major in zip(first_names, last_names, ids, student_majors)]),
+        ("model_construct", lambda: [Student.model_construct(first_name=first_name, last_name=last_name, name=f"{first_name} {last_name}", id_number=id_number, major=major)
+                                     for first_name, last_name, id_number, major in zip(first_names, last_names, ids, student_majors)]),
+        ("from_trusted", lambda: [Student.from_trusted(first_name, last_name, id_number, major=major)
+                                  for first_name, last_name, id_number, major in zip(first_names, last_names, ids, student_majors)]),
+        ("from_trusted_many", lambda: Student.from_trusted_many(
+            first_names, last_names, ids, major=student_majors)),
+    )
+    course_id = course_ids[0]
+    enrollment_ids = [id_number for id_number, _, _ in enrollments]
+    enrollment_grades = [grade for _, _, grade in enrollments]
+    enrollments_built = (
+        ("validated", lambda: [Enrollment(id_number=id_number, course_id=course_id, grade=grade)
+                               for id_number, grade in zip(enrollment_ids, enrollment_grades)]),
+        ("model_construct", lambda: [Enrollment.model_construct(id_number=id_number, course_id=course_id, grade=grade)
+                                     for id_number, grade in zip(enrollment_ids, enrollment_grades)]),
+        ("from_trusted", lambda: [Enrollment.from_trusted(id_number, course_id, grade)
+                                  for id_number, grade in zip(enrollment_ids, enrollment_grades)]),
+        ("from_trusted_many", lambda: Enrollment.from_trusted_many(
+            enrollment_ids, course_id, enrollment_grades)),
+    )
+
+    print(f"{args.students:,} students, {len(enrollments):,} enrollments")
+    print(f"{'model':<11} {'path':<18} {'seconds':>8} {'speedup':>8}")
+
+    for model, paths in (("Student", students), ("Enrollment", enrollments_built)):
+        baseline = None
+
+        for path, build in paths:
+            seconds, _ = timed(build, pause_gc=True)
+            baseline = baseline or seconds
+            print(f"{model:<11} {path:<18} {seconds:>8.3f} {baseline / seconds:>7.1f}x")
+
+    sms = StudentManagementSystem()
+    sms.add_courses_many(Course(course_name_id=course_name_id)
+                         for course_name_id in CourseNameId)
+    sms.add_students_many(Student.from_trusted_many(
+        first_names, last_names, ids, major=student_majors))
+    sms.enroll_many((id_number, course_id)
+                    for id_number, course_id, _ in enrollments)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sms.snap")
+        sms.save_snapshot(path)
+        load, _ = timed(lambda: StudentManagementSystem.load_snapshot(path), pause_gc=True)
+
+    rebuild, _ = timed(lambda: StudentManagementSystem(
+        students=sms.students, instructors=sms.instructors, courses=sms.courses), pause_gc=True)
+    trusted, _ = timed(lambda: StudentManagementSystem.from_trusted(
+        students=sms.students, instructors=sms.instructors, courses=sms.courses), pause_gc=True)
+
+    print(f"\nload_snapshot: {load:.2f} s")
+    print(f"StudentManagementSystem(...): {rebuild:.2f} s, from_trusted(...): {trusted:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
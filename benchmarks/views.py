@@ -0,0 +1,73 @@
+"""
+Measures read snapshots: the cost of taking one, the overhead an open snapshot adds to writes, and
+a full scan of a snapshot, compared with deep-copying the system to get the same consistency.
+
+Usage:
+    python -m benchmarks.views --students 100000 --courses-per-student 5 --operations 20000
+"""
+import argparse
+import copy
+import importlib
+import random
+from typing import Any, List, Tuple
+
+from benchmarks.timing import timed
+from utils.enums import CourseNameId, Grade, Major
+
+
+BACKENDS = ("vanilla", "pydantic", "columnar")
+
+
+def grade_all(sms: Any, operations: List[Tuple[str, str, Grade]]) -> None:
+    for id_number, course_id, grade in operations:
+        sms.grade_student(id_number=id_number, course_id=course_id, grade=grade)
+
+
+def scan(view: Any) -> int:
+    return sum(1 for course in view.courses.values() for _ in course.enrolled_students.values())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--courses-per-student", type=int, default=5)
+    parser.add_argument("--operations", type=int, default=20_000)
+    parser.add_argument("--backends", nargs="+",
+                        default=list(BACKENDS), choices=BACKENDS)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    course_ids = [course_name_id.course_id for course_name_id in CourseNameId]
+    majors = list(Major)
+    enrollments = [(f"STU-{i:08d}", course_id) for i in range(args.students)
+                   for course_id in rng.sample(course_ids, args.courses_per_student)]
+    operations = [(*rng.choice(enrollments), rng.choice(list(Grade)))
+                  for _ in range(args.operations)]
+
+    print(f"{args.students:,} students, {len(enrollments):,} enrollments, {args.operations:,} grade_student calls")
+    print(f"{'backend':<10} {'snapshot ms':>12} {'writes s':>9} {'writes+view s':>14} {'scan s':>7} {'deepcopy s':>11}")
+
+    for backend in args.backends:
+        module = importlib.import_module(
+            f"utils.{backend}.student_management_system")
+        sms = module.StudentManagementSystem()
+        sms.add_courses_many(module.Course(course_name_id=course_name_id)
+                             for course_name_id in CourseNameId)
+        sms.add_students_many(module.Student(first_name=f"First{i}", last_name=f"Last{i}", major=majors[i % len(majors)], id_number=f"STU-{i:08d}")
+                              for i in range(args.students))
+        sms.enroll_many(enrollments)
+
+        writes, _ = timed(lambda: grade_all(sms, operations))
+        snapshot_time, view = timed(sms.snapshot)
+        writes_with_view, _ = timed(lambda: grade_all(sms, operations))
+        scan_time, _ = timed(lambda: scan(view))
+        view.close()
+
+        deepcopy_time, _ = timed(lambda: copy.deepcopy(sms))
+
+        print(f"{backend:<10} {snapshot_time * 1000:>12.3f} {writes:>9.2f} {writes_with_view:>14.2f} {scan_time:>7.2f} {deepcopy_time:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
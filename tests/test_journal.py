@@ -0,0 +1,68 @@
+"""
+Tests of journal recovery of names and IDs that a NUL-separated format could not store, on every backend.
+"""
+import importlib
+from types import ModuleType
+from typing import Any
+
+import pytest
+
+from utils.enums import Major
+from utils.enums.course_name_id import CourseNameId
+from utils.journal import Journal
+
+
+INTRO = CourseNameId.INTRO_TO_PROGRAMMING
+
+# A NUL character, an empty string, a lone surrogate and a name too long for a one-byte length
+NAMES = ("Ada\x00Lovelace", "", "\ud800", "Ada" * 100)
+
+
+@pytest.fixture(params=["vanilla", "pydantic", "columnar", "threadsafe"])
+def module(request: Any) -> ModuleType:
+    return importlib.import_module(f"utils.{request.param}.student_management_system")
+
+
+def journal_awkward_names(module: ModuleType, path: str) -> None:
+    journal = Journal.open(module.StudentManagementSystem, path)
+    sms = journal.system
+    sms.add_course(module.Course(course_name_id=INTRO))
+
+    for i, name in enumerate(NAMES):
+        sms.add_student(module.Student(first_name=name, last_name=name,
+                                       major=Major.MATHEMATICS, id_number=f"STU-{i}\x00"))
+        sms.enroll_student(f"STU-{i}\x00", INTRO.course_id)
+
+    journal.close()
+
+
+def assert_recovered(module: ModuleType, path: str) -> None:
+    journal = Journal.open(module.StudentManagementSystem, path)
+    sms = journal.system
+
+    for i, name in enumerate(NAMES):
+        student = sms.find_student(f"STU-{i}\x00")
+        assert (student.first_name, student.last_name) == (name, name)
+
+    assert sorted(sms.find_course_enrolled_students(INTRO.course_id)) == [
+        f"STU-{i}\x00" for i in range(len(NAMES))]
+
+    journal.close()
+
+
+def test_replay_keeps_any_string(module: ModuleType, tmp_path: Any) -> None:
+    path = str(tmp_path / "sms.journal")
+    journal_awkward_names(module, path)
+
+    assert_recovered(module, path)
+
+
+def test_checkpoint_keeps_any_string(module: ModuleType, tmp_path: Any) -> None:
+    path = str(tmp_path / "sms.journal")
+    journal_awkward_names(module, path)
+
+    journal = Journal.open(module.StudentManagementSystem, path)
+    journal.checkpoint()
+    journal.close()
+
+    assert_recovered(module, path)
@@ -0,0 +1,106 @@
+"""
+Tests of the reverse indexes mapping students and instructors to their courses, on the vanilla and pydantic backends.
+"""
+import importlib
+from types import ModuleType
+from typing import Any, List
+
+import pytest
+
+from utils.enums import Department, Major
+from utils.enums.course_name_id import CourseNameId
+
+
+INTRO, DATA_STRUCTURES = CourseNameId.INTRO_TO_PROGRAMMING, CourseNameId.DATA_STRUCTURES
+
+
+@pytest.fixture(params=["vanilla", "pydantic"])
+def module(request: Any) -> ModuleType:
+    return importlib.import_module(f"utils.{request.param}.student_management_system")
+
+
+@pytest.fixture
+def sms(module: ModuleType) -> Any:
+    """
+    A system with two students, one instructor teaching two courses, and the first student enrolled in both courses.
+    """
+
+    sms = module.StudentManagementSystem()
+    sms.add_students_many([module.Student(first_name="Ada", last_name="Lovelace", major=Major.COMPUTER_SCIENCE, id_number="STU-1"),
+                           module.Student(first_name="Alan", last_name="Turing", major=Major.MATHEMATICS, id_number="STU-2")])
+    instructor = module.Instructor(first_name="Grace", last_name="Hopper",
+                                   department=Department.COMPUTER_SCIENCE, id_number="INS-1")
+    sms.add_instructor(instructor)
+    sms.add_courses_many([module.Course(course_name_id=INTRO, instructors={"INS-1": instructor}),
+                          module.Course(course_name_id=DATA_STRUCTURES, instructors={"INS-1": instructor})])
+    sms.enroll_student("STU-1", INTRO.course_id)
+    sms.enroll_student("STU-1", DATA_STRUCTURES.course_id)
+
+    return sms
+
+
+def courses_of(sms: Any, id_number: str) -> List[str]:
+    return sorted(sms.find_enrolled_student_courses(id_number))
+
+
+def test_enroll_student(sms: Any) -> None:
+    sms.enroll_student("STU-2", INTRO.course_id)
+
+    sms.verify_indexes()
+    assert courses_of(sms, "STU-1") == sorted([INTRO.course_id, DATA_STRUCTURES.course_id])
+    assert courses_of(sms, "STU-2") == [INTRO.course_id]
+    assert sorted(sms.find_course_enrollments(INTRO.course_id)) == ["STU-1", "STU-2"]
+
+
+def test_remove_student(sms: Any) -> None:
+    sms.remove_student("STU-1")
+
+    sms.verify_indexes()
+    assert sms.find_course_enrollments(INTRO.course_id) == {}
+    assert sms.find_course_enrollments(DATA_STRUCTURES.course_id) == {}
+
+    with pytest.raises(KeyError):
+        sms.find_enrolled_student_courses("STU-1")
+
+
+def test_remove_course(sms: Any) -> None:
+    sms.remove_course(INTRO.course_id)
+
+    sms.verify_indexes()
+    assert courses_of(sms, "STU-1") == [DATA_STRUCTURES.course_id]
+    assert sms.find_instructor_courses("INS-1") == [DATA_STRUCTURES.course_id]
+
+
+def test_update_course_with_a_new_instance(sms: Any, module: ModuleType) -> None:
+    instructor = module.Instructor(first_name="Barbara", last_name="Liskov",
+                                   department=Department.COMPUTER_SCIENCE, id_number="INS-2")
+    sms.add_instructor(instructor)
+    sms.update_course(module.Course(course_name_id=INTRO, instructors={"INS-2": instructor},
+                                    enrolled_students={"STU-2": module.Enrollment(id_number="STU-2", course_id=INTRO.course_id)}))
+
+    sms.verify_indexes()
+    assert courses_of(sms, "STU-1") == [DATA_STRUCTURES.course_id]
+    assert courses_of(sms, "STU-2") == [INTRO.course_id]
+    assert sms.find_instructor_courses("INS-1") == [DATA_STRUCTURES.course_id]
+    assert sms.find_instructor_courses("INS-2") == [INTRO.course_id]
+
+
+def test_update_course_with_the_same_instance(sms: Any, module: ModuleType) -> None:
+    course = sms.find_course(INTRO.course_id)
+    course.add_student(module.Enrollment(id_number="STU-2", course_id=INTRO.course_id))
+    course.remove_instructor("INS-1")
+    sms.update_course(course)
+
+    sms.verify_indexes()
+    assert courses_of(sms, "STU-2") == [INTRO.course_id]
+    assert sorted(sms.find_course_enrollments(INTRO.course_id)) == ["STU-1", "STU-2"]
+    assert sms.find_instructor_courses("INS-1") == [DATA_STRUCTURES.course_id]
+
+
+def test_course_remove_student(sms: Any) -> None:
+    sms.find_course(INTRO.course_id).remove_student("STU-1")
+
+    sms.verify_indexes()
+    assert courses_of(sms, "STU-1") == [DATA_STRUCTURES.course_id]
+    assert sms.find_course_enrollments(INTRO.course_id) == {}
+    assert sms.find_course_enrollments(DATA_STRUCTURES.course_id).keys() == {"STU-1"}
@@ -0,0 +1,182 @@
+"""
+Stress tests of the thread-safe StudentManagementSystem: writers running at once must leave every index consistent.
+"""
+import sys
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterator
+
+import pytest
+
+from utils.enums import Department, Grade, Major
+from utils.enums.course_name_id import CourseNameId
+from utils.journal import Journal
+from utils.threadsafe.student_management_system import StudentManagementSystem
+from utils.vanilla.course import Course
+from utils.vanilla.instructor import Instructor
+from utils.vanilla.student import Student
+
+
+THREADS = 8
+PEOPLE = 100
+
+MAJORS = list(Major)
+DEPARTMENTS = list(Department)
+GRADES = [grade for grade in Grade if grade is not Grade.NO_GRADE]
+COURSE_IDS = [course_name_id.course_id for course_name_id in CourseNameId]
+
+
+@pytest.fixture(autouse=True)
+def frequent_switches() -> Iterator[None]:
+    # Switch threads as often as possible, so that writers interleave within every operation
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    yield
+
+    sys.setswitchinterval(interval)
+
+
+def run_threads(target: Callable[[int], None]) -> None:
+    """
+    Runs `target(thread)` on THREADS threads started together and re-raises the first error of any of them.
+    """
+
+    barrier = threading.Barrier(THREADS)
+    errors = []
+
+    def run(thread: int) -> None:
+        barrier.wait()
+
+        try:
+            target(thread)
+        except BaseException as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=run, args=(thread,)) for thread in range(THREADS)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+
+
+def student_id(thread: int, i: int) -> str:
+    return f"STU-{thread:02d}{i:06d}"
+
+
+def instructor_id(thread: int, i: int) -> str:
+    return f"INS-{thread:02d}{i:06d}"
+
+
+def grades(sms: StudentManagementSystem) -> Dict[str, Dict[str, Grade]]:
+    return {course_id: {id_number: enrollment.grade for id_number, enrollment in course.enrolled_students.items()}
+            for course_id, course in sms.courses.items()}
+
+
+@pytest.mark.parametrize("round", range(30))
+def test_people_writers_keep_indexes(round: int) -> None:
+    # The indexes by major and department only get new keys while they fill up, so each round starts from an empty system
+    sms = StudentManagementSystem(stripes=4)
+
+    # Each thread starts from a different major and department, so the first keys of the indexes are added concurrently
+    def write(thread: int) -> None:
+        for i in range(PEOPLE):
+            sms.add_student(Student(first_name=f"First{i}", last_name=f"Last{thread}",
+                                    major=MAJORS[(thread + i) % len(MAJORS)], id_number=student_id(thread, i)))
+            sms.add_instructor(Instructor(first_name=f"First{i}", last_name=f"Last{thread}",
+                                          department=DEPARTMENTS[(thread + i) % len(DEPARTMENTS)], id_number=instructor_id(thread, i)))
+
+        for i in range(PEOPLE):
+            sms.update_student(Student(first_name=f"First{i}", last_name=f"Last{thread}",
+                                       major=MAJORS[(thread + i + 1) % len(MAJORS)], id_number=student_id(thread, i)))
+
+            if i % 3 == 0:
+                sms.remove_student(student_id(thread, i))
+                sms.remove_instructor(instructor_id(thread, i))
+
+    run_threads(write)
+    sms.verify_indexes()
+
+    kept = [(thread, i) for thread in range(THREADS) for i in range(PEOPLE) if i % 3]
+    majors = Counter(MAJORS[(thread + i + 1) % len(MAJORS)] for thread, i in kept)
+    departments = Counter(DEPARTMENTS[(thread + i) % len(DEPARTMENTS)] for thread, i in kept)
+
+    assert len(sms.students) == len(sms.instructors) == len(kept)
+    assert {major: len(sms.find_students_by_major(major)) for major in MAJORS} == {major: majors[major] for major in MAJORS}
+    assert {department: len(sms.find_instructors_by_department(department)) for department in DEPARTMENTS} == \
+        {department: departments[department] for department in DEPARTMENTS}
+
+
+def test_enrollment_writers_keep_indexes() -> None:
+    sms = StudentManagementSystem(stripes=4)
+    sms.add_courses_many(Course(course_name_id=course_name_id) for course_name_id in CourseNameId)
+
+    def write(thread: int) -> None:
+        for i in range(PEOPLE):
+            id_number = student_id(thread, i)
+            course_ids = [COURSE_IDS[(thread + i + offset) % len(COURSE_IDS)] for offset in range(3)]
+
+            sms.add_student(Student(first_name=f"First{i}", last_name=f"Last{thread}",
+                                    major=MAJORS[i % len(MAJORS)], id_number=id_number))
+
+            for course_id in course_ids:
+                sms.enroll_student(id_number, course_id)
+
+            sms.grade_student(id_number, course_ids[0], GRADES[i % len(GRADES)])
+
+            if i % 4 == 0:
+                sms.remove_student(id_number)
+
+    run_threads(write)
+    sms.verify_indexes()
+
+    kept = [(thread, i) for thread in range(THREADS) for i in range(PEOPLE) if i % 4]
+    enrollments = Counter(COURSE_IDS[(thread + i + offset) % len(COURSE_IDS)]
+                          for thread, i in kept for offset in range(3))
+
+    assert len(sms.students) == len(kept)
+    assert {course_id: len(sms.find_course_enrollments(course_id)) for course_id in COURSE_IDS} == \
+        {course_id: enrollments[course_id] for course_id in COURSE_IDS}
+    assert all(len(sms.find_enrolled_student_courses(student_id(thread, i))) == 3 for thread, i in kept)
+
+
+def test_checkpoints_alongside_writers(tmp_path) -> None:
+    path = str(tmp_path / "sms.journal")
+    journal = Journal.open(StudentManagementSystem, path, fsync="never")
+    sms = journal.system
+    sms.add_courses_many(Course(course_name_id=course_name_id) for course_name_id in CourseNameId)
+
+    # The last thread checkpoints for as long as the others write
+    def write(thread: int) -> None:
+        if thread == THREADS - 1:
+            while len(sms.students) < (THREADS - 1) * PEOPLE:
+                journal.checkpoint()
+            return
+
+        for i in range(PEOPLE):
+            id_number = student_id(thread, i)
+            course_id = COURSE_IDS[(thread + i) % len(COURSE_IDS)]
+
+            sms.add_student(Student(first_name=f"First{i}", last_name=f"Last{thread}",
+                                    major=MAJORS[i % len(MAJORS)], id_number=id_number))
+            sms.enroll_student(id_number, course_id)
+            sms.grade_student(id_number, course_id, GRADES[i % len(GRADES)])
+
+    run_threads(write)
+    journal.close()
+
+    restored = Journal.open(StudentManagementSystem, path)
+
+    try:
+        restored.system.verify_indexes()
+
+        assert restored.generation > 0
+        assert len(restored.system.students) == (THREADS - 1) * PEOPLE
+        assert grades(restored.system) == grades(sms)
+    finally:
+        restored.close()
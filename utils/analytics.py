@@ -0,0 +1,444 @@
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from utils.enums.grade import Grade
+from utils.enums.major import Major
+
+
+# Grades and majors are encoded as their position in their enum
+GRADES: List[Grade] = list(Grade)
+GRADE_CODES: Dict[Grade, int] = {grade: code for code,
+                                 grade in enumerate(GRADES)}
+MAJORS: List[Major] = list(Major)
+MAJOR_CODES: Dict[Major, int] = {major: code for code,
+                                 major in enumerate(MAJORS)}
+
+# Lookup tables indexed by grade code
+GRADE_POINTS = np.array([grade.grade_points if grade.grade_points is not None else 0.0
+                         for grade in GRADES], dtype=np.float64)
+COUNTS_TOWARDS_GPA = np.array(
+    [grade.grade_points is not None for grade in GRADES], dtype=bool)
+PASSED = np.array([grade.is_passing is True for grade in GRADES], dtype=bool)
+FAILED = np.array([grade.is_passing is False for grade in GRADES], dtype=bool)
+
+# Major code of enrollments whose student is not registered in the system
+NO_MAJOR = -1
+
+
+class _Ordinals(dict):
+    """
+    A dictionary that assigns the next ordinal to every key it has not seen yet.
+    """
+
+    def __missing__(self, key: str) -> int:
+        ordinal = self[key] = len(self)
+        return ordinal
+
+
+class GradeAnalytics:
+    """
+    Computes GPAs, grade distributions and pass rates over every enrollment of a StudentManagementSystem in batch with NumPy.
+
+    All enrollments are first gathered into three parallel arrays: student ordinal, course ordinal and
+    grade code. Every statistic is then a handful of vectorized `np.bincount` calls over those arrays.
+    For the columnar backend the arrays are read straight from its `EnrollmentStore`. For the vanilla
+    and pydantic backends they are filled with `np.fromiter` over the course dictionaries.
+
+    Grades are handled as follows:
+        - Letter grades (A+ to F) count towards GPAs and averages with their `Grade.grade_points`.
+        - PASS and FAIL count towards pass rates only.
+        - NO_GRADE counts towards nothing except the grade distributions.
+
+    Attributes:
+        student_ids (List[str]): Student ordinal -> student ID.
+        course_ids (List[str]): Course ordinal -> course ID.
+        students (np.ndarray): Student ordinal of every enrollment.
+        courses (np.ndarray): Course ordinal of every enrollment.
+        grades (np.ndarray): Grade code of every enrollment.
+        student_majors (np.ndarray): Student ordinal -> major code, `NO_MAJOR` for unregistered students.
+    """
+
+    def __init__(self, sms: Any) -> None:
+        """
+        Initializes a GradeAnalytics instance from a snapshot of the system's enrollments.
+
+        Args:
+            sms (StudentManagementSystem): A vanilla, pydantic or columnar system.
+        """
+
+        store = getattr(sms, "_store", None)
+
+        if store is not None:
+            self._load_store(store)
+        else:
+            self._load_courses(sms)
+
+        # Courses removed from a columnar system keep their ordinal in its store
+        self._registered_courses = set(sms.courses)
+
+        # Majors of the students, in student ordinal order
+        self.student_majors = np.fromiter(
+            (MAJOR_CODES[student.major] if student is not None else NO_MAJOR
+             for student in map(sms.students.get, self.student_ids)),
+            dtype=np.int16, count=len(self.student_ids))
+
+    def _load_store(self, store: Any) -> None:
+        """
+        Reads the enrollment arrays of a columnar `EnrollmentStore` without copying them per row.
+        """
+
+        from utils.columnar.enrollment_store import REMOVED
+
+        grades = np.frombuffer(store.grades, dtype=np.uint8)
+        live = grades != REMOVED
+
+        self.student_ids = list(store.student_ids)
+        self.course_ids = list(store.course_ids)
+        self.students = np.frombuffer(store.students, dtype=np.uint32)[
+            live].astype(np.intp)
+        self.courses = np.frombuffer(store.courses, dtype=np.uint16)[
+            live].astype(np.intp)
+        self.grades = grades[live].astype(np.intp)
+
+    def _load_courses(self, sms: Any) -> None:
+        """
+        Gathers the enrollments of a dictionary-based system into arrays, one course at a time.
+        """
+
+        ordinals = _Ordinals((id_number, ordinal)
+                             for ordinal, id_number in enumerate(sms.students))
+        students, courses, grades = [], [], []
+
+        self.course_ids = list(sms.courses)
+
+        for ordinal, course in enumerate(sms.courses.values()):
+            enrolled_students = course.enrolled_students
+            count = len(enrolled_students)
+
+            students.append(np.fromiter(
+                map(ordinals.__getitem__, enrolled_students), dtype=np.intp, count=count))
+            grades.append(np.fromiter(map(GRADE_CODES.__getitem__, map(
+                attrgetter("grade"), enrolled_students.values())), dtype=np.intp, count=count))
+            courses.append(np.full(count, ordinal, dtype=np.intp))
+
+        self.student_ids = list(ordinals)
+        self.students = np.concatenate(students) if students else np.empty(0, dtype=np.intp)
+        self.courses = np.concatenate(courses) if courses else np.empty(0, dtype=np.intp)
+        self.grades = np.concatenate(grades) if grades else np.empty(0, dtype=np.intp)
+
+    @property
+    def grade_points(self) -> np.ndarray:
+        """
+        Grade points of every enrollment, 0.0 where the grade does not count towards a GPA.
+        """
+
+        return GRADE_POINTS[self.grades]
+
+    def student_gpa(self) -> Dict[str, float]:
+        """
+        Computes the GPA of every student with at least one letter grade.
+
+        Returns:
+            Dict[str, float]: A dictionary mapping student IDs to their GPA.
+        """
+
+        counted = COUNTS_TOWARDS_GPA[self.grades]
+        students = self.students[counted]
+        size = len(self.student_ids)
+
+        totals = np.bincount(students, weights=GRADE_POINTS[self.grades[counted]], minlength=size)
+        counts = np.bincount(students, minlength=size)
+        graded = np.flatnonzero(counts)
+
+        return dict(zip([self.student_ids[ordinal] for ordinal in graded], (totals[graded] / counts[graded]).tolist()))
+
+    def course_distributions(self) -> Dict[str, Dict[Grade, int]]:
+        """
+        Computes the grade histogram of every course.
+
+        Returns:
+            Dict[str, Dict[Grade, int]]: A dictionary mapping course IDs to the number of enrollments holding each grade.
+        """
+
+        histogram = np.bincount(self.courses * len(GRADES) + self.grades, minlength=len(
+            self.course_ids) * len(GRADES)).reshape(len(self.course_ids), len(GRADES))
+
+        return {course_id: dict(zip(GRADES, counts)) for course_id, counts in zip(self.course_ids, histogram.tolist())
+                if course_id in self._registered_courses}
+
+    def major_distributions(self) -> Dict[Major, Dict[Grade, int]]:
+        """
+        Computes the grade histogram of every major over the enrollments of its students.
+
+        Returns:
+            Dict[Major, Dict[Grade, int]]: A dictionary mapping majors to the number of their students' enrollments holding each grade.
+        """
+
+        majors = self.student_majors[self.students]
+        registered = majors != NO_MAJOR
+
+        histogram = np.bincount(majors[registered].astype(np.intp) * len(GRADES) + self.grades[registered],
+                                minlength=len(MAJORS) * len(GRADES)).reshape(len(MAJORS), len(GRADES))
+
+        return {major: dict(zip(GRADES, counts)) for major, counts in zip(MAJORS, histogram.tolist())}
+
+    def course_averages(self) -> Dict[str, float]:
+        """
+        Computes the average grade points of every course with at least one letter grade.
+
+        Returns:
+            Dict[str, float]: A dictionary mapping course IDs to their average grade points.
+        """
+
+        return self._averages(self.courses, self.course_ids)
+
+    def major_averages(self) -> Dict[Major, float]:
+        """
+        Computes the average grade points of every major over all letter-graded enrollments of its students.
+
+        Returns:
+            Dict[Major, float]: A dictionary mapping majors to their average grade points.
+        """
+
+        majors = self.student_majors[self.students]
+        registered = majors != NO_MAJOR
+
+        return self._averages(majors[registered].astype(np.intp), MAJORS, registered)
+
+    def course_pass_rates(self) -> Dict[str, float]:
+        """
+        Computes the share of passing grades among the graded enrollments of every course.
+
+        Letter grades from D- up and PASS are passing, F and FAIL are failing, NO_GRADE is ignored.
+
+        Returns:
+            Dict[str, float]: A dictionary mapping course IDs to their pass rate between 0 and 1.
+        """
+
+        size = len(self.course_ids)
+        passed = np.bincount(self.courses, weights=PASSED[self.grades], minlength=size)
+        decided = np.bincount(self.courses, weights=(PASSED | FAILED)[self.grades], minlength=size)
+        graded = np.flatnonzero(decided)
+
+        return dict(zip([self.course_ids[ordinal] for ordinal in graded], (passed[graded] / decided[graded]).tolist()))
+
+    def pass_rate(self) -> float:
+        """
+        Computes the share of passing grades among all graded enrollments.
+
+        Returns:
+            float: The pass rate between 0 and 1, or NaN when nothing has been graded yet.
+        """
+
+        passed = int(np.count_nonzero(PASSED[self.grades]))
+        decided = passed + int(np.count_nonzero(FAILED[self.grades]))
+
+        return passed / decided if decided else float("nan")
+
+    def _averages(self, groups: np.ndarray, labels: List[Any], rows: Any = slice(None)) -> Dict[Any, float]:
+        """
+        Averages the grade points of the letter-graded enrollments selected by `rows`, grouped by `groups`.
+        """
+
+        grades = self.grades[rows]
+        counted = COUNTS_TOWARDS_GPA[grades]
+        groups = groups[counted]
+
+        totals = np.bincount(groups, weights=GRADE_POINTS[grades[counted]], minlength=len(labels))
+        counts = np.bincount(groups, minlength=len(labels))
+        graded = np.flatnonzero(counts)
+
+        return dict(zip([labels[group] for group in graded], (totals[graded] / counts[graded]).tolist()))
+
+
+# Grade points in tenths, which every `Grade.grade_points` is a whole number of, None where they do not count
+_GRADE_POINT_TENTHS: Dict[Grade, Optional[int]] = {
+    grade: round(grade.grade_points * 10) if grade.grade_points is not None else None for grade in GRADES}
+
+
+class CourseStats:
+    """
+    Running grade aggregates of one course, updated in O(1) on every enrollment change.
+
+    Grade points are summed in tenths, as whole numbers, so the running sum never drifts no matter
+    how many grades were added and removed.
+
+    Attributes:
+        enrolled (int): Number of enrollments in the course.
+        histogram (Dict[Grade, int]): Grade -> number of enrollments with that grade, for every grade.
+    """
+
+    __slots__ = ("enrolled", "histogram", "_point_tenths", "_point_count")
+
+    def __init__(self) -> None:
+        """
+        Initializes the aggregates of a course without enrollments.
+        """
+
+        self.enrolled = 0
+        self.histogram: Dict[Grade, int] = dict.fromkeys(GRADES, 0)
+
+        # Sum of grade points in tenths, and number of enrollments whose grade counts towards it
+        self._point_tenths = 0
+        self._point_count = 0
+
+    @property
+    def graded(self) -> int:
+        """
+        Number of enrollments that were assigned a grade.
+        """
+
+        return self.enrolled - self.histogram[Grade.NO_GRADE]
+
+    @property
+    def grade_point_sum(self) -> float:
+        """
+        Sum of the grade points of the enrollments with a letter grade.
+        """
+
+        return self._point_tenths / 10
+
+    @property
+    def grade_point_count(self) -> int:
+        """
+        Number of enrollments with a letter grade, which count towards the grade point sum.
+        """
+
+        return self._point_count
+
+    @property
+    def average_grade_points(self) -> Optional[float]:
+        """
+        Mean grade points of the enrollments with a letter grade, or None if there is none.
+        """
+
+        if not self._point_count:
+            return None
+
+        return self._point_tenths / 10 / self._point_count
+
+    def add(self, grade: Grade, count: int = 1) -> None:
+        """
+        Counts new enrollments with a grade.
+
+        Args:
+            grade (Grade): The grade of the enrollments.
+            count (int, optional): The number of enrollments. Defaults to 1.
+        """
+
+        self.enrolled += count
+        self.histogram[grade] += count
+        tenths = _GRADE_POINT_TENTHS[grade]
+
+        if tenths is not None:
+            self._point_tenths += tenths * count
+            self._point_count += count
+
+    def add_grades(self, grades: Iterable[Grade]) -> None:
+        """
+        Counts a batch of new enrollments by their grades.
+
+        Args:
+            grades (Iterable[Grade]): The grade of every new enrollment.
+        """
+
+        # Enum members hash in Python, so the batch is counted by identity of the member
+        counts: Dict[int, int] = {}
+
+        for grade in grades:
+            counts[id(grade)] = counts.get(id(grade), 0) + 1
+
+        for grade in GRADES:
+            count = counts.get(id(grade))
+
+            if count:
+                self.add(grade, count)
+
+    def remove(self, grade: Grade, count: int = 1) -> None:
+        """
+        Uncounts removed enrollments with a grade.
+
+        Args:
+            grade (Grade): The grade the enrollments had.
+            count (int, optional): The number of enrollments. Defaults to 1.
+        """
+
+        self.add(grade, -count)
+
+    def regrade(self, old_grade: Grade, grade: Grade) -> None:
+        """
+        Moves an enrollment from one grade to another.
+
+        Args:
+            old_grade (Grade): The grade the enrollment had.
+            grade (Grade): The grade it has now.
+        """
+
+        if old_grade is not grade:
+            self.remove(old_grade)
+            self.add(grade)
+
+    def regrade_many(self, old_grades: Iterable[Grade], grades: Iterable[Grade]) -> None:
+        """
+        Moves a batch of enrollments from one grade to another.
+
+        Args:
+            old_grades (Iterable[Grade]): The grade every enrollment had.
+            grades (Iterable[Grade]): The grade every enrollment has now, in the same order.
+        """
+
+        # Enum members hash in Python, so the moves are netted by identity of the member
+        deltas: Dict[int, int] = {}
+
+        for old_grade, grade in zip(old_grades, grades):
+            if old_grade is not grade:
+                deltas[id(old_grade)] = deltas.get(id(old_grade), 0) - 1
+                deltas[id(grade)] = deltas.get(id(grade), 0) + 1
+
+        # The moves net to zero enrollments, leaving `enrolled` unchanged
+        for grade in GRADES:
+            delta = deltas.get(id(grade))
+
+            if delta:
+                self.add(grade, delta)
+
+    def update(self, other: "CourseStats") -> None:
+        """
+        Adds the aggregates of other enrollments of the course, such as those held by another partition.
+
+        Args:
+            other (CourseStats): The aggregates to add.
+        """
+
+        self.enrolled += other.enrolled
+        self._point_tenths += other._point_tenths
+        self._point_count += other._point_count
+
+        for grade, count in other.histogram.items():
+            self.histogram[grade] += count
+
+    def copy(self) -> "CourseStats":
+        """
+        Returns an independent copy of the aggregates.
+        """
+
+        stats = CourseStats()
+        stats.enrolled = self.enrolled
+        stats.histogram = dict(self.histogram)
+        stats._point_tenths = self._point_tenths
+        stats._point_count = self._point_count
+
+        return stats
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CourseStats):
+            return NotImplemented
+
+        return (self.enrolled, self.histogram, self._point_tenths, self._point_count) == \
+            (other.enrolled, other.histogram, other._point_tenths, other._point_count)
+
+    def __repr__(self) -> str:
+        return (f"CourseStats(enrolled={self.enrolled}, graded={self.graded}, "
+                f"grade_point_sum={self.grade_point_sum}, histogram={ {grade.name: count for grade, count in self.histogram.items() if count} })")
@@ -0,0 +1,745 @@
+"""
+Compressed bitmap indexes of the students enrolled in each course, and set-algebra queries over them.
+
+Students are numbered with dense ordinals and every course keeps the ordinals of its students in a
+`Bitmap`. Like a Roaring bitmap, it splits ordinals into chunks of 65,536 by their high 16 bits and
+stores each chunk either as a sorted array of its low 16 bits, while it holds at most 4,096 of them,
+or as a bitset of 1,024 64-bit words. Small courses cost two bytes per student and large ones one bit
+per ordinal, and AND, OR and AND NOT run chunk by chunk as NumPy operations over whole words.
+
+Queries combine courses with `&`, `|`, `-` and `~`:
+
+Example:
+    >>> query = enrolled_in(CourseNameId.INTRO_TO_PROGRAMMING) & enrolled_in(CourseNameId.LINEAR_ALGEBRA) \\
+    ...     & ~enrolled_in(CourseNameId.DATA_STRUCTURES)
+    >>> sms.count_students_where(query)
+    1234
+    >>> list(sms.iter_students_where(enrolled_in_subject("ECON")))
+    ['STU-...', ...]
+"""
+import re
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+from utils.enums.course_name_id import CourseNameId
+
+
+# Ordinals per chunk, addressed by their low 16 bits
+CHUNK_SIZE = 1 << 16
+
+# 64-bit words of a bitset chunk
+CHUNK_WORDS = CHUNK_SIZE // 64
+
+# Chunks holding more ordinals than this are stored as bitsets, which are then the smaller form
+ARRAY_LIMIT = 4096
+
+# Bitsets are read as bytes by `np.unpackbits`, so their words are little-endian on every platform
+_WORD = np.dtype("<u8")
+_ONE = np.uint64(1)
+
+_SUBJECT = re.compile(r"[A-Za-z]+")
+
+
+def _bits(low: np.ndarray) -> np.ndarray:
+    """
+    Returns the single-bit word masks of low ordinals.
+    """
+
+    return _ONE << (low & 63).astype(np.uint64)
+
+
+def _to_bitset(low: np.ndarray) -> np.ndarray:
+    """
+    Converts the low ordinals of an array chunk to a bitset chunk.
+    """
+
+    flags = np.zeros(CHUNK_SIZE, dtype=bool)
+    flags[low] = True
+
+    return np.packbits(flags, bitorder="little").view(_WORD)
+
+
+def _to_array(words: np.ndarray) -> np.ndarray:
+    """
+    Converts a bitset chunk to the sorted low ordinals it holds.
+    """
+
+    return np.flatnonzero(np.unpackbits(words.view(np.uint8), bitorder="little")).astype(np.uint16)
+
+
+def _contains(words: np.ndarray, low: np.ndarray) -> np.ndarray:
+    """
+    Returns which low ordinals are set in a bitset chunk.
+    """
+
+    return (words[low >> 6] & _bits(low)) != 0
+
+
+def _cardinality(chunk: np.ndarray) -> int:
+    if chunk.dtype == np.uint16:
+        return len(chunk)
+
+    return int(np.bitwise_count(chunk).sum())
+
+
+def _nonempty(words: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Returns a bitset chunk computed by a query, or None if it is empty.
+
+    Results stay bitsets even when sparse: converting them costs more than the operation itself, and
+    they only live until the query is read.
+    """
+
+    return words if words.any() else None
+
+
+def _shrink(words: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Returns a bitset chunk in its smaller form, or None if it is empty.
+    """
+
+    count = _cardinality(words)
+
+    if count == 0:
+        return None
+
+    return _to_array(words) if count <= ARRAY_LIMIT else words
+
+
+def _grow(low: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Returns an array chunk in its smaller form, or None if it is empty.
+    """
+
+    if len(low) == 0:
+        return None
+
+    return _to_bitset(low) if len(low) > ARRAY_LIMIT else low
+
+
+def _and(left: np.ndarray, right: np.ndarray) -> Optional[np.ndarray]:
+    if left.dtype == np.uint16 and right.dtype == np.uint16:
+        return _grow(np.intersect1d(left, right, assume_unique=True))
+
+    if left.dtype == np.uint16:
+        return _grow(left[_contains(right, left)])
+
+    if right.dtype == np.uint16:
+        return _grow(right[_contains(left, right)])
+
+    return _nonempty(left & right)
+
+
+def _or(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    if left.dtype == np.uint16 and right.dtype == np.uint16:
+        return _grow(np.union1d(left, right))
+
+    if left.dtype == np.uint16:
+        left, right = right, left
+
+    if right.dtype == np.uint16:
+        words = left.copy()
+        np.bitwise_or.at(words, right >> 6, _bits(right))
+        return words
+
+    return left | right
+
+
+def _sub(left: np.ndarray, right: np.ndarray) -> Optional[np.ndarray]:
+    if left.dtype == np.uint16 and right.dtype == np.uint16:
+        return _grow(np.setdiff1d(left, right, assume_unique=True))
+
+    if left.dtype == np.uint16:
+        return _grow(left[~_contains(right, left)])
+
+    if right.dtype == np.uint16:
+        words = left.copy()
+        np.bitwise_and.at(words, right >> 6, ~_bits(right))
+        return _nonempty(words)
+
+    return _nonempty(left & ~right)
+
+
+class Bitmap:
+    """
+    Compressed set of non-negative integers below 2**32, stored as chunks of 65,536.
+
+    Bitmaps are combined with `&`, `|` and `-` into new bitmaps, and read back with `len`, `in`,
+    iteration or `to_array`.
+    """
+
+    __slots__ = ("_chunks",)
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty Bitmap.
+        """
+
+        # High 16 bits -> sorted uint16 array of low 16 bits, or bitset of CHUNK_WORDS words
+        self._chunks: Dict[int, np.ndarray] = {}
+
+    @classmethod
+    def from_ordinals(cls, ordinals: Union[np.ndarray, Iterable[int]]) -> "Bitmap":
+        """
+        Builds a bitmap from ordinals in any order, repeats allowed.
+
+        Args:
+            ordinals (Union[np.ndarray, Iterable[int]]): The ordinals to hold.
+
+        Returns:
+            Bitmap: The new bitmap.
+        """
+
+        if not isinstance(ordinals, np.ndarray):
+            ordinals = np.fromiter(ordinals, dtype=np.uint32)
+
+        ordinals = np.sort(ordinals.astype(np.uint32, copy=False))
+
+        if len(ordinals) > 1:
+            ordinals = ordinals[np.concatenate(([True], ordinals[1:] != ordinals[:-1]))]
+
+        highs = ordinals >> 16
+        bitmap = cls()
+
+        # Sorted ordinals split into one run per chunk
+        starts = (np.flatnonzero(np.diff(highs)) + 1).tolist()
+
+        for start, end in zip([0] + starts, starts + [len(ordinals)]):
+            if start == end:
+                continue
+
+            bitmap._chunks[int(highs[start])] = _grow(
+                (ordinals[start:end] & 0xFFFF).astype(np.uint16))
+
+        return bitmap
+
+    def add(self, ordinal: int) -> None:
+        """
+        Adds one ordinal.
+        """
+
+        high, low = ordinal >> 16, ordinal & 0xFFFF
+        chunk = self._chunks.get(high)
+
+        if chunk is None:
+            self._chunks[high] = np.array([low], dtype=np.uint16)
+        elif chunk.dtype == np.uint16:
+            position = int(np.searchsorted(chunk, low))
+
+            if position == len(chunk) or chunk[position] != low:
+                self._chunks[high] = _grow(np.insert(chunk, position, low))
+        else:
+            chunk[low >> 6] |= _ONE << np.uint64(low & 63)
+
+    def discard(self, ordinal: int) -> None:
+        """
+        Removes one ordinal if present.
+        """
+
+        high, low = ordinal >> 16, ordinal & 0xFFFF
+        chunk = self._chunks.get(high)
+
+        if chunk is None:
+            return
+
+        if chunk.dtype == np.uint16:
+            position = int(np.searchsorted(chunk, low))
+
+            if position == len(chunk) or chunk[position] != low:
+                return
+
+            chunk = np.delete(chunk, position)
+        else:
+            bit = _ONE << np.uint64(low & 63)
+
+            if not chunk[low >> 6] & bit:
+                return
+
+            chunk[low >> 6] &= ~bit
+
+            # Bitsets go back to arrays only well below the limit, so a chunk at the limit does not flip on every change
+            if _cardinality(chunk) > ARRAY_LIMIT // 2:
+                return
+
+            chunk = _shrink(chunk)
+
+        if chunk is None or len(chunk) == 0:
+            del self._chunks[high]
+        else:
+            self._chunks[high] = chunk
+
+    def update(self, ordinals: Union[np.ndarray, Iterable[int]]) -> None:
+        """
+        Adds many ordinals at once.
+        """
+
+        self._chunks = (self | Bitmap.from_ordinals(ordinals))._chunks
+
+    def __contains__(self, ordinal: object) -> bool:
+        if not isinstance(ordinal, int) or ordinal < 0:
+            return False
+
+        chunk = self._chunks.get(ordinal >> 16)
+
+        if chunk is None:
+            return False
+
+        low = ordinal & 0xFFFF
+
+        if chunk.dtype == np.uint16:
+            position = int(np.searchsorted(chunk, low))
+            return position < len(chunk) and chunk[position] == low
+
+        return bool(chunk[low >> 6] & (_ONE << np.uint64(low & 63)))
+
+    def __len__(self) -> int:
+        return sum(map(_cardinality, self._chunks.values()))
+
+    def __iter__(self) -> Iterator[int]:
+        for high in sorted(self._chunks):
+            yield from self._chunk_ordinals(high).tolist()
+
+    def to_array(self) -> np.ndarray:
+        """
+        Returns every ordinal in ascending order.
+
+        Returns:
+            np.ndarray: The ordinals as uint32.
+        """
+
+        if not self._chunks:
+            return np.empty(0, dtype=np.uint32)
+
+        return np.concatenate([self._chunk_ordinals(high) for high in sorted(self._chunks)])
+
+    def nbytes(self) -> int:
+        """
+        Bytes held by the chunks.
+        """
+
+        return sum(chunk.nbytes for chunk in self._chunks.values())
+
+    def copy(self) -> "Bitmap":
+        bitmap = Bitmap()
+        bitmap._chunks = {high: chunk.copy() for high, chunk in self._chunks.items()}
+        return bitmap
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        bitmap = Bitmap()
+
+        for high in self._chunks.keys() & other._chunks.keys():
+            chunk = _and(self._chunks[high], other._chunks[high])
+
+            if chunk is not None:
+                bitmap._chunks[high] = chunk
+
+        return bitmap
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        bitmap = Bitmap()
+
+        for high in self._chunks.keys() | other._chunks.keys():
+            left, right = self._chunks.get(high), other._chunks.get(high)
+
+            if left is None or right is None:
+                bitmap._chunks[high] = (left if right is None else right).copy()
+            else:
+                bitmap._chunks[high] = _or(left, right)
+
+        return bitmap
+
+    def __sub__(self, other: "Bitmap") -> "Bitmap":
+        bitmap = Bitmap()
+
+        for high, left in self._chunks.items():
+            right = other._chunks.get(high)
+            chunk = left.copy() if right is None else _sub(left, right)
+
+            if chunk is not None:
+                bitmap._chunks[high] = chunk
+
+        return bitmap
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Bitmap):
+            return NotImplemented
+
+        return np.array_equal(self.to_array(), other.to_array())
+
+    def _chunk_ordinals(self, high: int) -> np.ndarray:
+        chunk = self._chunks[high]
+        low = chunk if chunk.dtype == np.uint16 else _to_array(chunk)
+
+        return low.astype(np.uint32) | np.uint32(high << 16)
+
+    def __repr__(self) -> str:
+        return f"Bitmap({len(self)} ordinals in {len(self._chunks)} chunks)"
+
+
+class CourseBitmapIndex:
+    """
+    Maintained bitmaps of the students of every course, safe to share between threads.
+
+    Every student gets the next ordinal the first time it is seen and keeps it for the lifetime of
+    the index, so bitmaps stay valid as students come and go. The bitmap of all students in the
+    system is the universe that `~` queries are taken against.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty CourseBitmapIndex.
+        """
+
+        self._lock = threading.Lock()
+
+        # Student ID -> ordinal, and back
+        self._ordinals: Dict[str, int] = {}
+        self._ids: List[str] = []
+
+        # The students in the system, and course ID -> students enrolled in the course
+        self._students = Bitmap()
+        self._courses: Dict[str, Bitmap] = {}
+
+    def add_students(self, id_numbers: Iterable[str]) -> None:
+        """
+        Adds students to the system's universe.
+
+        Args:
+            id_numbers (Iterable[str]): The IDs of the students.
+        """
+
+        with self._lock:
+            self._students.update(self._intern(id_numbers))
+
+    def remove_student(self, id_number: str) -> None:
+        """
+        Drops a student from the universe. The student's enrollments are removed one by one.
+
+        Args:
+            id_number (str): The ID of the student.
+        """
+
+        with self._lock:
+            ordinal = self._ordinals.get(id_number)
+
+            if ordinal is not None:
+                self._students.discard(ordinal)
+
+    def intern(self, id_numbers: Iterable[str]) -> np.ndarray:
+        """
+        Returns the ordinals of student IDs, numbering the IDs seen for the first time.
+
+        Args:
+            id_numbers (Iterable[str]): The IDs of the students.
+
+        Returns:
+            np.ndarray: Their ordinals as uint32, in the same order.
+        """
+
+        with self._lock:
+            return self._intern(id_numbers)
+
+    def add(self, course_id: str, id_numbers: Iterable[str]) -> None:
+        """
+        Records enrollments in a course, registering the course if it is new.
+
+        Args:
+            course_id (str): The ID of the course.
+            id_numbers (Iterable[str]): The IDs of the enrolled students.
+        """
+
+        with self._lock:
+            self._add_ordinals(course_id, self._intern(id_numbers))
+
+    def add_ordinals(self, course_id: str, ordinals: np.ndarray) -> None:
+        """
+        Records enrollments in a course by student ordinals from `intern`, registering the course if it is new.
+
+        Args:
+            course_id (str): The ID of the course.
+            ordinals (np.ndarray): The ordinals of the enrolled students.
+        """
+
+        with self._lock:
+            self._add_ordinals(course_id, ordinals)
+
+    def discard(self, course_id: str, id_number: str) -> None:
+        """
+        Removes an enrollment from a course.
+
+        Args:
+            course_id (str): The ID of the course.
+            id_number (str): The ID of the student.
+        """
+
+        with self._lock:
+            bitmap = self._courses.get(course_id)
+            ordinal = self._ordinals.get(id_number)
+
+            if bitmap is not None and ordinal is not None:
+                bitmap.discard(ordinal)
+
+    def drop(self, course_id: str) -> None:
+        """
+        Forgets a course removed from the system.
+
+        Args:
+            course_id (str): The ID of the course.
+        """
+
+        with self._lock:
+            self._courses.pop(course_id, None)
+
+    def evaluate(self, query: "CourseQuery") -> Bitmap:
+        """
+        Evaluates a query to the bitmap of the students it selects.
+
+        Args:
+            query (CourseQuery): The query, such as `enrolled_in(...) & ~enrolled_in(...)`.
+
+        Returns:
+            Bitmap: A new bitmap of student ordinals, owned by the caller.
+
+        Raises:
+            KeyError: If the query names a course that does not exist in the system.
+        """
+
+        with self._lock:
+            return query._evaluate(self)
+
+    def count(self, query: "CourseQuery") -> int:
+        """
+        Counts the students a query selects.
+        """
+
+        return len(self.evaluate(query))
+
+    def iter_ids(self, query: "CourseQuery") -> Iterator[str]:
+        """
+        Yields the IDs of the students a query selects, in ordinal order.
+
+        The query is evaluated when this is called. IDs are looked up chunk by chunk as they are consumed.
+        """
+
+        bitmap = self.evaluate(query)
+        ids = self._ids
+
+        def generate() -> Iterator[str]:
+            # Ordinals are never reused and `_ids` only grows, so no lock is needed here
+            for high in sorted(bitmap._chunks):
+                yield from map(ids.__getitem__, bitmap._chunk_ordinals(high).tolist())
+
+        return generate()
+
+    def course(self, course_id: str) -> Bitmap:
+        """
+        Returns the bitmap of a course. Called with the lock held, by query evaluation.
+
+        Raises:
+            KeyError: If no course with the given ID is indexed.
+        """
+
+        bitmap = self._courses.get(course_id)
+
+        if bitmap is None:
+            raise KeyError(
+                f"Course with ID {course_id} does not exist in this management system.")
+
+        return bitmap
+
+    def course_ids(self) -> List[str]:
+        """
+        Returns the IDs of the indexed courses. Called with the lock held, by query evaluation.
+        """
+
+        return list(self._courses)
+
+    @property
+    def students(self) -> Bitmap:
+        """
+        The bitmap of every student in the system. Read with the lock held, by query evaluation.
+        """
+
+        return self._students
+
+    def nbytes(self) -> int:
+        """
+        Bytes held by the bitmaps, excluding the ordinal table.
+        """
+
+        with self._lock:
+            return self._students.nbytes() + sum(bitmap.nbytes() for bitmap in self._courses.values())
+
+    def _add_ordinals(self, course_id: str, ordinals: np.ndarray) -> None:
+        bitmap = self._courses.get(course_id)
+
+        if bitmap is None:
+            self._courses[course_id] = Bitmap.from_ordinals(ordinals)
+        elif len(ordinals) == 1:
+            bitmap.add(int(ordinals[0]))
+        elif len(ordinals):
+            bitmap.update(ordinals)
+
+    def _intern(self, id_numbers: Iterable[str]) -> np.ndarray:
+        """
+        Returns the ordinals of student IDs, assigning the next free ones to new IDs.
+        """
+
+        ordinals, ids = self._ordinals, self._ids
+        id_numbers = id_numbers if isinstance(id_numbers, (list, tuple)) else list(id_numbers)
+
+        try:
+            return np.fromiter(map(ordinals.__getitem__, id_numbers), dtype=np.uint32, count=len(id_numbers))
+        except KeyError:
+            pass
+
+        # Some students are new: number them in order of first appearance, then look everyone up
+        new = [id_number for id_number in dict.fromkeys(id_numbers) if id_number not in ordinals]
+        ordinals.update(zip(new, range(len(ids), len(ids) + len(new))))
+        ids.extend(new)
+
+        return np.fromiter(map(ordinals.__getitem__, id_numbers), dtype=np.uint32, count=len(id_numbers))
+
+
+class CourseQuery:
+    """
+    A set-algebra expression over course enrollments, selecting students.
+
+    Combine queries with `&` (enrolled in both), `|` (in either), `-` (in the first but not the
+    second) and `~` (every student of the system not selected).
+    """
+
+    def __and__(self, other: "CourseQuery") -> "CourseQuery":
+        return _And(self, other)
+
+    def __or__(self, other: "CourseQuery") -> "CourseQuery":
+        return _Or(self, other)
+
+    def __sub__(self, other: "CourseQuery") -> "CourseQuery":
+        return _And(self, _Not(other))
+
+    def __invert__(self) -> "CourseQuery":
+        return _Not(self)
+
+    def _evaluate(self, index: CourseBitmapIndex) -> Bitmap:
+        """
+        Returns the selected students as a bitmap the caller may change. Called with the index lock held.
+        """
+
+        raise NotImplementedError
+
+
+class _Courses(CourseQuery):
+    """
+    Students enrolled in any of the given courses.
+    """
+
+    def __init__(self, course_ids: List[str]) -> None:
+        self.course_ids = course_ids
+
+    def _evaluate(self, index: CourseBitmapIndex) -> Bitmap:
+        bitmaps = [index.course(course_id) for course_id in self.course_ids]
+
+        if not bitmaps:
+            return Bitmap()
+
+        selected = bitmaps[0].copy()
+
+        for bitmap in bitmaps[1:]:
+            selected = selected | bitmap
+
+        return selected
+
+    def __repr__(self) -> str:
+        return f"enrolled_in({', '.join(map(repr, self.course_ids))})"
+
+
+class _Subject(CourseQuery):
+    """
+    Students enrolled in any course of a subject, matched against the letters of the course IDs.
+    """
+
+    def __init__(self, subject: str) -> None:
+        self.subject = subject.upper()
+
+    def _evaluate(self, index: CourseBitmapIndex) -> Bitmap:
+        course_ids = [course_id for course_id in index.course_ids()
+                      if (match := _SUBJECT.match(course_id)) and match.group().upper() == self.subject]
+
+        return _Courses(course_ids)._evaluate(index)
+
+    def __repr__(self) -> str:
+        return f"enrolled_in_subject({self.subject!r})"
+
+
+class _And(CourseQuery):
+    def __init__(self, left: CourseQuery, right: CourseQuery) -> None:
+        self.left = left
+        self.right = right
+
+    def _evaluate(self, index: CourseBitmapIndex) -> Bitmap:
+        # `a & ~b` is evaluated as `a - b`, which never builds the complement of `b`
+        if isinstance(self.right, _Not):
+            return self.left._evaluate(index) - self.right.operand._evaluate(index)
+
+        if isinstance(self.left, _Not):
+            return self.right._evaluate(index) - self.left.operand._evaluate(index)
+
+        return self.left._evaluate(index) & self.right._evaluate(index)
+
+    def __repr__(self) -> str:
+        return f"({self.left!r} & {self.right!r})"
+
+
+class _Or(CourseQuery):
+    def __init__(self, left: CourseQuery, right: CourseQuery) -> None:
+        self.left = left
+        self.right = right
+
+    def _evaluate(self, index: CourseBitmapIndex) -> Bitmap:
+        return self.left._evaluate(index) | self.right._evaluate(index)
+
+    def __repr__(self) -> str:
+        return f"({self.left!r} | {self.right!r})"
+
+
+class _Not(CourseQuery):
+    def __init__(self, operand: CourseQuery) -> None:
+        self.operand = operand
+
+    def _evaluate(self, index: CourseBitmapIndex) -> Bitmap:
+        return index.students - self.operand._evaluate(index)
+
+    def __repr__(self) -> str:
+        return f"~{self.operand!r}"
+
+
+def enrolled_in(*courses: Union[CourseNameId, str]) -> CourseQuery:
+    """
+    Selects the students enrolled in any of the given courses.
+
+    Args:
+        *courses (Union[CourseNameId, str]): The courses, by `CourseNameId` or course ID.
+
+    Returns:
+        CourseQuery: The query, to combine with others.
+    """
+
+    return _Courses([course.course_id if isinstance(course, CourseNameId) else course
+                     for course in courses])
+
+
+def enrolled_in_subject(subject: str) -> CourseQuery:
+    """
+    Selects the students enrolled in any course of a subject, such as "ECON" for ECON101 and ECON102.
+
+    Args:
+        subject (str): The letters that start the course IDs of the subject, in any case.
+
+    Returns:
+        CourseQuery: The query, to combine with others.
+    """
+
+    return _Subject(subject)
@@ -0,0 +1,336 @@
+from typing import Dict, Iterator, List, Mapping, Optional
+
+from utils.enums.course_name_id import CourseNameId
+from utils.enums.grade import Grade
+from utils.vanilla.instructor import Instructor
+from utils.vanilla.enrollment import Enrollment
+from .enrollment_store import EnrollmentStore, GRADES, GRADE_CODES
+
+
+class EnrolledStudents(Mapping):
+    """
+    A read-only mapping of student IDs to `Enrollment` views over one course's rows in an `EnrollmentStore`.
+
+    Enrollments are materialized on access and are detached copies: to change a grade, pass the
+    modified enrollment to `Course.update_student` or use `StudentManagementSystem.grade_student`.
+    """
+
+    __slots__ = ("_store", "_course_id", "_ordinal")
+
+    def __init__(self, store: EnrollmentStore, course_id: str, ordinal: int) -> None:
+        self._store = store
+        self._course_id = course_id
+        self._ordinal = ordinal
+
+    def __getitem__(self, id_number: str) -> Enrollment:
+        store = self._store
+        row = store.find_row(store.student_ordinals.get(
+            id_number), self._ordinal)
+
+        if row is None:
+            raise KeyError(id_number)
+
+        return Enrollment(id_number=id_number, course_id=self._course_id, grade=GRADES[store.grades[row]])
+
+    def __contains__(self, id_number: object) -> bool:
+        store = self._store
+        return store.find_row(store.student_ordinals.get(id_number), self._ordinal) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        store = self._store
+        student_ids, students = store.student_ids, store.students
+
+        for row in store.iter_course_rows(self._ordinal):
+            yield student_ids[students[row]]
+
+    def __len__(self) -> int:
+        return self._store.course_sizes[self._ordinal]
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+
+class Course:
+    """
+    Represents a course whose enrollments live in the columnar `EnrollmentStore` of its StudentManagementSystem.
+
+    Until the course is added to a system its enrollments are kept in a plain dictionary, exactly
+    like the vanilla `Course`. Once added, they move into the system's store and `enrolled_students`
+    becomes a read-only `EnrolledStudents` view.
+
+    Attributes:
+        course_name (str): The name of the course.
+        course_id (str): A unique identifier for the course.
+        enrolled_students (Mapping[str, Enrollment]): A mapping of student IDs to `Enrollment` instances for students enrolled in the course.
+        instructors (Optional[Dict[str, Instructor]]): A dictionary mapping instructor IDs to `Instructor` instances for those teaching the course, or None if no instructors are assigned.
+    """
+
+    __slots__ = ("course_name", "course_id", "instructors",
+                 "_system", "_store", "_ordinal", "_enrollments")
+
+    def __init__(self, course_name_id: CourseNameId, enrolled_students: Optional[Dict[str, Enrollment]] = None, instructors: Optional[Dict[str, Instructor]] = None) -> None:
+        """
+        Initializes a Course instance.
+
+        Args:
+            course_name_id (CourseNameId): An instance containing both the course name and its unique identifier.
+            enrolled_students (Optional[Dict[str, Enrollment]], optional): A dictionary of students enrolled in the course, with student IDs as keys. Defaults to an empty dictionary if not provided.
+            instructors (Optional[Dict[str, Instructor]], optional): A dictionary of instructors for the course, with instructor IDs as keys. Defaults to an empty dictionary if not provided.
+        """
+
+        self.course_name = course_name_id.course_name
+        self.course_id = course_name_id.course_id
+        self.instructors = instructors if instructors is not None else {}
+
+        # The StudentManagementSystem this course is registered in, notified of enrollment and instructor changes to keep its indexes
+        # current and to journal them. Its own operations go through the underscored methods, which only keep the indexes current
+        self._system = None
+
+        # The store holding the enrollments once the course is registered, and the course ordinal in it
+        self._store: Optional[EnrollmentStore] = None
+        self._ordinal = -1
+
+        # Enrollments held by the course itself while it is not registered in a system
+        self._enrollments: Dict[str, Enrollment] = enrolled_students if enrolled_students is not None else {}
+
+    @property
+    def enrolled_students(self) -> Mapping[str, Enrollment]:
+        if self._store is None:
+            return self._enrollments
+
+        return EnrolledStudents(self._store, self.course_id, self._ordinal)
+
+    def _attach(self, store: EnrollmentStore) -> None:
+        # Move the enrollments held by the course into the store
+        self._ordinal = store.intern_course(self.course_id)
+        self._store = store
+
+        for enrollment in self._enrollments.values():
+            store.add(store.intern_student(enrollment.id_number),
+                      self._ordinal, GRADE_CODES[enrollment.grade])
+
+        self._enrollments = {}
+
+    def _detach(self) -> None:
+        # Move the enrollments out of the store and back into the course
+        store = self._store
+        rows = list(store.iter_course_rows(self._ordinal))
+
+        self._enrollments = {
+            store.student_ids[store.students[row]]: Enrollment(
+                id_number=store.student_ids[store.students[row]], course_id=self.course_id, grade=GRADES[store.grades[row]])
+            for row in rows
+        }
+
+        for row in rows:
+            store.remove(row)
+
+        store.compact_if_needed()
+
+        self._store = None
+        self._ordinal = -1
+
+    def add_student(self, enrollment: Enrollment) -> None:
+        self._add_student(enrollment=enrollment)
+
+        if self._system is not None:
+            self._system._record_enrollments(course=self, enrollments=[enrollment])
+
+    def _add_student(self, enrollment: Enrollment) -> None:
+        # Check if the student is already enrolled in the course without materializing the enrollment
+        if enrollment.id_number in self.enrolled_students:
+            raise ValueError(
+                f"Student with ID {enrollment.id_number}, is already enrolled in this course: ({self})")
+
+        if self._system is not None:
+            self._system._preserve("courses", (self.course_id,))
+
+        # Enroll the student in the course
+        store = self._store
+
+        if store is None:
+            self._enrollments[enrollment.id_number] = enrollment
+        else:
+            store.add(store.intern_student(enrollment.id_number),
+                      self._ordinal, GRADE_CODES[enrollment.grade])
+
+            if self._system is not None:
+                self._system._index_enrollment(course=self, enrollment=enrollment)
+
+    def add_students_many(self, enrollments: List[Enrollment]) -> None:
+        self._add_students_many(enrollments=enrollments)
+
+        if self._system is not None:
+            self._system._record_enrollments(course=self, enrollments=enrollments)
+
+    def _add_students_many(self, enrollments: List[Enrollment]) -> None:
+        # Check all the students up front so that either every enrollment is added or none is
+        enrolled_students = self.enrolled_students
+        new_students = set()
+
+        for enrollment in enrollments:
+            if enrollment.id_number in enrolled_students or enrollment.id_number in new_students:
+                raise ValueError(
+                    f"Student with ID {enrollment.id_number}, is already enrolled in this course: ({self})")
+
+            new_students.add(enrollment.id_number)
+
+        if self._system is not None:
+            self._system._preserve("courses", (self.course_id,))
+
+        # Enroll the students in the course
+        store = self._store
+
+        if store is None:
+            self._enrollments.update(
+                (enrollment.id_number, enrollment) for enrollment in enrollments)
+        else:
+            add, intern_student, ordinal = store.add, store.intern_student, self._ordinal
+
+            for enrollment in enrollments:
+                add(intern_student(enrollment.id_number),
+                    ordinal, GRADE_CODES[enrollment.grade])
+
+            if self._system is not None:
+                self._system._index_enrollments(course=self, enrollments=enrollments)
+
+    def update_student(self, enrollment: Enrollment) -> None:
+        previous_grade = self._update_student(enrollment=enrollment)
+
+        if self._system is not None:
+            self._system._record_regrade(course=self, enrollment=enrollment, previous_grade=previous_grade)
+
+    def _update_student(self, enrollment: Enrollment) -> Optional[Grade]:
+        enrolled_student = self.find_enrolled_student(
+            id_number=enrollment.id_number)
+
+        if enrolled_student is None:
+            raise ValueError(
+                f"Student with ID {enrollment.id_number}, is not enrolled in this course: ({self})")
+
+        if self._system is not None:
+            self._system._preserve("courses", (self.course_id,))
+
+        store = self._store
+
+        if store is None:
+            self._enrollments[enrollment.id_number] = enrollment
+        else:
+            row = store.find_row(
+                store.student_ordinals[enrollment.id_number], self._ordinal)
+            old_grade = GRADES[store.grades[row]]
+            store.grades[row] = GRADE_CODES[enrollment.grade]
+
+            if self._system is not None:
+                self._system._regrade_enrollment(
+                    course=self, old_grade=old_grade, grade=enrollment.grade)
+
+        # Enrollments of the store are detached copies, still holding the previous grade
+        return enrolled_student.grade
+
+    def remove_student(self, id_number: str) -> None:
+        enrollment = self._remove_student(id_number=id_number)
+
+        if self._system is not None:
+            self._system._record_unenrollment(course=self, enrollment=enrollment)
+
+    def _remove_student(self, id_number: str) -> Enrollment:
+        if self._system is not None:
+            self._system._preserve("courses", (self.course_id,))
+
+        store = self._store
+
+        if store is None:
+            enrollment = self._enrollments.pop(id_number, None)
+        else:
+            row = store.find_row(
+                store.student_ordinals.get(id_number), self._ordinal)
+            enrollment = None
+
+            if row is not None:
+                enrollment = Enrollment(
+                    id_number=id_number, course_id=self.course_id, grade=GRADES[store.grades[row]])
+                store.remove(row)
+                store.compact_if_needed()
+
+                if self._system is not None:
+                    self._system._unindex_enrollment(course=self, enrollment=enrollment)
+
+        if enrollment is None:
+            raise Exception(
+                f"Student with ID {id_number}, is not enrolled in this course: ({self})")
+
+        return enrollment
+
+    def find_enrolled_student(self, id_number: str) -> Optional[Enrollment]:
+        enrolled_student = self.enrolled_students.get(id_number, None)
+        return enrolled_student
+
+    def add_instructor(self, instructor: Instructor) -> None:
+        course_instructor = self.find_instructor(
+            id_number=instructor.id_number)
+
+        if course_instructor:
+            raise ValueError(
+                f"Instructor with ID {instructor.id_number}, is already an instructor for this course: ({self})")
+
+        if self._system is not None:
+            self._system._preserve("courses", (self.course_id,))
+
+        self.instructors[instructor.id_number] = instructor
+
+        if self._system is not None:
+            self._system._index_instructor(course=self, instructor=instructor)
+            self._system._record_assignment(course=self, instructor=instructor)
+
+    def update_instructor(self, instructor: Instructor) -> None:
+        course_instructor = self.find_instructor(
+            id_number=instructor.id_number)
+
+        if course_instructor is None:
+            raise ValueError(
+                f"Instructor with ID {instructor.id_number}, is not an instructor for this course: ({self})")
+
+        if self._system is not None:
+            self._system._preserve("courses", (self.course_id,))
+
+        self.instructors.update({
+            instructor.id_number: instructor
+        })
+
+    def remove_instructor(self, id_number: str) -> None:
+        instructor = self._remove_instructor(id_number=id_number)
+
+        if self._system is not None:
+            self._system._record_unassignment(course=self, instructor=instructor)
+
+    def _remove_instructor(self, id_number: str) -> Instructor:
+        if self._system is not None:
+            self._system._preserve("courses", (self.course_id,))
+
+        instructor = self.instructors.pop(id_number, None)
+
+        if instructor is None:
+            raise Exception(
+                f"Instructor with ID {id_number}, is not an instructor for this course: ({self})")
+
+        if self._system is not None:
+            self._system._unindex_instructor(course=self, instructor=instructor)
+
+        return instructor
+
+    def find_instructor(self, id_number: str) -> Optional[Instructor]:
+        instructor = self.instructors.get(id_number, None)
+        return instructor
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the course.
+
+        Returns:
+            str: A string describing the course, including the course name, course ID, and the number of enrolled students.
+        """
+        return f"Course(course_name: {self.course_name}, course_id: {self.course_id}, enrolled_students: {self.enrolled_students}, total_students_enrolled: {len(self.enrolled_students)}, instructors: {self.instructors}, total_instructors: {len(self.instructors)})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -0,0 +1,210 @@
+from array import array
+from typing import Dict, Iterator, List, Optional
+
+from utils.enums.grade import Grade
+
+
+# Grades are stored as their position in the Grade enum, which fits in one unsigned byte
+GRADES: List[Grade] = list(Grade)
+GRADE_CODES: Dict[Grade, int] = {grade: code for code,
+                                 grade in enumerate(GRADES)}
+
+# Grade code marking a removed row until the store is compacted
+REMOVED = 255
+
+# Compact once removed rows outnumber live rows, but not for tiny stores
+COMPACT_MIN_ROWS = 1024
+
+
+class EnrollmentStore:
+    """
+    Stores enrollments as parallel typed arrays instead of one `Enrollment` object per row.
+
+    Student and course IDs are interned to dense integer ordinals, so each enrollment row costs a
+    4-byte student ordinal, a 2-byte course ordinal and a 1-byte grade code. Two row lists, one per
+    course and one per student, answer course rosters and student transcripts without scanning.
+
+    Attributes:
+        student_ids (List[str]): Student ordinal -> student ID.
+        student_ordinals (Dict[str, int]): Student ID -> student ordinal.
+        course_ids (List[str]): Course ordinal -> course ID.
+        course_ordinals (Dict[str, int]): Course ID -> course ordinal.
+        students (array): Student ordinal of every row (uint32).
+        courses (array): Course ordinal of every row (uint16).
+        grades (array): Grade code of every row (uint8), `REMOVED` for removed rows.
+        course_rows (List[array]): Course ordinal -> rows of that course. May still hold removed rows.
+        course_sizes (array): Course ordinal -> number of live rows in that course.
+        student_rows (List[Optional[array]]): Student ordinal -> live rows of that student.
+        removed (int): Number of removed rows waiting for compaction.
+    """
+
+    __slots__ = ("student_ids", "student_ordinals", "course_ids", "course_ordinals", "students",
+                 "courses", "grades", "course_rows", "course_sizes", "student_rows", "removed")
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty EnrollmentStore.
+        """
+
+        self.student_ids: List[str] = []
+        self.student_ordinals: Dict[str, int] = {}
+        self.course_ids: List[str] = []
+        self.course_ordinals: Dict[str, int] = {}
+        self.students = array("I")
+        self.courses = array("H")
+        self.grades = array("B")
+        self.course_rows: List[array] = []
+        self.course_sizes = array("I")
+        self.student_rows: List[Optional[array]] = []
+        self.removed = 0
+
+    def intern_student(self, id_number: str) -> int:
+        """
+        Returns the ordinal of a student ID, assigning the next free one on first use.
+        """
+
+        ordinal = self.student_ordinals.get(id_number)
+
+        if ordinal is None:
+            ordinal = len(self.student_ids)
+            self.student_ids.append(id_number)
+            self.student_ordinals[id_number] = ordinal
+            self.student_rows.append(None)
+
+        return ordinal
+
+    def intern_course(self, course_id: str) -> int:
+        """
+        Returns the ordinal of a course ID, assigning the next free one on first use.
+        """
+
+        ordinal = self.course_ordinals.get(course_id)
+
+        if ordinal is None:
+            ordinal = len(self.course_ids)
+            self.course_ids.append(course_id)
+            self.course_ordinals[course_id] = ordinal
+            self.course_rows.append(array("I"))
+            self.course_sizes.append(0)
+
+        return ordinal
+
+    def add(self, student: int, course: int, grade: int) -> int:
+        """
+        Appends an enrollment row and returns its row number.
+        """
+
+        row = len(self.grades)
+        self.students.append(student)
+        self.courses.append(course)
+        self.grades.append(grade)
+        self.course_rows[course].append(row)
+        self.course_sizes[course] += 1
+
+        rows = self.student_rows[student]
+
+        if rows is None:
+            self.student_rows[student] = array("I", (row,))
+        else:
+            rows.append(row)
+
+        return row
+
+    def find_row(self, student: Optional[int], course: int) -> Optional[int]:
+        """
+        Returns the live row enrolling a student in a course, if any.
+
+        Runs in O(courses of the student).
+        """
+
+        if student is None:
+            return None
+
+        rows = self.student_rows[student]
+
+        if rows is not None:
+            courses = self.courses
+
+            for row in rows:
+                if courses[row] == course:
+                    return row
+
+        return None
+
+    def remove(self, row: int) -> None:
+        """
+        Marks a row as removed. Its slot is reclaimed by the next compaction.
+
+        Row numbers stay valid until `compact_if_needed` is called, so callers removing several
+        rows compact once at the end.
+        """
+
+        student = self.students[row]
+        rows = self.student_rows[student]
+        rows.remove(row)
+
+        if not rows:
+            self.student_rows[student] = None
+
+        self.course_sizes[self.courses[row]] -= 1
+        self.grades[row] = REMOVED
+        self.removed += 1
+
+    def compact_if_needed(self) -> None:
+        """
+        Compacts the store once removed rows outnumber live rows.
+        """
+
+        if self.removed > COMPACT_MIN_ROWS and self.removed > len(self.grades) - self.removed:
+            self.compact()
+
+    def iter_course_rows(self, course: int) -> Iterator[int]:
+        """
+        Yields the live rows of a course in enrollment order.
+        """
+
+        grades = self.grades
+
+        for row in self.course_rows[course]:
+            if grades[row] != REMOVED:
+                yield row
+
+    def compact(self) -> None:
+        """
+        Drops removed rows and renumbers the live ones, rebuilding the per-course and per-student row lists.
+        """
+
+        students, courses, grades = self.students, self.courses, self.grades
+
+        self.students = array("I")
+        self.courses = array("H")
+        self.grades = array("B")
+        self.course_rows = [array("I") for _ in self.course_ids]
+        self.course_sizes = array("I", bytes(4 * len(self.course_ids)))
+        self.student_rows = [None] * len(self.student_ids)
+        self.removed = 0
+
+        for student, course, grade in zip(students, courses, grades):
+            if grade != REMOVED:
+                self.add(student, course, grade)
+
+    @property
+    def size(self) -> int:
+        """
+        Number of live enrollment rows.
+        """
+
+        return len(self.grades) - self.removed
+
+    def nbytes(self) -> int:
+        """
+        Approximate bytes held by the row arrays, excluding the interned ID strings.
+        """
+
+        total = sum(column.itemsize * len(column)
+                    for column in (self.students, self.courses, self.grades, self.course_sizes))
+        total += sum(rows.itemsize * len(rows) for rows in self.course_rows)
+        total += sum(rows.itemsize * len(rows)
+                     for rows in self.student_rows if rows is not None)
+
+        return total
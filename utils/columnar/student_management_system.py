@@ -0,0 +1,470 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from utils.vanilla.student import Student
+from utils.vanilla.instructor import Instructor
+from utils.vanilla.enrollment import Enrollment
+from utils.vanilla.student_management_system import StudentManagementSystem as VanillaStudentManagementSystem
+from utils.bitmaps import CourseBitmapIndex
+from utils.enums.grade import Grade
+from utils.errors import BulkOperationError
+from utils.events import StudentEnrolled, StudentRemoved
+from utils.snapshot import load_system, read_snapshot
+from .course import Course
+from .enrollment_store import EnrollmentStore, GRADES, GRADE_CODES, REMOVED
+
+# The models of the backend are looked up on this module by the generator, the journal and the benchmarks
+__all__ = ["StudentManagementSystem", "Student", "Instructor", "Course", "Enrollment"]
+
+
+class StudentManagementSystem(VanillaStudentManagementSystem):
+    """
+    Manages students, instructors, courses, and enrollments within an educational institution, keeping enrollments in columnar arrays.
+
+    This class exposes the same methods as the vanilla `StudentManagementSystem`. Students, instructors
+    and courses are the vanilla objects, but every enrollment is a row of an `EnrollmentStore`
+    instead of an `Enrollment` instance. `Enrollment` objects are only materialized when they are
+    read, for example by `find_course_enrollments` or `find_student_enrollments`.
+
+    Attributes:
+        students (Dict[str, Student]): A dictionary mapping student IDs to `Student` instances.
+        instructors (Dict[str, Instructor]): A dictionary mapping instructor IDs to `Instructor` instances.
+        courses (Dict[str, Course]): A dictionary mapping course IDs to columnar `Course` instances.
+
+    Notes:
+        Materialized enrollments are detached copies. Grade changes must go through `grade_student`
+        or `Course.update_student` to be stored.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes the StudentManagementSystem with empty dictionaries for students, instructors, and courses, and an empty enrollment store.
+        """
+
+        super().__init__()
+
+        # The enrollment store doubles as the student -> courses and the grade index
+        del self._student_courses
+        del self._course_grades
+        self._store = EnrollmentStore()
+
+    def remove_student(self, id_number: str) -> None:
+        """
+        Removes a student from the system by their ID, along with all of the student's enrollments.
+
+        Args:
+            id_number (str): The unique identifier of the student to remove.
+
+        Raises:
+            KeyError: If no student with the given ID exists in the system.
+        """
+
+        self._preserve("students", (id_number,))
+        student = self.students.pop(id_number, None)
+
+        if student is None:
+            raise KeyError(
+                f"Student with ID {id_number} does not exist.")
+
+        self._unindex_person("students", id_number)
+
+        store = self._store
+        ordinal = store.student_ordinals.get(id_number)
+        course_ids: Tuple[str, ...] = ()
+        grades: List[Grade] = []
+
+        if ordinal is not None and store.student_rows[ordinal] is not None:
+            course_ids = tuple(store.course_ids[store.courses[row]]
+                               for row in store.student_rows[ordinal])
+            self._preserve("courses", course_ids)
+
+            for row in list(store.student_rows[ordinal]):
+                grade = GRADES[store.grades[row]]
+                self._stats_of(store.course_ids[store.courses[row]]).remove(grade)
+                grades.append(grade)
+                store.remove(row)
+
+            if self._course_bitmaps is not None:
+                for course_id in course_ids:
+                    self._course_bitmaps.discard(course_id, id_number)
+
+            store.compact_if_needed()
+
+        if self._journal is not None:
+            self._journal.record("remove_student", id_number)
+
+        if self._events is not None:
+            self._events.publish([StudentRemoved(student, course_ids, tuple(grades))])
+
+    def find_student_enrollments(self, id_number: str) -> Dict[str, List[Enrollment]]:
+        """
+        Retrieves a dictionary of enrollments for a specific student.
+
+        Args:
+            id_number (str): The unique identifier of the student whose enrollments are to be retrieved.
+
+        Returns:
+            Dict[str, List[Enrollment]]: A dictionary where the key is the student ID and the value is the list
+            of materialized `Enrollment` instances for the specified student.
+
+        Raises:
+            KeyError: If no student with the given ID exists in the system.
+        """
+
+        student = self.find_student(id_number=id_number)
+
+        if student is None:
+            raise KeyError(
+                f"Student with ID {id_number} does not exist in this management system.")
+
+        store = self._store
+        ordinal = store.student_ordinals.get(id_number)
+        rows = store.student_rows[ordinal] if ordinal is not None else None
+
+        student_enrollments: Dict[str, List[Enrollment]] = {id_number: [
+            Enrollment(id_number=id_number, course_id=store.course_ids[store.courses[row]],
+                       grade=GRADES[store.grades[row]])
+            for row in rows or ()
+        ]}
+
+        return student_enrollments
+
+    def enroll_many(self, enrollments: Iterable[Tuple[str, str]]) -> None:
+        """
+        Enrolls many students in courses in one all-or-nothing step.
+
+        All rows are validated in a single pass against the enrollment store and then appended to
+        it directly, without building an `Enrollment` object per row.
+
+        Args:
+            enrollments (Iterable[Tuple[str, str]]): Pairs of (student ID, course ID) to enroll.
+
+        Raises:
+            BulkOperationError: Listing every row whose student or course does not exist, whose student 
+            is already enrolled in the course, or that is repeated in the batch.
+        """
+
+        store = self._store
+        students = self.students
+        courses = self.courses
+        student_ordinals = store.student_ordinals
+        errors: List[Tuple[int, str]] = []
+        new_enrollments: Dict[Tuple[str, int], None] = {}
+
+        for row, (id_number, course_id) in enumerate(enrollments):
+            course = courses.get(course_id)
+
+            if id_number not in students:
+                errors.append(
+                    (row, f"Student with ID {id_number} does not exist and can not be enrolled in this management system."))
+            elif course is None:
+                errors.append(
+                    (row, f"Course with ID {course_id} does not exist in this management system. Student with ID {id_number} was not enrolled."))
+            elif (id_number, course._ordinal) in new_enrollments or store.find_row(student_ordinals.get(id_number), course._ordinal) is not None:
+                errors.append(
+                    (row, f"Student with ID {id_number}, is already enrolled in course with ID {course_id}."))
+            else:
+                new_enrollments[(id_number, course._ordinal)] = None
+
+        if errors:
+            raise BulkOperationError("enroll_many", errors)
+
+        self._preserve("courses", {
+                       store.course_ids[ordinal] for _, ordinal in new_enrollments})
+
+        # Append the new rows straight to the store
+        add, intern_student = store.add, store.intern_student
+        no_grade = GRADE_CODES[Grade.NO_GRADE]
+
+        by_course: Dict[int, List[str]] = {}
+
+        for id_number, ordinal in new_enrollments:
+            add(intern_student(id_number), ordinal, no_grade)
+            by_course.setdefault(ordinal, []).append(id_number)
+
+        for ordinal, id_numbers in by_course.items():
+            self._stats_of(store.course_ids[ordinal]).add(Grade.NO_GRADE, len(id_numbers))
+
+            if self._course_bitmaps is not None:
+                self._course_bitmaps.add(store.course_ids[ordinal], id_numbers)
+
+        if self._journal is not None:
+            self._journal.record("enroll", [(id_number, store.course_ids[ordinal])
+                                           for id_number, ordinal in new_enrollments])
+
+        if self._events is not None:
+            self._events.publish([StudentEnrolled(id_number, store.course_ids[ordinal])
+                                  for id_number, ordinal in new_enrollments])
+
+    def verify_indexes(self) -> None:
+        """
+        Recomputes the per-course and per-student row lists and the instructor index and checks them against the maintained ones.
+
+        Raises:
+            ValueError: If the enrollment store or an index is out of sync with the courses in the system.
+        """
+
+        store = self._store
+        student_rows: Dict[int, Set[int]] = {}
+        instructor_courses: Dict[str, Set[str]] = {}
+
+        for course_id, course in self.courses.items():
+            if course._system is not self or course._store is not store:
+                raise ValueError(
+                    f"Course with ID {course_id} is not registered with this management system.")
+
+            rows = list(store.iter_course_rows(course._ordinal))
+
+            if len(rows) != store.course_sizes[course._ordinal]:
+                raise ValueError(
+                    f"Course with ID {course_id} has {len(rows)} live rows but its size is {store.course_sizes[course._ordinal]}.")
+
+            for row in rows:
+                if store.courses[row] != course._ordinal:
+                    raise ValueError(
+                        f"Row {row} is listed under course with ID {course_id} but belongs to another course.")
+
+                student_rows.setdefault(store.students[row], set()).add(row)
+
+            for id_number in course.instructors:
+                instructor_courses.setdefault(id_number, set()).add(course_id)
+
+        maintained = {ordinal: set(rows) for ordinal, rows in enumerate(
+            store.student_rows) if rows is not None}
+
+        if student_rows != maintained:
+            raise ValueError(
+                f"Student rows are out of sync. Expected: {student_rows}, found: {maintained}")
+
+        if len(store.grades) - store.removed != sum(len(rows) for rows in student_rows.values()):
+            raise ValueError(
+                f"Enrollment store holds {store.size} live rows that do not belong to a registered course.")
+
+        if instructor_courses != self._instructor_courses:
+            raise ValueError(
+                f"Instructor to course index is out of sync. Expected: {instructor_courses}, found: {self._instructor_courses}")
+
+        self._verify_attribute_indexes()
+        self._verify_course_bitmaps()
+        self.verify_course_stats()
+
+    def find_course_enrollments_by_grade(self, course_id: str, grade: Grade) -> Dict[str, Enrollment]:
+        """
+        Retrieves the enrollments of a course with a given grade.
+
+        The store keeps no grade index: the grade column of the course's rows is filtered with one
+        vectorized comparison instead, which needs no memory per enrollment.
+
+        Args:
+            course_id (str): The unique identifier of the course.
+            grade (Grade): The grade to look up, such as `Grade.F`.
+
+        Returns:
+            Dict[str, Enrollment]: Student IDs mapped to materialized `Enrollment` instances with that grade.
+
+        Raises:
+            KeyError: If no course with the given ID exists in the system.
+        """
+
+        course = self.find_course(course_id=course_id)
+
+        if course is None:
+            raise KeyError(
+                f"Course with ID {course_id} does not exist in this management system.")
+
+        store = self._store
+        rows = np.frombuffer(store.course_rows[course._ordinal], dtype=np.uint32)
+
+        # Removed rows carry the REMOVED grade code and never match
+        matched = rows[np.frombuffer(store.grades, dtype=np.uint8)[rows] == GRADE_CODES[grade]]
+        student_ids, students = store.student_ids, store.students
+
+        return {student_ids[students[row]]: Enrollment(id_number=student_ids[students[row]], course_id=course_id, grade=grade)
+                for row in matched.tolist()}
+
+    def _course_bitmap_index(self) -> CourseBitmapIndex:
+        """
+        Returns the course bitmap index, building it first if needed from the columns of the store.
+        """
+
+        if self._course_bitmaps is not None:
+            return self._course_bitmaps
+
+        store = self._store
+        bitmaps = CourseBitmapIndex()
+        bitmaps.add_students(self.students)
+
+        # Rosters are read as whole columns, with store ordinals mapped to bitmap ordinals in one step
+        ordinals = bitmaps.intern(store.student_ids)
+        students = np.frombuffer(store.students, dtype=np.uint32)
+        grades = np.frombuffer(store.grades, dtype=np.uint8)
+
+        for course_id, course in self.courses.items():
+            rows = np.frombuffer(store.course_rows[course._ordinal], dtype=np.uint32)
+            rows = rows[grades[rows] != REMOVED]
+            bitmaps.add_ordinals(course_id, ordinals[students[rows]])
+
+        self._course_bitmaps = bitmaps
+
+        return bitmaps
+
+    def _count_course_grades(self, course: Course, new_rows: Optional[int] = None) -> None:
+        """
+        Adds the grades of a course's rows to its aggregates, counted with one pass over the grade column.
+
+        Args:
+            course (Course): The course, attached to the store.
+            new_rows (Optional[int], optional): The number of rows just appended to the course, or None
+                to count every row of a course joining the store.
+        """
+
+        store = self._store
+        rows = np.frombuffer(store.course_rows[course._ordinal], dtype=np.uint32)
+
+        if new_rows is not None:
+            rows = rows[len(rows) - new_rows:]
+
+        counts = np.bincount(np.frombuffer(store.grades, dtype=np.uint8)[rows],
+                             minlength=len(GRADES))
+        stats = self._stats_of(course.course_id)
+
+        # Removed rows carry the REMOVED code, which lies past every grade
+        for grade, count in zip(GRADES, counts.tolist()):
+            if count:
+                stats.add(grade, count)
+
+    def _index_enrollment(self, course: Course, enrollment: Enrollment) -> None:
+        """
+        Records a new enrollment in the grade aggregates and the course bitmaps, the store being the other indexes. Called by `Course.add_student`.
+        """
+
+        self._stats_of(course.course_id).add(enrollment.grade)
+
+        if self._course_bitmaps is not None:
+            self._course_bitmaps.add(course.course_id, (enrollment.id_number,))
+
+    def _index_enrollments(self, course: Course, enrollments: List[Enrollment]) -> None:
+        """
+        Records a batch of new enrollments of one course in the grade aggregates and the course bitmaps. Called by `Course.add_students_many`.
+        """
+
+        # The enrollments were just appended to the course's rows, where their grades are already encoded
+        self._count_course_grades(course, new_rows=len(enrollments))
+
+        if self._course_bitmaps is not None:
+            self._course_bitmaps.add(course.course_id, [enrollment.id_number for enrollment in enrollments])
+
+    def _unindex_enrollment(self, course: Course, enrollment: Enrollment) -> None:
+        """
+        Removes an enrollment from the grade aggregates and the course bitmaps. Called by `Course.remove_student`.
+        """
+
+        self._stats_of(course.course_id).remove(enrollment.grade)
+
+        if self._course_bitmaps is not None:
+            self._course_bitmaps.discard(course.course_id, enrollment.id_number)
+
+    def _assign_grades(self, grades: List[Tuple[str, str, Grade]]) -> List[Grade]:
+        """
+        Writes validated grades straight to the grade column, for `grade_many`.
+
+        Args:
+            grades (List[Tuple[str, str, Grade]]): Triples of (student ID, course ID, grade) of enrolled students.
+
+        Returns:
+            List[Grade]: The grade each row replaced.
+        """
+
+        store = self._store
+        find_row, student_ordinals, codes = store.find_row, store.student_ordinals, store.grades
+        courses = self.courses
+        previous_grades: List[Grade] = []
+
+        # Course ID -> the grades moved from and to in the course, applied to its aggregates at once
+        moves: Dict[str, Tuple[List[Grade], List[Grade]]] = {}
+
+        for id_number, course_id, grade in grades:
+            row = find_row(student_ordinals[id_number], courses[course_id]._ordinal)
+            previous_grade = GRADES[codes[row]]
+            codes[row] = GRADE_CODES[grade]
+            previous_grades.append(previous_grade)
+
+            move = moves.get(course_id)
+
+            if move is None:
+                move = moves[course_id] = ([], [])
+
+            move[0].append(previous_grade)
+            move[1].append(grade)
+
+        for course_id, (old_grades, new_grades) in moves.items():
+            self._stats_of(course_id).regrade_many(old_grades, new_grades)
+
+        return previous_grades
+
+    def _regrade_enrollment(self, course: Course, old_grade: Grade, grade: Grade) -> None:
+        """
+        Moves a regraded enrollment in the grade aggregates. Called by `Course.update_student`.
+
+        Args:
+            course (Course): The course of the enrollment.
+            old_grade (Grade): The grade stored before.
+            grade (Grade): The grade stored now.
+        """
+
+        self._stats_of(course.course_id).regrade(old_grade, grade)
+
+    @classmethod
+    def load_snapshot(cls, path: str) -> "StudentManagementSystem":
+        """
+        Loads a system saved with `save_snapshot`, by any backend, filling the enrollment store directly from the snapshot arrays.
+
+        Args:
+            path (str): The snapshot file to read.
+
+        Returns:
+            StudentManagementSystem: The restored system with all of its indexes built.
+
+        Raises:
+            ValueError: If the file is not a snapshot or was written by an unsupported version.
+        """
+
+        return load_system(read_snapshot(path), backend="columnar")
+
+    def _bind_course(self, course: Course) -> None:
+        """
+        Registers a course with the system, moving its enrollments into the store, and indexes its instructors.
+
+        Args:
+            course (Course): The `Course` instance being added to the system.
+        """
+
+        course._system = self
+        course._attach(self._store)
+        self._count_course_grades(course)
+
+        if self._course_bitmaps is not None:
+            self._course_bitmaps.add(course.course_id, course.enrolled_students)
+
+        for instructor in course.instructors.values():
+            self._index_instructor(course=course, instructor=instructor)
+
+    def _unbind_course(self, course: Course) -> None:
+        """
+        Moves a course's enrollments out of the store, drops its instructors from the index and detaches it from the system.
+
+        Args:
+            course (Course): The `Course` instance leaving the system.
+        """
+
+        course._detach()
+        self._course_stats.pop(course.course_id, None)
+
+        if self._course_bitmaps is not None:
+            self._course_bitmaps.drop(course.course_id)
+
+        for instructor in course.instructors.values():
+            self._unindex_instructor(course=course, instructor=instructor)
+
+        course._system = None
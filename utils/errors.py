@@ -0,0 +1,54 @@
+from typing import List, Tuple
+
+
+class BulkOperationError(ValueError):
+    """
+    Raised when a bulk operation on the StudentManagementSystem is rejected.
+
+    The whole batch is validated before anything is applied, so when this error is raised
+    the system is left exactly as it was before the call.
+
+    Attributes:
+        operation (str): The name of the bulk operation that was rejected.
+        errors (List[Tuple[int, str]]): The position of every rejected row in the batch paired with the reason it was rejected.
+    """
+
+    def __init__(self, operation: str, errors: List[Tuple[int, str]]) -> None:
+        """
+        Initializes a BulkOperationError instance.
+
+        Args:
+            operation (str): The name of the bulk operation that was rejected.
+            errors (List[Tuple[int, str]]): The rejected rows as (row index, error message) pairs.
+        """
+
+        self.operation = operation
+        self.errors = errors
+
+        details = "\n".join(f"Row {row}: {error}" for row, error in errors)
+        super().__init__(
+            f"{operation} rejected {len(errors)} row(s), nothing was applied:\n{details}")
+
+    def __reduce__(self) -> Tuple[type, Tuple[str, List[Tuple[int, str]]]]:
+        # Rebuilt from the constructor arguments when pickled, such as when raised in a worker process
+        return type(self), (self.operation, self.errors)
+
+
+class SubscriptionOverflowError(RuntimeError):
+    """
+    Raised to the consumer of an event subscription disconnected because its buffer overflowed.
+
+    Events published after the overflow were never delivered, so the consumer has to rebuild its
+    view from the system and subscribe again.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """
+        Initializes a SubscriptionOverflowError instance.
+
+        Args:
+            maxsize (int): The size of the buffer that overflowed.
+        """
+
+        super().__init__(
+            f"The subscription fell more than {maxsize} event(s) behind and was disconnected.")
@@ -0,0 +1,493 @@
+"""
+Typed change events of a StudentManagementSystem and the bus delivering them to subscribers.
+
+Every successful mutating call of a system (`add_*`, `update_*`, `remove_*`, `enroll_*` and
+`grade_student`) publishes the events of the change, as one batch, once the change is applied. So
+does every enrollment and instructor change made directly on a registered `Course`, such as
+`Course.remove_student` or `Course.add_instructor`.
+Subscribers either register a callback, called in the writing thread, or read batches from an
+`AsyncSubscription` in an asyncio event loop:
+
+    with sms.subscribe(on_change, types=[EnrollmentGraded]):
+        sms.grade_student(id_number, course_id, Grade.A)
+
+    async with sms.subscribe_async(batch_size=500) as subscription:
+        async for events in subscription:
+            view.apply(events)
+
+A system has no bus until the first subscription and drops it when the last one closes, so
+changes made without subscribers cost a single `None` check.
+"""
+import asyncio
+import logging
+import threading
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from utils.enums.grade import Grade
+from utils.errors import SubscriptionOverflowError
+
+
+logger = logging.getLogger(__name__)
+
+
+class StudentAdded(NamedTuple):
+    student: Any
+
+
+class StudentUpdated(NamedTuple):
+    student: Any
+    previous: Any
+
+
+class StudentRemoved(NamedTuple):
+    """
+    A removed student, with the IDs of the courses the student was unenrolled from and the grade held in each.
+    """
+
+    student: Any
+    course_ids: Tuple[str, ...]
+    grades: Tuple[Grade, ...]
+
+
+class InstructorAdded(NamedTuple):
+    instructor: Any
+
+
+class InstructorUpdated(NamedTuple):
+    instructor: Any
+    previous: Any
+
+
+class InstructorRemoved(NamedTuple):
+    """
+    A removed instructor, with the IDs of the courses the instructor was removed from.
+    """
+
+    instructor: Any
+    course_ids: Tuple[str, ...]
+
+
+class CourseAdded(NamedTuple):
+    course: Any
+
+
+class CourseReplaced(NamedTuple):
+    """
+    A course replaced by a different instance through `update_course`.
+    """
+
+    course: Any
+    previous: Any
+
+
+class CourseRemoved(NamedTuple):
+    course: Any
+
+
+class StudentEnrolled(NamedTuple):
+    id_number: str
+    course_id: str
+
+
+class EnrollmentGraded(NamedTuple):
+    id_number: str
+    course_id: str
+    grade: Grade
+    previous_grade: Grade
+
+
+class StudentUnenrolled(NamedTuple):
+    """
+    A student removed from a course with `Course.remove_student`, with the grade held in it.
+    """
+
+    id_number: str
+    course_id: str
+    grade: Grade
+
+
+class InstructorAssigned(NamedTuple):
+    """
+    An instructor added to a course with `Course.add_instructor`.
+    """
+
+    instructor: Any
+    course_id: str
+
+
+class InstructorUnassigned(NamedTuple):
+    """
+    An instructor removed from a course with `Course.remove_instructor`.
+    """
+
+    instructor: Any
+    course_id: str
+
+
+ChangeEvent = Union[StudentAdded, StudentUpdated, StudentRemoved,
+                    InstructorAdded, InstructorUpdated, InstructorRemoved,
+                    CourseAdded, CourseReplaced, CourseRemoved,
+                    StudentEnrolled, EnrollmentGraded, StudentUnenrolled,
+                    InstructorAssigned, InstructorUnassigned]
+
+
+class OverflowPolicy(Enum):
+    """
+    What an `AsyncSubscription` does when a batch arrives and its buffer is full.
+
+    BLOCK: the writer waits until the consumer makes room. Writers on the thread of the subscription's
+        event loop can not wait for it, so the buffer grows past its size for them instead.
+    DROP_OLDEST: the oldest buffered events are discarded and counted in `dropped`.
+    DISCONNECT: the subscription is closed. The consumer reads the events buffered so far and then
+        gets a `SubscriptionOverflowError`, after which it should rebuild its view and subscribe again.
+    """
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DISCONNECT = "disconnect"
+
+
+class _Subscription:
+    """
+    Base of the subscriptions of an `EventBus`, closing itself as a context manager.
+    """
+
+    def __init__(self, bus: "EventBus", types: Optional[Iterable[type]]) -> None:
+        self._bus = bus
+        self._types: Optional[FrozenSet[type]] = frozenset(
+            types) if types is not None else None
+
+    def _select(self, events: List[ChangeEvent]) -> List[ChangeEvent]:
+        """
+        Returns the events of a batch of the subscribed types.
+        """
+
+        types = self._types
+
+        if types is None:
+            return events
+
+        return [event for event in events if type(event) in types]
+
+    def close(self) -> None:
+        """
+        Stops the delivery of events to this subscription.
+        """
+
+        self._bus._remove(self)
+
+    def __enter__(self) -> "_Subscription":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class Subscription(_Subscription):
+    """
+    A callback called in the writing thread with the events of every change.
+
+    The callback runs after the change is applied, while the system still holds the locks of the
+    change on the thread-safe backend, so it should be quick and must not change the system.
+    Exceptions raised by the callback are logged and do not reach the writer.
+    """
+
+    def __init__(self, bus: "EventBus", callback: Callable[[Any], None], types: Optional[Iterable[type]],
+                 batched: bool) -> None:
+        """
+        Initializes a Subscription instance.
+
+        Args:
+            bus (EventBus): The bus delivering the events.
+            callback (Callable[[Any], None]): Called with every event, or with the list of events of
+                each change when `batched` is set.
+            types (Optional[Iterable[type]]): The event types to deliver, None for all.
+            batched (bool): Whether the callback takes whole batches.
+        """
+
+        super().__init__(bus, types)
+        self._callback = callback
+        self._batched = batched
+
+    def _deliver(self, events: List[ChangeEvent]) -> None:
+        events = self._select(events)
+
+        if not events:
+            return
+
+        try:
+            if self._batched:
+                self._callback(events)
+            else:
+                for event in events:
+                    self._callback(event)
+        except Exception:
+            logger.exception("Event subscriber %r failed", self._callback)
+
+
+class AsyncSubscription(_Subscription):
+    """
+    A bounded buffer of events read in batches by a coroutine.
+
+    Writers may run on any thread. Events are buffered as they are published and handed to the
+    consumer in batches of up to `batch_size`, so a consumer that falls behind catches up on larger
+    batches. A full buffer applies the subscription's `OverflowPolicy`.
+
+    Attributes:
+        dropped (int): The number of events discarded by the DROP_OLDEST policy.
+    """
+
+    def __init__(self, bus: "EventBus", types: Optional[Iterable[type]], maxsize: int, batch_size: int,
+                 overflow: OverflowPolicy, linger: float, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """
+        Initializes an AsyncSubscription instance.
+
+        Args:
+            bus (EventBus): The bus delivering the events.
+            types (Optional[Iterable[type]]): The event types to deliver, None for all.
+            maxsize (int): The number of events buffered before the overflow policy applies.
+            batch_size (int): The most events handed to the consumer at once.
+            overflow (OverflowPolicy): What to do when the buffer is full.
+            linger (float): Seconds a reader woken by new events waits for more before taking a batch.
+                Longer waits mean fewer, larger batches and fewer wake-ups paid by the writers.
+            loop (Optional[asyncio.AbstractEventLoop]): The event loop of the consumer. Defaults to the
+                running loop.
+
+        Raises:
+            ValueError: If `maxsize` or `batch_size` is not positive, or `linger` is negative.
+            RuntimeError: If no loop is given and none is running.
+        """
+
+        if maxsize < 1 or batch_size < 1:
+            raise ValueError(
+                f"maxsize and batch_size must be positive, got {maxsize} and {batch_size}.")
+
+        if linger < 0:
+            raise ValueError(f"linger can not be negative, got {linger}.")
+
+        super().__init__(bus, types)
+        self._maxsize = maxsize
+        self._batch_size = batch_size
+        self._overflow = overflow
+        self._linger = linger
+        self._buffer: Deque[ChangeEvent] = deque()
+        self._condition = threading.Condition()
+        self._waiter: Optional[asyncio.Future] = None
+        self._closed = False
+        self._overflowed = False
+        self.dropped = 0
+
+        if loop is None:
+            loop = asyncio.get_running_loop()
+            self._loop_thread: Optional[int] = threading.get_ident()
+        else:
+            # Learned from the first read, which runs in the loop
+            self._loop_thread = None
+
+        self._loop = loop
+
+    def _deliver(self, events: List[ChangeEvent]) -> None:
+        events = self._select(events)
+
+        if not events:
+            return
+
+        buffer, maxsize = self._buffer, self._maxsize
+
+        with self._condition:
+            if self._closed:
+                return
+
+            if len(buffer) + len(events) <= maxsize:
+                buffer.extend(events)
+            elif self._overflow is OverflowPolicy.DROP_OLDEST:
+                buffer.extend(events)
+                excess = len(buffer) - maxsize
+                self.dropped += excess
+
+                for _ in range(excess):
+                    buffer.popleft()
+            elif self._overflow is OverflowPolicy.DISCONNECT:
+                self._overflowed = True
+                self._close()
+            elif threading.get_ident() == self._loop_thread:
+                buffer.extend(events)
+            else:
+                # Block, letting in as many events as there is room for each time the consumer reads
+                position = 0
+
+                while position < len(events) and not self._closed:
+                    room = maxsize - len(buffer)
+
+                    if room <= 0:
+                        self._wake()
+                        self._condition.wait()
+                        continue
+
+                    buffer.extend(events[position:position + room])
+                    position += room
+
+            self._wake()
+
+    def _wake(self) -> None:
+        """
+        Resolves the future the consumer is waiting on, if any. Called with the condition held.
+        """
+
+        waiter, self._waiter = self._waiter, None
+
+        if waiter is not None:
+            try:
+                self._loop.call_soon_threadsafe(_resolve, waiter)
+            except RuntimeError:
+                # The loop is closed, nobody is left to read
+                self._close()
+
+    def _close(self) -> None:
+        """
+        Marks the subscription closed and releases waiting writers. Called with the condition held.
+        """
+
+        if not self._closed:
+            self._closed = True
+            self._condition.notify_all()
+            self._bus._remove(self)
+
+    async def get(self) -> List[ChangeEvent]:
+        """
+        Waits for and returns the next batch of events, oldest first.
+
+        Returns:
+            List[ChangeEvent]: Between one and `batch_size` events.
+
+        Raises:
+            SubscriptionOverflowError: If the subscription was disconnected by the DISCONNECT policy
+                and every event buffered before was read.
+            EOFError: If the subscription is closed and every buffered event was read.
+        """
+
+        if self._loop_thread is None:
+            self._loop_thread = threading.get_ident()
+
+        buffer = self._buffer
+
+        while True:
+            with self._condition:
+                if buffer:
+                    batch = [buffer.popleft()
+                             for _ in range(min(len(buffer), self._batch_size))]
+                    self._condition.notify_all()
+
+                    return batch
+
+                if self._overflowed:
+                    raise SubscriptionOverflowError(self._maxsize)
+
+                if self._closed:
+                    raise EOFError("The subscription is closed.")
+
+                waiter = self._waiter = self._loop.create_future()
+
+            await waiter
+
+            if self._linger and len(buffer) < self._batch_size:
+                await asyncio.sleep(self._linger)
+
+    def close(self) -> None:
+        """
+        Stops the delivery of events. Events already buffered can still be read.
+        """
+
+        with self._condition:
+            self._close()
+            self._wake()
+
+    def __aiter__(self) -> "AsyncSubscription":
+        return self
+
+    async def __anext__(self) -> List[ChangeEvent]:
+        try:
+            return await self.get()
+        except EOFError:
+            raise StopAsyncIteration from None
+
+    async def __aenter__(self) -> "AsyncSubscription":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class EventBus:
+    """
+    Delivers the change events of a system to its subscriptions.
+
+    Subscriptions are kept in a tuple replaced on every change, so publishing reads it without a lock.
+    """
+
+    def __init__(self, on_idle: Optional[Callable[["EventBus"], None]] = None) -> None:
+        """
+        Initializes an EventBus instance.
+
+        Args:
+            on_idle (Optional[Callable[[EventBus], None]], optional): Called with the bus when its last
+                subscription closes.
+        """
+
+        self._subscriptions: Tuple[_Subscription, ...] = ()
+        self._lock = threading.Lock()
+        self._on_idle = on_idle
+
+    def subscribe(self, callback: Callable[[Any], None], types: Optional[Iterable[type]] = None,
+                  batched: bool = False) -> Subscription:
+        """
+        Registers a callback called in the writing thread, see `Subscription`.
+        """
+
+        return self._add(Subscription(self, callback, types, batched))
+
+    def subscribe_async(self, types: Optional[Iterable[type]] = None, maxsize: int = 10_000,
+                        batch_size: int = 1_000, overflow: OverflowPolicy = OverflowPolicy.BLOCK, linger: float = 0.0,
+                        loop: Optional[asyncio.AbstractEventLoop] = None) -> AsyncSubscription:
+        """
+        Opens a buffer of events read by a coroutine, see `AsyncSubscription`.
+        """
+
+        return self._add(AsyncSubscription(self, types, maxsize, batch_size, overflow, linger, loop))
+
+    def publish(self, events: List[ChangeEvent]) -> None:
+        """
+        Delivers the events of one change to every subscription.
+
+        Args:
+            events (List[ChangeEvent]): The events of the change, in order.
+        """
+
+        for subscription in self._subscriptions:
+            subscription._deliver(events)
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def _add(self, subscription: _Subscription) -> Any:
+        with self._lock:
+            self._subscriptions += (subscription,)
+
+        return subscription
+
+    def _remove(self, subscription: _Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions
+            self._subscriptions = tuple(
+                other for other in subscriptions if other is not subscription)
+            idle = subscriptions and not self._subscriptions
+
+        if idle and self._on_idle is not None:
+            self._on_idle(self)
@@ -0,0 +1,383 @@
+"""
+Deterministic synthetic data for a whole institution: students, instructors, courses and enrollments.
+
+The same seed always produces the same data. Course popularity follows a Zipf distribution, so a few
+courses take most of the enrollments, and grades follow `GRADE_WEIGHTS`. Every `Major`, `Department`
+and `CourseNameId` is used.
+
+Data is produced in chunks of students together with their enrollments, so it can be streamed into a
+StudentManagementSystem with `populate`, or into a database, without holding it all twice.
+
+Example:
+    >>> generator = InstitutionGenerator(students=250_000, seed=42)
+    >>> sms = StudentManagementSystem()
+    >>> populate(sms, generator)
+"""
+import gc
+import importlib
+import math
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from utils.enums.course_name_id import CourseNameId
+from utils.enums.department import Department
+from utils.enums.grade import Grade
+from utils.enums.major import Major
+
+
+# Share of enrollments per grade, roughly the spread of a large university with some courses still running
+GRADE_WEIGHTS: Dict[Grade, float] = {
+    Grade.A_PLUS: 2,
+    Grade.A: 15,
+    Grade.A_MINUS: 11,
+    Grade.B_PLUS: 10,
+    Grade.B: 12,
+    Grade.B_MINUS: 8,
+    Grade.C_PLUS: 6,
+    Grade.C: 7,
+    Grade.C_MINUS: 3,
+    Grade.D_PLUS: 2,
+    Grade.D: 2,
+    Grade.D_MINUS: 1,
+    Grade.F: 4,
+    Grade.PASS: 5,
+    Grade.FAIL: 1,
+    Grade.NO_GRADE: 11,
+}
+
+FIRST_NAMES = ("Ada", "Alan", "Amara", "Bola", "Chen", "Chidi", "Diego", "Elena", "Emeka", "Fatima",
+               "Grace", "Guido", "Hana", "Ibrahim", "Ines", "Jamal", "Jin", "Kemi", "Lars", "Leila",
+               "Linus", "Maria", "Mateo", "Mei", "Nia", "Olga", "Omar", "Priya", "Ravi", "Rosa",
+               "Sade", "Sofia", "Tariq", "Tomas", "Uche", "Vera", "Wei", "Yara", "Yusuf", "Zara")
+
+LAST_NAMES = ("Abara", "Adeyemi", "Alvarez", "Andersen", "Bello", "Chen", "Costa", "Dubois", "Eze",
+              "Fischer", "Garcia", "Gupta", "Hansen", "Hoffmann", "Ivanova", "Kim", "Kowalski",
+              "Lopez", "Martin", "Mensah", "Müller", "Nakamura", "Nguyen", "Novak", "Okafor",
+              "Okundaye", "Olsen", "Patel", "Rossi", "Rossum", "Santos", "Schmidt", "Silva",
+              "Singh", "Smith", "Tanaka", "Torres", "Wang", "Yilmaz", "Zhou")
+
+# Random streams, combined with the seed so each kind of data is drawn independently
+_COURSES, _INSTRUCTORS, _STUDENTS = 0, 1, 2
+
+# Students drawn from one stream, chunk sizes are rounded up to a multiple of it
+BLOCK_SIZE = 10_000
+
+
+class Instructors:
+    """
+    The instructors of an institution, as columns.
+
+    Attributes:
+        id_numbers (List[str]): The ID of every instructor.
+        first_names (List[str]): The first name of every instructor.
+        last_names (List[str]): The last name of every instructor.
+        departments (List[Department]): The department of every instructor.
+        course_ids (List[str]): The ID of the course every instructor teaches.
+    """
+
+    __slots__ = ("id_numbers", "first_names",
+                 "last_names", "departments", "course_ids")
+
+    def __len__(self) -> int:
+        return len(self.id_numbers)
+
+
+class Chunk:
+    """
+    A chunk of students and their enrollments, as columns.
+
+    Attributes:
+        id_numbers (List[str]): The ID of every student.
+        first_names (List[str]): The first name of every student.
+        last_names (List[str]): The last name of every student.
+        majors (List[Major]): The major of every student.
+        enrollments (Dict[str, Tuple[List[str], List[Grade]]]): Course ID -> the IDs of the students of the chunk enrolled in the course, and their grades.
+    """
+
+    __slots__ = ("id_numbers", "first_names",
+                 "last_names", "majors", "enrollments")
+
+    def __len__(self) -> int:
+        return len(self.id_numbers)
+
+    @property
+    def enrollment_count(self) -> int:
+        """
+        The number of enrollments of the chunk.
+        """
+
+        return sum(len(id_numbers) for id_numbers, _ in self.enrollments.values())
+
+
+class InstitutionGenerator:
+    """
+    Generates the students, instructors, courses and enrollments of an institution from a seed.
+
+    Every kind of data is drawn from its own random stream, so changing the number of instructors
+    does not change the students, and students are drawn in blocks of `BLOCK_SIZE` with a stream each,
+    so the data is the same whatever the chunk size.
+
+    Attributes:
+        students (int): The number of students.
+        instructors (int): The number of instructors, each teaching one course.
+        courses_per_student (float): The average number of courses a student is enrolled in.
+        seed (int): The seed all data is derived from.
+        course_ids (List[str]): The IDs of every course, most popular first.
+        course_weights (List[float]): The relative popularity of each course in `course_ids`.
+    """
+
+    def __init__(self, students: int, seed: int = 0, instructors: Optional[int] = None,
+                 courses_per_student: float = 4.0, zipf_exponent: float = 1.0) -> None:
+        """
+        Initializes an InstitutionGenerator.
+
+        Args:
+            students (int): The number of students.
+            seed (int, optional): The seed all data is derived from. Defaults to 0.
+            instructors (Optional[int], optional): The number of instructors. Defaults to one per 40 students, and at least one per course.
+            courses_per_student (float, optional): The average number of courses a student is enrolled in. Defaults to 4.
+            zipf_exponent (float, optional): The skew of course popularity, 0 for uniform. Defaults to 1.
+
+        Raises:
+            ValueError: If `courses_per_student` is not between 1 and the number of courses.
+        """
+
+        course_name_ids = list(CourseNameId)
+
+        if not 1 <= courses_per_student <= len(course_name_ids):
+            raise ValueError(
+                f"courses_per_student must be between 1 and {len(course_name_ids)}, not {courses_per_student}.")
+
+        self.students = students
+        self.instructors = instructors if instructors is not None else max(
+            students // 40, len(course_name_ids))
+        self.courses_per_student = courses_per_student
+        self.seed = seed
+
+        # Which course is the most popular is part of the seeded data too
+        order = self._rng(_COURSES).permutation(len(course_name_ids))
+        self.course_ids = [course_name_ids[index].course_id for index in order]
+        self.course_weights = [1 / rank ** zipf_exponent
+                               for rank in range(1, len(course_name_ids) + 1)]
+
+    def _rng(self, *stream: int) -> np.random.Generator:
+        """
+        Returns a fresh random generator for one kind of data.
+        """
+
+        return np.random.default_rng([self.seed, *stream])
+
+    def instructor_records(self) -> Instructors:
+        """
+        Returns every instructor. The first ones cover every course once, the others are spread over the courses by popularity.
+
+        Returns:
+            Instructors: The instructors.
+        """
+
+        rng = self._rng(_INSTRUCTORS)
+        count = self.instructors
+        weights = np.array(self.course_weights)
+        courses = np.concatenate([np.arange(len(self.course_ids)), rng.choice(
+            len(self.course_ids), size=max(count - len(self.course_ids), 0), p=weights / weights.sum())])[:count]
+
+        instructors = Instructors()
+        instructors.id_numbers = [f"INS-{i:08d}" for i in range(count)]
+        instructors.first_names = _pick(FIRST_NAMES, rng, count)
+        instructors.last_names = _pick(LAST_NAMES, rng, count)
+        instructors.departments = _pick(list(Department), rng, count)
+        instructors.course_ids = [self.course_ids[index]
+                                  for index in courses.tolist()]
+
+        return instructors
+
+    def chunks(self, size: int = 100_000) -> Iterator[Chunk]:
+        """
+        Yields the students in chunks, each with the enrollments of its students.
+
+        Args:
+            size (int, optional): The number of students per chunk, rounded up to a multiple of `BLOCK_SIZE`. Defaults to 100,000.
+
+        Yields:
+            Chunk: The next students and their enrollments.
+        """
+
+        courses = len(self.course_ids)
+        majors, grades = list(Major), list(GRADE_WEIGHTS)
+        grade_p = np.array(list(GRADE_WEIGHTS.values()), dtype=np.float64)
+        grade_p /= grade_p.sum()
+        log_weights = np.log(self.course_weights)
+
+        # Courses per student: 1 plus a Poisson count, capped at the number of courses
+        mean = self.courses_per_student - 1
+        count_p = np.array([math.exp(-mean) * mean ** k / math.factorial(k)
+                            for k in range(courses)])
+        count_p /= count_p.sum()
+
+        # Chunks are made of whole blocks, each drawn from its own stream, so the data does not depend on the chunk size
+        size = max(size // BLOCK_SIZE, 1) * BLOCK_SIZE
+
+        for start in range(0, self.students, size):
+            stop = min(start + size, self.students)
+            names, counts, draws = [], [], []
+
+            for block_start in range(start, stop, BLOCK_SIZE):
+                rng = self._rng(_STUDENTS, block_start // BLOCK_SIZE)
+                count = min(block_start + BLOCK_SIZE, stop) - block_start
+                names.append(rng.integers(
+                    (len(FIRST_NAMES), len(LAST_NAMES), len(majors)), size=(count, 3)))
+
+                # Weighted sampling without replacement for every student at once: the `n` courses with the
+                # largest log weight plus Gumbel noise are a weighted draw of `n` distinct courses
+                block_counts = rng.choice(courses, size=count, p=count_p) + 1
+                block_keys = log_weights + rng.gumbel(size=(count, courses))
+                picked = np.argsort(-block_keys, axis=1)[np.arange(courses) < block_counts[:, None]]
+                counts.append(block_counts)
+                draws.append((picked, rng.choice(len(grades), size=len(picked), p=grade_p)))
+
+            chunk = Chunk()
+            chunk.id_numbers = [f"STU-{i:08d}" for i in range(start, stop)]
+            first_names, last_names, major_codes = np.concatenate(names).T.tolist()
+            chunk.first_names = [FIRST_NAMES[code] for code in first_names]
+            chunk.last_names = [LAST_NAMES[code] for code in last_names]
+            chunk.majors = [majors[code] for code in major_codes]
+
+            counts = np.concatenate(counts)
+            students = np.repeat(np.arange(stop - start), counts)
+            picked = np.concatenate([block_picked for block_picked, _ in draws])
+            enrollment_grades = np.concatenate([block_grades for _, block_grades in draws])
+
+            # Group the enrollments by course
+            order = np.argsort(picked, kind="stable")
+            bounds = np.concatenate(
+                [[0], np.cumsum(np.bincount(picked, minlength=courses))]).tolist()
+            students, enrollment_grades = students[order].tolist(), enrollment_grades[order].tolist()
+            id_numbers = chunk.id_numbers
+
+            chunk.enrollments = {
+                self.course_ids[course]: ([id_numbers[student] for student in students[bounds[course]:bounds[course + 1]]],
+                                          [grades[grade] for grade in enrollment_grades[bounds[course]:bounds[course + 1]]])
+                for course in range(courses) if bounds[course] != bounds[course + 1]}
+
+            yield chunk
+
+
+def _pick(values: List[Any], rng: np.random.Generator, count: int) -> List[Any]:
+    """
+    Draws `count` values uniformly with replacement.
+    """
+
+    return [values[index] for index in rng.integers(len(values), size=count).tolist()]
+
+
+def populate(sms: Any, generator: InstitutionGenerator, chunk_size: int = 100_000) -> None:
+    """
+    Streams the data of a generator into a StudentManagementSystem of any backend through its bulk APIs.
+
+    Courses are added first with their instructors, then each chunk of students is added together with
+    its enrollments, grades included. Enrollments are added through `Course.add_students_many`, which a
+    journal records with one more record per graded enrollment: take a checkpoint after populating a
+    journaled system.
+
+    Args:
+        sms (StudentManagementSystem): The system to fill. It must not hold any of the generated IDs or courses yet.
+        generator (InstitutionGenerator): The data to add.
+        chunk_size (int, optional): The number of students added at a time. Defaults to 100,000.
+    """
+
+    # Every object added stays alive, so collections triggered by the allocations would only rescan the growing heap
+    enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        _populate(sms, generator, chunk_size)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _populate(sms: Any, generator: InstitutionGenerator, chunk_size: int) -> None:
+    """
+    Fills the system for `populate`.
+    """
+
+    populate_courses(sms, generator)
+
+    for chunk in generator.chunks(chunk_size):
+        populate_chunk(sms, chunk)
+
+
+def populate_courses(sms: Any, generator: InstitutionGenerator) -> None:
+    """
+    Adds the instructors and the courses of a generator to a StudentManagementSystem, the first step of `populate`.
+
+    Args:
+        sms (StudentManagementSystem): The system to fill.
+        generator (InstitutionGenerator): The data to add.
+    """
+
+    module = importlib.import_module(type(sms).__module__)
+    Instructor, Course = module.Instructor, module.Course
+
+    # Pydantic models are built through their trusted path, the generated data needs no validation
+    trusted = hasattr(module.Enrollment, "from_trusted_many")
+
+    instructors = generator.instructor_records()
+
+    if trusted:
+        people = Instructor.from_trusted_many(instructors.first_names, instructors.last_names,
+                                              instructors.id_numbers, department=instructors.departments)
+    else:
+        people = [Instructor(first_name=first_name, last_name=last_name, department=department, id_number=id_number)
+                  for id_number, first_name, last_name, department in zip(instructors.id_numbers, instructors.first_names,
+                                                                           instructors.last_names, instructors.departments)]
+
+    sms.add_instructors_many(people)
+
+    course_name_ids = {
+        course_name_id.course_id: course_name_id for course_name_id in CourseNameId}
+    course_instructors: Dict[str, Dict[str, Any]] = {
+        course_id: {} for course_id in generator.course_ids}
+
+    for course_id, instructor in zip(instructors.course_ids, people):
+        course_instructors[course_id][instructor.id_number] = instructor
+
+    sms.add_courses_many((Course.from_trusted(course_name_ids[course_id], instructors=course_instructors[course_id]) if trusted
+                          else Course(course_name_id=course_name_ids[course_id], instructors=course_instructors[course_id]))
+                         for course_id in generator.course_ids)
+
+
+def populate_chunk(sms: Any, chunk: Chunk) -> None:
+    """
+    Adds a chunk of students to a StudentManagementSystem together with their enrollments, grades included.
+
+    The courses of the enrollments must already be in the system, see `populate_courses`.
+
+    Args:
+        sms (StudentManagementSystem): The system to fill.
+        chunk (Chunk): The students and their enrollments.
+    """
+
+    module = importlib.import_module(type(sms).__module__)
+    Student, Enrollment = module.Student, module.Enrollment
+    trusted = hasattr(Enrollment, "from_trusted_many")
+    courses = sms.courses
+
+    if trusted:
+        sms.add_students_many(Student.from_trusted_many(
+            chunk.first_names, chunk.last_names, chunk.id_numbers, major=chunk.majors))
+    else:
+        sms.add_students_many(Student(first_name=first_name, last_name=last_name, major=major, id_number=id_number)
+                              for id_number, first_name, last_name, major in zip(chunk.id_numbers, chunk.first_names,
+                                                                                 chunk.last_names, chunk.majors))
+
+    for course_id, (id_numbers, grades) in chunk.enrollments.items():
+        if trusted:
+            enrollments = Enrollment.from_trusted_many(
+                id_numbers, course_id, grades)
+        else:
+            enrollments = [Enrollment(id_number=id_number, course_id=course_id, grade=grade)
+                           for id_number, grade in zip(id_numbers, grades)]
+
+        courses[course_id].add_students_many(enrollments=enrollments)
@@ -0,0 +1,255 @@
+"""
+Time-ordered, compact and collision-free identifiers.
+
+Every ID is 128 bits: a 48-bit Unix timestamp in milliseconds followed by an 80-bit sequence, written
+as 26 characters of Crockford's base32, so IDs sort lexically in creation order. The sequence starts
+at a random 79-bit value each millisecond, its top bit clear so that at least 2**79 further IDs fit in
+the millisecond, and is incremented for every further ID in that millisecond. One generator never
+hands out the same ID twice, and the 79 random bits keep IDs from different processes apart. This is the layout of a ULID (https://github.com/ulid/spec).
+
+Example:
+    >>> new_id("STU")
+    'STU-01J9Z3K4XQ8N2M6V0T5R7W1YAB'
+"""
+import os
+import threading
+import time
+import weakref
+from typing import Callable, List, Optional
+
+
+# Crockford's base32 alphabet, which skips I, L, O and U
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+# Number of characters of an ID, without its prefix
+LENGTH = 26
+
+TIMESTAMP_BITS = 48
+SEQUENCE_BITS = 80
+SEQUENCE_MAX = (1 << SEQUENCE_BITS) - 1
+
+# Random bits of the first sequence of a millisecond, the top bit of the sequence left for counting up
+RANDOM_BITS = SEQUENCE_BITS - 1
+
+# Lookup of every pair of base32 digits, so an ID is encoded in 13 steps instead of 26
+_PAIRS = [a + b for a in ALPHABET for b in ALPHABET]
+
+# Every live generator, so a forked child can reset them all
+_generators: "weakref.WeakSet[IdGenerator]" = weakref.WeakSet()
+
+
+def _random_sequence() -> int:
+    return int.from_bytes(os.urandom(SEQUENCE_BITS // 8), "big") >> (SEQUENCE_BITS - RANDOM_BITS)
+
+
+def _encode(value: int) -> str:
+    """
+    Encodes a 128-bit integer as 26 base32 characters, most significant first.
+    """
+
+    pairs = _PAIRS
+    digits = [""] * 13
+
+    for position in range(12, -1, -1):
+        digits[position] = pairs[value & 0x3FF]
+        value >>= 10
+
+    # The 26 characters hold 130 bits, the two highest are always 0
+    return "".join(digits)
+
+
+def timestamp_of(id: str) -> float:
+    """
+    Returns when an ID was generated.
+
+    Args:
+        id (str): An ID returned by `new_id` or `new_ids`, with or without its prefix.
+
+    Returns:
+        float: The Unix time the ID was generated at, in seconds with millisecond precision.
+
+    Raises:
+        ValueError: If `id` is not a generated ID.
+    """
+
+    encoded = id.rpartition("-")[2]
+
+    if len(encoded) != LENGTH:
+        raise ValueError(f"{id} is not a generated ID.")
+
+    value = 0
+
+    for character in encoded[:10]:
+        digit = ALPHABET.find(character)
+
+        if digit < 0:
+            raise ValueError(f"{id} is not a generated ID.")
+
+        value = value << 5 | digit
+
+    return value / 1000
+
+
+class IdGenerator:
+    """
+    Hands out time-ordered IDs, safe to share between threads.
+
+    Attributes:
+        clock (Callable[[], int]): Returns the current time in milliseconds.
+    """
+
+    def __init__(self, clock: Optional[Callable[[], int]] = None) -> None:
+        """
+        Initializes an IdGenerator.
+
+        Args:
+            clock (Optional[Callable[[], int]], optional): Returns the current time in milliseconds. Defaults to the system clock.
+        """
+
+        self.clock = clock if clock is not None else (
+            lambda: time.time_ns() // 1_000_000)
+        self._lock = threading.Lock()
+        self._timestamp = -1
+        self._sequence = 0
+        _generators.add(self)
+
+    def _reset(self) -> None:
+        """
+        Forgets the last timestamp and sequence, so the next ID starts at a fresh random sequence.
+
+        Runs in a forked child, which would otherwise carry on from the parent's sequence and hand out
+        the very IDs the parent hands out next. The lock is replaced too, in case another thread of
+        the parent held it while forking.
+        """
+
+        self._lock = threading.Lock()
+        self._timestamp = -1
+        self._sequence = 0
+
+    def _allocate(self, count: int) -> int:
+        """
+        Reserves `count` consecutive IDs and returns the first one as an integer.
+
+        The clock is never allowed to go backwards: if it does, or the sequence of the current
+        millisecond is used up, IDs carry on from the last timestamp handed out.
+        """
+
+        with self._lock:
+            timestamp = self.clock()
+
+            if timestamp > self._timestamp:
+                # New millisecond: restart the sequence at a random value, leaving room for the batch
+                sequence = _random_sequence()
+            else:
+                timestamp = self._timestamp
+                sequence = self._sequence + 1
+
+            if sequence + count - 1 > SEQUENCE_MAX:
+                # The millisecond is full, borrow the next one
+                timestamp += 1
+                sequence = _random_sequence()
+
+            if timestamp >> TIMESTAMP_BITS:
+                raise ValueError(
+                    "The clock is past the year 10889 and can not be encoded in an ID.")
+
+            self._timestamp = timestamp
+            self._sequence = sequence + count - 1
+
+        return timestamp << SEQUENCE_BITS | sequence
+
+    def new_id(self, prefix: Optional[str] = None) -> str:
+        """
+        Returns a new ID.
+
+        Args:
+            prefix (Optional[str], optional): Prepended to the ID with a dash, such as "STU". Defaults to no prefix.
+
+        Returns:
+            str: The new ID.
+        """
+
+        encoded = _encode(self._allocate(1))
+
+        return f"{prefix}-{encoded}" if prefix else encoded
+
+    def new_ids(self, count: int, prefix: Optional[str] = None) -> List[str]:
+        """
+        Returns `count` new IDs in one allocation, for bulk loads.
+
+        The IDs are consecutive, so they sort in the order they are returned.
+
+        Args:
+            count (int): The number of IDs.
+            prefix (Optional[str], optional): Prepended to every ID with a dash, such as "STU". Defaults to no prefix.
+
+        Returns:
+            List[str]: The new IDs.
+
+        Raises:
+            ValueError: If `count` is negative.
+        """
+
+        if count < 0:
+            raise ValueError(f"Can not allocate {count} IDs.")
+
+        if count == 0:
+            return []
+
+        value = self._allocate(count)
+        end = value + count
+        head = f"{prefix}-" if prefix else ""
+        pairs = _PAIRS
+        ids: List[str] = []
+
+        # Consecutive IDs only differ in their last 4 characters, the low 20 bits, until those wrap
+        # around, so the first 22 characters are encoded once per block of 2**20 IDs
+        while value < end:
+            block_end = min((value | 0xFFFFF) + 1, end)
+            stem = head + _encode(value)[:22]
+            ids.extend([stem + pairs[low >> 10] + pairs[low & 0x3FF]
+                        for low in range(value & 0xFFFFF, (block_end - 1 & 0xFFFFF) + 1)])
+            value = block_end
+
+        return ids
+
+
+def _reset_after_fork() -> None:
+    for generator in list(_generators):
+        generator._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+# Generator shared by the whole process
+_generator = IdGenerator()
+
+
+def new_id(prefix: Optional[str] = None) -> str:
+    """
+    Returns a new ID from the process-wide generator.
+
+    Args:
+        prefix (Optional[str], optional): Prepended to the ID with a dash, such as "STU". Defaults to no prefix.
+
+    Returns:
+        str: The new ID.
+    """
+
+    return _generator.new_id(prefix)
+
+
+def new_ids(count: int, prefix: Optional[str] = None) -> List[str]:
+    """
+    Returns `count` new consecutive IDs from the process-wide generator, for bulk loads.
+
+    Args:
+        count (int): The number of IDs.
+        prefix (Optional[str], optional): Prepended to every ID with a dash, such as "STU". Defaults to no prefix.
+
+    Returns:
+        List[str]: The new IDs.
+    """
+
+    return _generator.new_ids(count, prefix)
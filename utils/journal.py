@@ -0,0 +1,581 @@
+"""
+Append-only journal of the changes made to a StudentManagementSystem, with replay and checkpoints.
+
+Every successful mutating call of a journaled system (`add_*`, `update_*`, `remove_*`, `enroll_*` and
+`grade_student`) appends one record to the journal file, as do the enrollment and instructor changes
+made directly on its registered courses, such as `Course.add_instructor`. After a crash, `Journal.open` loads the last
+checkpoint and replays the records written since, stopping at the first torn or corrupt record.
+`Journal.checkpoint` folds the journal into a snapshot of the system and starts a new, empty journal.
+
+File layout:
+    header      magic, version, checkpoint generation (u64)
+    records     length (u32), CRC-32 of the body (u32), body
+
+A record body is an opcode byte followed by its fields, each a length and UTF-8 bytes, so any
+string can be journaled and encoding a record never rejects a change that was already applied.
+The length is one byte, or 255 followed by a u32 for fields of 255 bytes or more.
+Enums are stored by member name. Checkpoints are snapshot files named `<journal>.<generation>.checkpoint`, generation 0 meaning
+no checkpoint.
+"""
+import importlib
+import os
+import struct
+import threading
+import time
+import zlib
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from utils.enums.course_name_id import CourseNameId
+from utils.enums.department import Department
+from utils.enums.grade import Grade
+from utils.enums.major import Major
+from utils.snapshot import write_snapshot
+from utils.transactions import Transaction
+
+
+MAGIC = b"SMSJRNL\x00"
+VERSION = 2
+
+_HEADER = struct.Struct("<8sHQ")
+_RECORD = struct.Struct("<II")
+_LONG_FIELD = struct.Struct("<I")
+
+# Length byte announcing a u32 length
+LONG_FIELD = 0xFF
+
+# Opcodes of the journaled operations
+OPCODES: Dict[str, int] = {operation: opcode for opcode, operation in enumerate((
+    "add_students", "update_student", "remove_student",
+    "add_instructors", "update_instructor", "remove_instructor",
+    "add_courses", "update_course", "remove_course",
+    "enroll", "grade",
+    "unenroll", "assign_instructor", "unassign_instructor",
+), start=1)}
+OPERATIONS: Dict[int, str] = {opcode: operation for operation,
+                              opcode in OPCODES.items()}
+
+# Writes buffered by the NEVER policy are handed to the OS once they reach this size
+BUFFER_SIZE = 1 << 16
+
+COURSE_NAME_IDS: Dict[str, CourseNameId] = {
+    course_name_id.course_id: course_name_id for course_name_id in CourseNameId}
+
+
+class FsyncPolicy(Enum):
+    """
+    When the journal forces its records to disk.
+
+    ALWAYS: fsync after every record. Nothing acknowledged is ever lost.
+    INTERVAL: group commit. Records are buffered and written and fsynced together at most every
+        `interval_ms`, losing at most that window of changes.
+    NEVER: records are handed to the OS in large writes and never fsynced. Survives a crash of the
+        process, not of the machine.
+    """
+
+    ALWAYS = "always"
+    INTERVAL = "interval"
+    NEVER = "never"
+
+
+def checkpoint_path(path: str, generation: int) -> str:
+    """
+    Returns the path of the checkpoint of a journal for a given generation.
+    """
+
+    return f"{path}.{generation}.checkpoint"
+
+
+def _encode_person(person: Any, field: str) -> List[str]:
+    return [person.id_number, person.first_name, person.last_name, getattr(person, field).name]
+
+
+def _encode_course(course: Any) -> List[str]:
+    fields = [COURSE_NAME_IDS[course.course_id].name,
+              str(len(course.instructors))]
+
+    for instructor in course.instructors.values():
+        fields += _encode_person(instructor, "department")
+
+    enrolled_students = course.enrolled_students
+    fields.append(str(len(enrolled_students)))
+
+    for id_number, enrollment in enrolled_students.items():
+        fields += (id_number, enrollment.grade.name)
+
+    return fields
+
+
+def encode(operation: str, argument: Any) -> bytes:
+    """
+    Encodes one journal record, header included.
+
+    Args:
+        operation (str): The name of the operation, a key of `OPCODES`.
+        argument (Any): The students, instructors or courses of the operation, an ID for removals,
+            (student ID, course ID) pairs for "enroll", a (student ID, course ID, grade) triple for "grade",
+            a (student ID, course ID) pair for "unenroll", an (instructor, course ID) pair for
+            "assign_instructor" or an (instructor ID, course ID) pair for "unassign_instructor".
+
+    Returns:
+        bytes: The encoded record.
+    """
+
+    if operation == "add_students":
+        fields = [field for student in argument for field in _encode_person(
+            student, "major")]
+    elif operation == "update_student":
+        fields = _encode_person(argument, "major")
+    elif operation == "add_instructors":
+        fields = [field for instructor in argument for field in _encode_person(
+            instructor, "department")]
+    elif operation == "update_instructor":
+        fields = _encode_person(argument, "department")
+    elif operation == "add_courses":
+        fields = [str(len(argument))]
+
+        for course in argument:
+            fields += _encode_course(course)
+    elif operation == "update_course":
+        fields = _encode_course(argument)
+    elif operation == "enroll":
+        fields = [field for pair in argument for field in pair]
+    elif operation == "grade":
+        id_number, course_id, grade = argument
+        fields = [id_number, course_id, grade.name]
+    elif operation == "assign_instructor":
+        instructor, course_id = argument
+        fields = _encode_person(instructor, "department") + [course_id]
+    elif operation in ("unenroll", "unassign_instructor"):
+        fields = list(argument)
+    else:
+        fields = [argument]
+
+    # Lone surrogates are kept as they are, so every str round-trips
+    body = bytearray((OPCODES[operation],))
+
+    for field in fields:
+        data = field.encode("utf-8", "surrogatepass")
+
+        if len(data) < LONG_FIELD:
+            body.append(len(data))
+        else:
+            body.append(LONG_FIELD)
+            body += _LONG_FIELD.pack(len(data))
+
+        body += data
+
+    return _RECORD.pack(len(body), zlib.crc32(body)) + bytes(body)
+
+
+def _decode_fields(body: bytes) -> Optional[List[str]]:
+    # The fields of a record body, or None if they overrun it
+    fields = []
+    offset = 1
+
+    while offset < len(body):
+        length = body[offset]
+        offset += 1
+
+        if length == LONG_FIELD:
+            if offset + _LONG_FIELD.size > len(body):
+                return None
+
+            (length,) = _LONG_FIELD.unpack_from(body, offset)
+            offset += _LONG_FIELD.size
+
+        if offset + length > len(body):
+            return None
+
+        fields.append(body[offset:offset + length].decode("utf-8", "surrogatepass"))
+        offset += length
+
+    return fields
+
+
+def read_records(data: bytes) -> Iterator[Tuple[str, List[str], int]]:
+    """
+    Yields the valid records of a journal file's contents, stopping at the first torn or corrupt one.
+
+    Args:
+        data (bytes): The contents of the journal file, header included.
+
+    Yields:
+        Tuple[str, List[str], int]: The operation, the fields of the record and the offset just past it.
+    """
+
+    offset = _HEADER.size
+
+    while offset + _RECORD.size <= len(data):
+        length, checksum = _RECORD.unpack_from(data, offset)
+        start = offset + _RECORD.size
+        body = data[start:start + length]
+
+        if len(body) != length or length == 0 or zlib.crc32(body) != checksum or body[0] not in OPERATIONS:
+            return
+
+        fields = _decode_fields(body)
+
+        if fields is None:
+            return
+
+        offset = start + length
+
+        yield OPERATIONS[body[0]], fields, offset
+
+
+def _read_header(data: bytes, path: str) -> int:
+    if len(data) < _HEADER.size:
+        raise ValueError(f"{path} is not a journal file.")
+
+    magic, version, generation = _HEADER.unpack_from(data)
+
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a journal file.")
+
+    if version != VERSION:
+        raise ValueError(
+            f"Journal version {version} of {path} is not supported, expected version {VERSION}.")
+
+    return generation
+
+
+def _decode_people(cls: type, field: str, enum: type, fields: List[str]) -> List[Any]:
+    return [cls(first_name=fields[i + 1], last_name=fields[i + 2], id_number=fields[i], **{field: enum[fields[i + 3]]})
+            for i in range(0, len(fields), 4)]
+
+
+def _decode_course(module: Any, fields: List[str], offset: int) -> Tuple[Any, int]:
+    course = module.Course(course_name_id=CourseNameId[fields[offset]])
+    count = int(fields[offset + 1])
+    offset += 2
+
+    for instructor in _decode_people(module.Instructor, "department", Department, fields[offset:offset + 4 * count]):
+        course.add_instructor(instructor=instructor)
+
+    offset += 4 * count
+    count = int(fields[offset])
+    offset += 1
+
+    course.add_students_many(enrollments=[
+        module.Enrollment(id_number=fields[i], course_id=course.course_id,
+                          grade=Grade[fields[i + 1]])
+        for i in range(offset, offset + 2 * count, 2)])
+
+    return course, offset + 2 * count
+
+
+def apply(sms: Any, operation: str, fields: List[str]) -> None:
+    """
+    Applies one decoded journal record to a system through its public methods.
+
+    Args:
+        sms (StudentManagementSystem): The system being rebuilt. Must not have a journal attached.
+        operation (str): The operation of the record.
+        fields (List[str]): The fields of the record.
+    """
+
+    module = importlib.import_module(type(sms).__module__)
+
+    if operation == "add_students":
+        sms.add_students_many(_decode_people(
+            module.Student, "major", Major, fields))
+    elif operation == "update_student":
+        sms.update_student(_decode_people(
+            module.Student, "major", Major, fields)[0])
+    elif operation == "remove_student":
+        sms.remove_student(id_number=fields[0])
+    elif operation == "add_instructors":
+        sms.add_instructors_many(_decode_people(
+            module.Instructor, "department", Department, fields))
+    elif operation == "update_instructor":
+        sms.update_instructor(_decode_people(
+            module.Instructor, "department", Department, fields)[0])
+    elif operation == "remove_instructor":
+        sms.remove_instructor(id_number=fields[0])
+    elif operation == "add_courses":
+        courses, offset = [], 1
+
+        for _ in range(int(fields[0])):
+            course, offset = _decode_course(module, fields, offset)
+            courses.append(course)
+
+        sms.add_courses_many(courses)
+    elif operation == "update_course":
+        sms.update_course(_decode_course(module, fields, 0)[0])
+    elif operation == "remove_course":
+        sms.remove_course(course_id=fields[0])
+    elif operation == "enroll":
+        sms.enroll_many(zip(fields[0::2], fields[1::2]))
+    elif operation == "grade":
+        sms.grade_student(
+            id_number=fields[0], course_id=fields[1], grade=Grade[fields[2]])
+    elif operation == "unenroll":
+        sms.courses[fields[1]].remove_student(id_number=fields[0])
+    elif operation == "assign_instructor":
+        sms.courses[fields[4]].add_instructor(instructor=_decode_people(
+            module.Instructor, "department", Department, fields[:4])[0])
+    elif operation == "unassign_instructor":
+        sms.courses[fields[1]].remove_instructor(id_number=fields[0])
+
+
+def replay(path: str, sms: Any) -> int:
+    """
+    Applies every valid record of a journal file to a system.
+
+    Args:
+        path (str): The journal file.
+        sms (StudentManagementSystem): The system to apply the records to, usually restored from the journal's checkpoint.
+
+    Returns:
+        int: The number of records applied.
+
+    Raises:
+        ValueError: If the file is not a journal.
+    """
+
+    with open(path, "rb") as file:
+        data = file.read()
+
+    _read_header(data, path)
+    count = 0
+
+    for operation, fields, _ in read_records(data):
+        apply(sms, operation, fields)
+        count += 1
+
+    return count
+
+
+def _fsync_directory(path: str) -> None:
+    # Make renames in the directory durable, where the platform allows opening directories
+    try:
+        descriptor = os.open(os.path.dirname(
+            os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+class Journal:
+    """
+    An open journal attached to a StudentManagementSystem.
+
+    Use `Journal.open` to recover a system from a journal and start journaling it.
+
+    Attributes:
+        path (str): The journal file.
+        system (StudentManagementSystem): The journaled system.
+        fsync (FsyncPolicy): When records are forced to disk.
+        interval (float): Group commit window of the INTERVAL policy, in seconds.
+        generation (int): Generation of the checkpoint the journal continues from, 0 for none.
+    """
+
+    def __init__(self, path: str, system: Any, generation: int, fsync: Union[FsyncPolicy, str] = FsyncPolicy.ALWAYS, interval_ms: float = 10.0) -> None:
+        """
+        Initializes a Journal appending to an existing journal file and attaches it to the system.
+
+        Args:
+            path (str): The journal file, whose records have already been applied to the system.
+            system (StudentManagementSystem): The system to journal.
+            generation (int): Generation of the journal file's checkpoint.
+            fsync (Union[FsyncPolicy, str], optional): When records are forced to disk. Defaults to ALWAYS.
+            interval_ms (float, optional): Group commit window of the INTERVAL policy. Defaults to 10 ms.
+        """
+
+        self.path = path
+        self.system = system
+        self.fsync = FsyncPolicy(fsync)
+        self.interval = interval_ms / 1000
+        self.generation = generation
+
+        self._descriptor = os.open(path, os.O_WRONLY | os.O_APPEND)
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self._last_sync = time.monotonic()
+        self._closed = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+        # Flush the tail of a group commit even when no further record arrives
+        if self.fsync is FsyncPolicy.INTERVAL:
+            self._flusher = threading.Thread(
+                target=self._flush_periodically, name="journal-flusher", daemon=True)
+            self._flusher.start()
+
+        system._journal = self
+
+    @classmethod
+    def open(cls, system_class: type, path: str, fsync: Union[FsyncPolicy, str] = FsyncPolicy.ALWAYS, interval_ms: float = 10.0) -> "Journal":
+        """
+        Recovers a system from a journal and its checkpoint, then keeps journaling it.
+
+        A missing journal file is created, giving an empty system. A torn or corrupt tail left by a
+        crash is truncated after replay.
+
+        Args:
+            system_class (type): The StudentManagementSystem class of the backend to restore.
+            path (str): The journal file.
+            fsync (Union[FsyncPolicy, str], optional): When records are forced to disk. Defaults to ALWAYS.
+            interval_ms (float, optional): Group commit window of the INTERVAL policy. Defaults to 10 ms.
+
+        Returns:
+            Journal: The open journal. The restored system is its `system` attribute.
+
+        Raises:
+            ValueError: If the file is not a journal.
+        """
+
+        if not os.path.exists(path):
+            cls._create(path, generation=0)
+
+        with open(path, "rb") as file:
+            data = file.read()
+
+        generation = _read_header(data, path)
+        system = system_class.load_snapshot(checkpoint_path(
+            path, generation)) if generation else system_class()
+        end = _HEADER.size
+
+        for operation, fields, end in read_records(data):
+            apply(system, operation, fields)
+
+        if end < len(data):
+            os.truncate(path, end)
+
+        return cls(path, system, generation, fsync=fsync, interval_ms=interval_ms)
+
+    @staticmethod
+    def _create(path: str, generation: int) -> None:
+        # Write a journal holding only its header, durably, and atomically put it in place
+        temporary = f"{path}.tmp"
+
+        with open(temporary, "wb") as file:
+            file.write(_HEADER.pack(MAGIC, VERSION, generation))
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temporary, path)
+        _fsync_directory(path)
+
+    def record(self, operation: str, argument: Any) -> None:
+        """
+        Appends one record to the journal. Called by the system after every successful change.
+
+        Args:
+            operation (str): The name of the operation, a key of `OPCODES`.
+            argument (Any): The argument of the operation, as described by `encode`.
+        """
+
+        record = encode(operation, argument)
+
+        with self._lock:
+            self._buffer += record
+
+            if self.fsync is FsyncPolicy.ALWAYS:
+                self._flush_locked(sync=True)
+            elif self.fsync is FsyncPolicy.INTERVAL:
+                if time.monotonic() - self._last_sync >= self.interval:
+                    self._flush_locked(sync=True)
+            elif len(self._buffer) >= BUFFER_SIZE:
+                self._flush_locked(sync=False)
+
+    def flush(self, sync: bool = True) -> None:
+        """
+        Writes the buffered records to the journal file.
+
+        Args:
+            sync (bool, optional): Whether to fsync the file afterwards. Defaults to True.
+        """
+
+        with self._lock:
+            self._flush_locked(sync=sync)
+
+    def _flush_locked(self, sync: bool) -> None:
+        if self._buffer:
+            os.write(self._descriptor, self._buffer)
+            self._buffer.clear()
+
+        if sync:
+            os.fsync(self._descriptor)
+            self._last_sync = time.monotonic()
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(self.interval):
+            with self._lock:
+                if self._buffer:
+                    self._flush_locked(sync=True)
+
+    def checkpoint(self) -> None:
+        """
+        Folds the journal into a snapshot of the system and starts a new, empty journal.
+
+        The new checkpoint is written and made durable before the journal referencing it replaces
+        the old one, so a crash at any point leaves either the old or the new pair on disk.
+
+        Writers of the system are held back for the whole checkpoint. Each change is then either
+        in the checkpoint and the old journal, or only in the new journal.
+
+        Raises:
+            RuntimeError: If a transaction is open on the system, as its changes are applied but not yet journaled.
+        """
+
+        system = self.system
+
+        # Writers record their change while holding the locks of the change, so those locks are taken
+        # before the journal lock here too
+        with system._exclusive():
+            if isinstance(system._journal, Transaction):
+                raise RuntimeError(
+                    "A journal can not be checkpointed while a transaction is open on its management system.")
+
+            with self._lock:
+                self._flush_locked(sync=True)
+
+                generation = self.generation + 1
+                checkpoint = checkpoint_path(self.path, generation)
+                temporary = f"{checkpoint}.tmp"
+
+                # Written directly, as the save_snapshot of the thread-safe backend would wait for the held locks
+                write_snapshot(system, temporary)
+
+                with open(temporary, "rb+") as file:
+                    os.fsync(file.fileno())
+
+                os.replace(temporary, checkpoint)
+                self._create(self.path, generation)
+
+                os.close(self._descriptor)
+                self._descriptor = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+
+                if self.generation:
+                    os.remove(checkpoint_path(self.path, self.generation))
+
+                self.generation = generation
+
+    def close(self) -> None:
+        """
+        Flushes and fsyncs the remaining records and detaches the journal from the system.
+        """
+
+        self._closed.set()
+
+        if self._flusher is not None:
+            self._flusher.join()
+
+        with self._lock:
+            self._flush_locked(sync=self.fsync is not FsyncPolicy.NEVER)
+            os.close(self._descriptor)
+
+        self.system._journal = None
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,859 @@
+"""
+A StudentManagementSystem partitioned by student across worker processes.
+
+One system lives in one process and is bound to one core by the GIL. `StudentManagementSystem` here
+is a coordinator that hashes every student ID to one of several shards, each a vanilla, pydantic or
+columnar system in its own worker process:
+
+    with StudentManagementSystem(shards=4, backend="columnar") as sms:
+        sms.populate(InstitutionGenerator(students=1_000_000, seed=42))
+        sms.enroll_many(enrollments)
+        gpa = sms.grade_analytics().student_gpa()
+
+A student, and every enrollment of that student, lives on exactly one shard. Instructors and courses
+are replicated on every shard, each course holding only the enrollments of the shard's students.
+Operations on one student go to the shard owning it. Queries over a course or over many students
+are sent to every shard at once and their answers merged. Bulk changes are split by shard and applied
+by all of them in parallel, as one two-phase commit: every shard applies its part in a transaction,
+and commits only once all of them succeeded.
+
+Notes:
+    The coordinator serves one caller at a time. Name search, change events, transactions, snapshots
+    and journals are per shard and not offered by the coordinator.
+"""
+import gc
+import importlib
+import multiprocessing
+import os
+import zlib
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from utils.analytics import COUNTS_TOWARDS_GPA, FAILED, GRADE_POINTS, GRADES, PASSED, CourseStats, GradeAnalytics
+from utils.bitmaps import CourseQuery
+from utils.enums.course_name_id import CourseNameId
+from utils.enums.department import Department
+from utils.enums.grade import Grade
+from utils.enums.major import Major
+from utils.errors import BulkOperationError
+from utils.generator import Chunk, InstitutionGenerator, populate_chunk, populate_courses
+
+
+# Course ID -> its CourseNameId, to rebuild the part of a course held by a shard
+COURSE_NAME_IDS: Dict[str, CourseNameId] = {
+    course_name_id.course_id: course_name_id for course_name_id in CourseNameId}
+
+# Grade points of every grade code counted towards averages, 0.0 for the others
+_COUNTED_POINTS = GRADE_POINTS * COUNTS_TOWARDS_GPA
+
+
+def shard_of(id_number: str, shards: int) -> int:
+    """
+    Returns the shard owning a student.
+
+    Student IDs are hashed with CRC-32 rather than `hash`, which is salted differently in every process.
+
+    Args:
+        id_number (str): The ID of the student.
+        shards (int): The number of shards.
+
+    Returns:
+        int: The index of the shard, between 0 and `shards - 1`.
+    """
+
+    return zlib.crc32(id_number.encode()) % shards
+
+
+class _Rollback(Exception):
+    """
+    Ends the transaction of a prepared bulk change by rolling it back.
+    """
+
+
+class _Shard:
+    """
+    The part of the system held by one worker process.
+
+    Commands of the coordinator are methods of the shard when it defines them, such as those handling
+    courses, which have to be cut down to the shard's students, and methods of its system otherwise.
+    """
+
+    def __init__(self, backend: str, index: int, shards: int) -> None:
+        self.module = importlib.import_module(
+            f"utils.{backend}.student_management_system")
+        self.sms = self.module.StudentManagementSystem()
+        self.index = index
+        self.shards = shards
+
+        # Transaction of the bulk change prepared by the coordinator, until it commits or rolls back
+        self.transaction: Optional[Any] = None
+
+    def prepare(self, operation: str, rows: List[Any]) -> None:
+        # Apply the shard's part of a bulk change, keeping it open until every shard has applied its own
+        transaction = self.sms.transaction()
+        transaction.__enter__()
+
+        try:
+            getattr(self.sms, operation)(rows)
+        except BaseException as error:
+            transaction.__exit__(type(error), error, error.__traceback__)
+            raise
+
+        self.transaction = transaction
+
+    def commit(self) -> None:
+        transaction, self.transaction = self.transaction, None
+        transaction.__exit__(None, None, None)
+
+    def rollback(self) -> None:
+        transaction, self.transaction = self.transaction, None
+        transaction.__exit__(_Rollback, _Rollback(), None)
+
+    def _part(self, course: Any) -> Any:
+        """
+        Copies a course with only the enrollments of the shard's students, detached from any system.
+        """
+
+        enrollments = {id_number: enrollment for id_number, enrollment in course.enrolled_students.items()
+                       if shard_of(id_number, self.shards) == self.index}
+
+        return self.module.Course(course_name_id=COURSE_NAME_IDS[course.course_id],
+                                  enrolled_students=enrollments, instructors=dict(course.instructors))
+
+    def add_course(self, course: Any) -> None:
+        self.sms.add_course(self._part(course))
+
+    def add_courses_many(self, courses: List[Any]) -> None:
+        self.sms.add_courses_many([self._part(course) for course in courses])
+
+    def update_course(self, course: Any) -> None:
+        self.sms.update_course(self._part(course))
+
+    def find_course(self, course_id: str) -> Optional[Any]:
+        # The registered course refers to the whole system, which must not be sent along with it
+        course = self.sms.find_course(course_id)
+
+        return self._part(course) if course is not None else None
+
+    def find_course_enrollments(self, course_id: str) -> Dict[str, Any]:
+        return dict(self.sms.find_course_enrollments(course_id))
+
+    def find_course_enrollments_by_grade(self, course_id: str, grade: Grade) -> Dict[str, Any]:
+        return dict(self.sms.find_course_enrollments_by_grade(course_id, grade))
+
+    def students_where(self, query: CourseQuery) -> List[str]:
+        return list(self.sms.iter_students_where(query))
+
+    def count_students(self) -> int:
+        return len(self.sms.students)
+
+    def populate_courses(self, generator: InstitutionGenerator) -> None:
+        populate_courses(self.sms, generator)
+
+    def populate_chunk(self, chunk: Chunk) -> None:
+        # Every object added stays alive, as in `utils.generator.populate`
+        enabled = gc.isenabled()
+        gc.disable()
+
+        try:
+            populate_chunk(self.sms, chunk)
+        finally:
+            if enabled:
+                gc.enable()
+
+    def grade_analytics(self) -> Tuple[Dict[str, float], Dict[str, Dict[Grade, int]], Dict[Major, Dict[Grade, int]]]:
+        # GPAs are final as every student lives on one shard, the histograms are summed by the coordinator
+        analytics = GradeAnalytics(self.sms)
+
+        return analytics.student_gpa(), analytics.course_distributions(), analytics.major_distributions()
+
+
+def _serve(connection: Any, backend: str, index: int, shards: int) -> None:
+    """
+    Runs the commands of the coordinator on one shard until it closes, in a worker process.
+    """
+
+    shard = _Shard(backend, index, shards)
+
+    while True:
+        name, arguments = connection.recv()
+
+        if name == "close":
+            connection.close()
+            return
+
+        try:
+            command = getattr(shard, name) if hasattr(_Shard, name) else getattr(shard.sms, name)
+            result = command(*arguments)
+        except Exception as error:
+            connection.send((False, error))
+        else:
+            connection.send((True, result))
+
+
+class PartitionedGradeAnalytics:
+    """
+    The statistics of `utils.analytics.GradeAnalytics`, merged from those computed by every shard in parallel.
+
+    Each shard computes the GPAs of its own students, which are final, and the grade histograms of
+    every course and major over its enrollments. The histograms are summed, and every average and
+    pass rate is derived from them.
+    """
+
+    def __init__(self, partials: Iterable[Tuple[Dict[str, float], Dict[str, Dict[Grade, int]], Dict[Major, Dict[Grade, int]]]]) -> None:
+        """
+        Initializes a PartitionedGradeAnalytics instance.
+
+        Args:
+            partials: The GPAs, course histograms and major histograms computed by every shard.
+        """
+
+        self._student_gpa: Dict[str, float] = {}
+        self._course_histograms: Dict[str, np.ndarray] = {}
+        self._major_histograms: Dict[Major, np.ndarray] = {}
+
+        for student_gpa, course_distributions, major_distributions in partials:
+            self._student_gpa.update(student_gpa)
+            _add_histograms(self._course_histograms, course_distributions)
+            _add_histograms(self._major_histograms, major_distributions)
+
+    def student_gpa(self) -> Dict[str, float]:
+        """
+        Returns the GPA of every student with at least one letter grade.
+
+        Returns:
+            Dict[str, float]: A dictionary mapping student IDs to their GPA.
+        """
+
+        return dict(self._student_gpa)
+
+    def course_distributions(self) -> Dict[str, Dict[Grade, int]]:
+        """
+        Returns the grade histogram of every course.
+
+        Returns:
+            Dict[str, Dict[Grade, int]]: A dictionary mapping course IDs to the number of enrollments holding each grade.
+        """
+
+        return {course_id: dict(zip(GRADES, histogram.tolist())) for course_id, histogram in self._course_histograms.items()}
+
+    def course_averages(self) -> Dict[str, float]:
+        """
+        Returns the average grade points of every course with at least one letter grade.
+
+        Returns:
+            Dict[str, float]: A dictionary mapping course IDs to their average grade points.
+        """
+
+        return _ratios(self._course_histograms, _COUNTED_POINTS, COUNTS_TOWARDS_GPA)
+
+    def major_averages(self) -> Dict[Major, float]:
+        """
+        Returns the average grade points of every major over all letter-graded enrollments of its students.
+
+        Returns:
+            Dict[Major, float]: A dictionary mapping majors to their average grade points.
+        """
+
+        return _ratios(self._major_histograms, _COUNTED_POINTS, COUNTS_TOWARDS_GPA)
+
+    def course_pass_rates(self) -> Dict[str, float]:
+        """
+        Returns the share of passing grades among the graded enrollments of every course.
+
+        Returns:
+            Dict[str, float]: A dictionary mapping course IDs to their pass rate between 0 and 1.
+        """
+
+        return _ratios(self._course_histograms, PASSED, PASSED | FAILED)
+
+    def pass_rate(self) -> float:
+        """
+        Returns the share of passing grades among all graded enrollments.
+
+        Returns:
+            float: The pass rate between 0 and 1, or NaN when nothing has been graded yet.
+        """
+
+        total = sum(self._course_histograms.values(), np.zeros(len(GRADES), dtype=np.int64))
+        passed = int(total @ PASSED)
+        decided = int(total @ (PASSED | FAILED))
+
+        return passed / decided if decided else float("nan")
+
+
+def _add_histograms(totals: Dict[Any, np.ndarray], histograms: Dict[Any, Dict[Grade, int]]) -> None:
+    """
+    Adds grade histograms, keyed by course or major, to running totals indexed by grade code.
+    """
+
+    for key, histogram in histograms.items():
+        counts = np.fromiter((histogram[grade] for grade in GRADES), dtype=np.int64, count=len(GRADES))
+        total = totals.get(key)
+
+        if total is None:
+            totals[key] = counts
+        else:
+            total += counts
+
+
+def _ratios(histograms: Dict[Any, np.ndarray], numerator: np.ndarray, denominator: np.ndarray) -> Dict[Any, float]:
+    """
+    Weighs every histogram by two per-grade tables and divides the results, leaving out empty denominators.
+    """
+
+    ratios: Dict[Any, float] = {}
+
+    for key, histogram in histograms.items():
+        divisor = histogram @ denominator
+
+        if divisor:
+            ratios[key] = float(histogram @ numerator / divisor)
+
+    return ratios
+
+
+class StudentManagementSystem:
+    """
+    Coordinates a StudentManagementSystem split by student across worker processes.
+
+    Offers the changes and queries of a single system, routed to the shard owning the student or
+    sent to every shard at once. Bulk changes are all or nothing across shards, and their rejected
+    rows are reported at their position in the whole batch.
+
+    Attributes:
+        shards (int): The number of shards, one worker process each.
+        backend (str): The backend of every shard: "vanilla", "pydantic" or "columnar".
+    """
+
+    def __init__(self, shards: Optional[int] = None, backend: str = "vanilla") -> None:
+        """
+        Initializes the coordinator and starts a worker process for every shard.
+
+        Args:
+            shards (Optional[int], optional): The number of shards. Defaults to the number of CPUs.
+            backend (str, optional): The backend of every shard. Defaults to "vanilla".
+
+        Raises:
+            ValueError: If `shards` is less than 1.
+        """
+
+        self.shards = shards if shards is not None else os.cpu_count() or 1
+        self.backend = backend
+
+        if self.shards < 1:
+            raise ValueError(f"A partitioned system needs at least one shard, not {self.shards}.")
+
+        # Fail here rather than in every worker on an unknown backend
+        importlib.import_module(f"utils.{backend}.student_management_system")
+
+        context = multiprocessing.get_context()
+        self._connections: List[Any] = []
+        self._processes: List[Any] = []
+
+        for index in range(self.shards):
+            connection, worker_connection = context.Pipe()
+            process = context.Process(target=_serve, args=(worker_connection, backend, index, self.shards),
+                                      name=f"sms-shard-{index}", daemon=True)
+            process.start()
+            worker_connection.close()
+
+            self._connections.append(connection)
+            self._processes.append(process)
+
+    def _shard(self, id_number: str) -> int:
+        return shard_of(id_number, self.shards)
+
+    def _exchange(self, calls: Dict[int, Tuple[str, Tuple[Any, ...]]]) -> Dict[int, Tuple[bool, Any]]:
+        """
+        Sends commands to shards, all before waiting for any, and returns the outcome of each as an (ok, result or error) pair.
+        """
+
+        connections = self._connections
+
+        for shard, call in calls.items():
+            connections[shard].send(call)
+
+        return {shard: connections[shard].recv() for shard in calls}
+
+    def _scatter(self, calls: Dict[int, Tuple[str, Tuple[Any, ...]]]) -> Dict[int, Any]:
+        """
+        Runs commands on shards in parallel and returns their results, raising the error of the first shard that failed.
+        """
+
+        outcomes = self._exchange(calls)
+
+        for ok, result in outcomes.values():
+            if not ok:
+                raise result
+
+        return {shard: result for shard, (_, result) in outcomes.items()}
+
+    def _call(self, shard: int, name: str, *arguments: Any) -> Any:
+        return self._scatter({shard: (name, arguments)})[shard]
+
+    def _broadcast(self, name: str, *arguments: Any) -> List[Any]:
+        """
+        Runs a command on every shard in parallel and returns their results in shard order.
+        """
+
+        results = self._scatter({shard: (name, arguments) for shard in range(self.shards)})
+
+        return [results[shard] for shard in range(self.shards)]
+
+    def _bulk(self, operation: str, rows: Iterable[Any], key: Callable[[Any], str]) -> None:
+        """
+        Splits the rows of a bulk change by the shard owning their student and applies every part in parallel, all or nothing.
+
+        Args:
+            operation (str): The bulk method of the shards, such as "enroll_many".
+            rows (Iterable[Any]): The rows of the change.
+            key (Callable[[Any], str]): Returns the student ID of a row.
+
+        Raises:
+            BulkOperationError: If a shard rejected rows, listed at their position in `rows`. No shard kept its part.
+        """
+
+        parts: Dict[int, List[Any]] = {}
+        positions: Dict[int, List[int]] = {}
+        shards = self.shards
+
+        for position, row in enumerate(rows):
+            shard = shard_of(key(row), shards)
+            part = parts.get(shard)
+
+            if part is None:
+                part = parts[shard] = []
+                positions[shard] = []
+
+            part.append(row)
+            positions[shard].append(position)
+
+        # A single shard applies its part all or nothing by itself
+        if len(parts) == 1:
+            calls = {shard: (operation, (part,)) for shard, part in parts.items()}
+        else:
+            calls = {shard: ("prepare", (operation, part)) for shard, part in parts.items()}
+
+        outcomes = self._exchange(calls)
+        failed = {shard: error for shard, (ok, error) in outcomes.items() if not ok}
+
+        if len(parts) > 1:
+            self._scatter({shard: ("rollback" if failed else "commit", ()) for shard, (ok, _) in outcomes.items() if ok})
+
+        if not failed:
+            return
+
+        if all(isinstance(error, BulkOperationError) for error in failed.values()):
+            raise BulkOperationError(operation, sorted((positions[shard][row], message) for shard, error in failed.items()
+                                                       for row, message in error.errors))
+
+        raise next(iter(failed.values()))
+
+    def add_student(self, student: Any) -> None:
+        """
+        Adds a new student to the shard owning it.
+
+        Raises:
+            ValueError: If a student with the same ID already exists in the system.
+        """
+
+        self._call(self._shard(student.id_number), "add_student", student)
+
+    def add_students_many(self, students: Iterable[Any]) -> None:
+        """
+        Adds many new students in one all-or-nothing step, each shard adding its own in parallel.
+
+        Raises:
+            BulkOperationError: If any student is rejected. Nothing is added.
+        """
+
+        self._bulk("add_students_many", students, lambda student: student.id_number)
+
+    def update_student(self, student: Any) -> None:
+        """
+        Replaces a student on the shard owning it.
+
+        Raises:
+            KeyError: If no student with the same ID exists in the system.
+        """
+
+        self._call(self._shard(student.id_number), "update_student", student)
+
+    def remove_student(self, id_number: str) -> None:
+        """
+        Removes a student and its enrollments from the shard owning it.
+
+        Raises:
+            KeyError: If no student with the given ID exists in the system.
+        """
+
+        self._call(self._shard(id_number), "remove_student", id_number)
+
+    def find_student(self, id_number: str) -> Optional[Any]:
+        """
+        Finds a student on the shard owning it, or returns None.
+        """
+
+        return self._call(self._shard(id_number), "find_student", id_number)
+
+    def find_students_by_major(self, major: Major) -> List[Any]:
+        """
+        Gathers the students with a major from every shard.
+        """
+
+        return list(chain.from_iterable(self._broadcast("find_students_by_major", major)))
+
+    def count_students(self) -> int:
+        """
+        Returns the number of students in the system.
+        """
+
+        return sum(self._broadcast("count_students"))
+
+    def add_instructor(self, instructor: Any) -> None:
+        """
+        Adds a new instructor to every shard.
+
+        Raises:
+            ValueError: If an instructor with the same ID already exists in the system.
+        """
+
+        self._broadcast("add_instructor", instructor)
+
+    def add_instructors_many(self, instructors: Iterable[Any]) -> None:
+        """
+        Adds many new instructors to every shard in one all-or-nothing step.
+
+        Raises:
+            BulkOperationError: If any instructor is rejected. Nothing is added.
+        """
+
+        self._broadcast("add_instructors_many", list(instructors))
+
+    def update_instructor(self, instructor: Any) -> None:
+        """
+        Replaces an instructor on every shard.
+        """
+
+        self._broadcast("update_instructor", instructor)
+
+    def remove_instructor(self, id_number: str) -> None:
+        """
+        Removes an instructor from every shard.
+        """
+
+        self._broadcast("remove_instructor", id_number)
+
+    # Every shard holds every instructor and course, so the first one answers for all
+    def find_instructor(self, id_number: str) -> Optional[Any]:
+        """
+        Finds an instructor, or returns None.
+        """
+
+        return self._call(0, "find_instructor", id_number)
+
+    def find_instructors_by_department(self, department: Department) -> List[Any]:
+        """
+        Retrieves the instructors of a department.
+        """
+
+        return self._call(0, "find_instructors_by_department", department)
+
+    def find_instructor_courses(self, id_number: str) -> List[str]:
+        """
+        Retrieves the IDs of the courses an instructor teaches.
+        """
+
+        return self._call(0, "find_instructor_courses", id_number)
+
+    def add_course(self, course: Any) -> None:
+        """
+        Adds a new course to every shard, each keeping the enrollments of its own students.
+
+        Raises:
+            ValueError: If a course with the same ID already exists in the system.
+        """
+
+        self._broadcast("add_course", course)
+
+    def add_courses_many(self, courses: Iterable[Any]) -> None:
+        """
+        Adds many new courses to every shard in one all-or-nothing step.
+        """
+
+        self._broadcast("add_courses_many", list(courses))
+
+    def update_course(self, course: Any) -> None:
+        """
+        Replaces a course on every shard, each keeping the enrollments of its own students.
+        """
+
+        self._broadcast("update_course", course)
+
+    def remove_course(self, course_id: str) -> None:
+        """
+        Removes a course and its enrollments from every shard.
+        """
+
+        self._broadcast("remove_course", course_id)
+
+    def find_course(self, course_id: str) -> Optional[Any]:
+        """
+        Gathers a course from every shard.
+
+        Returns:
+            Optional[Course]: A detached copy of the course with the enrollments of every shard, or None if it does not exist.
+        """
+
+        parts = self._broadcast("find_course", course_id)
+        course = parts[0]
+
+        if course is not None:
+            for part in parts[1:]:
+                course.enrolled_students.update(part.enrolled_students)
+
+        return course
+
+    def enroll_student(self, id_number: str, course_id: str) -> None:
+        """
+        Enrolls a student in a course on the shard owning the student.
+
+        Raises:
+            KeyError: If the student or the course does not exist in the system.
+            ValueError: If the student is already enrolled in the course.
+        """
+
+        self._call(self._shard(id_number), "enroll_student", id_number, course_id)
+
+    def enroll_many(self, enrollments: Iterable[Tuple[str, str]]) -> None:
+        """
+        Enrolls many students in one all-or-nothing step, each shard enrolling its own students in parallel.
+
+        Raises:
+            BulkOperationError: If any enrollment is rejected. Nothing is enrolled.
+        """
+
+        self._bulk("enroll_many", enrollments, lambda row: row[0])
+
+    def grade_student(self, id_number: str, course_id: str, grade: Grade) -> None:
+        """
+        Assigns a grade on the shard owning the student.
+
+        Raises:
+            KeyError: If the student or the course does not exist, or the student is not enrolled in the course.
+        """
+
+        self._call(self._shard(id_number), "grade_student", id_number, course_id, grade)
+
+    def grade_many(self, grades: Iterable[Tuple[str, str, Grade]]) -> None:
+        """
+        Assigns many grades in one all-or-nothing step, each shard grading its own students in parallel.
+
+        Raises:
+            BulkOperationError: If any grade is rejected. Nothing is graded.
+        """
+
+        self._bulk("grade_many", grades, lambda row: row[0])
+
+    def find_course_enrollments(self, course_id: str) -> Dict[str, Any]:
+        """
+        Gathers the enrollments of a course from every shard.
+
+        Raises:
+            KeyError: If no course with the given ID exists in the system.
+        """
+
+        enrollments: Dict[str, Any] = {}
+
+        for part in self._broadcast("find_course_enrollments", course_id):
+            enrollments.update(part)
+
+        return enrollments
+
+    def find_course_enrollments_by_grade(self, course_id: str, grade: Grade) -> Dict[str, Any]:
+        """
+        Gathers the enrollments of a course with a given grade from every shard.
+        """
+
+        enrollments: Dict[str, Any] = {}
+
+        for part in self._broadcast("find_course_enrollments_by_grade", course_id, grade):
+            enrollments.update(part)
+
+        return enrollments
+
+    def find_course_stats(self, course_id: str) -> CourseStats:
+        """
+        Sums the grade aggregates of a course over every shard.
+
+        Raises:
+            KeyError: If no course with the given ID exists in the system.
+        """
+
+        stats = CourseStats()
+
+        for part in self._broadcast("find_course_stats", course_id):
+            stats.update(part)
+
+        return stats
+
+    def find_course_enrolled_students(self, course_id: str) -> List[str]:
+        """
+        Gathers the IDs of the students enrolled in a course from every shard.
+        """
+
+        return list(chain.from_iterable(self._broadcast("find_course_enrolled_students", course_id)))
+
+    def find_student_enrollments(self, id_number: str) -> Dict[str, List[Any]]:
+        """
+        Retrieves the enrollments of a student from the shard owning it.
+        """
+
+        return self._call(self._shard(id_number), "find_student_enrollments", id_number)
+
+    def find_enrolled_student_courses(self, id_number: str) -> List[str]:
+        """
+        Retrieves the IDs of the courses a student is enrolled in from the shard owning it.
+        """
+
+        return self._call(self._shard(id_number), "find_enrolled_student_courses", id_number)
+
+    def count_students_where(self, query: CourseQuery) -> int:
+        """
+        Counts the students matching a course query, each shard counting its own.
+        """
+
+        return sum(self._broadcast("count_students_where", query))
+
+    def iter_students_where(self, query: CourseQuery) -> Iterator[str]:
+        """
+        Iterates over the IDs of the students matching a course query, shard by shard.
+        """
+
+        return chain.from_iterable(self._broadcast("students_where", query))
+
+    def verify_indexes(self) -> None:
+        """
+        Checks the indexes of every shard.
+
+        Raises:
+            ValueError: If an index of a shard does not match its data.
+        """
+
+        self._broadcast("verify_indexes")
+
+    def grade_analytics(self) -> PartitionedGradeAnalytics:
+        """
+        Computes GPAs, grade distributions and pass rates over every enrollment, each shard over its own in parallel.
+
+        Returns:
+            PartitionedGradeAnalytics: The statistics, with the methods of `utils.analytics.GradeAnalytics`.
+        """
+
+        return PartitionedGradeAnalytics(self._broadcast("grade_analytics"))
+
+    def populate(self, generator: InstitutionGenerator, chunk_size: int = 100_000) -> None:
+        """
+        Streams the data of a generator into the shards, like `utils.generator.populate`.
+
+        Every shard adds the instructors and courses itself. Students are generated here chunk by chunk
+        and each chunk is split by shard, the next chunk being generated while the shards load the last.
+
+        Args:
+            generator (InstitutionGenerator): The data to add.
+            chunk_size (int, optional): The number of students generated at a time. Defaults to 100,000.
+        """
+
+        self._broadcast("populate_courses", generator)
+        pending: Optional[Dict[int, Any]] = None
+
+        for chunk in generator.chunks(chunk_size):
+            parts = self._split_chunk(chunk)
+
+            if pending is not None:
+                self._receive(pending)
+
+            pending = {shard: ("populate_chunk", (part,)) for shard, part in parts.items()}
+
+            for shard, call in pending.items():
+                self._connections[shard].send(call)
+
+        if pending is not None:
+            self._receive(pending)
+
+    def _receive(self, calls: Dict[int, Any]) -> None:
+        """
+        Waits for the shards of commands already sent, raising the error of the first shard that failed.
+        """
+
+        outcomes = [self._connections[shard].recv() for shard in calls]
+
+        for ok, result in outcomes:
+            if not ok:
+                raise result
+
+    def _split_chunk(self, chunk: Chunk) -> Dict[int, Chunk]:
+        """
+        Splits a generated chunk by the shard owning each student.
+        """
+
+        shards = self.shards
+        owners = [shard_of(id_number, shards) for id_number in chunk.id_numbers]
+        parts: Dict[int, Chunk] = {}
+
+        for shard in set(owners):
+            part = parts[shard] = Chunk()
+            part.id_numbers, part.first_names, part.last_names, part.majors = [], [], [], []
+            part.enrollments = {}
+
+        for owner, id_number, first_name, last_name, major in zip(owners, chunk.id_numbers, chunk.first_names,
+                                                                 chunk.last_names, chunk.majors):
+            part = parts[owner]
+            part.id_numbers.append(id_number)
+            part.first_names.append(first_name)
+            part.last_names.append(last_name)
+            part.majors.append(major)
+
+        owner_of = dict(zip(chunk.id_numbers, owners))
+
+        for course_id, (id_numbers, grades) in chunk.enrollments.items():
+            for id_number, grade in zip(id_numbers, grades):
+                enrollments = parts[owner_of[id_number]].enrollments
+                course = enrollments.get(course_id)
+
+                if course is None:
+                    course = enrollments[course_id] = ([], [])
+
+                course[0].append(id_number)
+                course[1].append(grade)
+
+        return parts
+
+    def close(self) -> None:
+        """
+        Stops the worker processes, discarding the data of every shard.
+        """
+
+        for connection, process in zip(self._connections, self._processes):
+            if process.is_alive():
+                connection.send(("close", ()))
+
+            process.join()
+            connection.close()
+
+        self._connections, self._processes = [], []
+
+    def __enter__(self) -> "StudentManagementSystem":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __str__(self) -> str:
+        return f"StudentManagementSystem(shards: {self.shards}, backend: {self.backend})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
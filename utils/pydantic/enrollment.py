@@ -1,7 +1,12 @@
+from typing import Iterable, List, Optional
+from typing_extensions import Self
+
 from utils.enums.grade import Grade
 
 from pydantic import BaseModel, Field
 
+from .trusted import construct_trusted, construct_trusted_many
+
 
 class Enrollment(BaseModel):
     """
@@ -17,6 +22,41 @@ class Enrollment(BaseModel):
     course_id: str
     grade: Grade = Field(default=Grade.NO_GRADE)
 
+    @classmethod
+    def from_trusted(cls, id_number: str, course_id: str, grade: Grade = Grade.NO_GRADE) -> Self:
+        """
+        Creates an enrollment from already validated data without running validation.
+
+        Args:
+            id_number (str): The ID of the enrolled student.
+            course_id (str): The ID of the course.
+            grade (Grade, optional): The grade of the student. Defaults to NO_GRADE.
+
+        Returns:
+            Self: The new instance.
+        """
+
+        return construct_trusted(cls, {"id_number": id_number, "course_id": course_id, "grade": grade})
+
+    @classmethod
+    def from_trusted_many(cls, id_numbers: Iterable[str], course_id: str, grades: Optional[Iterable[Grade]] = None) -> List[Self]:
+        """
+        Creates the enrollments of many students in one course from already validated data without running validation.
+
+        Args:
+            id_numbers (Iterable[str]): The IDs of the enrolled students.
+            course_id (str): The ID of the course.
+            grades (Optional[Iterable[Grade]], optional): The grade of every student. Defaults to NO_GRADE for all.
+
+        Returns:
+            List[Self]: The new instances, in the order of `id_numbers`.
+        """
+
+        if grades is None:
+            return construct_trusted_many(cls, ({"id_number": id_number, "course_id": course_id, "grade": Grade.NO_GRADE} for id_number in id_numbers))
+
+        return construct_trusted_many(cls, ({"id_number": id_number, "course_id": course_id, "grade": grade} for id_number, grade in zip(id_numbers, grades)))
+
     def assign_grade(self, grade: Grade) -> None:
         """
         Assigns a grade to the student for the course.
@@ -1,9 +1,12 @@
-import uuid
-from typing import Optional
+from typing import Any, Iterable, List, Optional
 from typing_extensions import Self
 
 from pydantic import BaseModel, Field, model_validator
 
+from utils.ids import new_id
+
+from .trusted import construct_trusted, construct_trusted_many
+
 
 class Person(BaseModel):
     """
@@ -46,6 +49,50 @@ class Person(BaseModel):
         self.handle_id()
         return self
 
+    @classmethod
+    def from_trusted(cls, first_name: str, last_name: str, id_number: str, **fields: Any) -> Self:
+        """
+        Creates an instance from already validated data, such as rows read back from our own storage, without running any validator.
+
+        `name` is filled from the first and last names exactly as `set_name` would. No ID is generated,
+        so `id_number` must be given.
+
+        Args:
+            first_name (str): The first name of the person.
+            last_name (str): The last name of the person.
+            id_number (str): The identifier of the person, prefix included.
+            **fields (Any): The remaining fields of the subclass, such as `major` or `department`.
+
+        Returns:
+            Self: The new instance.
+        """
+
+        return construct_trusted(cls, {"first_name": first_name, "last_name": last_name, "name": f"{first_name} {last_name}", "id_number": id_number, **fields})
+
+    @classmethod
+    def from_trusted_many(cls, first_names: Iterable[str], last_names: Iterable[str], id_numbers: Iterable[str], **columns: Iterable[Any]) -> List[Self]:
+        """
+        Creates many instances from columns of already validated data without running any validator.
+
+        Args:
+            first_names (Iterable[str]): The first name of every person.
+            last_names (Iterable[str]): The last name of every person.
+            id_numbers (Iterable[str]): The identifier of every person, prefix included.
+            **columns (Iterable[Any]): A column for each remaining field of the subclass, such as `major` or `department`.
+
+        Returns:
+            List[Self]: The new instances, in row order.
+
+        Example:
+            >>> students = Student.from_trusted_many(["Ada"], ["Lovelace"], ["STU-1a2b3c4d"], major=[Major.MATHEMATICS])
+        """
+
+        keys = ("first_name", "last_name", "name", "id_number", *columns)
+
+        return construct_trusted_many(cls, (
+            dict(zip(keys, (first_name, last_name, f"{first_name} {last_name}", id_number, *values)))
+            for first_name, last_name, id_number, *values in zip(first_names, last_names, id_numbers, *columns.values())))
+
     def handle_id(self, prefix: str = "PER") -> None:
         """
         Generates or returns a unique identifier with a given prefix.
@@ -55,16 +102,13 @@ class Person(BaseModel):
             id (Optional[str]): An optional ID. If provided, it is returned as-is.
 
         Returns:
-            str: A unique identifier with the given prefix. If no ID is provided, a new ID is generated using UUID.
+            str: A unique identifier with the given prefix. If no ID is provided, a new time-ordered ID is generated.
         """
 
         # Use id if give else generate id
         if self.id_number is None:
-            # Generate a random UUID and take only the first 8 characters
-            short_uuid = str(uuid.uuid4())[:8]
-
-            # Add a custom prefix
-            self.id_number = f"{prefix}-{short_uuid}"
+            # Generate a time-ordered ID with the custom prefix, see `utils.ids`
+            self.id_number = new_id(prefix)
 
     def __str__(self) -> str:
         """
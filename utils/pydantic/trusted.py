@@ -0,0 +1,83 @@
+from typing import Any, Dict, Iterable, List, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+
+Model = TypeVar("Model", bound=BaseModel)
+
+_object_setattr = object.__setattr__
+
+
+def _private_defaults(cls: Type[BaseModel]) -> Optional[Dict[str, Any]]:
+    """
+    Returns fresh default values for the private attributes of a model, or None if it has none, as pydantic expects.
+    """
+
+    private_attributes = cls.__private_attributes__
+
+    if not private_attributes:
+        return None
+
+    return {name: private_attribute.get_default() for name, private_attribute in private_attributes.items()}
+
+
+def construct_trusted(cls: Type[Model], values: Dict[str, Any]) -> Model:
+    """
+    Creates a model instance from already validated values without running any validator.
+
+    This sets the same internal state as pydantic's own construction, but skips both validation
+    and the per-call overhead of `model_construct`. It is meant for data the system has validated
+    before, such as rows read back from its own storage.
+
+    Args:
+        cls (Type[Model]): The model class.
+        values (Dict[str, Any]): A value for every field of the model, in field order.
+
+    Returns:
+        Model: The new instance.
+    """
+
+    model = object.__new__(cls)
+    _object_setattr(model, "__dict__", values)
+    _object_setattr(model, "__pydantic_fields_set__", set(values))
+    _object_setattr(model, "__pydantic_extra__", None)
+    _object_setattr(model, "__pydantic_private__", _private_defaults(cls))
+
+    return model
+
+
+def construct_trusted_many(cls: Type[Model], rows: Iterable[Dict[str, Any]]) -> List[Model]:
+    """
+    Creates many model instances of one class from already validated values without running any validator.
+
+    Args:
+        cls (Type[Model]): The model class.
+        rows (Iterable[Dict[str, Any]]): For every instance, a value for every field of the model, in field order.
+            Unlike `construct_trusted`, no field may be left out.
+
+    Returns:
+        List[Model]: The new instances.
+    """
+
+    new = object.__new__
+    setattr_ = _object_setattr
+    models = []
+    append = models.append
+
+    # Every row sets every field, so each instance gets a copy of the same set
+    fields_set = set(cls.model_fields)
+    copy_fields_set = fields_set.copy
+
+    # Models without private attributes share None, others get fresh defaults per instance
+    private = None if not cls.__private_attributes__ else _private_defaults
+
+    for values in rows:
+        model = new(cls)
+        setattr_(model, "__dict__", values)
+        setattr_(model, "__pydantic_fields_set__", copy_fields_set())
+        setattr_(model, "__pydantic_extra__", None)
+        setattr_(model, "__pydantic_private__",
+                 private(cls) if private is not None else None)
+        append(model)
+
+    return models
@@ -0,0 +1,364 @@
+"""
+In-memory name search with prefix and fuzzy matching.
+
+Names are split into normalized tokens, lowercased with accents removed, and the index keeps two
+inverted lists: token -> IDs of the people whose name contains it, and trigram -> tokens. A query
+term matches a token exactly, as a prefix of it, or fuzzily when they share enough trigrams, the
+way PostgreSQL's pg_trgm compares strings. Since a population has far fewer distinct name tokens
+than people, matching works on the tokens and only touches the people of the best ones.
+
+Example:
+    >>> index = NameIndex()
+    >>> index.add("STU-1", "Ada", "Lovelace")
+    >>> index.add("STU-2", "Adam", "Lovell")
+    >>> index.search("ada love")
+    ['STU-1', 'STU-2']
+    >>> index.search("lovlace")
+    ['STU-1']
+"""
+import heapq
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+# Minimum share of trigrams a token needs with a query term to match it fuzzily, pg_trgm's default
+SIMILARITY_THRESHOLD = 0.3
+
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits a name or query into normalized tokens.
+
+    Args:
+        text (str): The text to split.
+
+    Returns:
+        List[str]: The distinct casefolded tokens without accents, in order of appearance.
+    """
+
+    if not text.isascii():
+        # Split accented letters into letter and accent, then drop the accents
+        decomposed = unicodedata.normalize("NFKD", text)
+        text = "".join(
+            character for character in decomposed if not unicodedata.combining(character))
+
+    return list(dict.fromkeys(token for token in _SEPARATORS.split(text.casefold()) if token))
+
+
+@lru_cache(maxsize=1 << 16)
+def _name_tokens(name: str) -> Tuple[str, ...]:
+    """
+    Tokenizes a single name. Cached, as first and last names repeat across a population.
+    """
+
+    return tuple(tokenize(name))
+
+
+def trigrams(token: str) -> Set[str]:
+    """
+    Returns the trigrams of a token, padded like pg_trgm with two spaces in front and one behind.
+
+    Args:
+        token (str): A normalized token.
+
+    Returns:
+        Set[str]: The distinct trigrams.
+    """
+
+    padded = f"  {token} "
+    return {padded[start:start + 3] for start in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    Maintained search index over the names of people, safe to share between threads.
+
+    Attributes:
+        threshold (float): Minimum trigram similarity of a fuzzy match.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD) -> None:
+        """
+        Initializes an empty NameIndex.
+
+        Args:
+            threshold (float, optional): Minimum trigram similarity of a fuzzy match. Defaults to `SIMILARITY_THRESHOLD`.
+        """
+
+        self.threshold = threshold
+        self._lock = threading.Lock()
+
+        # ID -> tokens of the name it was indexed with, to unindex it
+        self._names: Dict[str, Tuple[str, ...]] = {}
+
+        # Token -> IDs of the people whose name contains it
+        self._tokens: Dict[str, Set[str]] = {}
+
+        # Trigram -> tokens containing it
+        self._trigrams: Dict[str, Set[str]] = {}
+
+        # Sorted tokens for prefix scans. New tokens wait in `_pending` until the next search and
+        # removed ones are skipped there, so bulk loads do not pay for keeping the list sorted
+        self._sorted: List[str] = []
+        self._pending: Set[str] = set()
+        self._stale = 0
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self._names
+
+    def add(self, id: str, *names: str) -> None:
+        """
+        Indexes a person under their names, replacing what they were indexed with before.
+
+        Args:
+            id (str): The person's ID.
+            *names (str): The names to index, such as the first and last name.
+        """
+
+        with self._lock:
+            self._add(((id, names),))
+
+    def add_many(self, entries: Iterable[Tuple[str, Iterable[str]]]) -> None:
+        """
+        Indexes many people at once.
+
+        Args:
+            entries (Iterable[Tuple[str, Iterable[str]]]): Pairs of a person's ID and their names.
+        """
+
+        with self._lock:
+            self._add(entries)
+
+    def remove(self, id: str) -> None:
+        """
+        Drops a person from the index. Unknown IDs are ignored.
+
+        Args:
+            id (str): The person's ID.
+        """
+
+        with self._lock:
+            self._remove(id)
+
+    def search(self, query: str, limit: int = 10, fuzzy: bool = True) -> List[str]:
+        """
+        Finds the people whose name matches every term of a query, best matches first.
+
+        A term scores 1 on a token equal to it, between 0.5 and 1 on a token it is a prefix of, the
+        shorter the token the higher, and half the trigram similarity on a fuzzy match. A person's
+        score is the sum of the best score of each term.
+
+        Args:
+            query (str): Terms separated by spaces, such as "ada lov".
+            limit (int, optional): Maximum number of IDs to return. Defaults to 10.
+            fuzzy (bool, optional): Whether terms may also match misspelled tokens. Defaults to True.
+
+        Returns:
+            List[str]: The IDs of the matching people, best first.
+        """
+
+        terms = tokenize(query)
+
+        if not terms or limit <= 0:
+            return []
+
+        with self._lock:
+            self._merge_pending()
+            matches = [self._match(term, fuzzy) for term in terms]
+
+            if not all(matches):
+                return []
+
+            if len(matches) == 1:
+                return self._top_single(matches[0], limit)
+
+            return self._top_many(matches, limit)
+
+    def _add(self, entries: Iterable[Tuple[str, Iterable[str]]]) -> None:
+        # Bound to locals, this loop runs once per person of a bulk load
+        indexed = self._names
+        postings = self._tokens
+
+        for id, names in entries:
+            if id in indexed:
+                self._remove(id)
+
+            tokens: Tuple[str, ...] = ()
+
+            for name in names:
+                tokens += _name_tokens(name)
+
+            if len(tokens) > 1 and len(set(tokens)) < len(tokens):
+                tokens = tuple(dict.fromkeys(tokens))
+
+            indexed[id] = tokens
+
+            for token in tokens:
+                ids = postings.get(token)
+
+                if ids is None:
+                    postings[token] = {id}
+                    self._pending.add(token)
+
+                    for trigram in trigrams(token):
+                        self._trigrams.setdefault(trigram, set()).add(token)
+                else:
+                    ids.add(id)
+
+    def _remove(self, id: str) -> None:
+        tokens = self._names.pop(id, None)
+
+        if tokens is None:
+            return
+
+        for token in tokens:
+            ids = self._tokens[token]
+            ids.discard(id)
+
+            if ids:
+                continue
+
+            # Last person with this token, it stays in `_sorted` until the list is rebuilt
+            del self._tokens[token]
+
+            if token in self._pending:
+                self._pending.discard(token)
+            else:
+                self._stale += 1
+
+            for trigram in trigrams(token):
+                containing = self._trigrams[trigram]
+                containing.discard(token)
+
+                if not containing:
+                    del self._trigrams[trigram]
+
+    def _merge_pending(self) -> None:
+        """
+        Brings the sorted token list up to date with the tokens added and removed since the last search.
+        """
+
+        if not self._pending and self._stale * 2 <= len(self._sorted):
+            return
+
+        if len(self._pending) * 8 < len(self._sorted) and self._stale * 2 <= len(self._sorted):
+            # A few new tokens: insert them where they belong
+            for token in self._pending:
+                position = bisect_left(self._sorted, token)
+
+                if position == len(self._sorted) or self._sorted[position] != token:
+                    insort(self._sorted, token, lo=position)
+        else:
+            # Many new or removed tokens, as after a bulk load: sorting from scratch is cheaper
+            self._sorted = sorted(self._tokens)
+            self._stale = 0
+
+        self._pending.clear()
+
+    def _match(self, term: str, fuzzy: bool) -> Dict[str, float]:
+        """
+        Returns the tokens a query term matches with the score of each.
+        """
+
+        scores: Dict[str, float] = {}
+
+        # Exact and prefix matches
+        position = bisect_left(self._sorted, term)
+
+        while position < len(self._sorted) and self._sorted[position].startswith(term):
+            token = self._sorted[position]
+            position += 1
+
+            if token in self._tokens:
+                scores[token] = 0.5 + 0.5 * len(term) / len(token)
+
+        if not fuzzy:
+            return scores
+
+        # Fuzzy matches: count the trigrams each token shares with the term
+        term_trigrams = trigrams(term)
+        shared: Dict[str, int] = {}
+
+        for trigram in term_trigrams:
+            for token in self._trigrams.get(trigram, ()):
+                shared[token] = shared.get(token, 0) + 1
+
+        for token, count in shared.items():
+            similarity = count / \
+                (len(term_trigrams) + len(trigrams(token)) - count)
+
+            if similarity >= self.threshold and scores.get(token, 0.0) < 0.5 * similarity:
+                scores[token] = 0.5 * similarity
+
+        return scores
+
+    def _top_single(self, scores: Dict[str, float], limit: int) -> List[str]:
+        """
+        Ranks the people matching a one-term query.
+
+        Everyone holding the same token scores the same, so tokens are visited best first and the
+        scan stops as soon as `limit` people are found.
+        """
+
+        found: Dict[str, None] = {}
+
+        for token in sorted(scores, key=scores.__getitem__, reverse=True):
+            for id in self._tokens[token]:
+                found.setdefault(id)
+
+                if len(found) == limit:
+                    return list(found)
+
+        return list(found)
+
+    def _top_many(self, matches: List[Dict[str, float]], limit: int) -> List[str]:
+        """
+        Ranks the people matching every term of a query of several terms.
+
+        Candidates come from the term matching the fewest people and are narrowed down term by term
+        with set intersections, so only the people matching every term are scored.
+        """
+
+        postings = self._tokens
+        matches = sorted(matches, key=lambda scores: sum(
+            len(postings[token]) for token in scores))
+        seed = [postings[token] for token in matches[0]]
+        candidates: Set[str] = seed[0] if len(seed) == 1 else set().union(*seed)
+
+        for scores in matches[1:]:
+            # Intersecting with every token's people costs the size of the smaller side each time,
+            # unlike building the union of all of them first
+            narrowed: Set[str] = set()
+
+            for token in scores:
+                narrowed |= candidates & postings[token]
+
+            candidates = narrowed
+
+            if not candidates:
+                return []
+
+        # People with the same name tokens score the same, so each combination is scored once
+        totals: Dict[Tuple[str, ...], float] = {}
+        ranked: List[Tuple[float, str]] = []
+
+        for id in candidates:
+            tokens = self._names[id]
+            total = totals.get(tokens)
+
+            if total is None:
+                total = totals[tokens] = sum(
+                    max(scores.get(token, 0.0) for token in tokens) for scores in matches)
+
+            ranked.append((total, id))
+
+        return [id for _, id in heapq.nlargest(limit, ranked)]
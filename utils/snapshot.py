@@ -0,0 +1,496 @@
+"""
+Compact, versioned binary snapshots of a StudentManagementSystem.
+
+A snapshot is a fixed sequence of length-prefixed blocks. Every block is either a typed array,
+written in native byte order and byte-swapped on load when needed, or a list of strings stored as
+one NUL-separated UTF-8 blob. A list holding a string with a NUL character in it also stores the
+length of every string, which is otherwise an empty array. Enums are stored as codes together with the member names of each
+enum, so snapshots survive enum members being reordered or added.
+
+Layout (version 2):
+    header                  magic, version, byte order
+    enum names              Major, Department, CourseNameId and Grade member names
+    students                IDs, first names, last names, major codes
+    instructors             IDs, first names, last names, department codes, registered flags
+    courses                 CourseNameId codes, enrollment count per course
+    course instructors      (course index, instructor index) pairs
+    enrollments             IDs of enrolled students that are not registered, student index and
+                            grade code per enrollment, grouped by course in course order
+    student rows            enrollment rows of every student index, as offsets and rows
+
+Loading reads the file through a memory map and builds objects directly from the trusted data,
+without running `Person.handle_id` or any pydantic validator.
+"""
+import gc
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List, Sequence, Union
+
+from utils.enums.course_name_id import CourseNameId
+from utils.enums.department import Department
+from utils.enums.grade import Grade
+from utils.enums.major import Major
+
+
+MAGIC = b"SMSSNAP\x00"
+VERSION = 2
+
+_HEADER = struct.Struct("<8sHB")
+_COUNT = struct.Struct("<I")
+_LENGTH = struct.Struct("<Q")
+
+_BYTE_ORDERS = {"little": 0, "big": 1}
+
+
+class SnapshotData:
+    """
+    The columns of a snapshot, as read from or written to disk.
+
+    Student indexes cover the registered students first, followed by `orphan_student_ids`: students
+    that are enrolled in a course but not registered in the system. Instructor indexes likewise cover
+    registered instructors and instructors only known to a course, told apart by `instructor_registered`.
+    """
+
+    __slots__ = ("majors", "departments", "course_name_ids", "grades",
+                 "student_ids", "student_first_names", "student_last_names", "student_majors",
+                 "instructor_ids", "instructor_first_names", "instructor_last_names", "instructor_departments", "instructor_registered",
+                 "course_codes", "course_sizes", "course_instructor_courses", "course_instructor_instructors",
+                 "orphan_student_ids", "enrollment_students", "enrollment_grades",
+                 "student_row_offsets", "student_rows")
+
+
+def _write_array(file: Any, values: array) -> None:
+    file.write(_LENGTH.pack(len(values) * values.itemsize))
+    file.write(values)
+
+
+def _write_strings(file: Any, strings: Sequence[str]) -> None:
+    # Lone surrogates are kept as they are, so every str round-trips
+    blob = "\x00".join(strings).encode("utf-8", "surrogatepass")
+
+    # Strings with NUL characters in them can not be split apart again, so their lengths are stored
+    if blob.count(b"\x00") != max(len(strings) - 1, 0):
+        lengths = array("I", map(len, strings))
+    else:
+        lengths = array("I")
+
+    file.write(_COUNT.pack(len(strings)))
+    file.write(_LENGTH.pack(len(blob)))
+    file.write(blob)
+    _write_array(file, lengths)
+
+
+class _Reader:
+    """
+    Reads the blocks of a snapshot one after another from a memory-mapped view.
+    """
+
+    __slots__ = ("view", "offset", "swap")
+
+    def __init__(self, view: memoryview, swap: bool) -> None:
+        self.view = view
+        self.offset = _HEADER.size
+        self.swap = swap
+
+    def _unpack(self, fmt: struct.Struct) -> int:
+        (value,) = fmt.unpack_from(self.view, self.offset)
+        self.offset += fmt.size
+        return value
+
+    def array(self, typecode: str) -> array:
+        length = self._unpack(_LENGTH)
+        values = array(typecode)
+        values.frombytes(self.view[self.offset:self.offset + length])
+        self.offset += length
+
+        if self.swap:
+            values.byteswap()
+
+        return values
+
+    def strings(self) -> List[str]:
+        count = self._unpack(_COUNT)
+        length = self._unpack(_LENGTH)
+        blob = str(self.view[self.offset:self.offset + length], "utf-8", "surrogatepass")
+        self.offset += length
+        lengths = self.array("I")
+
+        if not lengths:
+            return blob.split("\x00") if count else []
+
+        strings = []
+        start = 0
+
+        for string_length in lengths:
+            strings.append(blob[start:start + string_length])
+            start += string_length + 1
+
+        return strings
+
+
+def write_snapshot(sms: Any, path: Union[str, os.PathLike]) -> None:
+    """
+    Writes a snapshot of a vanilla, pydantic or columnar StudentManagementSystem to a file.
+
+    Args:
+        sms (StudentManagementSystem): The system to save.
+        path (Union[str, os.PathLike]): The file to write. An existing file is overwritten.
+    """
+
+    major_codes = {member: code for code, member in enumerate(Major)}
+    department_codes = {member: code for code,
+                        member in enumerate(Department)}
+    course_codes = {member.course_id: code for code,
+                    member in enumerate(CourseNameId)}
+    grade_codes = {member: code for code, member in enumerate(Grade)}
+
+    # Students, followed by enrolled students that are not registered
+    student_index: Dict[str, int] = {id_number: index for index,
+                                     id_number in enumerate(sms.students)}
+    orphan_student_ids: List[str] = []
+
+    def index_student(id_number: str) -> int:
+        index = student_index.get(id_number)
+
+        if index is None:
+            index = student_index[id_number] = len(student_index)
+            orphan_student_ids.append(id_number)
+
+        return index
+
+    # Instructors, followed by course instructors that are not registered
+    instructors = list(sms.instructors.values())
+    instructor_index: Dict[str, int] = {instructor.id_number: index for index,
+                                        instructor in enumerate(instructors)}
+    registered = array("B", bytes([1]) * len(instructors))
+    links_courses, links_instructors = array("H"), array("I")
+
+    for course_index, course in enumerate(sms.courses.values()):
+        for instructor in course.instructors.values():
+            index = instructor_index.get(instructor.id_number)
+
+            if index is None:
+                index = instructor_index[instructor.id_number] = len(
+                    instructors)
+                instructors.append(instructor)
+                registered.append(0)
+
+            links_courses.append(course_index)
+            links_instructors.append(index)
+
+    # Enrollments, grouped by course
+    sizes, enrollment_students, enrollment_grades = array(
+        "I"), array("I"), array("B")
+    store = getattr(sms, "_store", None)
+
+    for course in sms.courses.values():
+        if store is not None:
+            rows = list(store.iter_course_rows(course._ordinal))
+            enrollment_students.extend(index_student(
+                store.student_ids[store.students[row]]) for row in rows)
+            enrollment_grades.extend(store.grades[row] for row in rows)
+        else:
+            rows = course.enrolled_students.items()
+            enrollment_students.extend(
+                index_student(id_number) for id_number, _ in rows)
+            enrollment_grades.extend(
+                grade_codes[enrollment.grade] for _, enrollment in rows)
+
+        sizes.append(len(rows))
+
+    # Enrollment rows of every student, as offsets into one array
+    offsets = array("I", bytes(4 * (len(student_index) + 1)))
+
+    for index in enrollment_students:
+        offsets[index + 1] += 1
+
+    for index in range(len(student_index)):
+        offsets[index + 1] += offsets[index]
+
+    positions = array("I", offsets)
+    student_rows = array("I", bytes(4 * len(enrollment_students)))
+
+    for row, index in enumerate(enrollment_students):
+        student_rows[positions[index]] = row
+        positions[index] += 1
+
+    students = sms.students.values()
+
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, _BYTE_ORDERS[sys.byteorder]))
+
+        for enum in (Major, Department, CourseNameId, Grade):
+            _write_strings(file, [member.name for member in enum])
+
+        _write_strings(file, list(sms.students))
+        _write_strings(file, [student.first_name for student in students])
+        _write_strings(file, [student.last_name for student in students])
+        _write_array(file, array(
+            "B", (major_codes[student.major] for student in students)))
+
+        _write_strings(
+            file, [instructor.id_number for instructor in instructors])
+        _write_strings(
+            file, [instructor.first_name for instructor in instructors])
+        _write_strings(
+            file, [instructor.last_name for instructor in instructors])
+        _write_array(file, array(
+            "B", (department_codes[instructor.department] for instructor in instructors)))
+        _write_array(file, registered)
+
+        _write_array(file, array(
+            "B", (course_codes[course_id] for course_id in sms.courses)))
+        _write_array(file, sizes)
+        _write_array(file, links_courses)
+        _write_array(file, links_instructors)
+
+        _write_strings(file, orphan_student_ids)
+        _write_array(file, enrollment_students)
+        _write_array(file, enrollment_grades)
+
+        _write_array(file, offsets)
+        _write_array(file, student_rows)
+
+
+def read_snapshot(path: Union[str, os.PathLike]) -> SnapshotData:
+    """
+    Reads the columns of a snapshot file through a memory map.
+
+    Args:
+        path (Union[str, os.PathLike]): The snapshot file to read.
+
+    Returns:
+        SnapshotData: The columns stored in the snapshot.
+
+    Raises:
+        ValueError: If the file is not a snapshot or was written by an unsupported version.
+    """
+
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        with memoryview(mapped) as view:
+            if len(view) < _HEADER.size:
+                raise ValueError(f"{path} is not a snapshot file.")
+
+            magic, version, byte_order = _HEADER.unpack_from(view)
+
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a snapshot file.")
+
+            if version != VERSION:
+                raise ValueError(
+                    f"Snapshot version {version} of {path} is not supported, expected version {VERSION}.")
+
+            reader = _Reader(view, swap=byte_order !=
+                             _BYTE_ORDERS[sys.byteorder])
+            data = SnapshotData()
+
+            data.majors = [Major[name] for name in reader.strings()]
+            data.departments = [Department[name]
+                                for name in reader.strings()]
+            data.course_name_ids = [CourseNameId[name]
+                                    for name in reader.strings()]
+            data.grades = [Grade[name] for name in reader.strings()]
+
+            data.student_ids = reader.strings()
+            data.student_first_names = reader.strings()
+            data.student_last_names = reader.strings()
+            data.student_majors = reader.array("B")
+
+            data.instructor_ids = reader.strings()
+            data.instructor_first_names = reader.strings()
+            data.instructor_last_names = reader.strings()
+            data.instructor_departments = reader.array("B")
+            data.instructor_registered = reader.array("B")
+
+            data.course_codes = reader.array("B")
+            data.course_sizes = reader.array("I")
+            data.course_instructor_courses = reader.array("H")
+            data.course_instructor_instructors = reader.array("I")
+
+            data.orphan_student_ids = reader.strings()
+            data.enrollment_students = reader.array("I")
+            data.enrollment_grades = reader.array("B")
+
+            data.student_row_offsets = reader.array("I")
+            data.student_rows = reader.array("I")
+
+    return data
+
+
+def _vanilla_people(cls: type, ids: List[str], first_names: List[str], last_names: List[str], field: str, values: List[Any]) -> List[Any]:
+    """
+    Builds vanilla students or instructors without running their constructors.
+    """
+
+    new = object.__new__
+    people = []
+
+    for id_number, first_name, last_name, value in zip(ids, first_names, last_names, values):
+        person = new(cls)
+        person.first_name = first_name
+        person.last_name = last_name
+        person.name = f"{first_name} {last_name}"
+        person.id_number = id_number
+        setattr(person, field, value)
+        people.append(person)
+
+    return people
+
+
+def _pydantic_people(cls: type, ids: List[str], first_names: List[str], last_names: List[str], field: str, values: List[Any]) -> List[Any]:
+    """
+    Builds pydantic students or instructors without running their validators.
+    """
+
+    return cls.from_trusted_many(first_names, last_names, ids, **{field: values})
+
+
+def load_system(data: SnapshotData, backend: str) -> Any:
+    """
+    Builds a StudentManagementSystem of the given backend from the columns of a snapshot.
+
+    Args:
+        data (SnapshotData): The columns read by `read_snapshot`.
+        backend (str): One of "vanilla", "pydantic", "columnar" or "threadsafe".
+
+    Returns:
+        StudentManagementSystem: The restored system with all of its indexes built.
+    """
+
+    # Every object built here stays alive, so the collections its allocations would trigger only rescan
+    # the growing heap. They are paused until the system is complete, which matters most for pydantic
+    enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        return _build_system(data, backend)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _build_system(data: SnapshotData, backend: str) -> Any:
+    """
+    Builds the system for `load_system`.
+    """
+
+    if backend == "pydantic":
+        from utils.pydantic.student_management_system import Student, Instructor, Course, Enrollment, StudentManagementSystem
+        make_people = _pydantic_people
+    elif backend == "columnar":
+        from utils.columnar.student_management_system import Student, Instructor, Course, Enrollment, StudentManagementSystem
+        make_people = _vanilla_people
+    elif backend == "threadsafe":
+        from utils.threadsafe.student_management_system import Student, Instructor, Course, Enrollment, StudentManagementSystem
+        make_people = _vanilla_people
+    else:
+        from utils.vanilla.student_management_system import Student, Instructor, Course, Enrollment, StudentManagementSystem
+        make_people = _vanilla_people
+
+    sms = StudentManagementSystem()
+
+    students = make_people(Student, data.student_ids, data.student_first_names, data.student_last_names,
+                           "major", [data.majors[code] for code in data.student_majors])
+    sms.students = dict(zip(data.student_ids, students))
+    sms._index_people("students", students)
+
+    instructors = make_people(Instructor, data.instructor_ids, data.instructor_first_names, data.instructor_last_names,
+                              "department", [data.departments[code] for code in data.instructor_departments])
+    sms.instructors = {instructor.id_number: instructor for instructor, registered in zip(
+        instructors, data.instructor_registered) if registered}
+    sms._index_people("instructors", sms.instructors.values())
+
+    course_name_ids = [data.course_name_ids[code]
+                       for code in data.course_codes]
+
+    if backend == "pydantic":
+        courses = [Course.from_trusted(course_name_id)
+                   for course_name_id in course_name_ids]
+    else:
+        courses = [Course(course_name_id=course_name_id)
+                   for course_name_id in course_name_ids]
+
+    for course_index, instructor_index in zip(data.course_instructor_courses, data.course_instructor_instructors):
+        instructor = instructors[instructor_index]
+        courses[course_index].instructors[instructor.id_number] = instructor
+
+    all_student_ids = data.student_ids + data.orphan_student_ids
+
+    if backend == "columnar":
+        _load_store(sms, data, courses, all_student_ids)
+    else:
+        grades = data.grades
+        start = 0
+
+        for course, size in zip(courses, data.course_sizes):
+            course_id = course.course_id
+            id_numbers = list(map(all_student_ids.__getitem__,
+                                  data.enrollment_students[start:start + size]))
+            course_grades = map(grades.__getitem__,
+                                data.enrollment_grades[start:start + size])
+
+            if backend == "pydantic":
+                course.enrolled_students.update(zip(id_numbers, Enrollment.from_trusted_many(
+                    id_numbers, course_id, course_grades)))
+            else:
+                course.enrolled_students.update(
+                    (id_number, Enrollment(id_number=id_number, course_id=course_id, grade=grade))
+                    for id_number, grade in zip(id_numbers, course_grades))
+
+            start += size
+
+        for course in courses:
+            sms.courses[course.course_id] = course
+            sms._bind_course(course=course)
+
+    return sms
+
+
+def _load_store(sms: Any, data: SnapshotData, courses: List[Any], all_student_ids: List[str]) -> None:
+    """
+    Fills the `EnrollmentStore` of a columnar system straight from the snapshot arrays.
+    """
+
+    from utils.columnar.enrollment_store import GRADE_CODES
+
+    store = sms._store
+    store.student_ids = all_student_ids
+    store.student_ordinals = dict(
+        zip(all_student_ids, range(len(all_student_ids))))
+    store.course_ids = [course.course_id for course in courses]
+    store.course_ordinals = {course_id: ordinal for ordinal,
+                             course_id in enumerate(store.course_ids)}
+
+    # Student indexes of the snapshot are the store's student ordinals, and course indexes its course ordinals
+    store.students = data.enrollment_students
+    store.grades = array("B", data.enrollment_grades.tobytes().translate(
+        bytes(GRADE_CODES[grade] for grade in data.grades).ljust(256, b"\x00")))
+    store.courses = array("H")
+    store.course_rows = []
+    start = 0
+
+    for ordinal, size in enumerate(data.course_sizes):
+        store.courses.extend(array("H", (ordinal,)) * size)
+        store.course_rows.append(array("I", range(start, start + size)))
+        start += size
+
+    store.course_sizes = array("I", data.course_sizes)
+
+    offsets, rows = data.student_row_offsets, data.student_rows
+    store.student_rows = [rows[offsets[ordinal]:offsets[ordinal + 1]] if offsets[ordinal] != offsets[ordinal + 1] else None
+                          for ordinal in range(len(all_student_ids))]
+    store.removed = 0
+
+    for ordinal, course in enumerate(courses):
+        course._system = sms
+        course._store = store
+        course._ordinal = ordinal
+        sms.courses[course.course_id] = course
+
+        sms._count_course_grades(course)
+
+        for instructor in course.instructors.values():
+            sms._index_instructor(course=course, instructor=instructor)
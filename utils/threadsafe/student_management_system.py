@@ -0,0 +1,419 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Set, Tuple
+
+from utils.vanilla.student import Student
+from utils.vanilla.instructor import Instructor
+from utils.vanilla.course import Course
+from utils.vanilla.enrollment import Enrollment
+from utils.vanilla.student_management_system import StudentManagementSystem as VanillaStudentManagementSystem
+from utils.analytics import CourseStats
+from utils.bitmaps import CourseBitmapIndex
+from utils.enums.grade import Grade
+from utils.events import EnrollmentGraded, StudentEnrolled
+from utils.snapshot import load_system, read_snapshot
+from utils.views import SystemView
+
+
+class LockStripes:
+    """
+    A fixed set of locks shared by any number of keys, each key always mapping to the same lock.
+
+    Attributes:
+        locks (List[threading.Lock]): The locks, indexed by stripe.
+    """
+
+    __slots__ = ("locks",)
+
+    def __init__(self, count: int) -> None:
+        """
+        Initializes a LockStripes instance.
+
+        Args:
+            count (int): The number of locks. More stripes mean fewer unrelated keys sharing a lock.
+        """
+
+        self.locks = [threading.Lock() for _ in range(count)]
+
+    def __getstate__(self) -> int:
+        """
+        Returns the number of locks, as locks themselves can not be pickled or copied.
+
+        Returns:
+            int: The number of locks.
+        """
+
+        return len(self.locks)
+
+    def __setstate__(self, count: int) -> None:
+        """
+        Recreates the locks of a pickled or copied instance, all released.
+
+        Args:
+            count (int): The number of locks returned by `__getstate__`.
+        """
+
+        self.locks = [threading.Lock() for _ in range(count)]
+
+    def lock(self, key: Hashable) -> threading.Lock:
+        """
+        Returns the lock of a single key, to be used as a context manager.
+
+        Args:
+            key (Hashable): The key to lock.
+        """
+
+        return self.locks[hash(key) % len(self.locks)]
+
+    def locked(self, keys: Iterable[Hashable]) -> "_HeldLocks":
+        """
+        Returns a context manager holding the locks of the given keys, acquired in stripe order so that concurrent callers can not deadlock.
+
+        Args:
+            keys (Iterable[Hashable]): The keys to lock.
+        """
+
+        count = len(self.locks)
+
+        return _HeldLocks([self.locks[stripe] for stripe in sorted({hash(key) % count for key in keys})])
+
+    def locked_all(self) -> "_HeldLocks":
+        """
+        Returns a context manager holding every lock of the stripes.
+        """
+
+        return _HeldLocks(self.locks)
+
+
+class _HeldLocks:
+    """
+    Acquires a list of locks in order on entry and releases them in reverse order on exit.
+    """
+
+    __slots__ = ("locks",)
+
+    def __init__(self, locks: List[threading.Lock]) -> None:
+        self.locks = locks
+
+    def __enter__(self) -> None:
+        for lock in self.locks:
+            lock.acquire()
+
+    def __exit__(self, *exc_info: object) -> None:
+        for lock in reversed(self.locks):
+            lock.release()
+
+
+class StudentManagementSystem(VanillaStudentManagementSystem):
+    """
+    Manages students, instructors, courses, and enrollments within an educational institution, safely under concurrent use.
+
+    This class exposes the same methods as the vanilla `StudentManagementSystem` and guards them with
+    three sets of striped locks, keyed by course ID, student ID and instructor ID, instead of one
+    global lock. Operations on different courses and students take different locks and run concurrently.
+
+    Deadlocks are avoided with a fixed acquisition order: course locks first, then student locks,
+    then instructor locks, each set in stripe order. Operations that only learn which courses they
+    touch from an index, such as `remove_student`, read the index, lock those courses and the
+    entity, then check that the index did not change in the meantime, retrying if it did.
+
+    Attributes:
+        students (Dict[str, Student]): A dictionary mapping student IDs to `Student` instances.
+        instructors (Dict[str, Instructor]): A dictionary mapping instructor IDs to `Instructor` instances.
+        courses (Dict[str, Course]): A dictionary mapping course IDs to `Course` instances.
+
+    Notes:
+        Only the methods of the system are guarded. Changes made directly on a registered `Course`
+        are not, and the dictionaries returned by `find_course_enrollments` are the live ones.
+    """
+
+    def __init__(self, stripes: int = 64) -> None:
+        """
+        Initializes the StudentManagementSystem with empty dictionaries for students, instructors, and courses, and its lock stripes.
+
+        Args:
+            stripes (int, optional): The number of locks per kind of key. Defaults to 64.
+        """
+
+        super().__init__()
+
+        self._course_locks = LockStripes(stripes)
+        self._student_locks = LockStripes(stripes)
+        self._instructor_locks = LockStripes(stripes)
+
+    @contextmanager
+    def _locked_with_courses(self, index: Dict[str, Set[str]], locks: LockStripes, id_number: str) -> Iterator[Set[str]]:
+        """
+        Holds the locks of a student or instructor and of every course the index lists for them.
+
+        The courses are read from the index before they are locked, so the index is checked again
+        once every lock is held and the locking is retried if it changed in the meantime.
+
+        Args:
+            index (Dict[str, Set[str]]): The index mapping the ID to its course IDs.
+            locks (LockStripes): The lock stripes of the ID.
+            id_number (str): The student or instructor ID.
+
+        Yields:
+            Set[str]: The IDs of the locked courses.
+        """
+
+        while True:
+            with locks.lock(id_number):
+                course_ids = set(index.get(id_number, ()))
+
+            with self._course_locks.locked(course_ids), locks.lock(id_number):
+                if set(index.get(id_number, ())) == course_ids:
+                    yield course_ids
+                    return
+
+    def add_student(self, student: Student) -> None:
+        with self._student_locks.lock(student.id_number):
+            super().add_student(student)
+
+    def add_students_many(self, students: Iterable[Student]) -> None:
+        students = list(students)
+
+        with self._student_locks.locked(student.id_number for student in students):
+            super().add_students_many(students)
+
+    def update_student(self, student: Student) -> None:
+        with self._student_locks.lock(student.id_number):
+            super().update_student(student)
+
+    def remove_student(self, id_number: str) -> None:
+        with self._locked_with_courses(self._student_courses, self._student_locks, id_number):
+            super().remove_student(id_number)
+
+    def add_instructor(self, instructor: Instructor) -> None:
+        with self._instructor_locks.lock(instructor.id_number):
+            super().add_instructor(instructor)
+
+    def add_instructors_many(self, instructors: Iterable[Instructor]) -> None:
+        instructors = list(instructors)
+
+        with self._instructor_locks.locked(instructor.id_number for instructor in instructors):
+            super().add_instructors_many(instructors)
+
+    def update_instructor(self, instructor: Instructor) -> None:
+        with self._locked_with_courses(self._instructor_courses, self._instructor_locks, instructor.id_number):
+            super().update_instructor(instructor)
+
+    def remove_instructor(self, id_number: str) -> None:
+        with self._locked_with_courses(self._instructor_courses, self._instructor_locks, id_number):
+            super().remove_instructor(id_number)
+
+    def find_instructor_courses(self, id_number: str) -> List[str]:
+        with self._instructor_locks.lock(id_number):
+            return super().find_instructor_courses(id_number)
+
+    def add_course(self, course: Course) -> None:
+        with self._course_locks.lock(course.course_id), \
+                self._student_locks.locked(course.enrolled_students), \
+                self._instructor_locks.locked(course.instructors):
+            super().add_course(course)
+
+    def add_courses_many(self, courses: Iterable[Course]) -> None:
+        courses = list(courses)
+
+        with self._course_locks.locked(course.course_id for course in courses), \
+                self._student_locks.locked(id_number for course in courses for id_number in course.enrolled_students), \
+                self._instructor_locks.locked(id_number for course in courses for id_number in course.instructors):
+            super().add_courses_many(courses)
+
+    def update_course(self, course: Course) -> None:
+        with self._course_locks.lock(course.course_id):
+            # The replaced course can only be read once its lock is held
+            found_course = self.courses.get(course.course_id, course)
+
+            with self._student_locks.locked({*found_course.enrolled_students, *course.enrolled_students}), \
+                    self._instructor_locks.locked({*found_course.instructors, *course.instructors}):
+                super().update_course(course)
+
+    def remove_course(self, course_id: str) -> None:
+        with self._course_locks.lock(course_id):
+            course = self.courses.get(course_id)
+            id_numbers = course.enrolled_students if course is not None else ()
+            instructor_ids = course.instructors if course is not None else ()
+
+            with self._student_locks.locked(id_numbers), self._instructor_locks.locked(instructor_ids):
+                super().remove_course(course_id)
+
+    def enroll_student(self, id_number: str, course_id: str) -> None:
+        """
+        Enrolls a student in a specific course.
+
+        Unlike the vanilla method, the course is not written back with `update_course`: the course
+        and the student stay locked from the lookup to the enrollment.
+
+        Args:
+            id_number (str): The unique identifier of the student to enroll.
+            course_id (str): The unique identifier of the course.
+
+        Raises:
+            KeyError: If the student does not exist in the system.
+            KeyError: If the course does not exist in the system.
+            ValueError: If the student is already enrolled in the course.
+        """
+
+        with self._course_locks.lock(course_id), self._student_locks.lock(id_number):
+            student = self.find_student(id_number=id_number)
+            course = self.find_course(course_id=course_id)
+
+            if student is None:
+                raise KeyError(
+                    f"Student with ID {id_number} does not exist and can not be enrolled in this management system.")
+
+            if course is None:
+                raise KeyError(
+                    f"Course with ID {course_id} does not exist in this management system. Student with ID {id_number} was not enrolled.")
+
+            # Enroll the student in the course
+            course._add_student(enrollment=Enrollment(
+                id_number=id_number, course_id=course_id))
+
+            if self._journal is not None:
+                self._journal.record("enroll", [(id_number, course_id)])
+
+            if self._events is not None:
+                self._events.publish([StudentEnrolled(id_number, course_id)])
+
+    def enroll_many(self, enrollments: Iterable[Tuple[str, str]]) -> None:
+        enrollments = list(enrollments)
+
+        with self._course_locks.locked(course_id for _, course_id in enrollments), \
+                self._student_locks.locked(id_number for id_number, _ in enrollments):
+            super().enroll_many(enrollments)
+
+    def grade_many(self, grades: Iterable[Tuple[str, str, Grade]]) -> None:
+        grades = list(grades)
+
+        with self._course_locks.locked(course_id for _, course_id, _ in grades), \
+                self._student_locks.locked(id_number for id_number, _, _ in grades):
+            super().grade_many(grades)
+
+    def grade_student(self, id_number: str, course_id: str, grade: Grade) -> None:
+        """
+        Assigns a grade to a student for a specific course.
+
+        Unlike the vanilla method, the course is not written back with `update_course`: the course
+        and the student stay locked from the lookup to the grade assignment.
+
+        Args:
+            id_number (str): The unique identifier of the student.
+            course_id (str): The unique identifier of the course.
+            grade (Grade): The grade to assign.
+
+        Raises:
+            KeyError: If the student or course does not exist in the system.
+            ValueError: If the student is not enrolled in the course.
+        """
+
+        with self._course_locks.lock(course_id), self._student_locks.lock(id_number):
+            student = self.find_student(id_number=id_number)
+            course = self.find_course(course_id=course_id)
+
+            if student is None:
+                raise KeyError(
+                    f"Student with ID {id_number} does not exist and can not be assigned a grade in this management system.")
+
+            if course is None:
+                raise KeyError(
+                    f"Course with ID {course_id} does not exist in this management system. Student with ID {id_number} was not assigned a grade.")
+
+            enrolled_student = course.find_enrolled_student(
+                id_number=id_number)
+
+            if enrolled_student is None:
+                raise ValueError(
+                    f"Student with ID {id_number}, is not enrolled in this course: {course.enrolled_students}. Grade was not assigned.")
+
+            # Enrollments shared with open snapshots are replaced instead of changed in place
+            if self._snapshots:
+                enrolled_student = Enrollment(
+                    id_number=id_number, course_id=course_id, grade=enrolled_student.grade)
+
+            # Assign a grade and update the student enrollment in the course
+            previous_grade = enrolled_student.grade
+            enrolled_student.assign_grade(grade=grade)
+            course._update_student(enrollment=enrolled_student)
+
+            if self._journal is not None:
+                self._journal.record("grade", (id_number, course_id, grade))
+
+            if self._events is not None:
+                self._events.publish([EnrollmentGraded(id_number, course_id, grade, previous_grade)])
+
+    def find_student_enrollments(self, id_number: str) -> Dict[str, List[Enrollment]]:
+        # Every change to the enrollments of a student holds the student's lock, so its courses need not be locked
+        with self._student_locks.lock(id_number):
+            return super().find_student_enrollments(id_number)
+
+    def find_course_enrollments_by_grade(self, course_id: str, grade: Grade) -> Dict[str, Enrollment]:
+        with self._course_locks.lock(course_id):
+            return super().find_course_enrollments_by_grade(course_id, grade)
+
+    def find_course_stats(self, course_id: str) -> CourseStats:
+        # The copy is taken while no enrollment of the course can change
+        with self._course_locks.lock(course_id):
+            return super().find_course_stats(course_id)
+
+    @classmethod
+    def load_snapshot(cls, path: str) -> "StudentManagementSystem":
+        """
+        Loads a system saved with `save_snapshot`, by any backend.
+
+        Args:
+            path (str): The snapshot file to read.
+
+        Returns:
+            StudentManagementSystem: The restored system with all of its indexes built.
+
+        Raises:
+            ValueError: If the file is not a snapshot or was written by an unsupported version.
+        """
+
+        return load_system(read_snapshot(path), backend="threadsafe")
+
+    def snapshot(self) -> SystemView:
+        """
+        Takes a consistent, read-only view of the whole system, between two operations.
+
+        Returns:
+            SystemView: The view, to be closed once it is no longer needed.
+        """
+
+        with self._exclusive():
+            return super().snapshot()
+
+    def _search_names(self, kind: str, query: str, limit: int, fuzzy: bool) -> List[Any]:
+        if kind in self._name_indexes:
+            # The index has its own lock, searches run alongside writers
+            return super()._search_names(kind, query, limit, fuzzy)
+
+        locks = self._student_locks if kind == "students" else self._instructor_locks
+
+        # The first search builds the index while no person of its kind can change
+        with locks.locked_all():
+            return super()._search_names(kind, query, limit, fuzzy)
+
+    def _course_bitmap_index(self) -> CourseBitmapIndex:
+        if self._course_bitmaps is not None:
+            # The index has its own lock, queries run alongside writers
+            return self._course_bitmaps
+
+        # The first query builds the index while no course or student can change
+        with self._course_locks.locked_all(), self._student_locks.locked_all():
+            return super()._course_bitmap_index()
+
+    def verify_indexes(self) -> None:
+        with self._exclusive():
+            super().verify_indexes()
+
+    def save_snapshot(self, path: str) -> None:
+        with self._exclusive():
+            super().save_snapshot(path)
+
+    def _exclusive(self) -> "_HeldLocks":
+        # Every lock, in the order writers take them: course locks, then student locks, then instructor locks
+        return _HeldLocks(self._course_locks.locks + self._student_locks.locks + self._instructor_locks.locks)
@@ -0,0 +1,397 @@
+"""
+Transactions and batches of changes to a StudentManagementSystem.
+
+`Transaction` applies changes as they are made and keeps an undo log of them. If the block raises,
+the changes are undone in reverse order, in time proportional to the number of changes rather than
+to the size of the system:
+
+    with sms.transaction():
+        sms.add_student(student)
+        sms.enroll_student(student.id_number, course_id)
+        ...
+
+The undo log is the list of change events of `utils.events`, which carry the previous version of
+whatever they change, so changes made directly on a registered `Course`, such as
+`Course.remove_student`, are undone too. While a transaction is open, journal records and events are held back and
+only handed to the journal and to subscribers once it commits, so neither ever sees a change that
+is rolled back.
+
+`Batch` buffers changes without applying them, then applies them when the block ends, inside a
+transaction. Additions, enrollments and grades are merged into as few calls of the matching bulk
+method (`add_students_many`, `enroll_many`, `grade_many`, ...) as their dependencies allow, so each
+run is validated in a single pass and indexed once:
+
+    with sms.batch() as batch:
+        batch.add_student(student)
+        batch.enroll_student(student.id_number, course_id)
+
+Notes:
+    On the thread-safe backend a transaction only records and undoes the changes of its own thread,
+    and it does not isolate them from concurrent writers.
+"""
+import gc
+import importlib
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.enums.grade import Grade
+from utils.events import (AsyncSubscription, ChangeEvent, CourseAdded, CourseRemoved, CourseReplaced, EnrollmentGraded,
+                          EventBus, InstructorAdded, InstructorAssigned, InstructorRemoved, InstructorUnassigned,
+                          InstructorUpdated, StudentAdded, StudentEnrolled, StudentRemoved, StudentUnenrolled,
+                          StudentUpdated, Subscription)
+
+
+def _undo_student_removed(system: Any, event: StudentRemoved) -> None:
+    student = event.student
+    system.add_student(student)
+
+    for course_id, grade in zip(event.course_ids, event.grades):
+        system.enroll_student(student.id_number, course_id)
+
+        if grade is not Grade.NO_GRADE:
+            system.grade_student(student.id_number, course_id, grade)
+
+
+def _undo_instructor_removed(system: Any, event: InstructorRemoved) -> None:
+    instructor = event.instructor
+    system.add_instructor(instructor)
+
+    for course_id in event.course_ids:
+        system.courses[course_id].add_instructor(instructor=instructor)
+
+
+def _undo_student_unenrolled(system: Any, event: StudentUnenrolled) -> None:
+    # The enrollment goes back with its grade, even for a student no longer registered in the system
+    module = importlib.import_module(type(system).__module__)
+    system.courses[event.course_id].add_student(enrollment=module.Enrollment(
+        id_number=event.id_number, course_id=event.course_id, grade=event.grade))
+
+
+# Event type -> the change undoing it
+UNDO: Dict[type, Callable[[Any, Any], None]] = {
+    StudentAdded: lambda system, event: system.remove_student(event.student.id_number),
+    StudentUpdated: lambda system, event: system.update_student(event.previous),
+    StudentRemoved: _undo_student_removed,
+    InstructorAdded: lambda system, event: system.remove_instructor(event.instructor.id_number),
+    InstructorUpdated: lambda system, event: system.update_instructor(event.previous),
+    InstructorRemoved: _undo_instructor_removed,
+    CourseAdded: lambda system, event: system.remove_course(event.course.course_id),
+    CourseReplaced: lambda system, event: system.update_course(event.previous),
+    CourseRemoved: lambda system, event: system.add_course(event.course),
+    StudentEnrolled: lambda system, event: system.courses[event.course_id].remove_student(id_number=event.id_number),
+    EnrollmentGraded: lambda system, event: system.grade_student(event.id_number, event.course_id, event.previous_grade),
+    StudentUnenrolled: _undo_student_unenrolled,
+    InstructorAssigned: lambda system, event: system.courses[event.course_id].remove_instructor(id_number=event.instructor.id_number),
+    InstructorUnassigned: lambda system, event: system.courses[event.course_id].add_instructor(instructor=event.instructor),
+}
+
+
+class Transaction:
+    """
+    A group of changes to a system applied as a whole or not at all.
+
+    While open, the transaction stands in for the journal and the event bus of the system, both
+    reached through `record` and `publish`. A transaction opened inside another one on the same thread
+    is a savepoint: it only rolls back its own changes, and commits with the outer transaction.
+    """
+
+    def __init__(self, system: Any) -> None:
+        """
+        Initializes a Transaction instance.
+
+        Args:
+            system (Any): The StudentManagementSystem to change.
+        """
+
+        self._system = system
+        self._thread = threading.get_ident()
+        self._outer: Optional["Transaction"] = None
+        self._mark = (0, 0)
+        self._rolling_back = False
+
+        # Changes of the transaction, oldest first: their events, which are also the undo log, the end
+        # of each change's events in that list, and journal records as (operation, argument) pairs.
+        # Events are kept flat, as every object held until the end adds to the work of the garbage collector.
+        self._events: List[ChangeEvent] = []
+        self._ends: List[int] = []
+        self._records: List[Tuple[str, Any]] = []
+
+        # The journal and bus of the system, restored when the transaction ends
+        self._journal: Optional[Any] = None
+        self._bus: Optional[EventBus] = None
+
+    def __enter__(self) -> "Transaction":
+        system = self._system
+        current = system._events
+
+        if isinstance(current, Transaction):
+            if current._thread != self._thread:
+                raise RuntimeError(
+                    "Another thread has a transaction open on this management system.")
+
+            self._outer = current
+            self._mark = (len(current._ends), len(current._records))
+
+            return self
+
+        self._journal, self._bus = system._journal, current
+        system._journal = system._events = self
+
+        return self
+
+    def __exit__(self, exc_type: Optional[type], exc: Optional[BaseException], traceback: Any) -> None:
+        if self._outer is not None:
+            if exc_type is not None:
+                self._outer._rollback(*self._mark)
+
+            return
+
+        try:
+            if exc_type is not None:
+                self._rollback(0, 0)
+            elif self._journal is not None:
+                # Journaled while the transaction is still attached, as `Journal.checkpoint` refuses to run
+                # during a transaction but would fold in applied changes whose records are still held back
+                for operation, argument in self._records:
+                    self._journal.record(operation, argument)
+        finally:
+            system = self._system
+            bus = self._bus
+            system._journal = self._journal
+            system._events = bus if bus is not None and len(bus) else None
+
+        if exc_type is None:
+            self._commit()
+
+    def _commit(self) -> None:
+        """
+        Hands the held back events over to the subscribers, once the journal has the records of the transaction.
+        """
+
+        bus = self._system._events
+
+        if bus is not None:
+            events, start = self._events, 0
+
+            for end in self._ends:
+                bus.publish(events[start:end])
+                start = end
+
+    def _rollback(self, changes: int, records: int) -> None:
+        """
+        Undoes the changes made after the first ones, newest first.
+
+        Args:
+            changes (int): The number of changes to keep.
+            records (int): The number of journal records written by those changes.
+        """
+
+        system = self._system
+        events, ends = self._events, self._ends
+        self._rolling_back = True
+
+        try:
+            while len(ends) > changes:
+                ends.pop()
+                start = ends[-1] if ends else 0
+
+                while len(events) > start:
+                    event = events.pop()
+                    UNDO[type(event)](system, event)
+        finally:
+            self._rolling_back = False
+
+        del self._records[records:]
+
+    def record(self, operation: str, argument: Any) -> None:
+        """
+        Holds back a journal record until the transaction commits. Called by the system for every change.
+        """
+
+        if self._journal is None:
+            return
+
+        if threading.get_ident() != self._thread:
+            self._journal.record(operation, argument)
+        elif not self._rolling_back:
+            self._records.append((operation, argument))
+
+    def publish(self, events: List[ChangeEvent]) -> None:
+        """
+        Logs the events of a change until the transaction ends. Called by the system for every change.
+        """
+
+        if threading.get_ident() != self._thread:
+            if self._bus is not None:
+                self._bus.publish(events)
+        elif not self._rolling_back:
+            self._events.extend(events)
+            self._ends.append(len(self._events))
+
+    def subscribe(self, *args: Any, **kwargs: Any) -> Subscription:
+        return self._event_bus().subscribe(*args, **kwargs)
+
+    def subscribe_async(self, *args: Any, **kwargs: Any) -> AsyncSubscription:
+        return self._event_bus().subscribe_async(*args, **kwargs)
+
+    def _event_bus(self) -> EventBus:
+        """
+        Returns the bus the system had before the transaction, creating it for subscriptions made while the transaction is open.
+        """
+
+        if self._outer is not None:
+            return self._outer._event_bus()
+
+        if self._bus is None:
+            self._bus = EventBus(on_idle=self._system._detach_events)
+
+        return self._bus
+
+
+# Single-row operations of a batch -> the bulk method applying a run of them
+BULK_OPERATIONS: Dict[str, str] = {
+    "add_student": "add_students_many",
+    "add_instructor": "add_instructors_many",
+    "add_course": "add_courses_many",
+    "enroll_student": "enroll_many",
+    "grade_student": "grade_many",
+}
+
+# Bulk operation -> the operations whose changes it may rely on, which it is never moved ahead of
+DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    "add_student": (),
+    "add_instructor": (),
+    "add_course": ("add_instructor",),
+    "enroll_student": ("add_student", "add_course"),
+    "grade_student": ("add_student", "add_course", "enroll_student"),
+}
+
+
+class Batch:
+    """
+    Changes buffered by `StudentManagementSystem.batch` and applied together when the block ends.
+
+    The changes are applied inside a `Transaction`, so if any of them is rejected none is kept. If
+    the block itself raises, nothing is applied. An addition, enrollment or grade joins the latest
+    run of its kind, unless a change it may rely on, or any update or removal, was made after that
+    run. Otherwise changes are applied in the order they were made.
+    """
+
+    def __init__(self, system: Any) -> None:
+        """
+        Initializes a Batch instance.
+
+        Args:
+            system (Any): The StudentManagementSystem to change.
+        """
+
+        self._system = system
+
+        # Runs of changes as (operation, arguments) pairs, in the order they are applied
+        self._operations: List[Tuple[str, List[Any]]] = []
+
+    def _buffer(self, operation: str, arguments: Any) -> None:
+        operations = self._operations
+        dependencies = DEPENDENCIES.get(operation)
+
+        if dependencies is not None:
+            for earlier, earlier_arguments in reversed(operations):
+                if earlier == operation:
+                    earlier_arguments.extend(arguments)
+                    return
+
+                if earlier in dependencies or earlier not in DEPENDENCIES:
+                    break
+
+        operations.append((operation, list(arguments)))
+
+    def add_student(self, student: Any) -> None:
+        self._buffer("add_student", (student,))
+
+    def add_students_many(self, students: Any) -> None:
+        self._buffer("add_student", students)
+
+    def update_student(self, student: Any) -> None:
+        self._buffer("update_student", (student,))
+
+    def remove_student(self, id_number: str) -> None:
+        self._buffer("remove_student", (id_number,))
+
+    def add_instructor(self, instructor: Any) -> None:
+        self._buffer("add_instructor", (instructor,))
+
+    def add_instructors_many(self, instructors: Any) -> None:
+        self._buffer("add_instructor", instructors)
+
+    def update_instructor(self, instructor: Any) -> None:
+        self._buffer("update_instructor", (instructor,))
+
+    def remove_instructor(self, id_number: str) -> None:
+        self._buffer("remove_instructor", (id_number,))
+
+    def add_course(self, course: Any) -> None:
+        self._buffer("add_course", (course,))
+
+    def add_courses_many(self, courses: Any) -> None:
+        self._buffer("add_course", courses)
+
+    def update_course(self, course: Any) -> None:
+        self._buffer("update_course", (course,))
+
+    def remove_course(self, course_id: str) -> None:
+        self._buffer("remove_course", (course_id,))
+
+    def enroll_student(self, id_number: str, course_id: str) -> None:
+        self._buffer("enroll_student", ((id_number, course_id),))
+
+    def enroll_many(self, enrollments: Any) -> None:
+        self._buffer("enroll_student", enrollments)
+
+    def grade_student(self, id_number: str, course_id: str, grade: Grade) -> None:
+        self._buffer("grade_student", ((id_number, course_id, grade),))
+
+    def grade_many(self, grades: Any) -> None:
+        self._buffer("grade_student", grades)
+
+    def __len__(self) -> int:
+        return sum(len(arguments) for _, arguments in self._operations)
+
+    def apply(self) -> None:
+        """
+        Applies the buffered changes as one transaction and empties the batch.
+
+        Raises:
+            BulkOperationError: If a run of bulk changes is rejected, after undoing the changes applied before it.
+            KeyError: If a single change is rejected, after undoing the changes applied before it.
+            ValueError: If a single change is rejected, after undoing the changes applied before it.
+        """
+
+        system = self._system
+        operations, self._operations = self._operations, []
+
+        # The changes and their undo log stay alive until the end, so collections triggered by their
+        # allocations would only rescan the whole system
+        enabled = gc.isenabled()
+        gc.disable()
+
+        try:
+            with Transaction(system):
+                for operation, arguments in operations:
+                    bulk = BULK_OPERATIONS.get(operation)
+
+                    if bulk is not None:
+                        getattr(system, bulk)(arguments)
+                    else:
+                        getattr(system, operation)(*arguments)
+        finally:
+            if enabled:
+                gc.enable()
+
+    def __enter__(self) -> "Batch":
+        return self
+
+    def __exit__(self, exc_type: Optional[type], exc: Optional[BaseException], traceback: Any) -> None:
+        if exc_type is None:
+            self.apply()
+        else:
+            self._operations = []
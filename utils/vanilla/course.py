@@ -1,6 +1,7 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from utils.enums.course_name_id import CourseNameId
+from utils.enums.grade import Grade
 from .instructor import Instructor
 from .enrollment import Enrollment
 
@@ -16,7 +17,7 @@ class Course:
         instructors (Optional[Dict[str, Instructor]]): A dictionary mapping instructor IDs to `Instructor` instances for those teaching the course, or None if no instructors are assigned.
     """
     __slots__ = ("course_name", "course_id",
-                 "enrolled_students", "instructors")
+                 "enrolled_students", "instructors", "_system")
 
     def __init__(self, course_name_id: CourseNameId, enrolled_students: Optional[Dict[str, Enrollment]] = None, instructors: Optional[Dict[str, Instructor]] = None) -> None:
         """
@@ -33,7 +34,17 @@ class Course:
         self.enrolled_students = enrolled_students if enrolled_students is not None else {}
         self.instructors = instructors if instructors is not None else {}
 
+        # The StudentManagementSystem this course is registered in, notified of enrollment and instructor changes to keep its indexes
+        # current and to journal them. Its own operations go through the underscored methods, which only keep the indexes current
+        self._system = None
+
     def add_student(self, enrollment: Enrollment) -> None:
+        self._add_student(enrollment=enrollment)
+
+        if self._system is not None:
+            self._system._record_enrollments(course=self, enrollments=[enrollment])
+
+    def _add_student(self, enrollment: Enrollment) -> None:
         # Check if the student is already enrolled in the course
         enrolled_student = self.find_enrolled_student(
             id_number=enrollment.id_number)
@@ -42,10 +53,50 @@ class Course:
             raise ValueError(
                 f"Student with ID {enrollment.id_number}, is already enrolled in this course: ({self})")
 
+        if self._system is not None:
+            self._system._preserve("courses", (self.course_id,))
+
         # Enroll the student in the course
         self.enrolled_students[enrollment.id_number] = enrollment
 
+        if self._system is not None:
+            self._system._index_enrollment(course=self, enrollment=enrollment)
+
+    def add_students_many(self, enrollments: List[Enrollment]) -> None:
+        self._add_students_many(enrollments=enrollments)
+
+        if self._system is not None:
+            self._system._record_enrollments(course=self, enrollments=enrollments)
+
+    def _add_students_many(self, enrollments: List[Enrollment]) -> None:
+        # Check all the students up front so that either every enrollment is added or none is
+        new_students = set()
+
+        for enrollment in enrollments:
+            if enrollment.id_number in self.enrolled_students or enrollment.id_number in new_students:
+                raise ValueError(
+                    f"Student with ID {enrollment.id_number}, is already enrolled in this course: ({self})")
+
+            new_students.add(enrollment.id_number)
+
+        if self._system is not None:
+            self._system._preserve("courses", (self.course_id,))
+
+        # Enroll the students in the course and index them in one pass
+        self.enrolled_students.update(
+            (enrollment.id_number, enrollment) for enrollment in enrollments)
+
+        if self._system is not None:
+            self._system._index_enrollments(
+                course=self, enrollments=enrollments)
+
     def update_student(self, enrollment: Enrollment) -> None:
+        previous_grade = self._update_student(enrollment=enrollment)
+
+        if self._system is not None:
+            self._system._record_regrade(course=self, enrollment=enrollment, previous_grade=previous_grade)
+
+    def _update_student(self, enrollment: Enrollment) -> Optional[Grade]:
         enrolled_student = self.find_enrolled_student(
             id_number=enrollment.id_number)
 
@@ -53,17 +104,41 @@ class Course:
             raise ValueError(
                 f"Student with ID {enrollment.id_number}, is not enrolled in this course: ({self})")
 
+        if self._system is not None:
+            self._system._preserve("courses", (self.course_id,))
+
         self.enrolled_students.update({
             enrollment.id_number: enrollment
         })
 
+        # The enrollment may have been regraded in place, so the previous grade is the indexed one
+        if self._system is not None:
+            return self._system._reindex_enrollment(course=self, enrollment=enrollment)
+
+        return None
+
     def remove_student(self, id_number: str) -> None:
+        enrollment = self._remove_student(id_number=id_number)
+
+        if self._system is not None:
+            self._system._record_unenrollment(course=self, enrollment=enrollment)
+
+    def _remove_student(self, id_number: str) -> Enrollment:
+        if self._system is not None:
+            self._system._preserve("courses", (self.course_id,))
+
         enrolled_student = self.enrolled_students.pop(id_number, None)
 
         if enrolled_student is None:
             raise Exception(
                 f"Student with ID {id_number}, is not enrolled in this course: ({self})")
 
+        if self._system is not None:
+            self._system._unindex_enrollment(
+                course=self, enrollment=enrolled_student)
+
+        return enrolled_student
+
     def find_enrolled_student(self, id_number: str) -> Optional[Enrollment]:
         enrolled_student = self.enrolled_students.get(id_number, None)
         return enrolled_student
@@ -76,8 +151,15 @@ class Course:
             raise ValueError(
                 f"Instructor with ID {instructor.id_number}, is already an instructor for this course: ({self})")
 
+        if self._system is not None:
+            self._system._preserve("courses", (self.course_id,))
+
         self.instructors[instructor.id_number] = instructor
 
+        if self._system is not None:
+            self._system._index_instructor(course=self, instructor=instructor)
+            self._system._record_assignment(course=self, instructor=instructor)
+
     def update_instructor(self, instructor: Instructor) -> None:
         course_instructor = self.find_instructor(
             id_number=instructor.id_number)
@@ -86,17 +168,34 @@ class Course:
             raise ValueError(
                 f"Instructor with ID {instructor.id_number}, is not an instructor for this course: ({self})")
 
+        if self._system is not None:
+            self._system._preserve("courses", (self.course_id,))
+
         self.instructors.update({
             instructor.id_number: instructor
         })
 
     def remove_instructor(self, id_number: str) -> None:
+        instructor = self._remove_instructor(id_number=id_number)
+
+        if self._system is not None:
+            self._system._record_unassignment(course=self, instructor=instructor)
+
+    def _remove_instructor(self, id_number: str) -> Instructor:
+        if self._system is not None:
+            self._system._preserve("courses", (self.course_id,))
+
         instructor = self.instructors.pop(id_number, None)
 
         if instructor is None:
             raise Exception(
                 f"Instructor with ID {id_number}, is not an instructor for this course: ({self})")
 
+        if self._system is not None:
+            self._system._unindex_instructor(course=self, instructor=instructor)
+
+        return instructor
+
     def find_instructor(self, id_number: str) -> Optional[Instructor]:
         instructor = self.instructors.get(id_number, None)
         return instructor
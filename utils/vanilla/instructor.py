@@ -13,7 +13,7 @@ class Instructor(Person):
         last_name (str): The last name of the instructor.
         department (Department): The department in which the instructor teaches.
         id_number (Optional[str]): An optional unique identifier for the instructor. 
-            If not provided, a random ID with the prefix 'INS' is generated.
+            If not provided, a time-ordered ID with the prefix 'INS' is generated.
     """
 
     __slots__ = ("first_name", "last_name", "department", "id_number")
@@ -27,7 +27,7 @@ class Instructor(Person):
             last_name (str): The last name of the instructor.
             department (str): The department in which the instructor teaches.
             id_number (Optional[str]): An optional unique identifier for the instructor. 
-                If not provided, a random ID with the prefix 'INS' is generated.
+                If not provided, a time-ordered ID with the prefix 'INS' is generated.
 
         Calls:
             super().__init__: Initializes the base Person class with the provided first name, last name, 
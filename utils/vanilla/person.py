@@ -1,6 +1,7 @@
-import uuid
 from typing import Optional
 
+from utils.ids import new_id
+
 
 class Person:
     """
@@ -8,7 +9,7 @@ class Person:
 
     Attributes:
         name (str): The full name of the person, created from the first and last names.
-        id_number (str): A unique identifier for the person. If not provided, a random ID with the 'PER' prefix is generated.
+        id_number (str): A unique identifier for the person. If not provided, a time-ordered ID with the 'PER' prefix is generated.
     """
 
     __slots__ = ("first_name", "last_name", "name", "id_number")
@@ -21,9 +22,11 @@ class Person:
             first_name (str): The first name of the person.
             last_name (str): The last name of the person.
             id_number (Optional[str]): An optional unique identifier for the person. 
-                If not provided, a random ID with the 'PER' prefix is generated.
+                If not provided, a time-ordered ID with the 'PER' prefix is generated.
         """
 
+        self.first_name = first_name
+        self.last_name = last_name
         self.name: str = f"{first_name} {last_name}"
         self.id_number = self.handle_id(
             "PER") if not id_number else id_number
@@ -38,15 +41,12 @@ class Person:
             id (Optional[str]): An optional ID. If provided, it is returned as-is.
 
         Returns:
-            str: A unique identifier with the given prefix. If no ID is provided, a new ID is generated using UUID.
+            str: A unique identifier with the given prefix. If no ID is provided, a new time-ordered ID is generated.
         """
 
         if id is None:
-            # Generate a random UUID and take only the first 8 characters
-            short_uuid = str(uuid.uuid4())[:8]
-
-            # Add the custom prefix
-            id = f"{prefix}-{short_uuid}"
+            # Generate a time-ordered ID with the custom prefix, see `utils.ids`
+            id = new_id(prefix)
         return id
 
     def __str__(self) -> str:
@@ -13,7 +13,7 @@ class Student(Person):
         last_name (str): The last name of the student.
         major (Major): The major field of study for the student.
         id_number (Optional[str]): An optional unique identifier for the student. 
-            If not provided, a random ID with prefix 'STU' is generated.
+            If not provided, a time-ordered ID with prefix 'STU' is generated.
     """
 
     __slots__ = ("first_name", "last_name", "major", "id_number")
@@ -27,7 +27,7 @@ class Student(Person):
             last_name (str): The last name of the student.
             major (str): The major field of study for the student.
             id_number (Optional[str]): An optional unique identifier for the student. 
-                If not provided, a random ID with prefix 'STU' is generated.
+                If not provided, a time-ordered ID with prefix 'STU' is generated.
 
         Calls:
             super().__init__: Initializes the base Person class with the provided or generated ID.
@@ -1,11 +1,27 @@
-from typing import Dict, List, Optional
+import asyncio
+import weakref
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from .student import Student
 from .instructor import Instructor
 from .course import Course
 from .enrollment import Enrollment
 
+from utils.analytics import CourseStats
+from utils.bitmaps import CourseBitmapIndex, CourseQuery, enrolled_in
+from utils.enums.department import Department
 from utils.enums.grade import Grade
+from utils.enums.major import Major
+from utils.errors import BulkOperationError
+from utils.events import (AsyncSubscription, CourseAdded, CourseRemoved, CourseReplaced, EnrollmentGraded, EventBus,
+                          InstructorAdded, InstructorAssigned, InstructorRemoved, InstructorUnassigned, InstructorUpdated,
+                          OverflowPolicy, StudentAdded, StudentEnrolled, StudentRemoved, StudentUnenrolled, StudentUpdated,
+                          Subscription)
+from utils.search import NameIndex
+from utils.transactions import Batch, Transaction
+from utils.snapshot import load_system, read_snapshot, write_snapshot
+from utils.views import SystemView
 
 
 class StudentManagementSystem:
@@ -32,6 +48,39 @@ class StudentManagementSystem:
         self.instructors: Dict[str, Instructor] = {}
         self.courses: Dict[str, Course] = {}
 
+        # Reverse index of student ID -> IDs of the courses the student is enrolled in
+        self._student_courses: Dict[str, Set[str]] = {}
+
+        # Reverse index of instructor ID -> IDs of the courses the instructor teaches
+        self._instructor_courses: Dict[str, Set[str]] = {}
+
+        # Journal recording every change made through the system, see `utils.journal.Journal`
+        self._journal: Optional[Any] = None
+
+        # Bus publishing the change events of the system while it has subscriptions, see `utils.events`
+        self._events: Optional[EventBus] = None
+
+        # Open read snapshots, handed the current version of every entry before it changes
+        self._snapshots: weakref.WeakSet = weakref.WeakSet()
+
+        # Name search indexes of "students" and "instructors", built by the first search of each
+        self._name_indexes: Dict[str, NameIndex] = {}
+
+        # Secondary index of major -> IDs of the students with that major
+        self._major_students: Dict[Major, Set[str]] = {}
+
+        # Secondary index of department -> IDs of the instructors in that department
+        self._department_instructors: Dict[Department, Set[str]] = {}
+
+        # Secondary index of course ID -> grade -> IDs of the students with that grade in the course
+        self._course_grades: Dict[str, Dict[Grade, Set[str]]] = {}
+
+        # Course ID -> running grade aggregates of the course
+        self._course_stats: Dict[str, CourseStats] = {}
+
+        # Bitmaps of the students of every course, built by the first set-algebra query
+        self._course_bitmaps: Optional[CourseBitmapIndex] = None
+
     def add_student(self, student: Student) -> None:
         """
         Adds a new student to the system.
@@ -49,8 +98,58 @@ class StudentManagementSystem:
             raise ValueError(
                 f"Student with ID {student.id_number} already exists in this management system.")
 
+        self._preserve("students", (student.id_number,))
+
         # Add the student to the system
         self.students[student.id_number] = student
+        self._index_people("students", (student,))
+
+        if self._journal is not None:
+            self._journal.record("add_students", [student])
+
+        if self._events is not None:
+            self._events.publish([StudentAdded(student)])
+
+    def add_students_many(self, students: Iterable[Student]) -> None:
+        """
+        Adds many new students to the system in one all-or-nothing step.
+
+        Every student is checked before any is added, so a batch with a single bad row leaves the
+        system untouched.
+
+        Args:
+            students (Iterable[Student]): The `Student` instances to add.
+
+        Raises:
+            BulkOperationError: Listing every student whose ID already exists in the system or is repeated in the batch.
+        """
+
+        students = list(students)
+        errors: List[Tuple[int, str]] = []
+        new_ids: Set[str] = set()
+
+        for row, student in enumerate(students):
+            if student.id_number in self.students or student.id_number in new_ids:
+                errors.append(
+                    (row, f"Student with ID {student.id_number} already exists in this management system."))
+
+            new_ids.add(student.id_number)
+
+        if errors:
+            raise BulkOperationError("add_students_many", errors)
+
+        self._preserve("students", [student.id_number for student in students])
+
+        # Add the students to the system
+        self.students.update(
+            (student.id_number, student) for student in students)
+        self._index_people("students", students)
+
+        if self._journal is not None:
+            self._journal.record("add_students", students)
+
+        if self._events is not None:
+            self._events.publish([StudentAdded(student) for student in students])
 
     def update_student(self, student: Student) -> None:
         """
@@ -69,9 +168,19 @@ class StudentManagementSystem:
             raise KeyError(
                 f"Student with ID {student.id_number} does not exist and can not be updated in this management system.")
 
+        self._preserve("students", (student.id_number,))
+
         self.students.update({
             student.id_number: student
         })
+        self._unindex_person("students", student.id_number)
+        self._index_people("students", (student,))
+
+        if self._journal is not None:
+            self._journal.record("update_student", student)
+
+        if self._events is not None:
+            self._events.publish([StudentUpdated(student, existing_student)])
 
     def remove_student(self, id_number: str) -> None:
         """
@@ -84,20 +193,30 @@ class StudentManagementSystem:
             KeyError: If no student with the given ID exists in the system.
         """
 
+        self._preserve("students", (id_number,))
         student = self.students.pop(id_number, None)
 
         if student is None:
             raise KeyError(
                 f"Student with ID {id_number} does not exist.")
 
-        # Remove student from enrolled_students attribute of all course in courses and update the course in courses
-        for course in self.courses.values():
-            enrolled_student = course.find_enrolled_student(
-                id_number=id_number)
+        self._unindex_person("students", id_number)
+
+        # Remove student from enrolled_students attribute of only the courses the student is enrolled in
+        course_ids = tuple(self._student_courses.get(id_number, ()))
+
+        # The removed grades are only looked up for subscribers
+        grades = tuple(self.courses[course_id].enrolled_students[id_number].grade
+                       for course_id in course_ids) if self._events is not None else ()
+
+        for course_id in course_ids:
+            self.courses[course_id]._remove_student(id_number=id_number)
 
-            if enrolled_student:
-                course.remove_student(id_number=id_number)
-                self.update_course(course=course)
+        if self._journal is not None:
+            self._journal.record("remove_student", id_number)
+
+        if self._events is not None:
+            self._events.publish([StudentRemoved(student, course_ids, grades)])
 
     def find_student(self, id_number: str) -> Optional[Student]:
         """
@@ -118,6 +237,42 @@ class StudentManagementSystem:
         student = self.students.get(id_number, None)
         return student
 
+    def find_students_by_major(self, major: Major) -> List[Student]:
+        """
+        Retrieves every student with a given major, straight from the major index.
+
+        Args:
+            major (Major): The major to look up.
+
+        Returns:
+            List[Student]: The `Student` instances with that major, in no particular order.
+        """
+
+        students = self.students
+        found = [students.get(id_number)
+                 for id_number in list(self._major_students.get(major, ()))]
+
+        return [student for student in found if student is not None]
+
+    def search_students(self, query: str, limit: int = 10, fuzzy: bool = True) -> List[Student]:
+        """
+        Finds students by name, with prefix and fuzzy matching, best matches first.
+
+        Every term of the query has to match a token of the student's first or last name, exactly,
+        as a prefix, or with a small typo when `fuzzy` is set. The name index is built by the first
+        search and maintained by every later change.
+
+        Args:
+            query (str): Terms separated by spaces, such as "ada lov".
+            limit (int, optional): Maximum number of students to return. Defaults to 10.
+            fuzzy (bool, optional): Whether terms may also match misspelled names. Defaults to True.
+
+        Returns:
+            List[Student]: The matching `Student` instances, best first.
+        """
+
+        return self._search_names("students", query, limit, fuzzy)
+
     def add_instructor(self, instructor: Instructor) -> None:
         """
         Adds a new instructor to the system.
@@ -139,8 +294,55 @@ class StudentManagementSystem:
             raise ValueError(
                 f"Instructor with ID {instructor.id_number} already exists in this management system.")
 
+        self._preserve("instructors", (instructor.id_number,))
+
         # Add the instructor in the system
         self.instructors[instructor.id_number] = instructor
+        self._index_people("instructors", (instructor,))
+
+        if self._journal is not None:
+            self._journal.record("add_instructors", [instructor])
+
+        if self._events is not None:
+            self._events.publish([InstructorAdded(instructor)])
+
+    def add_instructors_many(self, instructors: Iterable[Instructor]) -> None:
+        """
+        Adds many new instructors to the system in one all-or-nothing step.
+
+        Args:
+            instructors (Iterable[Instructor]): The `Instructor` instances to add.
+
+        Raises:
+            BulkOperationError: Listing every instructor whose ID already exists in the system or is repeated in the batch.
+        """
+
+        instructors = list(instructors)
+        errors: List[Tuple[int, str]] = []
+        new_ids: Set[str] = set()
+
+        for row, instructor in enumerate(instructors):
+            if instructor.id_number in self.instructors or instructor.id_number in new_ids:
+                errors.append(
+                    (row, f"Instructor with ID {instructor.id_number} already exists in this management system."))
+
+            new_ids.add(instructor.id_number)
+
+        if errors:
+            raise BulkOperationError("add_instructors_many", errors)
+
+        self._preserve("instructors", [instructor.id_number for instructor in instructors])
+
+        # Add the instructors to the system
+        self.instructors.update(
+            (instructor.id_number, instructor) for instructor in instructors)
+        self._index_people("instructors", instructors)
+
+        if self._journal is not None:
+            self._journal.record("add_instructors", instructors)
+
+        if self._events is not None:
+            self._events.publish([InstructorAdded(instructor) for instructor in instructors])
 
     def update_instructor(self, instructor: Instructor) -> None:
         """
@@ -163,18 +365,23 @@ class StudentManagementSystem:
             raise KeyError(
                 f"Instructor with ID {instructor.id_number} does not exist and can not be updated in this management system.")
 
+        self._preserve("instructors", (instructor.id_number,))
+
         self.instructors.update({
             instructor.id_number: instructor
         })
+        self._unindex_person("instructors", instructor.id_number)
+        self._index_people("instructors", (instructor,))
 
-        # Update instructor in instructors attribute of all course in courses and update the course in courses
-        for course in self.courses.values():
-            course_instructor = course.find_instructor(
-                id_number=instructor.id_number)
+        # Update instructor in instructors attribute of only the courses the instructor teaches
+        for course_id in self._instructor_courses.get(instructor.id_number, ()):
+            self.courses[course_id].update_instructor(instructor=instructor)
 
-            if course_instructor:
-                course.update_instructor(instructor=instructor)
-                self.update_course(course=course)
+        if self._journal is not None:
+            self._journal.record("update_instructor", instructor)
+
+        if self._events is not None:
+            self._events.publish([InstructorUpdated(instructor, existing_instructor)])
 
     def remove_instructor(self, id_number: str) -> None:
         """
@@ -187,19 +394,26 @@ class StudentManagementSystem:
             KeyError: If no instructor with the given ID exists in the system.
         """
 
+        self._preserve("instructors", (id_number,))
         instructor = self.instructors.pop(id_number, None)
 
         if instructor is None:
             raise KeyError(
                 f"Instructor with ID {id_number} does not exist.")
 
-        # Remove instructor from instructors attribute in all course in courses
-        for course in self.courses.values():
-            course_instructor = course.find_instructor(id_number)
+        self._unindex_person("instructors", id_number)
+
+        # Remove instructor from instructors attribute of only the courses the instructor teaches
+        course_ids = tuple(self._instructor_courses.get(id_number, ()))
 
-            if course_instructor:
-                course.remove_instructor(id_number=id_number)
-                self.update_course(course=course)
+        for course_id in course_ids:
+            self.courses[course_id]._remove_instructor(id_number=id_number)
+
+        if self._journal is not None:
+            self._journal.record("remove_instructor", id_number)
+
+        if self._events is not None:
+            self._events.publish([InstructorRemoved(instructor, course_ids)])
 
     def find_instructor(self, id_number: str) -> Optional[Instructor]:
         """
@@ -223,6 +437,62 @@ class StudentManagementSystem:
         instructor = self.instructors.get(id_number, None)
         return instructor
 
+    def find_instructors_by_department(self, department: Department) -> List[Instructor]:
+        """
+        Retrieves every instructor in a given department, straight from the department index.
+
+        Args:
+            department (Department): The department to look up.
+
+        Returns:
+            List[Instructor]: The `Instructor` instances in that department, in no particular order.
+        """
+
+        instructors = self.instructors
+        found = [instructors.get(id_number)
+                 for id_number in list(self._department_instructors.get(department, ()))]
+
+        return [instructor for instructor in found if instructor is not None]
+
+    def search_instructors(self, query: str, limit: int = 10, fuzzy: bool = True) -> List[Instructor]:
+        """
+        Finds instructors by name, with prefix and fuzzy matching, best matches first.
+
+        Args:
+            query (str): Terms separated by spaces, such as "ada lov".
+            limit (int, optional): Maximum number of instructors to return. Defaults to 10.
+            fuzzy (bool, optional): Whether terms may also match misspelled names. Defaults to True.
+
+        Returns:
+            List[Instructor]: The matching `Instructor` instances, best first.
+        """
+
+        return self._search_names("instructors", query, limit, fuzzy)
+
+    def find_instructor_courses(self, id_number: str) -> List[str]:
+        """
+        Retrieves a list of course IDs that a specific instructor teaches.
+
+        Args:
+            id_number (str): The unique identifier of the instructor.
+
+        Returns:
+            List[str]: A list of course IDs the instructor is assigned to.
+
+        Raises:
+            KeyError: If no instructor with the given ID exists in the system.
+        """
+
+        instructor = self.find_instructor(id_number=id_number)
+
+        if instructor is None:
+            raise KeyError(
+                f"Instructor with ID {id_number} does not exist in this management system.")
+
+        instructor_courses = list(
+            self._instructor_courses.get(id_number, ()))
+        return instructor_courses
+
     def add_course(self, course: Course) -> None:
         """
         Adds a new course to the system.
@@ -240,8 +510,55 @@ class StudentManagementSystem:
             raise ValueError(
                 f"Course with ID {course.course_id} already exists in this management system.")
 
+        self._preserve("courses", (course.course_id,))
+
         # Add the course to the system
         self.courses[course.course_id] = course
+        self._bind_course(course=course)
+
+        if self._journal is not None:
+            self._journal.record("add_courses", [course])
+
+        if self._events is not None:
+            self._events.publish([CourseAdded(course)])
+
+    def add_courses_many(self, courses: Iterable[Course]) -> None:
+        """
+        Adds many new courses to the system in one all-or-nothing step.
+
+        Args:
+            courses (Iterable[Course]): The `Course` instances to add.
+
+        Raises:
+            BulkOperationError: Listing every course whose ID already exists in the system or is repeated in the batch.
+        """
+
+        courses = list(courses)
+        errors: List[Tuple[int, str]] = []
+        new_ids: Set[str] = set()
+
+        for row, course in enumerate(courses):
+            if course.course_id in self.courses or course.course_id in new_ids:
+                errors.append(
+                    (row, f"Course with ID {course.course_id} already exists in this management system."))
+
+            new_ids.add(course.course_id)
+
+        if errors:
+            raise BulkOperationError("add_courses_many", errors)
+
+        self._preserve("courses", [course.course_id for course in courses])
+
+        # Add the courses to the system
+        for course in courses:
+            self.courses[course.course_id] = course
+            self._bind_course(course=course)
+
+        if self._journal is not None:
+            self._journal.record("add_courses", courses)
+
+        if self._events is not None:
+            self._events.publish([CourseAdded(course) for course in courses])
 
     def update_course(self, course: Course) -> None:
         """
@@ -260,6 +577,18 @@ class StudentManagementSystem:
             raise KeyError(
                 f"Course with ID {course.course_id} does not exist and can not be updated in this management system.")
 
+        # Re-index only when the course is replaced by a different instance, changes made in place were indexed and journaled as they were made
+        if found_course is not course:
+            self._preserve("courses", (course.course_id,))
+            self._unbind_course(course=found_course)
+            self._bind_course(course=course)
+
+            if self._journal is not None:
+                self._journal.record("update_course", course)
+
+            if self._events is not None:
+                self._events.publish([CourseReplaced(course, found_course)])
+
         # Update the course in the system
         self.courses.update({
             course.course_id: course
@@ -276,12 +605,21 @@ class StudentManagementSystem:
             KeyError: If no course with the given ID exists in the system.
         """
 
+        self._preserve("courses", (course_id,))
         course = self.courses.pop(course_id, None)
 
         if course is None:
             raise KeyError(
                 f"Course with ID {course_id}, does not exist in this management system.")
 
+        self._unbind_course(course=course)
+
+        if self._journal is not None:
+            self._journal.record("remove_course", course_id)
+
+        if self._events is not None:
+            self._events.publish([CourseRemoved(course)])
+
     def find_course(self, course_id: str) -> Optional[Course]:
         """
         Finds a course by its unique identifier in the system.
@@ -332,11 +670,73 @@ class StudentManagementSystem:
         enrollment = Enrollment(id_number=id_number, course_id=course_id)
 
         # Enroll the student in the course
-        course.add_student(enrollment=enrollment)
+        course._add_student(enrollment=enrollment)
 
         # Update the course in the system
         self.update_course(course=course)
 
+        if self._journal is not None:
+            self._journal.record("enroll", [(id_number, course_id)])
+
+        if self._events is not None:
+            self._events.publish([StudentEnrolled(id_number, course_id)])
+
+    def enroll_many(self, enrollments: Iterable[Tuple[str, str]]) -> None:
+        """
+        Enrolls many students in courses in one all-or-nothing step.
+
+        All rows are validated in a single pass before anything is applied. The new enrollments are
+        then grouped by course and handed to each course once, instead of looking up, enrolling and
+        re-storing the course for every row as `enroll_student` does.
+
+        Args:
+            enrollments (Iterable[Tuple[str, str]]): Pairs of (student ID, course ID) to enroll.
+
+        Raises:
+            BulkOperationError: Listing every row whose student or course does not exist, whose student 
+            is already enrolled in the course, or that is repeated in the batch.
+        """
+
+        students = self.students
+        courses = self.courses
+        errors: List[Tuple[int, str]] = []
+        course_enrollments: Dict[str, Dict[str, Enrollment]] = {}
+
+        for row, (id_number, course_id) in enumerate(enrollments):
+            course = courses.get(course_id)
+
+            if id_number not in students:
+                errors.append(
+                    (row, f"Student with ID {id_number} does not exist and can not be enrolled in this management system."))
+            elif course is None:
+                errors.append(
+                    (row, f"Course with ID {course_id} does not exist in this management system. Student with ID {id_number} was not enrolled."))
+            else:
+                new_enrollments = course_enrollments.setdefault(course_id, {})
+
+                if id_number in course.enrolled_students or id_number in new_enrollments:
+                    errors.append(
+                        (row, f"Student with ID {id_number}, is already enrolled in course with ID {course_id}."))
+                else:
+                    new_enrollments[id_number] = Enrollment(
+                        id_number=id_number, course_id=course_id)
+
+        if errors:
+            raise BulkOperationError("enroll_many", errors)
+
+        # Enroll the students course by course
+        for course_id, new_enrollments in course_enrollments.items():
+            courses[course_id]._add_students_many(
+                enrollments=list(new_enrollments.values()))
+
+        if self._journal is not None:
+            self._journal.record("enroll", [(id_number, course_id) for course_id, new_enrollments in course_enrollments.items()
+                                           for id_number in new_enrollments])
+
+        if self._events is not None:
+            self._events.publish([StudentEnrolled(id_number, course_id) for course_id, new_enrollments in course_enrollments.items()
+                                  for id_number in new_enrollments])
+
     def grade_student(self, id_number: str, course_id: str, grade: Grade) -> None:
         """
         Assigns a grade to a student for a specific course.
@@ -369,13 +769,74 @@ class StudentManagementSystem:
             raise ValueError(
                 f"Student with ID {id_number}, is not enrolled in this course: {course.enrolled_students}. Grade was not assigned.")
 
+        # Enrollments shared with open snapshots are replaced instead of changed in place
+        if self._snapshots:
+            enrolled_student = Enrollment(
+                id_number=id_number, course_id=course_id, grade=enrolled_student.grade)
+
         # Assign a grade and update the student enrollment in the course
+        previous_grade = enrolled_student.grade
         enrolled_student.assign_grade(grade=grade)
-        course.update_student(enrollment=enrolled_student)
+        course._update_student(enrollment=enrolled_student)
 
         # Update the course in the system
         self.update_course(course=course)
 
+        if self._journal is not None:
+            self._journal.record("grade", (id_number, course_id, grade))
+
+        if self._events is not None:
+            self._events.publish([EnrollmentGraded(id_number, course_id, grade, previous_grade)])
+
+    def grade_many(self, grades: Iterable[Tuple[str, str, Grade]]) -> None:
+        """
+        Assigns many grades in one all-or-nothing step.
+
+        All rows are validated in a single pass before any grade is assigned. The grades are then
+        handed straight to their courses, without looking up and re-storing the course for every
+        row as `grade_student` does.
+
+        Args:
+            grades (Iterable[Tuple[str, str, Grade]]): Triples of (student ID, course ID, grade). A student
+                graded more than once in a course keeps the last grade.
+
+        Raises:
+            BulkOperationError: Listing every row whose student or course does not exist, or whose student
+            is not enrolled in the course.
+        """
+
+        grades = list(grades)
+        students = self.students
+        courses = self.courses
+        errors: List[Tuple[int, str]] = []
+
+        for row, (id_number, course_id, _) in enumerate(grades):
+            course = courses.get(course_id)
+
+            if id_number not in students:
+                errors.append(
+                    (row, f"Student with ID {id_number} does not exist and can not be assigned a grade in this management system."))
+            elif course is None:
+                errors.append(
+                    (row, f"Course with ID {course_id} does not exist in this management system. Student with ID {id_number} was not assigned a grade."))
+            elif id_number not in course.enrolled_students:
+                errors.append(
+                    (row, f"Student with ID {id_number}, is not enrolled in course with ID {course_id}. Grade was not assigned."))
+
+        if errors:
+            raise BulkOperationError("grade_many", errors)
+
+        self._preserve("courses", {course_id for _, course_id, _ in grades})
+        previous_grades = self._assign_grades(grades)
+
+        if self._journal is not None:
+            for id_number, course_id, grade in grades:
+                self._journal.record("grade", (id_number, course_id, grade))
+
+        if self._events is not None:
+            self._events.publish([EnrollmentGraded(id_number, course_id, grade, previous_grade)
+                                  for (id_number, course_id, grade), previous_grade in zip(grades, previous_grades)])
+
     def find_course_enrollments(self, course_id: str) -> Dict[str, Enrollment]:
         """
         Retrieves a dictionary of students enrolled in a specific course, including their enrollment details.        
@@ -405,6 +866,56 @@ class StudentManagementSystem:
         course_enrollments = course.enrolled_students
         return course_enrollments
 
+    def find_course_enrollments_by_grade(self, course_id: str, grade: Grade) -> Dict[str, Enrollment]:
+        """
+        Retrieves the enrollments of a course with a given grade, straight from the grade index.
+
+        Args:
+            course_id (str): The unique identifier of the course.
+            grade (Grade): The grade to look up, such as `Grade.F`.
+
+        Returns:
+            Dict[str, Enrollment]: Student IDs mapped to their `Enrollment` instances with that grade.
+
+        Raises:
+            KeyError: If no course with the given ID exists in the system.
+        """
+
+        course = self.find_course(course_id=course_id)
+
+        if course is None:
+            raise KeyError(
+                f"Course with ID {course_id} does not exist in this management system.")
+
+        id_numbers = self._course_grades.get(course_id, {}).get(grade, ())
+        enrolled_students = course.enrolled_students
+
+        return {id_number: enrolled_students[id_number] for id_number in id_numbers}
+
+    def find_course_stats(self, course_id: str) -> CourseStats:
+        """
+        Retrieves the grade aggregates of a course in O(1), without iterating its enrollments.
+
+        Args:
+            course_id (str): The unique identifier of the course.
+
+        Returns:
+            CourseStats: A copy of the course's enrollment count, graded count, grade histogram and grade point sum.
+
+        Raises:
+            KeyError: If no course with the given ID exists in the system.
+        """
+
+        course = self.find_course(course_id=course_id)
+
+        if course is None:
+            raise KeyError(
+                f"Course with ID {course_id} does not exist in this management system.")
+
+        stats = self._course_stats.get(course_id)
+
+        return stats.copy() if stats is not None else CourseStats()
+
     def find_course_enrolled_students(self, course_id: str) -> List[str]:
         """
         Retrieves a list of student IDs enrolled in a specific course.
@@ -448,14 +959,10 @@ class StudentManagementSystem:
             raise KeyError(
                 f"Student with ID {id_number} does not exist in this management system.")
 
-        student_enrollments: Dict[str, List[Enrollment]] = {id_number: []}
-
-        for course in self.courses.values():
-            enrolled_student = course.find_enrolled_student(
-                id_number=id_number)
-
-            if enrolled_student is not None:
-                student_enrollments[id_number].append(enrolled_student)
+        student_enrollments: Dict[str, List[Enrollment]] = {id_number: [
+            self.courses[course_id].enrolled_students[id_number]
+            for course_id in self._student_courses.get(id_number, ())
+        ]}
 
         return student_enrollments
 
@@ -478,6 +985,835 @@ class StudentManagementSystem:
 
         return student_courses
 
+    def count_students_where(self, query: CourseQuery) -> int:
+        """
+        Counts the students selected by a set-algebra query over course enrollments.
+
+        Args:
+            query (CourseQuery): Courses combined with `&`, `|`, `-` and `~`, such as
+                `enrolled_in(CourseNameId.CALCULUS) - enrolled_in(CourseNameId.LINEAR_ALGEBRA)`. See `utils.bitmaps`.
+
+        Returns:
+            int: The number of students selected.
+
+        Raises:
+            KeyError: If the query names a course that does not exist in this management system.
+        """
+
+        return self._course_bitmap_index().count(query)
+
+    def iter_students_where(self, query: CourseQuery) -> Iterator[str]:
+        """
+        Iterates over the IDs of the students selected by a set-algebra query over course enrollments.
+
+        Queries run against a compressed bitmap of the students of every course, built by the first
+        query and kept up to date by every later change, so no enrollment list is materialized.
+
+        Args:
+            query (CourseQuery): Courses combined with `&`, `|`, `-` and `~`. See `utils.bitmaps`.
+
+        Returns:
+            Iterator[str]: The IDs of the selected students, evaluated when this is called.
+
+        Raises:
+            KeyError: If the query names a course that does not exist in this management system.
+        """
+
+        return self._course_bitmap_index().iter_ids(query)
+
+    def verify_indexes(self) -> None:
+        """
+        Recomputes every index from the courses and checks it against the maintained one.
+
+        Raises:
+            ValueError: If a maintained index is out of sync with the courses in the system.
+
+        Notes:
+            This is a full O(enrollments) sweep meant for tests and debugging, not for regular use.
+        """
+
+        student_courses: Dict[str, Set[str]] = {}
+        instructor_courses: Dict[str, Set[str]] = {}
+
+        for course_id, course in self.courses.items():
+            if course._system is not self:
+                raise ValueError(
+                    f"Course with ID {course_id} is not registered with this management system.")
+
+            for id_number in course.enrolled_students:
+                student_courses.setdefault(id_number, set()).add(course_id)
+
+            for id_number in course.instructors:
+                instructor_courses.setdefault(id_number, set()).add(course_id)
+
+        if student_courses != self._student_courses:
+            raise ValueError(
+                f"Student to course index is out of sync. Expected: {student_courses}, found: {self._student_courses}")
+
+        if instructor_courses != self._instructor_courses:
+            raise ValueError(
+                f"Instructor to course index is out of sync. Expected: {instructor_courses}, found: {self._instructor_courses}")
+
+        self._verify_attribute_indexes()
+        self._verify_course_bitmaps()
+        self.verify_course_stats()
+
+        course_grades: Dict[str, Dict[Grade, Set[str]]] = {}
+
+        for course_id, course in self.courses.items():
+            for id_number, enrollment in course.enrolled_students.items():
+                course_grades.setdefault(course_id, {}).setdefault(
+                    enrollment.grade, set()).add(id_number)
+
+        # Emptied sets are kept in the maintained index
+        maintained = {course_id: {grade: id_numbers for grade, id_numbers in grades.items() if id_numbers}
+                      for course_id, grades in self._course_grades.items()}
+        maintained = {course_id: grades for course_id,
+                      grades in maintained.items() if grades}
+
+        if course_grades != maintained:
+            raise ValueError(
+                f"Course grade index is out of sync. Expected: {course_grades}, found: {maintained}")
+
+    def verify_course_stats(self) -> None:
+        """
+        Recomputes the grade aggregates of every course from its enrollments and checks them against the maintained ones.
+
+        Raises:
+            ValueError: If the aggregates of a course are out of sync with its enrollments.
+
+        Notes:
+            This is a full O(enrollments) sweep meant for tests and debugging, not for regular use.
+        """
+
+        for course_id, course in self.courses.items():
+            expected = CourseStats()
+            expected.add_grades(
+                enrollment.grade for enrollment in course.enrolled_students.values())
+            found = self._course_stats.get(course_id, CourseStats())
+
+            if expected != found:
+                raise ValueError(
+                    f"Grade aggregates of course with ID {course_id} are out of sync. Expected: {expected}, found: {found}")
+
+        stale = self._course_stats.keys() - self.courses.keys()
+
+        if stale:
+            raise ValueError(
+                f"Grade aggregates are kept for courses that are not in the system: {sorted(stale)}")
+
+    def _verify_course_bitmaps(self) -> None:
+        """
+        Checks the course bitmaps, if they have been built, against the students and courses in the system.
+
+        Raises:
+            ValueError: If a course bitmap or the bitmap of all students is out of sync with the system.
+        """
+
+        bitmaps = self._course_bitmaps
+
+        if bitmaps is None:
+            return
+
+        if set(bitmaps.course_ids()) != set(self.courses):
+            raise ValueError(
+                f"Course bitmaps are out of sync. Expected courses: {sorted(self.courses)}, found: {sorted(bitmaps.course_ids())}")
+
+        # No course at all selects nobody, so its complement is every student
+        found = set(bitmaps.iter_ids(~enrolled_in()))
+
+        if found != set(self.students):
+            raise ValueError(
+                f"Student bitmap is out of sync. Expected: {set(self.students)}, found: {found}")
+
+        for course_id, course in self.courses.items():
+            found = set(bitmaps.iter_ids(enrolled_in(course_id)))
+
+            if found != set(course.enrolled_students):
+                raise ValueError(
+                    f"Bitmap of course with ID {course_id} is out of sync. Expected: {set(course.enrolled_students)}, found: {found}")
+
+    def _verify_attribute_indexes(self) -> None:
+        """
+        Recomputes the major and department indexes and checks them against the maintained ones.
+
+        Raises:
+            ValueError: If the major or department index is out of sync with the people in the system.
+        """
+
+        for name, people, attribute, maintained in (("Major", self.students, "major", self._major_students),
+                                                    ("Department", self.instructors, "department", self._department_instructors)):
+            expected: Dict[Any, Set[str]] = {}
+
+            for id_number, person in people.items():
+                expected.setdefault(
+                    getattr(person, attribute), set()).add(id_number)
+
+            found = {value: id_numbers for value,
+                     id_numbers in maintained.items() if id_numbers}
+
+            if expected != found:
+                raise ValueError(
+                    f"{name} index is out of sync. Expected: {expected}, found: {found}")
+
+    def subscribe(self, callback: Callable[[Any], None], types: Optional[Iterable[type]] = None,
+                  batched: bool = False) -> Subscription:
+        """
+        Registers a callback called with the change events of every later change made through the system.
+
+        The callback runs in the writing thread once the change is applied, and should be quick and
+        leave the system unchanged. Events are the types of `utils.events`, such as `StudentAdded`
+        or `EnrollmentGraded`.
+
+        Args:
+            callback (Callable[[Any], None]): Called with each event, or with the list of events of
+                each change when `batched` is set.
+            types (Optional[Iterable[type]], optional): The event types to deliver. Defaults to all.
+            batched (bool, optional): Whether the callback takes whole batches. Defaults to False.
+
+        Returns:
+            Subscription: The subscription, to be closed once events are no longer wanted.
+        """
+
+        return self._event_bus().subscribe(callback, types=types, batched=batched)
+
+    def subscribe_async(self, types: Optional[Iterable[type]] = None, maxsize: int = 10_000, batch_size: int = 1_000,
+                        overflow: OverflowPolicy = OverflowPolicy.BLOCK, linger: float = 0.0,
+                        loop: Optional[asyncio.AbstractEventLoop] = None) -> AsyncSubscription:
+        """
+        Opens a bounded buffer of the change events of every later change, read in batches by a coroutine.
+
+        Args:
+            types (Optional[Iterable[type]], optional): The event types to deliver. Defaults to all.
+            maxsize (int, optional): The number of events buffered before `overflow` applies. Defaults to 10,000.
+            batch_size (int, optional): The most events read at once. Defaults to 1,000.
+            overflow (OverflowPolicy, optional): What a full buffer does to writers or to the
+                subscription. Defaults to blocking writers.
+            linger (float, optional): Seconds a woken reader waits for more events before reading a
+                batch, trading latency for fewer wake-ups of the reader. Defaults to 0.
+            loop (Optional[asyncio.AbstractEventLoop], optional): The event loop of the reader.
+                Defaults to the running loop.
+
+        Returns:
+            AsyncSubscription: The subscription, iterated with `async for` and closed once events are
+            no longer wanted.
+        """
+
+        return self._event_bus().subscribe_async(types=types, maxsize=maxsize, batch_size=batch_size,
+                                                 overflow=overflow, linger=linger, loop=loop)
+
+    def transaction(self) -> Transaction:
+        """
+        Groups the changes made in a `with` block so that they are kept as a whole or not at all.
+
+        Changes apply as they are made and are undone, newest first, if the block raises, in time
+        proportional to the number of changes rather than to the size of the system. Journal records
+        and change events are held back until the block ends and dropped for changes rolled back. A
+        transaction opened inside another one only rolls back its own changes.
+
+        Returns:
+            Transaction: The transaction, to be used as a context manager.
+
+        Example:
+            >>> with sms.transaction():
+            ...     sms.add_student(student)
+            ...     sms.enroll_student(student.id_number, course.course_id)
+        """
+
+        return Transaction(self)
+
+    def batch(self) -> Batch:
+        """
+        Buffers changes made on the returned batch and applies them together when the `with` block ends.
+
+        The changes are applied in a single transaction, with additions, enrollments and grades merged
+        into as few calls of the matching bulk methods as their dependencies allow, so that each run is
+        validated in one pass and indexed once. Nothing is applied if the block raises, and nothing is
+        kept if any change is rejected.
+
+        Returns:
+            Batch: The batch, offering the changing methods of the system.
+
+        Example:
+            >>> with sms.batch() as batch:
+            ...     batch.add_student(student)
+            ...     batch.enroll_student(student.id_number, course.course_id)
+        """
+
+        return Batch(self)
+
+    def snapshot(self) -> SystemView:
+        """
+        Takes a consistent, read-only view of the whole system at this point in time.
+
+        Taking the view is O(1). While it is open, the system copies each student, instructor or
+        course once, the first time it changes, so that the view keeps reading the old version.
+        Readers of the view neither block writers nor see their changes.
+
+        Returns:
+            SystemView: The view, to be closed once it is no longer needed.
+        """
+
+        view = SystemView(self)
+        self._snapshots.add(view)
+
+        return view
+
+    def save_snapshot(self, path: str) -> None:
+        """
+        Saves the whole system to a compact binary snapshot file.
+
+        Args:
+            path (str): The file to write. An existing file is overwritten.
+        """
+
+        write_snapshot(self, path)
+
+    @classmethod
+    def load_snapshot(cls, path: str) -> "StudentManagementSystem":
+        """
+        Loads a system saved with `save_snapshot`, by any backend.
+
+        Objects are built straight from the trusted snapshot data, without generating IDs or running validators.
+
+        Args:
+            path (str): The snapshot file to read.
+
+        Returns:
+            StudentManagementSystem: The restored system with all of its indexes built.
+
+        Raises:
+            ValueError: If the file is not a snapshot or was written by an unsupported version.
+        """
+
+        return load_system(read_snapshot(path), backend="vanilla")
+
+    def _bind_course(self, course: Course) -> None:
+        """
+        Registers a course with the system and indexes its enrollments and instructors.
+
+        Args:
+            course (Course): The `Course` instance being added to the system.
+        """
+
+        course._system = self
+        self._index_enrollments(course=course, enrollments=list(
+            course.enrolled_students.values()))
+
+        for instructor in course.instructors.values():
+            self._index_instructor(course=course, instructor=instructor)
+
+    def _unbind_course(self, course: Course) -> None:
+        """
+        Drops a course's enrollments and instructors from the indexes and detaches it from the system.
+
+        Args:
+            course (Course): The `Course` instance leaving the system.
+        """
+
+        for enrollment in course.enrolled_students.values():
+            self._unindex_enrollment(course=course, enrollment=enrollment)
+
+        for instructor in course.instructors.values():
+            self._unindex_instructor(course=course, instructor=instructor)
+
+        self._course_grades.pop(course.course_id, None)
+        self._course_stats.pop(course.course_id, None)
+
+        if self._course_bitmaps is not None:
+            self._course_bitmaps.drop(course.course_id)
+        course._system = None
+
+    def _index_enrollment(self, course: Course, enrollment: Enrollment) -> None:
+        """
+        Records a new enrollment in the indexes. Called by `Course.add_student`.
+
+        Args:
+            course (Course): The course the student was enrolled in.
+            enrollment (Enrollment): The new `Enrollment` instance.
+        """
+
+        self._student_courses.setdefault(
+            enrollment.id_number, set()).add(course.course_id)
+        self._course_grades.setdefault(course.course_id, {}).setdefault(
+            enrollment.grade, set()).add(enrollment.id_number)
+        self._stats_of(course.course_id).add(enrollment.grade)
+
+        if self._course_bitmaps is not None:
+            self._course_bitmaps.add(course.course_id, (enrollment.id_number,))
+
+    def _index_enrollments(self, course: Course, enrollments: List[Enrollment]) -> None:
+        """
+        Records a batch of new enrollments of one course in the indexes. Called by `Course.add_students_many`.
+
+        Args:
+            course (Course): The course the students were enrolled in.
+            enrollments (List[Enrollment]): The new `Enrollment` instances.
+        """
+
+        student_courses = self._student_courses
+        course_id = course.course_id
+        course_grades = self._course_grades.setdefault(course_id, {})
+
+        # Enum members hash in Python, so within this loop the grade sets are looked up by identity
+        graded_by_id = {id(grade): graded for grade, graded in course_grades.items()}
+        sizes = {id(grade): len(graded) for grade, graded in course_grades.items()}
+
+        for enrollment in enrollments:
+            course_ids = student_courses.get(enrollment.id_number)
+
+            if course_ids is None:
+                student_courses[enrollment.id_number] = {course_id}
+            else:
+                course_ids.add(course_id)
+
+            graded = graded_by_id.get(id(enrollment.grade))
+
+            if graded is None:
+                graded = graded_by_id[id(enrollment.grade)] = course_grades.setdefault(
+                    enrollment.grade, set())
+
+            graded.add(enrollment.id_number)
+
+        # New students are new to every grade set, so the aggregates take what each set grew by
+        stats = self._stats_of(course_id)
+
+        for grade, graded in course_grades.items():
+            added = len(graded) - sizes.get(id(grade), 0)
+
+            if added:
+                stats.add(grade, added)
+
+        # Also registers the course with the bitmap index when it has no enrollments yet
+        if self._course_bitmaps is not None:
+            self._course_bitmaps.add(course_id, [enrollment.id_number for enrollment in enrollments])
+
+    def _unindex_enrollment(self, course: Course, enrollment: Enrollment) -> None:
+        """
+        Removes an enrollment from the indexes. Called by `Course.remove_student`.
+
+        Args:
+            course (Course): The course the student was removed from.
+            enrollment (Enrollment): The removed `Enrollment` instance.
+        """
+
+        course_ids = self._student_courses.get(enrollment.id_number)
+
+        if course_ids is not None:
+            course_ids.discard(course.course_id)
+
+            if not course_ids:
+                del self._student_courses[enrollment.id_number]
+
+        grade = self._unindex_grade(course=course, id_number=enrollment.id_number,
+                                    grade=enrollment.grade)
+        self._stats_of(course.course_id).remove(
+            grade if grade is not None else enrollment.grade)
+
+        if self._course_bitmaps is not None:
+            self._course_bitmaps.discard(course.course_id, enrollment.id_number)
+
+    def _reindex_enrollment(self, course: Course, enrollment: Enrollment) -> Optional[Grade]:
+        """
+        Moves a replaced or regraded enrollment to its current grade in the grade index. Called by `Course.update_student`.
+
+        Args:
+            course (Course): The course of the enrollment.
+            enrollment (Enrollment): The updated `Enrollment` instance.
+
+        Returns:
+            Optional[Grade]: The grade the enrollment was indexed under, or None if it was not indexed.
+        """
+
+        old_grade = self._unindex_grade(course=course, id_number=enrollment.id_number)
+        self._course_grades.setdefault(course.course_id, {}).setdefault(
+            enrollment.grade, set()).add(enrollment.id_number)
+
+        if old_grade is not None:
+            self._stats_of(course.course_id).regrade(old_grade, enrollment.grade)
+
+        return old_grade
+
+    def _assign_grades(self, grades: List[Tuple[str, str, Grade]]) -> List[Grade]:
+        """
+        Assigns validated grades straight to their enrollments and the indexes, for `grade_many`.
+
+        Args:
+            grades (List[Tuple[str, str, Grade]]): Triples of (student ID, course ID, grade) of enrolled students.
+
+        Returns:
+            List[Grade]: The grade each row replaced.
+        """
+
+        courses = self.courses
+        course_grades = self._course_grades
+        previous_grades: List[Grade] = []
+
+        # Course ID -> the grades moved from and to in the course, applied to its aggregates at once
+        moves: Dict[str, Tuple[List[Grade], List[Grade]]] = {}
+
+        for id_number, course_id, grade in grades:
+            course = courses[course_id]
+            enrolled_student = course.enrolled_students[id_number]
+            previous_grade = enrolled_student.grade
+
+            # Enrollments shared with open snapshots are replaced instead of changed in place
+            if self._snapshots:
+                enrolled_student = Enrollment(
+                    id_number=id_number, course_id=course_id, grade=previous_grade)
+                course.enrolled_students[id_number] = enrolled_student
+
+            enrolled_student.assign_grade(grade=grade)
+            previous_grades.append(previous_grade)
+
+            indexed_grade = self._unindex_grade(course=course, id_number=id_number, grade=previous_grade)
+            course_grades.setdefault(course_id, {}).setdefault(grade, set()).add(id_number)
+
+            if indexed_grade is not None:
+                move = moves.get(course_id)
+
+                if move is None:
+                    move = moves[course_id] = ([], [])
+
+                move[0].append(indexed_grade)
+                move[1].append(grade)
+
+        for course_id, (old_grades, new_grades) in moves.items():
+            self._stats_of(course_id).regrade_many(old_grades, new_grades)
+
+        return previous_grades
+
+    def _unindex_grade(self, course: Course, id_number: str, grade: Optional[Grade] = None) -> Optional[Grade]:
+        """
+        Drops a student from the grade index of a course.
+
+        Args:
+            course (Course): The course of the enrollment.
+            id_number (str): The ID of the student.
+            grade (Optional[Grade], optional): The grade the student is expected under. Every grade is
+                checked if it is not given or wrong, as enrollments may be regraded in place.
+
+        Returns:
+            Optional[Grade]: The grade the student was indexed under, or None if the student was not indexed.
+        """
+
+        course_grades = self._course_grades.get(course.course_id, {})
+        graded = course_grades.get(grade)
+
+        if graded is None or id_number not in graded:
+            grade, graded = next(((found, graded) for found, graded in course_grades.items()
+                                  if id_number in graded), (None, None))
+
+        # Emptied sets are kept, so that concurrent writers never add to a set that was dropped
+        if graded is not None:
+            graded.discard(id_number)
+
+        return grade
+
+    def _stats_of(self, course_id: str) -> CourseStats:
+        """
+        Returns the grade aggregates of a course, creating them on its first enrollment.
+        """
+
+        stats = self._course_stats.get(course_id)
+
+        if stats is None:
+            stats = self._course_stats[course_id] = CourseStats()
+
+        return stats
+
+    def _index_instructor(self, course: Course, instructor: Instructor) -> None:
+        """
+        Records a new course instructor in the indexes. Called by `Course.add_instructor`.
+
+        Args:
+            course (Course): The course the instructor was assigned to.
+            instructor (Instructor): The assigned `Instructor` instance.
+        """
+
+        self._instructor_courses.setdefault(
+            instructor.id_number, set()).add(course.course_id)
+
+    def _unindex_instructor(self, course: Course, instructor: Instructor) -> None:
+        """
+        Removes a course instructor from the indexes. Called by `Course.remove_instructor`.
+
+        Args:
+            course (Course): The course the instructor was removed from.
+            instructor (Instructor): The removed `Instructor` instance.
+        """
+
+        course_ids = self._instructor_courses.get(instructor.id_number)
+
+        if course_ids is not None:
+            course_ids.discard(course.course_id)
+
+            if not course_ids:
+                del self._instructor_courses[instructor.id_number]
+
+    def _record_enrollments(self, course: Course, enrollments: List[Enrollment]) -> None:
+        """
+        Journals and publishes enrollments added directly on a registered course. Called by `Course.add_student` and `Course.add_students_many`.
+
+        Args:
+            course (Course): The course the students were enrolled in.
+            enrollments (List[Enrollment]): The new `Enrollment` instances.
+        """
+
+        if self._journal is not None and enrollments:
+            self._journal.record("enroll", [(enrollment.id_number, course.course_id)
+                                           for enrollment in enrollments])
+
+            # Enrollments added with a grade are replayed as an enrollment followed by a grade
+            for enrollment in enrollments:
+                if enrollment.grade is not Grade.NO_GRADE:
+                    self._journal.record(
+                        "grade", (enrollment.id_number, course.course_id, enrollment.grade))
+
+        if self._events is not None and enrollments:
+            events: List[Any] = [StudentEnrolled(enrollment.id_number, course.course_id)
+                                 for enrollment in enrollments]
+            events += [EnrollmentGraded(enrollment.id_number, course.course_id, enrollment.grade, Grade.NO_GRADE)
+                       for enrollment in enrollments if enrollment.grade is not Grade.NO_GRADE]
+            self._events.publish(events)
+
+    def _record_regrade(self, course: Course, enrollment: Enrollment, previous_grade: Optional[Grade]) -> None:
+        """
+        Journals and publishes an enrollment replaced or regraded directly on a registered course. Called by `Course.update_student`.
+
+        Args:
+            course (Course): The course of the enrollment.
+            enrollment (Enrollment): The updated `Enrollment` instance.
+            previous_grade (Optional[Grade]): The grade the enrollment was indexed under before.
+        """
+
+        if self._journal is not None:
+            self._journal.record(
+                "grade", (enrollment.id_number, course.course_id, enrollment.grade))
+
+        if self._events is not None:
+            self._events.publish([EnrollmentGraded(enrollment.id_number, course.course_id, enrollment.grade,
+                                                   previous_grade if previous_grade is not None else enrollment.grade)])
+
+    def _record_unenrollment(self, course: Course, enrollment: Enrollment) -> None:
+        """
+        Journals and publishes a student removed directly from a registered course. Called by `Course.remove_student`.
+
+        Args:
+            course (Course): The course the student was removed from.
+            enrollment (Enrollment): The removed `Enrollment` instance.
+        """
+
+        if self._journal is not None:
+            self._journal.record("unenroll", (enrollment.id_number, course.course_id))
+
+        if self._events is not None:
+            self._events.publish([StudentUnenrolled(enrollment.id_number, course.course_id, enrollment.grade)])
+
+    def _record_assignment(self, course: Course, instructor: Instructor) -> None:
+        """
+        Journals and publishes an instructor added directly to a registered course. Called by `Course.add_instructor`.
+
+        Args:
+            course (Course): The course the instructor was assigned to.
+            instructor (Instructor): The assigned `Instructor` instance.
+        """
+
+        if self._journal is not None:
+            self._journal.record("assign_instructor", (instructor, course.course_id))
+
+        if self._events is not None:
+            self._events.publish([InstructorAssigned(instructor, course.course_id)])
+
+    def _record_unassignment(self, course: Course, instructor: Instructor) -> None:
+        """
+        Journals and publishes an instructor removed directly from a registered course. Called by `Course.remove_instructor`.
+
+        Args:
+            course (Course): The course the instructor was removed from.
+            instructor (Instructor): The removed `Instructor` instance.
+        """
+
+        if self._journal is not None:
+            self._journal.record("unassign_instructor", (instructor.id_number, course.course_id))
+
+        if self._events is not None:
+            self._events.publish([InstructorUnassigned(instructor, course.course_id)])
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Returns the state to pickle or copy, leaving out the journal, the event subscriptions and the open snapshots, which belong to this instance only.
+
+        Returns:
+            Dict[str, Any]: The attributes of the system.
+        """
+
+        state = self.__dict__.copy()
+        state["_journal"] = None
+        state["_events"] = None
+        del state["_snapshots"]
+
+        # Name and bitmap indexes hold a lock and are rebuilt by the next search or query
+        state["_name_indexes"] = {}
+        state["_course_bitmaps"] = None
+
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """
+        Restores a pickled or copied system, without a journal, event subscriptions or open snapshots.
+
+        Args:
+            state (Dict[str, Any]): The attributes returned by `__getstate__`.
+        """
+
+        self.__dict__.update(state)
+        self._snapshots = weakref.WeakSet()
+
+    def _search_names(self, kind: str, query: str, limit: int, fuzzy: bool) -> List[Any]:
+        """
+        Searches the name index of "students" or "instructors", building it first if needed.
+        """
+
+        people = getattr(self, kind)
+        index = self._name_indexes.get(kind)
+
+        if index is None:
+            index = NameIndex()
+            index.add_many((person.id_number, (person.first_name, person.last_name))
+                           for person in people.values())
+            self._name_indexes[kind] = index
+
+        # A person removed while the search ran is skipped
+        found = [people.get(id) for id in index.search(
+            query, limit=limit, fuzzy=fuzzy)]
+
+        return [person for person in found if person is not None]
+
+    def _course_bitmap_index(self) -> CourseBitmapIndex:
+        """
+        Returns the course bitmap index, building it first if needed.
+        """
+
+        bitmaps = self._course_bitmaps
+
+        if bitmaps is None:
+            bitmaps = CourseBitmapIndex()
+            bitmaps.add_students(self.students)
+
+            for course_id, course in self.courses.items():
+                bitmaps.add(course_id, course.enrolled_students)
+
+            self._course_bitmaps = bitmaps
+
+        return bitmaps
+
+    def _index_people(self, kind: str, people: Iterable[Any]) -> None:
+        """
+        Indexes added or updated people by major or department, and by name if their name index has been built.
+
+        Args:
+            kind (str): "students" or "instructors".
+            people (Iterable[Any]): The `Student` or `Instructor` instances.
+        """
+
+        people = people if isinstance(people, (list, tuple)) else list(people)
+
+        if kind == "students":
+            index, attribute = self._major_students, "major"
+        else:
+            index, attribute = self._department_instructors, "department"
+
+        # Looked up by identity of the enum member, as in `_index_enrollments`. The lookups are filled from
+        # the index key by key instead of copying it whole, as thread-safe writers of different people
+        # may add keys to it concurrently
+        indexed_by_id: Dict[int, Set[str]] = {}
+
+        for person in people:
+            value = getattr(person, attribute)
+            id_numbers = indexed_by_id.get(id(value))
+
+            if id_numbers is None:
+                id_numbers = indexed_by_id[id(value)] = index.setdefault(value, set())
+
+            id_numbers.add(person.id_number)
+
+        if kind == "students" and self._course_bitmaps is not None:
+            self._course_bitmaps.add_students(person.id_number for person in people)
+
+        names = self._name_indexes.get(kind)
+
+        if names is not None:
+            names.add_many((person.id_number, (person.first_name, person.last_name))
+                           for person in people)
+
+    def _unindex_person(self, kind: str, id_number: str) -> None:
+        """
+        Drops a removed or updated person from the major or department index and from the name index.
+
+        Args:
+            kind (str): "students" or "instructors".
+            id_number (str): The ID of the person.
+        """
+
+        index = self._major_students if kind == "students" else self._department_instructors
+
+        # The previous major or department is not known when a person was changed in place
+        for id_numbers in list(index.values()):
+            if id_number in id_numbers:
+                id_numbers.discard(id_number)
+                break
+
+        if kind == "students" and self._course_bitmaps is not None:
+            self._course_bitmaps.remove_student(id_number)
+
+        names = self._name_indexes.get(kind)
+
+        if names is not None:
+            names.remove(id_number)
+
+    def _preserve(self, kind: str, keys: Iterable[str]) -> None:
+        """
+        Hands the current version of entries about to change to every open snapshot. Called by the system and by `Course` before each change.
+
+        Args:
+            kind (str): "students", "instructors" or "courses".
+            keys (Iterable[str]): The IDs of the entries about to change.
+        """
+
+        if self._snapshots:
+            for view in list(self._snapshots):
+                view._preserve(kind, keys)
+
+    def _exclusive(self) -> ContextManager[None]:
+        """
+        Returns a context manager holding back every writer of the system, so that nothing changes
+        while it is held. Used by `Journal.checkpoint`. A system without locks has nothing to hold back.
+        """
+
+        return nullcontext()
+
+    def _event_bus(self) -> EventBus:
+        """
+        Returns the event bus of the system, creating it for the first subscription.
+        """
+
+        if self._events is None:
+            self._events = EventBus(on_idle=self._detach_events)
+
+        return self._events
+
+    def _detach_events(self, bus: EventBus) -> None:
+        """
+        Drops the event bus once its last subscription closes, so changes stop building events.
+
+        Args:
+            bus (EventBus): The bus left without subscriptions.
+        """
+
+        if self._events is bus:
+            self._events = None
+
     def __str__(self) -> str:
         return f"Student Management System, ©️ 2024. \nMade with 💖 by Gabriel Okundaye"
 
@@ -0,0 +1,429 @@
+"""
+Consistent, read-only views of a StudentManagementSystem at one point in time.
+
+`StudentManagementSystem.snapshot()` returns a `SystemView` in O(1): the view shares every container
+with the live system instead of copying it. Before the system changes a student, an instructor or a
+course, it hands the current version of that one entry to every open view, so each view keeps
+reading the state it was taken at while only the touched entries are ever copied.
+
+Reads never take a lock. A view looks an entry up in its preserved entries first and falls back to
+the live system, checking its preserved entries again afterwards, since an entry is always preserved
+before it changes.
+
+Notes:
+    Only changes made through the system or a registered `Course` are seen by views. Mutating an
+    `Enrollment`, `Student` or `Instructor` object in place is not.
+"""
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional
+
+
+# An entry that did not exist when the view was taken
+MISSING = object()
+
+# An entry the view has not preserved, to be read from the live system
+_LIVE = object()
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+class _Overlay:
+    """
+    The entries of one kind preserved by a view, falling back to a live dictionary for the others.
+    """
+
+    __slots__ = ("preserved", "live", "copy", "wrap")
+
+    def __init__(self, live: Callable[[], Dict[str, Any]], copy: Callable[[Any], Any] = _identity, wrap: Callable[[Any], Any] = _identity) -> None:
+        # Entries as they were when the view was taken, copied with `copy` before their first change
+        self.preserved: Dict[str, Any] = {}
+
+        # Entries that have not changed yet are read from the live dictionary and passed through `wrap`
+        self.live = live
+        self.copy = copy
+        self.wrap = wrap
+
+    def preserve(self, keys: Iterable[str]) -> None:
+        preserved, live = self.preserved, self.live()
+
+        for key in keys:
+            if key not in preserved:
+                value = live.get(key, MISSING)
+                preserved[key] = value if value is MISSING else self.copy(value)
+
+    def get(self, key: str) -> Any:
+        value = self.preserved.get(key, _LIVE)
+
+        if value is not _LIVE:
+            return value
+
+        value = self.live().get(key, MISSING)
+
+        # The entry may have been preserved and changed while it was read
+        preserved = self.preserved.get(key, _LIVE)
+
+        if preserved is not _LIVE:
+            return preserved
+
+        return value if value is MISSING else self.wrap(value)
+
+    def keys(self) -> Iterator[str]:
+        # Keys added after the view was taken are preserved as MISSING and hidden by `_OverlayMapping`
+        live_keys = list(self.live())
+
+        return iter(dict.fromkeys(live_keys + list(self.preserved)))
+
+
+class _OverlayMapping(Mapping):
+    """
+    A read-only mapping over an overlay, hiding entries that did not exist when the view was taken.
+    """
+
+    __slots__ = ("_overlay",)
+
+    def __init__(self, overlay: _Overlay) -> None:
+        self._overlay = overlay
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._overlay.get(key)
+
+        if value is MISSING:
+            raise KeyError(key)
+
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        get = self._overlay.get
+
+        for key in self._overlay.keys():
+            if get(key) is not MISSING:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+
+class _CourseState:
+    """
+    The enrollments and instructors of a course: preserved copies, or the live dictionaries of a course that has not changed yet.
+    """
+
+    __slots__ = ("course_name", "enrolled_students", "instructors")
+
+    def __init__(self, course_name: str, enrolled_students: Mapping[str, Any], instructors: Mapping[str, Any]) -> None:
+        self.course_name = course_name
+        self.enrolled_students = enrolled_students
+        self.instructors = instructors
+
+
+def _copy_course(course: Any) -> _CourseState:
+    return _CourseState(course.course_name, dict(course.enrolled_students), dict(course.instructors))
+
+
+def _wrap_course(course: Any) -> _CourseState:
+    return _CourseState(course.course_name, course.enrolled_students, course.instructors)
+
+
+class _CourseMapping(Mapping):
+    """
+    A read-only mapping over the enrollments or instructors of a course as seen by a view.
+
+    Every access resolves the course again, so a mapping handed out before the course changes keeps
+    showing its state at the time the view was taken.
+    """
+
+    __slots__ = ("_courses", "_course_id", "_attribute")
+
+    def __init__(self, courses: _Overlay, course_id: str, attribute: str) -> None:
+        self._courses = courses
+        self._course_id = course_id
+        self._attribute = attribute
+
+    def _read(self, read: Callable[[Mapping[str, Any]], Any]) -> Any:
+        courses, course_id = self._courses, self._course_id
+
+        while True:
+            state = courses.get(course_id)
+            result = read(getattr(state, self._attribute)
+                          if state is not MISSING else {})
+
+            # A live course preserved in the meantime may have changed while it was read
+            if state is MISSING or courses.preserved.get(course_id, state) is state:
+                return result
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._read(lambda source: source.get(key, MISSING))
+
+        if value is MISSING:
+            raise KeyError(key)
+
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return self._read(lambda source: key in source)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._read(list))
+
+    def __len__(self) -> int:
+        return self._read(len)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+
+class CourseView:
+    """
+    A read-only view of a course as it was when its `SystemView` was taken.
+
+    Attributes:
+        course_name (str): The name of the course.
+        course_id (str): A unique identifier for the course.
+        enrolled_students (Mapping[str, Enrollment]): The enrolled students of the course.
+        instructors (Mapping[str, Instructor]): The instructors of the course.
+    """
+
+    __slots__ = ("course_name", "course_id",
+                 "enrolled_students", "instructors")
+
+    def __init__(self, courses: _Overlay, course_name: str, course_id: str) -> None:
+        self.course_name = course_name
+        self.course_id = course_id
+        self.enrolled_students = _CourseMapping(
+            courses, course_id, "enrolled_students")
+        self.instructors = _CourseMapping(courses, course_id, "instructors")
+
+    def find_enrolled_student(self, id_number: str) -> Optional[Any]:
+        return self.enrolled_students.get(id_number)
+
+    def find_instructor(self, id_number: str) -> Optional[Any]:
+        return self.instructors.get(id_number)
+
+    def __str__(self) -> str:
+        return f"CourseView(course_name: {self.course_name}, course_id: {self.course_id}, enrolled_students: {self.enrolled_students}, total_students_enrolled: {len(self.enrolled_students)}, instructors: {self.instructors}, total_instructors: {len(self.instructors)})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class SystemView:
+    """
+    A read-only view of a StudentManagementSystem at the moment `snapshot()` was called.
+
+    The view exposes the read methods of the system. It costs nothing to take and, while open, makes
+    the system copy each student, instructor or course once, the first time it changes. Close the
+    view, or drop every reference to it, to stop that copying.
+
+    Attributes:
+        students (Mapping[str, Student]): A read-only mapping of student IDs to `Student` instances.
+        instructors (Mapping[str, Instructor]): A read-only mapping of instructor IDs to `Instructor` instances.
+        courses (Mapping[str, CourseView]): A read-only mapping of course IDs to `CourseView` instances.
+    """
+
+    __slots__ = ("_system", "_students", "_instructors",
+                 "_courses", "__weakref__")
+
+    def __init__(self, system: Any) -> None:
+        """
+        Initializes a SystemView sharing all of its state with the live system.
+
+        Args:
+            system (StudentManagementSystem): The system to view.
+        """
+
+        self._system = system
+        self._students = _Overlay(lambda: system.students)
+        self._instructors = _Overlay(lambda: system.instructors)
+        self._courses = _Overlay(lambda: system.courses,
+                                 copy=_copy_course, wrap=_wrap_course)
+
+    def _preserve(self, kind: str, keys: Iterable[str]) -> None:
+        """
+        Keeps the current version of the given entries before the system changes them.
+
+        Args:
+            kind (str): "students", "instructors" or "courses".
+            keys (Iterable[str]): The IDs of the entries about to change.
+        """
+
+        getattr(self, f"_{kind}").preserve(keys)
+
+    @property
+    def students(self) -> Mapping[str, Any]:
+        return _OverlayMapping(self._students)
+
+    @property
+    def instructors(self) -> Mapping[str, Any]:
+        return _OverlayMapping(self._instructors)
+
+    @property
+    def courses(self) -> Mapping[str, CourseView]:
+        return MappingProxyType({course_id: self._course_view(course_id) for course_id in _OverlayMapping(self._courses)})
+
+    def _course_view(self, course_id: str) -> Optional[CourseView]:
+        state = self._courses.get(course_id)
+
+        if state is MISSING:
+            return None
+
+        return CourseView(self._courses, state.course_name, course_id)
+
+    def find_student(self, id_number: str) -> Optional[Any]:
+        """
+        Finds a student by their unique ID number.
+
+        Args:
+            id_number (str): The unique identifier of the student to find.
+
+        Returns:
+            Optional[Student]: The `Student` instance if the student is found; otherwise, `None`.
+        """
+
+        student = self._students.get(id_number)
+        return student if student is not MISSING else None
+
+    def find_instructor(self, id_number: str) -> Optional[Any]:
+        """
+        Finds an instructor by their unique ID number.
+
+        Args:
+            id_number (str): The unique identifier of the instructor to find.
+
+        Returns:
+            Optional[Instructor]: The `Instructor` instance if found, otherwise `None`.
+        """
+
+        instructor = self._instructors.get(id_number)
+        return instructor if instructor is not MISSING else None
+
+    def find_course(self, course_id: str) -> Optional[CourseView]:
+        """
+        Finds a course by its unique identifier.
+
+        Args:
+            course_id (str): The unique identifier of the course to find.
+
+        Returns:
+            Optional[CourseView]: A `CourseView` of the course if found; otherwise, `None`.
+        """
+
+        return self._course_view(course_id)
+
+    def find_course_enrollments(self, course_id: str) -> Mapping[str, Any]:
+        """
+        Retrieves the students enrolled in a specific course, including their enrollment details.
+
+        Args:
+            course_id (str): The unique identifier of the course.
+
+        Returns:
+            Mapping[str, Enrollment]: A read-only mapping of student IDs to `Enrollment` instances.
+
+        Raises:
+            KeyError: If no course with the given ID existed when the view was taken.
+        """
+
+        course = self.find_course(course_id=course_id)
+
+        if course is None:
+            raise KeyError(
+                f"Course with ID {course_id} does not exist in this management system.")
+
+        return course.enrolled_students
+
+    def find_course_enrolled_students(self, course_id: str) -> List[str]:
+        """
+        Retrieves a list of student IDs enrolled in a specific course.
+
+        Args:
+            course_id (str): The unique identifier of the course.
+
+        Returns:
+            List[str]: A list of student IDs enrolled in the specified course.
+        """
+
+        return list(self.find_course_enrollments(course_id=course_id))
+
+    def find_student_enrollments(self, id_number: str) -> Dict[str, List[Any]]:
+        """
+        Retrieves the enrollments of a specific student.
+
+        The view keeps no student to course index, so every course is checked, which costs one
+        lookup per course.
+
+        Args:
+            id_number (str): The unique identifier of the student.
+
+        Returns:
+            Dict[str, List[Enrollment]]: A dictionary mapping the student ID to the student's `Enrollment` instances.
+
+        Raises:
+            KeyError: If no student with the given ID existed when the view was taken.
+        """
+
+        if self.find_student(id_number=id_number) is None:
+            raise KeyError(
+                f"Student with ID {id_number} does not exist in this management system.")
+
+        enrollments = []
+
+        for course_id in _OverlayMapping(self._courses):
+            enrollment = self._course_view(
+                course_id).find_enrolled_student(id_number=id_number)
+
+            if enrollment is not None:
+                enrollments.append(enrollment)
+
+        return {id_number: enrollments}
+
+    def find_enrolled_student_courses(self, id_number: str) -> List[str]:
+        """
+        Retrieves a list of course IDs for which a specific student is enrolled.
+
+        Args:
+            id_number (str): The unique identifier of the student.
+
+        Returns:
+            List[str]: A list of course IDs that the student is enrolled in.
+        """
+
+        return [enrollment.course_id for enrollment in self.find_student_enrollments(id_number=id_number)[id_number]]
+
+    def find_instructor_courses(self, id_number: str) -> List[str]:
+        """
+        Retrieves a list of course IDs that a specific instructor teaches.
+
+        Args:
+            id_number (str): The unique identifier of the instructor.
+
+        Returns:
+            List[str]: A list of course IDs the instructor is assigned to.
+
+        Raises:
+            KeyError: If no instructor with the given ID existed when the view was taken.
+        """
+
+        if self.find_instructor(id_number=id_number) is None:
+            raise KeyError(
+                f"Instructor with ID {id_number} does not exist in this management system.")
+
+        return [course_id for course_id in _OverlayMapping(self._courses)
+                if self._course_view(course_id).find_instructor(id_number=id_number) is not None]
+
+    def close(self) -> None:
+        """
+        Stops the system from preserving changes for this view. The view must not be read afterwards.
+        """
+
+        self._system._snapshots.discard(self)
+
+    def __enter__(self) -> "SystemView":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()